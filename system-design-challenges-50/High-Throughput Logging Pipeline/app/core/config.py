@@ -17,14 +17,58 @@ class Settings:
     PROJECT_VERSION: str = "1.0.0"
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     
-    # Redis queue settings
+    # Redis queue settings (a stream consumed by a consumer group)
     REDIS_QUEUE_NAME: str = os.getenv("REDIS_QUEUE_NAME", "log_queue")
+    REDIS_CONSUMER_GROUP: str = os.getenv("REDIS_CONSUMER_GROUP", "log_writers")
+    REDIS_DEAD_LETTER_QUEUE: str = os.getenv("REDIS_DEAD_LETTER_QUEUE", "log_queue:dead")
+    STREAM_CLAIM_IDLE_MS: int = int(os.getenv("STREAM_CLAIM_IDLE_MS", "60000"))  # pending this long => consumer presumed dead
+    STREAM_CLAIM_INTERVAL: int = int(os.getenv("STREAM_CLAIM_INTERVAL", "30"))  # seconds
+    STREAM_MAX_DELIVERIES: int = int(os.getenv("STREAM_MAX_DELIVERIES", "5"))
+    WORKER_NAME: Optional[str] = os.getenv("WORKER_NAME")  # consumer name, defaults to host-pid
     
     # Database batch settings
     BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "1000"))
     BATCH_TIMEOUT: int = int(os.getenv("BATCH_TIMEOUT", "5"))  # seconds
     
-    # Retention settings
+    # Streaming ingest settings (POST /ingest/stream)
+    INGEST_STREAM_BATCH_SIZE: int = int(os.getenv("INGEST_STREAM_BATCH_SIZE", "500"))  # lines per XADD pipeline
+    INGEST_MAX_LINE_BYTES: int = int(os.getenv("INGEST_MAX_LINE_BYTES", "65536"))
+    INGEST_MAX_BODY_BYTES: int = int(os.getenv("INGEST_MAX_BODY_BYTES", str(256 * 1024 * 1024)))  # after decompression
+    
+    # Admission control (token buckets are per API process) and fair dequeue
+    TENANT_RATE_LIMIT: float = float(os.getenv("TENANT_RATE_LIMIT", "5000"))  # logs/second per tenant, 0 disables
+    TENANT_RATE_LIMITS: str = os.getenv("TENANT_RATE_LIMITS", "")  # overrides, e.g. "tenant-a=20000,tenant-b=500"
+    TENANT_BURST_SECONDS: float = float(os.getenv("TENANT_BURST_SECONDS", "4"))  # bucket size in seconds of rate
+    TENANT_WEIGHTS: str = os.getenv("TENANT_WEIGHTS", "")  # dequeue weights, e.g. "tenant-a=4"; others weigh 1
+    TENANT_LANES: int = int(os.getenv("TENANT_LANES", "16"))  # shared lanes for tenants not in TENANT_WEIGHTS
+    QUEUE_HIGH_WATER: int = int(os.getenv("QUEUE_HIGH_WATER", "1000000"))  # backlog at which ingest answers 429
+    QUEUE_SHED_WATER: int = int(os.getenv("QUEUE_SHED_WATER", "500000"))  # backlog at which DEBUG logs are sampled, 0 disables
+    DEBUG_SAMPLE_RATE: float = float(os.getenv("DEBUG_SAMPLE_RATE", "0.1"))  # share of DEBUG logs kept while shedding
+    QUEUE_DEPTH_TTL: float = float(os.getenv("QUEUE_DEPTH_TTL", "1"))  # seconds a queue depth reading is reused
+    QUEUE_RETRY_AFTER: int = int(os.getenv("QUEUE_RETRY_AFTER", "5"))  # seconds
+    FAIR_PROBE_COUNT: int = int(os.getenv("FAIR_PROBE_COUNT", "50"))  # entries per round from lanes that were drained
+    
+    # Query settings
+    MAX_QUERY_LIMIT: int = int(os.getenv("MAX_QUERY_LIMIT", "1000"))
+    
+    # Retention settings (enforced by dropping whole log_entries partitions)
     LOG_RETENTION_DAYS: int = int(os.getenv("LOG_RETENTION_DAYS", "30"))
+    LOG_PARTITION_INTERVAL: str = os.getenv("LOG_PARTITION_INTERVAL", "day")  # "day" or "hour"
+    LOG_PARTITION_PREMAKE: int = int(os.getenv("LOG_PARTITION_PREMAKE", "7"))  # future partitions kept ready
+    PARTITION_MAINTENANCE_INTERVAL: int = int(os.getenv("PARTITION_MAINTENANCE_INTERVAL", "3600"))  # seconds
+    
+    # Cold tier (compressed columnar segment files for aged partitions)
+    COLD_STORAGE_PATH: str = os.getenv("COLD_STORAGE_PATH", "data/cold")
+    COLD_TIER_AFTER_DAYS: int = int(os.getenv("COLD_TIER_AFTER_DAYS", "7"))  # 0 keeps everything in PostgreSQL
+    COLD_BLOCK_ROWS: int = int(os.getenv("COLD_BLOCK_ROWS", "8192"))
+    COLD_ZSTD_LEVEL: int = int(os.getenv("COLD_ZSTD_LEVEL", "6"))
+    
+    # Template mining (worker side): messages stored as a template id plus parameters
+    TEMPLATE_MINING: bool = os.getenv("TEMPLATE_MINING", "True").lower() == "true"
+    TEMPLATE_SIMILARITY: float = float(os.getenv("TEMPLATE_SIMILARITY", "0.5"))  # share of tokens that must fit
+    TEMPLATE_TREE_DEPTH: int = int(os.getenv("TEMPLATE_TREE_DEPTH", "4"))
+    TEMPLATE_MAX_CHILDREN: int = int(os.getenv("TEMPLATE_MAX_CHILDREN", "100"))
+    TEMPLATE_MAX_TOKENS: int = int(os.getenv("TEMPLATE_MAX_TOKENS", "80"))  # longer messages are stored as is
+    TEMPLATE_MAX_TEMPLATES: int = int(os.getenv("TEMPLATE_MAX_TEMPLATES", "20000"))  # per worker process
 
 settings = Settings()
\ No newline at end of file
@@ -30,6 +30,10 @@ class LogIngestionError(LoggingPipelineException):
     """Raised when log ingestion fails"""
     pass
 
+class PayloadTooLargeError(LoggingPipelineException):
+    """Raised when a request body exceeds the ingest size limit"""
+    pass
+
 # HTTP exceptions
 class InvalidAPIKeyException(HTTPException):
     def __init__(self):
@@ -51,4 +55,25 @@ class LogNotFoundException(HTTPException):
         super().__init__(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Log with ID {log_id} not found",
-        )
\ No newline at end of file
+        )
+
+class TemplateNotFoundException(HTTPException):
+    def __init__(self, template_id: int):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template with ID {template_id} not found",
+        )
+
+class PayloadTooLargeException(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=detail,
+        )
+
+class IngestUnavailableException(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+        )
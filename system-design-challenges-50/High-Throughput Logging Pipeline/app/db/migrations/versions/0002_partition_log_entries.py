@@ -0,0 +1,103 @@
+"""Partition log_entries by timestamp
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-11-20 10:00:00.000000
+
+"""
+from datetime import datetime, timedelta, timezone
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.core.config import settings
+from app.db import partitions
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, timestamp, level, message, service, tenant_id, trace_id, span_id, metadata_, created_at"
+
+
+def upgrade():
+    # A regular table cannot be turned into a partitioned one in place: build
+    # the partitioned table next to it and copy over the rows still in retention
+    op.rename_table('log_entries', 'log_entries_unpartitioned')
+    op.execute("ALTER INDEX log_entries_pkey RENAME TO log_entries_unpartitioned_pkey")
+    for index in ('idx_log_entries_level_timestamp', 'idx_log_entries_service_timestamp',
+                  'idx_log_entries_tenant_timestamp', 'ix_log_entries_service',
+                  'ix_log_entries_tenant_id', 'ix_log_entries_timestamp'):
+        op.drop_index(index, table_name='log_entries_unpartitioned')
+
+    op.create_table('log_entries',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('level', postgresql.ENUM(name='loglevel', create_type=False), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('service', sa.String(), nullable=True),
+        sa.Column('tenant_id', sa.String(), nullable=True),
+        sa.Column('trace_id', sa.String(), nullable=True),
+        sa.Column('span_id', sa.String(), nullable=True),
+        sa.Column('metadata_', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'timestamp'),
+        postgresql_partition_by='RANGE (timestamp)'
+    )
+    # Indexes on the parent are created on every partition, current and future.
+    # The single-column service/tenant indexes are dropped: the composite
+    # (service, timestamp) and (tenant_id, timestamp) indexes cover them.
+    op.create_index('ix_log_entries_timestamp', 'log_entries', ['timestamp'], unique=False)
+    op.create_index('ix_log_entries_trace_id', 'log_entries', ['trace_id'], unique=False)
+    op.create_index('idx_log_entries_service_timestamp', 'log_entries', ['service', 'timestamp'], unique=False)
+    op.create_index('idx_log_entries_tenant_timestamp', 'log_entries', ['tenant_id', 'timestamp'], unique=False)
+    op.create_index('idx_log_entries_level_timestamp', 'log_entries', ['level', 'timestamp'], unique=False)
+
+    interval = settings.LOG_PARTITION_INTERVAL
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=settings.LOG_RETENTION_DAYS)
+    horizon = now + partitions.PARTITION_INTERVALS[interval] * settings.LOG_PARTITION_PREMAKE
+    for start in partitions.partition_starts(cutoff, horizon, interval):
+        op.execute(partitions.create_partition_sql(start, interval))
+    op.execute(partitions.create_default_partition_sql())
+
+    op.execute(
+        f"INSERT INTO log_entries ({COLUMNS}) "
+        f"SELECT id, COALESCE(timestamp, created_at, now()), level, message, service, tenant_id, "
+        f"trace_id, span_id, metadata_, created_at FROM log_entries_unpartitioned "
+        f"WHERE COALESCE(timestamp, created_at, now()) >= '{cutoff.isoformat()}'"
+    )
+    op.drop_table('log_entries_unpartitioned')
+
+
+def downgrade():
+    op.rename_table('log_entries', 'log_entries_partitioned')
+    op.execute("ALTER INDEX log_entries_pkey RENAME TO log_entries_partitioned_pkey")
+    for index in ('ix_log_entries_timestamp', 'ix_log_entries_trace_id', 'idx_log_entries_service_timestamp',
+                  'idx_log_entries_tenant_timestamp', 'idx_log_entries_level_timestamp'):
+        op.drop_index(index, table_name='log_entries_partitioned')
+
+    op.create_table('log_entries',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('level', postgresql.ENUM(name='loglevel', create_type=False), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('service', sa.String(), nullable=True),
+        sa.Column('tenant_id', sa.String(), nullable=True),
+        sa.Column('trace_id', sa.String(), nullable=True),
+        sa.Column('span_id', sa.String(), nullable=True),
+        sa.Column('metadata_', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f"INSERT INTO log_entries ({COLUMNS}) SELECT {COLUMNS} FROM log_entries_partitioned")
+    # Dropping the parent drops every partition with it
+    op.drop_table('log_entries_partitioned')
+
+    op.create_index('idx_log_entries_level_timestamp', 'log_entries', ['level', 'timestamp'], unique=False)
+    op.create_index('idx_log_entries_service_timestamp', 'log_entries', ['service', 'timestamp'], unique=False)
+    op.create_index('idx_log_entries_tenant_timestamp', 'log_entries', ['tenant_id', 'timestamp'], unique=False)
+    op.create_index(op.f('ix_log_entries_service'), 'log_entries', ['service'], unique=False)
+    op.create_index(op.f('ix_log_entries_tenant_id'), 'log_entries', ['tenant_id'], unique=False)
+    op.create_index(op.f('ix_log_entries_timestamp'), 'log_entries', ['timestamp'], unique=False)
@@ -0,0 +1,27 @@
+"""Add inverted index over log message tokens
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-11-24 10:00:00.000000
+
+"""
+from alembic import op
+from app.db.models import SEARCH_CONFIG
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Created on the partitioned parent, so every partition gets its own GIN index
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_log_entries_message_search ON log_entries "
+        f"USING gin (to_tsvector('{SEARCH_CONFIG}', message))"
+    )
+
+
+def downgrade():
+    op.drop_index('idx_log_entries_message_search', table_name='log_entries')
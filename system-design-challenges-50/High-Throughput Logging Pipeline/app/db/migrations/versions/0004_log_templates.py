@@ -0,0 +1,72 @@
+"""Store mined log messages as template references
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-12-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.db.models import LOG_SEARCH_EXPRESSION, SEARCH_CONFIG
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('log_templates',
+        sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('template', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('log_template_counts',
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('template_id', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('service', sa.String(), nullable=False),
+        sa.Column('level', sa.String(), nullable=False),
+        sa.Column('tenant_id', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'template_id', 'service', 'level', 'tenant_id')
+    )
+    op.create_index('idx_log_template_counts_template_bucket', 'log_template_counts',
+                    ['template_id', 'bucket'], unique=False)
+
+    # Added to the partitioned parent, so every partition gets the columns and index.
+    # Existing rows keep their message; only newly written logs are mined.
+    op.add_column('log_entries', sa.Column('template_id', sa.BigInteger(), nullable=True))
+    op.add_column('log_entries', sa.Column('params', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_index('idx_log_entries_template_timestamp', 'log_entries', ['template_id', 'timestamp'], unique=False)
+
+    op.drop_index('idx_log_entries_message_search', table_name='log_entries')
+    op.execute(f"CREATE INDEX IF NOT EXISTS idx_log_entries_search ON log_entries USING gin (({LOG_SEARCH_EXPRESSION}))")
+
+
+def downgrade():
+    # Put the text of mined logs back before the template columns go away
+    op.execute(
+        "UPDATE log_entries AS e SET message = ("
+        "SELECT string_agg(CASE WHEN w.token = '<*>' THEN e.params ->> (w.slot - 1)::int ELSE w.token END, "
+        "' ' ORDER BY w.ord) FROM ("
+        "SELECT t.token, t.ord, count(*) FILTER (WHERE t.token = '<*>') OVER (ORDER BY t.ord) AS slot "
+        "FROM log_templates AS lt, unnest(string_to_array(lt.template, ' ')) WITH ORDINALITY AS t(token, ord) "
+        "WHERE lt.id = e.template_id"
+        ") AS w"
+        ") WHERE e.message IS NULL AND e.template_id IS NOT NULL"
+    )
+    op.drop_index('idx_log_entries_search', table_name='log_entries')
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_log_entries_message_search ON log_entries "
+        f"USING gin (to_tsvector('{SEARCH_CONFIG}', message))"
+    )
+    op.drop_index('idx_log_entries_template_timestamp', table_name='log_entries')
+    op.drop_column('log_entries', 'params')
+    op.drop_column('log_entries', 'template_id')
+
+    op.drop_index('idx_log_template_counts_template_bucket', table_name='log_template_counts')
+    op.drop_table('log_template_counts')
+    op.drop_table('log_templates')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, Enum, Index
+from sqlalchemy import BigInteger, Column, String, Text, DateTime, Integer, Enum, Index, DDL, event, literal_column
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSONB
 from app.db.base import Base
@@ -9,12 +9,17 @@ import uuid
 class LogEntry(Base):
     __tablename__ = "log_entries"
     
+    # Range-partitioned on timestamp (see app/db/partitions.py), which must be part of the primary key
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    timestamp = Column(DateTime(timezone=True), default=datetime.utcnow, index=True)
-    level = Column(Enum(LogLevel), index=True)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, default=datetime.utcnow, index=True)
+    level = Column(Enum(LogLevel))
+    # Either the message as is, or (when the worker mined it) NULL with its
+    # template in log_templates and the values of the template's wildcards
     message = Column(Text)
-    service = Column(String, index=True)
-    tenant_id = Column(String, index=True)
+    template_id = Column(BigInteger)
+    params = Column(JSONB)
+    service = Column(String)
+    tenant_id = Column(String)
     trace_id = Column(String, index=True)
     span_id = Column(String)
     metadata_ = Column(JSONB)  # Renamed from 'metadata' to avoid conflict
@@ -24,8 +29,77 @@ class LogEntry(Base):
         Index('idx_log_entries_service_timestamp', 'service', 'timestamp'),
         Index('idx_log_entries_tenant_timestamp', 'tenant_id', 'timestamp'),
         Index('idx_log_entries_level_timestamp', 'level', 'timestamp'),
+        Index('idx_log_entries_template_timestamp', 'template_id', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
     )
 
+class LogTemplate(Base):
+    """
+    Catalogue of mined message templates. Rows never change: the id is a
+    hash of the text (see app/services/template_miner.py).
+    """
+    __tablename__ = "log_templates"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    template = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class LogTemplateCount(Base):
+    """
+    Hourly log counts per template, kept up to date by the worker in the
+    same transaction as the logs, so pattern statistics never scan
+    log_entries. Logs without a tenant count under ''.
+    """
+    __tablename__ = "log_template_counts"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    template_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    service = Column(String, primary_key=True)
+    level = Column(String, primary_key=True)
+    tenant_id = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index('idx_log_template_counts_template_bucket', 'template_id', 'bucket'),
+    )
+
+# Text search configuration used to tokenize messages. 'simple' lowercases
+# without stemming, so error codes and identifiers stay searchable as typed.
+SEARCH_CONFIG = "simple"
+
+# Indexed text of a log row: the message if stored as is, else the template
+# parameters (to_tsvector indexes the strings of a JSON array). Spelled as
+# SQL once so the index and the queries use the very same expression.
+LOG_SEARCH_EXPRESSION = (
+    f"to_tsvector('{SEARCH_CONFIG}', coalesce(message, '')) || "
+    f"to_tsvector('{SEARCH_CONFIG}', coalesce(params, '[]'::jsonb))"
+)
+
+def log_search_vector():
+    """
+    Tokenized message and template parameters, as indexed by
+    idx_log_entries_search. Queries must use this exact expression for
+    PostgreSQL to use the index.
+    """
+    config = literal_column(f"'{SEARCH_CONFIG}'")
+    return func.to_tsvector(config, func.coalesce(LogEntry.message, literal_column("''"))).op("||")(
+        func.to_tsvector(config, func.coalesce(LogEntry.params, literal_column("'[]'::jsonb")))
+    )
+
+def template_search_vector():
+    """Tokenized template text; the catalogue is small enough to scan"""
+    return func.to_tsvector(literal_column(f"'{SEARCH_CONFIG}'"), LogTemplate.template)
+
+# Inverted index over message tokens, built by PostgreSQL at insert time and
+# created per partition like the other indexes
+event.listen(
+    LogEntry.__table__,
+    "after_create",
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS idx_log_entries_search ON log_entries USING gin (({LOG_SEARCH_EXPRESSION}))"
+    ).execute_if(dialect="postgresql"),
+)
+
 class Tenant(Base):
     __tablename__ = "tenants"
     
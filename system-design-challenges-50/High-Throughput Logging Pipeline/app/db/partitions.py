@@ -0,0 +1,141 @@
+"""
+Time-range partitions of log_entries
+
+log_entries is range-partitioned on ``timestamp`` into one table per day
+(or hour, per ``LOG_PARTITION_INTERVAL``) named ``log_entries_pYYYYMMDD``
+(``log_entries_pYYYYMMDDHH``). Each partition carries its own small
+indexes, so index maintenance does not grow with retained volume; queries
+with a time range only scan the partitions it overlaps, and retention
+detaches and drops whole partitions instead of deleting rows.
+
+Rows outside every partition land in ``log_entries_default``. Partitions
+are created ``LOG_PARTITION_PREMAKE`` intervals ahead so that only
+stragglers with far-off timestamps end up there; when a partition is later
+created for their range, they are moved into it.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.utils.time_utils import convert_to_utc
+
+PARENT_TABLE = "log_entries"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+PARTITION_INTERVALS = {
+    "day": timedelta(days=1),
+    "hour": timedelta(hours=1),
+}
+_NAME_FORMATS = {
+    "day": "%Y%m%d",
+    "hour": "%Y%m%d%H",
+}
+
+def partition_start(ts: datetime, interval: str) -> datetime:
+    """Start of the partition holding ``ts``, in UTC"""
+    ts = convert_to_utc(ts)
+    if interval == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def partition_name(start: datetime, interval: str) -> str:
+    return f"{PARENT_TABLE}_p{start.strftime(_NAME_FORMATS[interval])}"
+
+def parse_partition_name(name: str, interval: str) -> Optional[datetime]:
+    """Start of a partition from its name, None for tables this module does not manage"""
+    match = re.fullmatch(rf"{PARENT_TABLE}_p(\d+)", name)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), _NAME_FORMATS[interval]).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def partition_starts(start: datetime, end: datetime, interval: str) -> List[datetime]:
+    """Starts of all partitions overlapping ``[start, end]``"""
+    step = PARTITION_INTERVALS[interval]
+    current = partition_start(start, interval)
+    end = convert_to_utc(end)
+    starts = []
+    while current <= end:
+        starts.append(current)
+        current += step
+    return starts
+
+def create_partition_sql(start: datetime, interval: str) -> str:
+    end = start + PARTITION_INTERVALS[interval]
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start, interval)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+def create_default_partition_sql() -> str:
+    return f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+
+def missing_partitions(existing: Iterable[str], now: datetime, interval: str, premake: int) -> List[datetime]:
+    """Starts of the current and next ``premake`` partitions that do not exist yet"""
+    existing = set(existing)
+    horizon = partition_start(now, interval) + PARTITION_INTERVALS[interval] * premake
+    return [
+        start for start in partition_starts(now, horizon, interval)
+        if partition_name(start, interval) not in existing
+    ]
+
+def expired_partitions(existing: Iterable[str], now: datetime, interval: str, retention_days: int) -> List[str]:
+    """Partitions whose whole range is older than the retention cutoff, oldest first"""
+    cutoff = convert_to_utc(now) - timedelta(days=retention_days)
+    expired = []
+    for name in existing:
+        start = parse_partition_name(name, interval)
+        if start is not None and start + PARTITION_INTERVALS[interval] <= cutoff:
+            expired.append((start, name))
+    return [name for _, name in sorted(expired)]
+
+async def list_partitions(conn: AsyncConnection) -> List[str]:
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {"parent": PARENT_TABLE})
+    return [row[0] for row in result]
+
+async def create_partition(conn: AsyncConnection, start: datetime, interval: str) -> str:
+    """
+    Create a partition. PostgreSQL refuses to create one while the default
+    partition holds rows in its range (e.g. logs stamped beyond the premake
+    horizon), so those are moved over: the default partition is detached,
+    the new partition created, the rows moved through the parent and the
+    default partition reattached, all in the caller's transaction.
+    """
+    end = start + PARTITION_INTERVALS[interval]
+    bounds = {"start": start, "end": end}
+    result = await conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end)"
+    ), bounds)
+    if not result.scalar():
+        await conn.execute(text(create_partition_sql(start, interval)))
+        return partition_name(start, interval)
+
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    await conn.execute(text(create_partition_sql(start, interval)))
+    await conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end "
+        f"RETURNING *) INSERT INTO {PARENT_TABLE} SELECT * FROM moved"
+    ), bounds)
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return partition_name(start, interval)
+
+async def drop_partition(conn: AsyncConnection, name: str) -> None:
+    """
+    Detach then drop a partition: a catalog change whose cost does not
+    depend on how many rows the partition holds
+    """
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    await conn.execute(text(f"DROP TABLE {name}"))
+
+async def purge_default_partition(conn: AsyncConnection, cutoff: datetime) -> int:
+    """Delete expired stragglers from the default partition"""
+    result = await conn.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < :cutoff"), {"cutoff": cutoff}
+    )
+    return result.rowcount
@@ -13,12 +13,13 @@ app = FastAPI(
 )
 
 # Import routers
-from app.routers import health, ingest, query
+from app.routers import health, ingest, query, templates
 
 # Include routers
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(ingest.router, prefix="/ingest", tags=["ingest"])
 app.include_router(query.router, prefix="/query", tags=["query"])
+app.include_router(templates.router, prefix="/templates", tags=["templates"])
 
 @app.get("/")
 async def root():
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, status, Header
-from typing import List
-from app.schemas.logs import LogIn, LogBatchIn, LogOut
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status, Header
+from fastapi.responses import JSONResponse
+from typing import List, Optional
+from app.schemas.logs import LogIn, LogBatchIn, LogOut, StreamIngestResult
 from app.services.log_ingestion import LogIngestionService
-from app.core.exceptions import InvalidAPIKeyException
+from app.core.exceptions import (
+    InvalidAPIKeyException,
+    IngestUnavailableException,
+    LogIngestionError,
+    LogValidationException,
+    PayloadTooLargeError,
+    PayloadTooLargeException,
+    ValidationError,
+)
 from app.core.config import settings
 from app.utils.security_utils import verify_api_key
 
 router = APIRouter()
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+
+ingestion_service = LogIngestionService()
+
 def get_api_key(x_api_key: str = Header(...)) -> str:
     """
     Dependency to verify API key from header
@@ -43,4 +56,44 @@ async def ingest_logs_batch(
     # 1. Validate all log entries
     # 2. Add to Redis queue in batch
     # 3. Return success
-    pass
\ No newline at end of file
+    pass
+
+@router.post("/stream", response_model=StreamIngestResult, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_logs_stream(
+    request: Request,
+    content_encoding: Optional[str] = Header(None),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Ingest newline-delimited JSON logs (``application/x-ndjson``), one
+    ``LogIn`` object per line, optionally with ``Content-Encoding: gzip``
+    or ``zstd``. The body is processed as it arrives and valid lines are
+    queued unchanged; invalid lines are skipped and reported.
+
+    When the tenant of a line is over its rate, or the queue is backed
+    up, the response is 429 with ``Retry-After``; lines before
+    ``retry_from_line`` were queued and the rest should be sent again.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in NDJSON_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of {', '.join(NDJSON_CONTENT_TYPES)}"
+        )
+    try:
+        summary = await ingestion_service.ingest_ndjson(request.stream(), content_encoding)
+    except ValidationError as e:
+        raise LogValidationException(e.message)
+    except PayloadTooLargeError as e:
+        raise PayloadTooLargeException(e.message)
+    except LogIngestionError as e:
+        raise IngestUnavailableException(e.message)
+    retry_after = summary.pop("retry_after", None)
+    result = StreamIngestResult(**summary)
+    if retry_after is not None:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content=result.dict(),
+            headers={"Retry-After": str(ingestion_service.admission.retry_after(retry_after))}
+        )
+    return result
@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.schemas.query import LogQueryParams, LogQueryResponse
+from datetime import datetime
+from app.schemas.query import LogQueryParams, LogQueryResponse, LogSearchResult
 from app.schemas.logs import LogLevel
-from app.core.exceptions import InvalidAPIKeyException
+from app.core.config import settings
+from app.core.exceptions import InvalidAPIKeyException, LogValidationException, ValidationError
+from app.db.base import get_db
+from app.services.db_service import DBService
 from app.utils.security_utils import verify_api_key
 
 router = APIRouter()
@@ -15,22 +20,69 @@ def get_api_key(x_api_key: str = Query(...)) -> str:
         raise InvalidAPIKeyException()
     return x_api_key
 
+def search_result(log) -> LogSearchResult:
+    """
+    Result for a hot row or a row read back from a cold segment. Built from
+    the attributes directly rather than with ``from_orm``, which pydantic 2
+    only allows on models configured with ``from_attributes``.
+    """
+    return LogSearchResult(
+        id=log.id,
+        timestamp=log.timestamp,
+        level=log.level,
+        message=log.message,
+        service=log.service,
+        tenant_id=log.tenant_id,
+        trace_id=log.trace_id,
+        span_id=log.span_id
+    )
+
 @router.get("/", response_model=LogQueryResponse, status_code=status.HTTP_200_OK)
 async def query_logs(
     service: Optional[str] = None,
     tenant_id: Optional[str] = None,
     level: Optional[LogLevel] = None,
-    start_time: Optional[str] = None,
-    end_time: Optional[str] = None,
-    limit: int = 100,
-    offset: int = 0,
-    api_key: str = Depends(get_api_key)
+    trace_id: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    search: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=settings.MAX_QUERY_LIMIT),
+    cursor: Optional[str] = None,
+    exact: bool = False,
+    api_key: str = Depends(get_api_key),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Query logs with filters
+    Query logs with filters, newest first.
+
+    Pass the returned ``next_cursor`` as ``cursor`` to get the next page.
+    ``total`` is the planner's estimate of the number of matches unless
+    ``exact=true`` asks for a real count.
     """
-    # In a real implementation, this would:
-    # 1. Parse query parameters
-    # 2. Query database with filters
-    # 3. Return paginated results
-    pass
\ No newline at end of file
+    query_params = LogQueryParams(
+        service=service,
+        tenant_id=tenant_id,
+        level=level,
+        trace_id=trace_id,
+        start_time=start_time,
+        end_time=end_time,
+        search=search,
+        limit=limit,
+        cursor=cursor
+    )
+    try:
+        logs, next_cursor = await DBService.query_logs(db, query_params)
+        if exact:
+            total = await DBService.get_log_count(db, query_params)
+        else:
+            total = await DBService.estimate_log_count(db, query_params)
+    except ValidationError as e:
+        raise LogValidationException(e.message)
+
+    return LogQueryResponse(
+        results=[search_result(log) for log in logs],
+        total=total,
+        total_exact=exact,
+        limit=limit,
+        next_cursor=next_cursor
+    )
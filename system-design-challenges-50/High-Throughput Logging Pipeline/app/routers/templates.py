@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime
+from app.schemas.query import LogQueryParams
+from app.schemas.logs import LogLevel
+from app.schemas.templates import (
+    TemplateCount,
+    TemplateCountsResponse,
+    TemplateInterval,
+    TemplateSeriesPoint,
+    TemplateSeriesResponse,
+)
+from app.core.config import settings
+from app.core.exceptions import TemplateNotFoundException
+from app.db.base import get_db
+from app.routers.query import get_api_key
+from app.services.db_service import DBService
+
+router = APIRouter()
+
+@router.get("/", response_model=TemplateCountsResponse, status_code=status.HTTP_200_OK)
+async def top_templates(
+    service: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    level: Optional[LogLevel] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=settings.MAX_QUERY_LIMIT),
+    api_key: str = Depends(get_api_key),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    The most frequent message templates, e.g. the top error patterns with
+    ``level=ERROR``. Served from hourly counts, so the time range is
+    applied at hour granularity. A pattern mined as several templates is
+    one result; ``template_ids`` lists them for ``/{template_id}/counts``.
+    """
+    query_params = LogQueryParams(
+        service=service,
+        tenant_id=tenant_id,
+        level=level,
+        start_time=start_time,
+        end_time=end_time,
+        limit=limit
+    )
+    counts = await DBService.top_templates(db, query_params)
+    return TemplateCountsResponse(
+        results=[
+            TemplateCount(template_id=key, template=template, count=count, template_ids=ids)
+            for key, template, count, ids in counts
+        ],
+        limit=limit
+    )
+
+@router.get("/{template_id}/counts", response_model=TemplateSeriesResponse, status_code=status.HTTP_200_OK)
+async def template_counts(
+    template_id: int,
+    interval: TemplateInterval = TemplateInterval.HOUR,
+    service: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    level: Optional[LogLevel] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    api_key: str = Depends(get_api_key),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Counts of one template over time, per hour or per day
+    """
+    template = await DBService.get_template(db, template_id)
+    if template is None:
+        raise TemplateNotFoundException(template_id)
+    query_params = LogQueryParams(
+        service=service,
+        tenant_id=tenant_id,
+        level=level,
+        start_time=start_time,
+        end_time=end_time
+    )
+    series = await DBService.template_series(db, template_id, query_params, interval.value)
+    return TemplateSeriesResponse(
+        template_id=template_id,
+        template=template,
+        interval=interval,
+        points=[TemplateSeriesPoint(bucket=bucket, count=count) for bucket, count in series]
+    )
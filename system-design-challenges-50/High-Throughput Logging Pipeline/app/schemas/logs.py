@@ -29,6 +29,17 @@ class LogOut(LogIn):
 
 class LogBatchIn(BaseModel):
     logs: List[LogIn]
+
+class StreamIngestError(BaseModel):
+    line: int
+    error: str
+
+class StreamIngestResult(BaseModel):
+    accepted: int
+    rejected: int
+    shed: int = 0  # DEBUG logs dropped while the queue was under pressure
+    errors: List[StreamIngestError]  # the first rejected lines only
+    retry_from_line: Optional[int] = None  # set when throttled: resend from this line
     
 class LogQuery(BaseModel):
     service: Optional[str] = None
@@ -7,10 +7,12 @@ class LogQueryParams(BaseModel):
     service: Optional[str] = None
     tenant_id: Optional[str] = None
     level: Optional[LogLevel] = None
+    trace_id: Optional[str] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    search: Optional[str] = None  # message search expression, see app/utils/search_utils.py
     limit: Optional[int] = 100
-    offset: Optional[int] = 0
+    cursor: Optional[str] = None  # next_cursor of the previous page
 
 class LogSearchResult(BaseModel):
     id: str
@@ -22,8 +24,12 @@ class LogSearchResult(BaseModel):
     trace_id: Optional[str] = None
     span_id: Optional[str] = None
 
+    class Config:
+        orm_mode = True
+
 class LogQueryResponse(BaseModel):
     results: List[LogSearchResult]
     total: int
+    total_exact: bool  # False when total is the planner estimate
     limit: int
-    offset: int
\ No newline at end of file
+    next_cursor: Optional[str] = None
\ No newline at end of file
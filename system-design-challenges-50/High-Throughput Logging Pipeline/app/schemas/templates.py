@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+from enum import Enum
+
+class TemplateInterval(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+class TemplateCount(BaseModel):
+    template_id: int  # the most frequent of template_ids
+    template: str  # variable tokens are shown as <*>
+    count: int
+    template_ids: List[int]  # every template of the pattern included in count
+
+class TemplateCountsResponse(BaseModel):
+    results: List[TemplateCount]
+    limit: int
+
+class TemplateSeriesPoint(BaseModel):
+    bucket: datetime  # start of the hour or day
+    count: int
+
+class TemplateSeriesResponse(BaseModel):
+    template_id: int
+    template: str
+    interval: TemplateInterval
+    points: List[TemplateSeriesPoint]  # oldest first, empty intervals left out
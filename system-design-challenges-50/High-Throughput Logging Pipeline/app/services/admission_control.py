@@ -0,0 +1,151 @@
+import math
+import random
+import time
+from typing import Callable, Dict, Optional
+from app.core.config import settings
+
+# Buckets beyond this many are pruned of those that have refilled completely
+MAX_TRACKED_TENANTS = 10000
+
+def parse_tenant_map(value: str) -> Dict[str, float]:
+    """
+    Parse a ``"tenant-a=4,tenant-b=0.5"`` setting into a dict
+
+    Raises:
+        ValueError: If an item is not ``tenant=number``
+    """
+    result = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        tenant, sep, number = item.partition("=")
+        if not sep or not tenant.strip():
+            raise ValueError(f"Expected tenant=number, got {item!r}")
+        result[tenant.strip()] = float(number)
+    return result
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at ``rate`` tokens per second up to
+    ``capacity``, and each admitted log takes one token.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float, count: int = 1) -> float:
+        """
+        Take ``count`` tokens if there are enough
+
+        Returns:
+            float: 0 if the tokens were taken, else seconds until they will be there
+        """
+        self.refill(now)
+        if self.tokens >= count:
+            self.tokens -= count
+            return 0.0
+        return (count - self.tokens) / self.rate
+
+class AdmissionController:
+    """
+    Decides which logs the API lets into the queue.
+
+    Three checks, cheapest first:
+
+    - Queue depth. Past ``high_water`` entries everything is refused until
+      the workers catch up; past ``shed_water`` only a ``debug_sample_rate``
+      share of DEBUG logs is kept. The depth is read from Redis at most
+      every ``depth_ttl`` seconds by the caller (see ``needs_queue_depth``).
+    - A token bucket per tenant (logs without a tenant share one), so a
+      tenant sending above its rate is throttled without affecting others.
+
+    State is per process: with N API replicas a tenant can send N times
+    its configured rate.
+    """
+
+    def __init__(
+        self,
+        rate: float = settings.TENANT_RATE_LIMIT,
+        rate_overrides: Optional[Dict[str, float]] = None,
+        burst_seconds: float = settings.TENANT_BURST_SECONDS,
+        high_water: int = settings.QUEUE_HIGH_WATER,
+        shed_water: int = settings.QUEUE_SHED_WATER,
+        debug_sample_rate: float = settings.DEBUG_SAMPLE_RATE,
+        depth_ttl: float = settings.QUEUE_DEPTH_TTL,
+        queue_retry_after: int = settings.QUEUE_RETRY_AFTER,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.rate_overrides = parse_tenant_map(settings.TENANT_RATE_LIMITS) if rate_overrides is None else rate_overrides
+        self.burst_seconds = burst_seconds
+        self.high_water = high_water
+        self.shed_water = shed_water
+        self.debug_sample_rate = debug_sample_rate
+        self.depth_ttl = depth_ttl
+        self.queue_retry_after = queue_retry_after
+        self.clock = clock
+        self.buckets: Dict[Optional[str], TokenBucket] = {}
+        self.queue_depth = 0
+        self.depth_read_at: Optional[float] = None
+
+    def needs_queue_depth(self) -> bool:
+        """Whether the cached queue depth is too old to decide on"""
+        return self.depth_read_at is None or self.clock() - self.depth_read_at >= self.depth_ttl
+
+    def set_queue_depth(self, depth: int) -> None:
+        self.queue_depth = depth
+        self.depth_read_at = self.clock()
+
+    def queue_full(self) -> bool:
+        return bool(self.high_water) and self.queue_depth >= self.high_water
+
+    def shedding(self) -> bool:
+        return bool(self.shed_water) and self.queue_depth >= self.shed_water
+
+    def keep(self, level: Optional[str]) -> bool:
+        """
+        Whether a log at ``level`` should be queued at all; False means it
+        is shed (dropped on purpose, not to be retried)
+        """
+        if level != "DEBUG" or not self.shedding():
+            return True
+        return random.random() < self.debug_sample_rate
+
+    def acquire(self, tenant_id: Optional[str], count: int = 1) -> float:
+        """
+        Take ``count`` tokens from the tenant's bucket
+
+        Returns:
+            float: 0 if admitted, else seconds until the tenant may send again
+        """
+        rate = self.rate_overrides.get(tenant_id, self.rate) if tenant_id else self.rate
+        if rate <= 0:
+            return 0.0
+        now = self.clock()
+        bucket = self.buckets.get(tenant_id)
+        if bucket is None:
+            if len(self.buckets) >= MAX_TRACKED_TENANTS:
+                self.prune(now)
+            bucket = self.buckets[tenant_id] = TokenBucket(rate, max(rate * self.burst_seconds, count), now)
+        return bucket.take(now, count)
+
+    def prune(self, now: float) -> None:
+        """Forget buckets that have refilled completely; a new one is identical"""
+        for tenant_id, bucket in list(self.buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del self.buckets[tenant_id]
+
+    @staticmethod
+    def retry_after(seconds: float) -> int:
+        """Whole seconds for a Retry-After header"""
+        return max(1, math.ceil(seconds))
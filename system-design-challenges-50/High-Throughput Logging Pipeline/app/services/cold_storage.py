@@ -0,0 +1,404 @@
+"""
+Cold tier: compressed columnar segment files for aged logs
+
+Once a log_entries partition is older than ``COLD_TIER_AFTER_DAYS`` the
+maintenance job exports it to one segment file under
+``COLD_STORAGE_PATH`` and drops the partition. A segment holds the rows
+sorted by (timestamp, id) in blocks of ``COLD_BLOCK_ROWS``:
+
+    MAGIC | block column chunks ... | footer (zstd JSON) | footer length | MAGIC
+
+Within a block every column is stored separately: timestamps as
+delta-encoded int64 microseconds, service/level/tenant_id as codes into
+segment-wide dictionaries, the remaining text columns as zstd-compressed
+JSON arrays. The footer keeps the dictionaries and, per block, the
+min/max timestamp, the dictionary codes present, chunk offsets and a
+bloom filter over trace_id. Queries read the footer, skip every block
+these rule out, and only decompress the columns they need from the rest.
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import zstandard
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.db.models import LogEntry
+from app.schemas.logs import LogLevel
+from app.utils.search_utils import SearchNode, match_search
+
+logger = get_logger("cold_storage")
+
+MAGIC = b"LOGSEG01"
+SEGMENT_SUFFIX = ".seg"
+_FOOTER_LENGTH = struct.Struct("<Q")
+
+DICTIONARY_COLUMNS = ("service", "level", "tenant_id")
+TEXT_COLUMNS = ("id", "message", "trace_id", "span_id", "metadata_")
+BLOOM_BITS_PER_VALUE = 10
+BLOOM_HASHES = 7
+
+# (timestamp in epoch microseconds, id): the keyset order of log queries
+Position = Tuple[int, str]
+
+# Decompression contexts are not thread-safe and segment reads run in
+# asyncio.to_thread workers, so every thread gets its own
+_local = threading.local()
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    decompressor = getattr(_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+def to_micros(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // _MICROSECOND
+
+def from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+def _bloom_positions(value: str, bits: int) -> List[int]:
+    digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % bits for i in range(BLOOM_HASHES)]
+
+def bloom_build(values: Iterable[str], bits: int) -> bytes:
+    bloom = bytearray((bits + 7) // 8)
+    for value in values:
+        for position in _bloom_positions(value, bits):
+            bloom[position >> 3] |= 1 << (position & 7)
+    return bytes(bloom)
+
+def bloom_contains(bloom: bytes, value: str) -> bool:
+    bits = len(bloom) * 8
+    return all(bloom[position >> 3] & (1 << (position & 7)) for position in _bloom_positions(value, bits))
+
+class SegmentWriter:
+    """
+    Streams rows, already sorted by (timestamp, id), into a segment file.
+    The file is written under a temporary name and renamed on ``close``,
+    so readers never see a partial segment.
+    """
+
+    def __init__(self, path: str, block_rows: int = 8192, level: int = 6,
+                 on_close: Optional[Callable[[], None]] = None):
+        self.path = path
+        self.on_close = on_close
+        self.block_rows = block_rows
+        self.row_count = 0
+        self._file = open(path + ".tmp", "wb")
+        self._file.write(MAGIC)
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._rows: List[Dict[str, Any]] = []
+        self._blocks: List[Dict[str, Any]] = []
+        self._dictionaries: Dict[str, Dict[Any, int]] = {column: {} for column in DICTIONARY_COLUMNS}
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Add one row with the LogEntry column names as keys"""
+        self._rows.append(row)
+        self.row_count += 1
+        if len(self._rows) >= self.block_rows:
+            self._flush_block()
+
+    def _write_chunk(self, data: bytes, compress: bool = True) -> List[int]:
+        if compress:
+            data = self._compressor.compress(data)
+        offset = self._file.tell()
+        self._file.write(data)
+        return [offset, len(data)]
+
+    def _flush_block(self) -> None:
+        rows, self._rows = self._rows, []
+        if not rows:
+            return
+        timestamps = [to_micros(row["timestamp"]) for row in rows]
+        created = [to_micros(row["created_at"]) if row.get("created_at") else 0 for row in rows]
+        block: Dict[str, Any] = {
+            "rows": len(rows),
+            "min_ts": timestamps[0],
+            "max_ts": timestamps[-1],
+            "codes": {},
+            "columns": {},
+        }
+        for column, values in (("timestamp", timestamps), ("created_at", created)):
+            deltas = array("q", [values[0]] + [b - a for a, b in zip(values, values[1:])])
+            block["columns"][column] = self._write_chunk(deltas.tobytes())
+        for column in DICTIONARY_COLUMNS:
+            dictionary = self._dictionaries[column]
+            codes = array("I", [dictionary.setdefault(row.get(column), len(dictionary)) for row in rows])
+            block["codes"][column] = sorted(set(codes))
+            block["columns"][column] = self._write_chunk(codes.tobytes())
+        for column in TEXT_COLUMNS:
+            values = [row.get(column) for row in rows]
+            block["columns"][column] = self._write_chunk(json.dumps(values, default=str).encode())
+        trace_ids = {row["trace_id"] for row in rows if row.get("trace_id")}
+        bits = max(len(trace_ids) * BLOOM_BITS_PER_VALUE, 64)
+        block["bloom"] = self._write_chunk(bloom_build(trace_ids, bits), compress=False)
+        self._blocks.append(block)
+
+    def close(self) -> None:
+        self._flush_block()
+        footer = {
+            "rows": self.row_count,
+            "min_ts": self._blocks[0]["min_ts"] if self._blocks else 0,
+            "max_ts": self._blocks[-1]["max_ts"] if self._blocks else 0,
+            "dictionaries": {
+                column: [value for value, _ in sorted(dictionary.items(), key=lambda item: item[1])]
+                for column, dictionary in self._dictionaries.items()
+            },
+            "blocks": self._blocks,
+        }
+        data = self._compressor.compress(json.dumps(footer).encode())
+        self._file.write(data)
+        self._file.write(_FOOTER_LENGTH.pack(len(data)))
+        self._file.write(MAGIC)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.path + ".tmp", self.path)
+        if self.on_close:
+            self.on_close()
+
+    def abort(self) -> None:
+        self._file.close()
+        os.remove(self.path + ".tmp")
+
+class ColdQuery:
+    """Filters of a log query, in the form segments evaluate them"""
+
+    def __init__(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 equals: Optional[Dict[str, str]] = None, trace_id: Optional[str] = None,
+                 search: Optional[SearchNode] = None, before: Optional[Position] = None):
+        self.start = to_micros(start) if start else None
+        self.end = to_micros(end) if end else None
+        self.equals = {column: value for column, value in (equals or {}).items() if value is not None}
+        self.trace_id = trace_id
+        self.search = search
+        self.before = before  # keyset cursor: only rows strictly older than this position
+
+    def overlaps(self, min_ts: int, max_ts: int) -> bool:
+        if self.start is not None and max_ts < self.start:
+            return False
+        if self.end is not None and min_ts > self.end:
+            return False
+        if self.before is not None and min_ts > self.before[0]:
+            return False
+        return True
+
+class Segment:
+    """Read side of one segment file; the footer is loaded once"""
+
+    def __init__(self, path: str):
+        self.path = path
+        tail = len(MAGIC) + _FOOTER_LENGTH.size
+        with open(path, "rb") as f:
+            f.seek(-tail, os.SEEK_END)
+            end = f.read(tail)
+            if end[-len(MAGIC):] != MAGIC:
+                raise ValueError(f"Not a log segment: {path}")
+            (length,) = _FOOTER_LENGTH.unpack(end[:_FOOTER_LENGTH.size])
+            f.seek(-(tail + length), os.SEEK_END)
+            footer = json.loads(_decompressor().decompress(f.read(length)))
+        self.rows: int = footer["rows"]
+        self.min_ts: int = footer["min_ts"]
+        self.max_ts: int = footer["max_ts"]
+        self.dictionaries: Dict[str, List] = footer["dictionaries"]
+        self.blocks: List[Dict[str, Any]] = footer["blocks"]
+        self._codes = {
+            column: {value: code for code, value in enumerate(values)}
+            for column, values in self.dictionaries.items()
+        }
+
+    def _chunk(self, f, chunk: List[int], compressed: bool = True) -> bytes:
+        f.seek(chunk[0])
+        data = f.read(chunk[1])
+        return _decompressor().decompress(data) if compressed else data
+
+    def _column(self, f, block: Dict[str, Any], column: str) -> List:
+        data = self._chunk(f, block["columns"][column])
+        if column in ("timestamp", "created_at"):
+            return list(accumulate(array("q", data)))
+        if column in DICTIONARY_COLUMNS:
+            values = self.dictionaries[column]
+            return [values[code] for code in array("I", data)]
+        return json.loads(data)
+
+    def candidate_blocks(self, f, query: ColdQuery) -> List[int]:
+        """
+        Indexes of the blocks that may hold matching rows, judged from the
+        footer and bloom filters without decompressing any column
+        """
+        if not query.overlaps(self.min_ts, self.max_ts):
+            return []
+        wanted = {}
+        for column, value in query.equals.items():
+            if value not in self._codes[column]:
+                return []
+            wanted[column] = self._codes[column][value]
+        candidates = []
+        for index, block in enumerate(self.blocks):
+            if not query.overlaps(block["min_ts"], block["max_ts"]):
+                continue
+            if any(code not in block["codes"][column] for column, code in wanted.items()):
+                continue
+            if query.trace_id and not bloom_contains(self._chunk(f, block["bloom"], compressed=False), query.trace_id):
+                continue
+            candidates.append(index)
+        return candidates
+
+    def _matching_rows(self, f, block: Dict[str, Any], query: ColdQuery) -> Tuple[List[int], Dict[str, List]]:
+        """Row offsets in a block that match every filter, plus the columns decoded so far"""
+        columns = {"timestamp": self._column(f, block, "timestamp")}
+        for column in list(query.equals) + (["trace_id"] if query.trace_id else []) + \
+                (["id"] if query.before else []) + (["message"] if query.search else []):
+            if column not in columns:
+                columns[column] = self._column(f, block, column)
+        matches = []
+        for row, timestamp in enumerate(columns["timestamp"]):
+            if query.start is not None and timestamp < query.start:
+                continue
+            if query.end is not None and timestamp > query.end:
+                continue
+            if query.before is not None and (timestamp, columns["id"][row]) >= query.before:
+                continue
+            if any(columns[column][row] != value for column, value in query.equals.items()):
+                continue
+            if query.trace_id and columns["trace_id"][row] != query.trace_id:
+                continue
+            if query.search and not match_search(query.search, columns["message"][row]):
+                continue
+            matches.append(row)
+        return matches, columns
+
+    def scan_newest_first(self, query: ColdQuery, limit: int) -> List[LogEntry]:
+        """Up to ``limit`` matching logs, newest first"""
+        results: List[LogEntry] = []
+        with open(self.path, "rb") as f:
+            for index in reversed(self.candidate_blocks(f, query)):
+                block = self.blocks[index]
+                matches, columns = self._matching_rows(f, block, query)
+                if not matches:
+                    continue
+                for column in ("id", "created_at", "message", "trace_id", "span_id", "metadata_") + DICTIONARY_COLUMNS:
+                    if column not in columns:
+                        columns[column] = self._column(f, block, column)
+                for row in reversed(matches):
+                    results.append(LogEntry(
+                        id=columns["id"][row],
+                        timestamp=from_micros(columns["timestamp"][row]),
+                        level=LogLevel(columns["level"][row]) if columns["level"][row] else None,
+                        message=columns["message"][row],
+                        service=columns["service"][row],
+                        tenant_id=columns["tenant_id"][row],
+                        trace_id=columns["trace_id"][row],
+                        span_id=columns["span_id"][row],
+                        metadata_=columns["metadata_"][row],
+                        created_at=from_micros(columns["created_at"][row]) if columns["created_at"][row] else None,
+                    ))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def count(self, query: ColdQuery, exact: bool) -> int:
+        """
+        Matching rows. The approximate count is the size of the candidate
+        blocks, clipped to the time range, and reads nothing but the footer
+        and bloom filters
+        """
+        with open(self.path, "rb") as f:
+            candidates = self.candidate_blocks(f, query)
+            if exact:
+                return sum(len(self._matching_rows(f, self.blocks[index], query)[0]) for index in candidates)
+        return sum(self.blocks[index]["rows"] for index in candidates)
+
+class ColdStore:
+    """
+    Directory of segment files, one per tiered partition. Segment footers
+    are cached and reloaded when a file changes. The newest cold timestamp,
+    checked by every log query, is cached until the directory changes
+    (segments are only ever added by rename or removed).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._segments: Dict[str, Tuple[float, Segment]] = {}
+        self._newest: Optional[Tuple[int, Optional[datetime]]] = None  # (directory mtime, newest timestamp)
+
+    def segment_path(self, name: str) -> str:
+        return os.path.join(self.path, name + SEGMENT_SUFFIX)
+
+    def segments(self) -> List[Segment]:
+        """All segments, newest first"""
+        if not os.path.isdir(self.path):
+            return []
+        loaded = {}
+        for filename in os.listdir(self.path):
+            if not filename.endswith(SEGMENT_SUFFIX):
+                continue
+            path = os.path.join(self.path, filename)
+            mtime = os.path.getmtime(path)
+            cached = self._segments.get(path)
+            if cached is None or cached[0] != mtime:
+                try:
+                    cached = (mtime, Segment(path))
+                except (OSError, ValueError) as e:
+                    logger.error(f"Skipping unreadable segment {path}: {str(e)}")
+                    continue
+            loaded[path] = cached
+        self._segments = loaded
+        return sorted((segment for _, segment in loaded.values()), key=lambda s: s.max_ts, reverse=True)
+
+    def invalidate(self) -> None:
+        """Forget the cached newest timestamp after a segment was written or removed"""
+        self._newest = None
+
+    def newest_timestamp(self) -> Optional[datetime]:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if self._newest is None or self._newest[0] != mtime:
+            segments = [segment for segment in self.segments() if segment.rows]
+            self._newest = (mtime, from_micros(segments[0].max_ts) if segments else None)
+        return self._newest[1]
+
+    def query(self, query: ColdQuery, limit: int) -> List[LogEntry]:
+        """Up to ``limit`` matching logs across segments, newest first"""
+        results: List[LogEntry] = []
+        for segment in self.segments():
+            if len(results) >= limit:
+                break
+            results.extend(segment.scan_newest_first(query, limit - len(results)))
+        return results
+
+    def count(self, query: ColdQuery, exact: bool = False) -> int:
+        return sum(segment.count(query, exact) for segment in self.segments())
+
+    def writer(self, name: str) -> SegmentWriter:
+        os.makedirs(self.path, exist_ok=True)
+        return SegmentWriter(self.segment_path(name), settings.COLD_BLOCK_ROWS, settings.COLD_ZSTD_LEVEL,
+                             on_close=self.invalidate)
+
+    def remove_before(self, cutoff: datetime) -> List[str]:
+        """Delete segments whose newest row is older than ``cutoff``"""
+        removed = []
+        for segment in self.segments():
+            if segment.max_ts < to_micros(cutoff):
+                os.remove(segment.path)
+                removed.append(segment.path)
+        if removed:
+            self.invalidate()
+        return removed
+
+cold_store = ColdStore(settings.COLD_STORAGE_PATH)
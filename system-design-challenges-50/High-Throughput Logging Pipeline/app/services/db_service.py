@@ -1,17 +1,222 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, desc
-from typing import List, Optional
-from app.db.models import LogEntry, Tenant
+from sqlalchemy import and_, desc, func, insert, literal_column, not_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Dict, List, Optional, Tuple
+from app.db.models import (
+    SEARCH_CONFIG,
+    LogEntry,
+    LogTemplate,
+    LogTemplateCount,
+    Tenant,
+    log_search_vector,
+    template_search_vector,
+)
 from app.schemas.logs import LogIn, LogLevel
 from app.schemas.query import LogQueryParams
 from app.core.config import settings
+from app.core.exceptions import ValidationError
 from app.core.logging_config import get_logger
+from app.utils.time_utils import convert_to_utc, get_current_utc_time
+from app.utils.search_utils import SearchNode, parse_search_query
+from app.services.cold_storage import ColdQuery, cold_store, to_micros
+from app.services.template_miner import MinedMessage, TemplateMiner, group_templates, render
+import asyncio
+import base64
+import json
 import uuid
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
+from functools import reduce
 
 logger = get_logger("db_service")
 
+# Columns written by the bulk loader, in record order; created_at is filled in by the server
+BULK_COLUMNS = (
+    "id", "timestamp", "level", "message", "template_id", "params",
+    "service", "tenant_id", "trace_id", "span_id", "metadata_",
+)
+
+# Template texts by id; catalogue rows never change, so they are cached for good
+template_texts: Dict[int, str] = {}
+
+def log_record(log_data: LogIn, encode_metadata: bool = True, mined: Optional[MinedMessage] = None) -> Tuple:
+    """
+    Row tuple for a log in BULK_COLUMNS order, with the id generated
+    client-side. A mined log stores its template id and parameters
+    instead of the message. COPY needs JSON columns as text; the INSERT
+    path passes them through the JSONB type instead.
+    """
+    metadata = log_data.metadata
+    params = mined.params if mined else None
+    if encode_metadata:
+        metadata = json.dumps(metadata) if metadata is not None else None
+        params = json.dumps(params) if params is not None else None
+    return (
+        str(uuid.uuid4()),
+        convert_to_utc(log_data.timestamp) if log_data.timestamp else None,
+        log_data.level.value if log_data.level else None,
+        None if mined else log_data.message,
+        mined.template_id if mined else None,
+        params,
+        log_data.service,
+        log_data.tenant_id,
+        log_data.trace_id,
+        log_data.span_id,
+        metadata,
+    )
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    """Start of the UTC hour a log is counted in"""
+    return convert_to_utc(timestamp).replace(minute=0, second=0, microsecond=0)
+
+def dialect_insert(conn, table):
+    """INSERT supporting ON CONFLICT for the connection's dialect"""
+    return (postgresql if conn.dialect.name == "postgresql" else sqlite).insert(table)
+
+def search_tsquery(node: SearchNode):
+    """
+    tsquery for a parsed search expression. Terms go through the same text
+    search configuration as the indexed messages, so they are tokenized the
+    same way (e.g. "payment-service" matches the hyphenated word).
+    """
+    kind, value = node
+    config = literal_column(f"'{SEARCH_CONFIG}'")
+    if kind == "word":
+        return func.plainto_tsquery(config, value)
+    if kind == "phrase":
+        return func.phraseto_tsquery(config, value)
+    if kind == "prefix":
+        return func.to_tsquery(config, f"{value}:*")
+    if kind == "not":
+        return func.tsquery_not(search_tsquery(value))
+    combine = func.tsquery_and if kind == "and" else func.tsquery_or
+    return reduce(combine, [search_tsquery(child) for child in value])
+
+def search_clause(node: SearchNode):
+    """
+    WHERE clause for a parsed search expression. A term matches a log if
+    it is in the indexed message or parameters, or in the text of the
+    log's template; the boolean operators combine these per-term
+    matches. A phrase must lie within the template text or within the
+    parameters.
+    """
+    kind, value = node
+    if kind == "not":
+        return not_(search_clause(value))
+    if kind in ("and", "or"):
+        return (and_ if kind == "and" else or_)(*[search_clause(child) for child in value])
+    query = search_tsquery(node)
+    templates = select(LogTemplate.id).where(template_search_vector().op("@@")(query))
+    return or_(
+        log_search_vector().op("@@")(query),
+        # Not NULL first, so that NOT keeps logs stored without a template
+        and_(LogEntry.template_id.isnot(None), LogEntry.template_id.in_(templates))
+    )
+
+def time_range(query_params: LogQueryParams) -> Tuple[datetime, Optional[datetime]]:
+    """
+    Time range of a log query in UTC. The start is always bounded below by
+    the retention cutoff, so PostgreSQL prunes every log_entries partition
+    outside the requested window (including expired ones not yet dropped)
+    instead of scanning them.
+    """
+    cutoff = get_current_utc_time() - timedelta(days=settings.LOG_RETENTION_DAYS)
+    start_time = convert_to_utc(query_params.start_time) if query_params.start_time else cutoff
+    end_time = convert_to_utc(query_params.end_time) if query_params.end_time else None
+    return max(start_time, cutoff), end_time
+
+def log_filters(query_params: LogQueryParams) -> List:
+    """
+    WHERE clauses for a log query
+    """
+    start_time, end_time = time_range(query_params)
+    filters = [LogEntry.timestamp >= start_time]
+    if end_time:
+        filters.append(LogEntry.timestamp <= end_time)
+    if query_params.service:
+        filters.append(LogEntry.service == query_params.service)
+    if query_params.tenant_id:
+        filters.append(LogEntry.tenant_id == query_params.tenant_id)
+    if query_params.level:
+        filters.append(LogEntry.level == query_params.level)
+    if query_params.trace_id:
+        filters.append(LogEntry.trace_id == query_params.trace_id)
+    if query_params.search:
+        # Answered from the GIN index over message tokens instead of scanning messages
+        filters.append(search_clause(parse_search_query(query_params.search)))
+    return filters
+
+def template_count_filters(query_params: LogQueryParams) -> List:
+    """
+    WHERE clauses of ``log_filters`` that apply to the hourly template
+    counts; the start is rounded down to its hour
+    """
+    start_time, end_time = time_range(query_params)
+    filters = [LogTemplateCount.bucket >= hour_bucket(start_time)]
+    if end_time:
+        filters.append(LogTemplateCount.bucket <= end_time)
+    if query_params.service:
+        filters.append(LogTemplateCount.service == query_params.service)
+    if query_params.tenant_id:
+        filters.append(LogTemplateCount.tenant_id == query_params.tenant_id)
+    if query_params.level:
+        filters.append(LogTemplateCount.level == query_params.level.value)
+    return filters
+
+async def render_messages(db: AsyncSession, logs: List[LogEntry]) -> None:
+    """
+    Fill in the message of logs stored as a template and parameters. The
+    rows are not marked as modified, so nothing is written back.
+    """
+    templated = [log for log in logs if log.message is None and log.template_id is not None]
+    missing = {log.template_id for log in templated} - template_texts.keys()
+    if missing:
+        result = await db.execute(select(LogTemplate.id, LogTemplate.template).where(LogTemplate.id.in_(missing)))
+        template_texts.update((row.id, row.template) for row in result)
+    for log in templated:
+        if log.template_id in template_texts:
+            set_committed_value(log, "message", render(template_texts[log.template_id], log.params or []))
+
+def encode_cursor(log: LogEntry) -> str:
+    """Opaque keyset cursor: the (timestamp, id) of the last log on a page"""
+    raw = f"{convert_to_utc(log.timestamp).isoformat()}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, log_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), log_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValidationError(f"Invalid cursor: {cursor}") from e
+
+def cold_query(query_params: LogQueryParams) -> ColdQuery:
+    """The same filters as ``log_filters``, for the cold segments"""
+    start_time, end_time = time_range(query_params)
+    before = None
+    if query_params.cursor:
+        timestamp, log_id = decode_cursor(query_params.cursor)
+        before = (to_micros(timestamp), log_id)
+    return ColdQuery(
+        start=start_time,
+        end=end_time,
+        equals={
+            "service": query_params.service,
+            "tenant_id": query_params.tenant_id,
+            "level": query_params.level.value if query_params.level else None,
+        },
+        trace_id=query_params.trace_id,
+        search=parse_search_query(query_params.search) if query_params.search else None,
+        before=before
+    )
+
+def newest_first(logs: List[LogEntry]) -> List[LogEntry]:
+    """Merge hot and cold rows in keyset order; a row seen in both (mid-tiering) is kept once"""
+    unique = {log.id: log for log in logs}
+    return sorted(unique.values(), key=lambda log: (convert_to_utc(log.timestamp), log.id), reverse=True)
+
 class DBService:
     @staticmethod
     async def create_log_entry(db: AsyncSession, log_data: LogIn) -> LogEntry:
@@ -62,11 +267,8 @@ class DBService:
                 db_logs.append(db_log)
                 
             db.add_all(db_logs)
+            # IDs are generated client-side, so there is nothing to refresh
             await db.commit()
-            
-            # Refresh all entries to get their IDs
-            for db_log in db_logs:
-                await db.refresh(db_log)
                 
             logger.info(f"Created batch of {len(db_logs)} log entries")
             return db_logs
@@ -76,37 +278,143 @@ class DBService:
             raise
             
     @staticmethod
-    async def query_logs(db: AsyncSession, query_params: LogQueryParams) -> List[LogEntry]:
+    async def bulk_insert_logs(db: AsyncSession, logs_data: List[LogIn], miner: Optional[TemplateMiner] = None) -> int:
+        """
+        Bulk-load log entries without building ORM objects.
+
+        On PostgreSQL through asyncpg this streams the rows with binary
+        ``COPY log_entries (...) FROM STDIN`` on the driver connection;
+        other backends get chunked multi-row ``INSERT ... VALUES``
+        statements. The COPY joins the session's transaction only if a
+        statement has already been executed through the session (the
+        adapter begins transactions lazily), which is why the template
+        statements run before it; without them the COPY is the only
+        statement. Either way the batch is committed as one transaction.
+
+        With a ``miner``, messages are stored as a template id plus their
+        parameters. New templates are added to log_templates and the
+        hourly counts in log_template_counts are bumped in the same
+        transaction.
+
+        Returns:
+            int: Number of rows written
+        """
+        if not logs_data:
+            return 0
+        mined = [miner.mine(log_data.message) if miner else None for log_data in logs_data]
+        new_templates = {m.template_id: m.template for m in mined if m and m.template_id not in miner.saved}
+        try:
+            conn = await db.connection()
+            if new_templates:
+                await db.execute(
+                    dialect_insert(conn, LogTemplate.__table__).on_conflict_do_nothing(index_elements=["id"]),
+                    [{"id": key, "template": template} for key, template in new_templates.items()]
+                )
+            # The counts go first: SQLAlchemy's asyncpg adapter only sends BEGIN
+            # with the first statement it executes, and a COPY issued before
+            # that would commit on its own, apart from the counts
+            if miner:
+                await DBService._add_template_counts(db, logs_data, mined)
+            if conn.dialect.driver == "asyncpg":
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    LogEntry.__tablename__,
+                    records=[log_record(log_data, mined=m) for log_data, m in zip(logs_data, mined)],
+                    columns=BULK_COLUMNS
+                )
+            else:
+                await DBService._insert_values(db, logs_data, mined)
+            await db.commit()
+            if miner:
+                miner.saved.update(new_templates)
+            logger.info(f"Bulk loaded {len(logs_data)} log entries")
+            return len(logs_data)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Failed to bulk load log entries: {str(e)}")
+            raise
+
+    @staticmethod
+    async def _insert_values(db: AsyncSession, logs_data: List[LogIn], mined: List[Optional[MinedMessage]]) -> None:
+        """
+        Multi-row INSERT ... VALUES fallback. Executed as an executemany,
+        which SQLAlchemy sends as cached multi-row VALUES statements sized
+        to the driver's bind parameter limit.
+        """
+        rows = [
+            dict(zip(BULK_COLUMNS, log_record(log_data, encode_metadata=False, mined=m)))
+            for log_data, m in zip(logs_data, mined)
+        ]
+        await db.execute(insert(LogEntry.__table__), rows)
+
+    @staticmethod
+    async def _add_template_counts(db: AsyncSession, logs_data: List[LogIn], mined: List[Optional[MinedMessage]]) -> None:
+        """
+        Add a batch to the hourly template counts. Rows are upserted in key
+        order, so concurrent workers lock them in the same order.
+        """
+        counts = Counter(
+            (hour_bucket(log_data.timestamp), m.template_id, log_data.service or "",
+             log_data.level.value if log_data.level else "", log_data.tenant_id or "")
+            for log_data, m in zip(logs_data, mined) if m and log_data.timestamp
+        )
+        if not counts:
+            return
+        table = LogTemplateCount.__table__
+        statement = dialect_insert(await db.connection(), table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["bucket", "template_id", "service", "level", "tenant_id"],
+            set_={"count": table.c.count + statement.excluded.count}
+        )
+        keys = ("bucket", "template_id", "service", "level", "tenant_id")
+        await db.execute(statement, [dict(zip(keys, key), count=count) for key, count in sorted(counts.items())])
+
+    @staticmethod
+    async def query_logs(db: AsyncSession, query_params: LogQueryParams) -> Tuple[List[LogEntry], Optional[str]]:
         """
-        Query log entries with filters
+        Query a page of log entries with filters, newest first.
+
+        Pages are addressed by keyset: the cursor holds the (timestamp, id)
+        of the previous page's last row and the next page starts strictly
+        after it, so every page is one index range scan of ``limit + 1``
+        rows however deep it is.
+
+        Logs moved to the cold tier are merged in transparently.
+
+        Returns:
+            Tuple[List[LogEntry], Optional[str]]: The page, and the cursor of the next page (None on the last page)
         """
         try:
-            query = select(LogEntry)
+            # Apply filters; the time range limits the scan to the matching partitions
+            query = select(LogEntry).where(and_(*log_filters(query_params)))
+            if query_params.cursor:
+                timestamp, log_id = decode_cursor(query_params.cursor)
+                # (timestamp, id) < cursor, spelled so the timestamp bound alone drives the index scan
+                query = query.where(
+                    LogEntry.timestamp <= timestamp,
+                    or_(LogEntry.timestamp < timestamp, LogEntry.id < log_id)
+                )
             
-            # Apply filters
-            filters = []
-            if query_params.service:
-                filters.append(LogEntry.service == query_params.service)
-            if query_params.tenant_id:
-                filters.append(LogEntry.tenant_id == query_params.tenant_id)
-            if query_params.level:
-                filters.append(LogEntry.level == query_params.level)
-            if query_params.start_time:
-                filters.append(LogEntry.timestamp >= query_params.start_time)
-            if query_params.end_time:
-                filters.append(LogEntry.timestamp <= query_params.end_time)
-                
-            if filters:
-                query = query.where(and_(*filters))
-                
-            # Apply ordering and pagination
-            query = query.order_by(desc(LogEntry.timestamp))
-            query = query.offset(query_params.offset).limit(query_params.limit)
+            # Apply ordering and pagination; the extra row tells whether another page exists
+            query = query.order_by(desc(LogEntry.timestamp), desc(LogEntry.id)).limit(query_params.limit + 1)
             
             result = await db.execute(query)
-            logs = result.scalars().all()
+            logs = list(result.scalars().all())
+            
+            # Older logs may live in cold segments; they are only read when
+            # the hot rows do not fill the page before reaching their range
+            newest_cold = cold_store.newest_timestamp()
+            if newest_cold and (len(logs) <= query_params.limit or convert_to_utc(logs[-1].timestamp) <= newest_cold):
+                cold_logs = await asyncio.to_thread(cold_store.query, cold_query(query_params), query_params.limit + 1)
+                logs = newest_first(logs + cold_logs)[:query_params.limit + 1]
+            
+            next_cursor = None
+            if len(logs) > query_params.limit:
+                logs = logs[:query_params.limit]
+                next_cursor = encode_cursor(logs[-1])
+            await render_messages(db, logs)
             logger.info(f"Queried {len(logs)} log entries")
-            return logs
+            return logs, next_cursor
         except Exception as e:
             logger.error(f"Failed to query log entries: {str(e)}")
             raise
@@ -114,30 +422,105 @@ class DBService:
     @staticmethod
     async def get_log_count(db: AsyncSession, query_params: LogQueryParams) -> int:
         """
-        Get the count of log entries matching the query
+        Get the count of log entries matching the query, hot and cold
         """
         try:
-            query = select(func.count(LogEntry.id))
+            query = select(func.count(LogEntry.id)).where(and_(*log_filters(query_params)))
             
-            # Apply filters
-            filters = []
-            if query_params.service:
-                filters.append(LogEntry.service == query_params.service)
-            if query_params.tenant_id:
-                filters.append(LogEntry.tenant_id == query_params.tenant_id)
-            if query_params.level:
-                filters.append(LogEntry.level == query_params.level)
-            if query_params.start_time:
-                filters.append(LogEntry.timestamp >= query_params.start_time)
-            if query_params.end_time:
-                filters.append(LogEntry.timestamp <= query_params.end_time)
-                
-            if filters:
-                query = query.where(and_(*filters))
-                
             result = await db.execute(query)
-            count = result.scalar()
-            return count or 0
+            count = result.scalar() or 0
+            return count + await asyncio.to_thread(cold_store.count, cold_query(query_params), True)
         except Exception as e:
             logger.error(f"Failed to get log count: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    async def estimate_log_count(db: AsyncSession, query_params: LogQueryParams) -> int:
+        """
+        Approximate count of log entries matching the query, taken from the
+        planner's row estimate (``EXPLAIN``) instead of counting rows. The
+        estimate comes from per-partition statistics and costs the same
+        whatever the number of matches. Cold segments contribute the size
+        of their candidate blocks. Backends other than asyncpg get an exact
+        count.
+        """
+        conn = await db.connection()
+        if conn.dialect.driver != "asyncpg":
+            return await DBService.get_log_count(db, query_params)
+        try:
+            compiled = select(LogEntry.id).where(and_(*log_filters(query_params))).compile(dialect=conn.dialect)
+            params = compiled.construct_params()
+            args = []
+            for name in compiled.positiontup:
+                processor = compiled.binds[name].type.bind_processor(conn.dialect)
+                args.append(processor(params[name]) if processor else params[name])
+            raw = await conn.get_raw_connection()
+            statement = await raw.driver_connection.prepare(compiled.string)
+            plan = await statement.explain(*args)
+            cold = await asyncio.to_thread(cold_store.count, cold_query(query_params), False)
+            return int(plan[0]["Plan"]["Plan Rows"]) + cold
+        except Exception as e:
+            logger.error(f"Failed to estimate log count: {str(e)}")
+            raise
+
+    @staticmethod
+    async def top_templates(db: AsyncSession, query_params: LogQueryParams) -> List[Tuple[int, str, int, List[int]]]:
+        """
+        The most frequent patterns matching the filters, from the hourly
+        counts; the time range is applied at hour granularity. The
+        templates of one pattern mined by different workers, or before and
+        after it was generalized, are counted together (see ``group_templates``).
+
+        Returns:
+            List[Tuple[int, str, int, List[int]]]: (template id, template, count, ids of the
+            templates counted), most frequent first
+        """
+        try:
+            total = func.sum(LogTemplateCount.count).label("total")
+            query = (
+                select(LogTemplateCount.template_id, LogTemplate.template, total)
+                .join(LogTemplate, LogTemplate.id == LogTemplateCount.template_id)
+                .where(and_(*template_count_filters(query_params)))
+                .group_by(LogTemplateCount.template_id, LogTemplate.template)
+            )
+            result = await db.execute(query)
+            counts = [(row.template_id, row.template, int(row.total)) for row in result]
+            return group_templates(counts)[:query_params.limit]
+        except Exception as e:
+            logger.error(f"Failed to count templates: {str(e)}")
+            raise
+
+    @staticmethod
+    async def get_template(db: AsyncSession, template_id: int) -> Optional[str]:
+        """Text of a template, None if it is not in the catalogue"""
+        if template_id not in template_texts:
+            template = await db.scalar(select(LogTemplate.template).where(LogTemplate.id == template_id))
+            if template is None:
+                return None
+            template_texts[template_id] = template
+        return template_texts[template_id]
+
+    @staticmethod
+    async def template_series(db: AsyncSession, template_id: int, query_params: LogQueryParams,
+                              interval: str = "hour") -> List[Tuple[datetime, int]]:
+        """
+        Counts of one template per hour or per (UTC) day, oldest first.
+        Intervals without logs are left out.
+        """
+        try:
+            total = func.sum(LogTemplateCount.count).label("total")
+            query = (
+                select(LogTemplateCount.bucket, total)
+                .where(LogTemplateCount.template_id == template_id, *template_count_filters(query_params))
+                .group_by(LogTemplateCount.bucket)
+            )
+            series: Counter = Counter()
+            for row in await db.execute(query):
+                bucket = convert_to_utc(row.bucket)
+                if interval == "day":
+                    bucket = bucket.replace(hour=0)
+                series[bucket] += int(row.total)
+            return sorted(series.items())
+        except Exception as e:
+            logger.error(f"Failed to count template {template_id}: {str(e)}")
+            raise
@@ -1,16 +1,72 @@
-from typing import List
-from app.schemas.logs import LogIn
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.schemas.logs import LogIn, LogLevel
+from app.services.admission_control import AdmissionController
 from app.services.redis_service import RedisService
 from app.services.db_service import DBService
+from app.services.metrics_service import MetricsService
+from app.core.config import settings
 from app.core.logging_config import get_logger
-from app.core.exceptions import LogIngestionError
+from app.core.exceptions import LogIngestionError, PayloadTooLargeError, ValidationError
+from app.utils.compression_utils import StreamDecompressor
+from datetime import datetime
 import json
 
 logger = get_logger("log_ingestion")
 
+LOG_LEVELS = {level.value for level in LogLevel}
+OPTIONAL_STRING_FIELDS = ("tenant_id", "trace_id", "span_id")
+MAX_REPORTED_ERRORS = 20
+# Largest piece of a streamed body decoded at once, however much a chunk inflates
+STREAM_DECODE_BYTES = 1024 * 1024
+
+def check_log_record(line: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Hand-written equivalent of validating one NDJSON line as ``LogIn``,
+    without building a model.
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[str]]: The decoded record, or None and the problem
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None, "invalid JSON"
+    if not isinstance(record, dict):
+        return None, "not a JSON object"
+    for field in ("message", "service"):
+        value = record.get(field)
+        if not isinstance(value, str) or not value:
+            return None, f"'{field}' must be a non-empty string"
+    if "level" in record and record["level"] not in LOG_LEVELS:
+        return None, f"'level' must be one of {sorted(LOG_LEVELS)}"
+    timestamp = record.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            return None, "'timestamp' must be an ISO 8601 datetime"
+    elif timestamp is not None and (isinstance(timestamp, bool) or not isinstance(timestamp, (int, float))):
+        return None, "'timestamp' must be an ISO 8601 datetime or epoch seconds"
+    for field in OPTIONAL_STRING_FIELDS:
+        if record.get(field) is not None and not isinstance(record[field], str):
+            return None, f"'{field}' must be a string"
+    if record.get("metadata") is not None and not isinstance(record["metadata"], dict):
+        return None, "'metadata' must be an object"
+    return record, None
+
+class Throttled(Exception):
+    """Stops a stream at the first line that was not admitted"""
+
+    def __init__(self, line: int, retry_after: float, reason: str):
+        self.line = line
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(reason)
+
 class LogIngestionService:
-    def __init__(self):
-        self.redis_service = RedisService()
+    def __init__(self, redis_service: Optional[RedisService] = None, admission: Optional[AdmissionController] = None):
+        self.redis_service = redis_service or RedisService()
+        self.admission = admission or AdmissionController()
         
     def validate_log(self, log_data: LogIn) -> bool:
         """
@@ -33,7 +89,7 @@ class LogIngestionService:
             logger.error(f"Log validation failed: {str(e)}")
             return False
             
-    def buffer_log(self, log_data: LogIn) -> bool:
+    async def buffer_log(self, log_data: LogIn) -> bool:
         """
         Buffer a log entry in Redis queue
         """
@@ -42,7 +98,7 @@ class LogIngestionService:
             log_dict = log_data.dict()
             
             # Add to Redis queue
-            success = self.redis_service.push_log(log_dict)
+            success = await self.redis_service.push_log(log_dict)
             if not success:
                 raise LogIngestionError("Failed to buffer log in Redis")
                 
@@ -52,7 +108,7 @@ class LogIngestionService:
             logger.error(f"Failed to buffer log: {str(e)}")
             return False
             
-    def buffer_logs_batch(self, logs_data: List[LogIn]) -> bool:
+    async def buffer_logs_batch(self, logs_data: List[LogIn]) -> bool:
         """
         Buffer a batch of log entries in Redis queue
         """
@@ -61,7 +117,7 @@ class LogIngestionService:
             logs_dicts = [log.dict() for log in logs_data]
             
             # Add to Redis queue
-            success = self.redis_service.push_logs_batch(logs_dicts)
+            success = await self.redis_service.push_logs_batch(logs_dicts)
             if not success:
                 raise LogIngestionError("Failed to buffer logs batch in Redis")
                 
@@ -69,4 +125,127 @@ class LogIngestionService:
             return True
         except Exception as e:
             logger.error(f"Failed to buffer logs batch: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    async def queue_retry_after(self) -> Optional[float]:
+        """
+        Seconds to wait before sending more if the queue is past its
+        high-water mark, else None. Reads the depth from Redis only when
+        the cached reading is stale.
+        """
+        if self.admission.needs_queue_depth():
+            self.admission.set_queue_depth(await self.redis_service.get_queue_length())
+        return self.admission.queue_retry_after if self.admission.queue_full() else None
+
+    async def ingest_ndjson(self, chunks: AsyncIterator[bytes], content_encoding: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Ingest a newline-delimited JSON body as it streams in.
+
+        Chunks are decompressed and split into lines incrementally; each
+        line is checked with ``check_log_record`` and valid lines are
+        queued byte for byte, ``INGEST_STREAM_BATCH_SIZE`` per round trip.
+        A chunk is decoded ``STREAM_DECODE_BYTES`` at a time, so memory is
+        bounded by one chunk, one decoded piece and its lines, one partial
+        line and one batch, whatever the size of the body or how much it
+        was compressed. Invalid lines are skipped and
+        reported; logs without a timestamp get their arrival time.
+
+        Every line passes admission control. DEBUG logs may be shed while
+        the queue is under pressure. Reading stops at the first line whose
+        tenant is over its rate, or once the queue is past its high-water
+        mark; the summary then gives the line to resend from and how long
+        to wait first.
+
+        Raises:
+            ValidationError: If the body cannot be decoded or a line is too long
+            PayloadTooLargeError: If the decompressed body exceeds ``INGEST_MAX_BODY_BYTES``
+            LogIngestionError: If the queue rejects a batch
+
+        Returns:
+            Dict[str, Any]: Counts of accepted, rejected and shed lines, the first errors by
+            line number, and ``retry_from_line`` / ``retry_after`` when throttled
+        """
+        try:
+            decompressor = StreamDecompressor(content_encoding, STREAM_DECODE_BYTES)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        summary: Dict[str, Any] = {"accepted": 0, "rejected": 0, "shed": 0, "errors": []}
+        batch: List[Tuple[Optional[str], bytes]] = []
+        line_number = 0
+        received = 0
+        pending = b""
+        admission = self.admission
+
+        async def push() -> None:
+            if not batch:
+                return
+            if not await self.redis_service.push_raw_logs(batch):
+                raise LogIngestionError(f"Failed to buffer logs in Redis after accepting {summary['accepted']}")
+            summary["accepted"] += len(batch)
+            batch.clear()
+
+        async def check_queue(next_line: int) -> None:
+            retry_after = await self.queue_retry_after()
+            if retry_after is not None:
+                raise Throttled(next_line, retry_after, "queue_full")
+
+        def take(line: bytes) -> None:
+            nonlocal line_number
+            line_number += 1
+            line = line.strip()
+            if not line:
+                return
+            if len(line) > settings.INGEST_MAX_LINE_BYTES:
+                record, error = None, f"line exceeds {settings.INGEST_MAX_LINE_BYTES} bytes"
+            else:
+                record, error = check_log_record(line)
+            if error is not None:
+                summary["rejected"] += 1
+                if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                    summary["errors"].append({"line": line_number, "error": error})
+                return
+            if not admission.keep(record.get("level")):
+                summary["shed"] += 1
+                return
+            tenant_id = record.get("tenant_id")
+            wait = admission.acquire(tenant_id)
+            if wait:
+                raise Throttled(line_number, wait, "rate_limited")
+            batch.append((tenant_id, line))
+
+        try:
+            try:
+                await check_queue(1)
+                async for chunk in chunks:
+                    for data in decompressor.decompress(chunk):
+                        received += len(data)
+                        if received > settings.INGEST_MAX_BODY_BYTES:
+                            raise OverflowError("Decompressed body exceeds the size limit")
+                        lines = (pending + data).split(b"\n")
+                        pending = lines.pop()
+                        if len(pending) > settings.INGEST_MAX_LINE_BYTES:
+                            raise ValidationError(f"Line {line_number + len(lines) + 1} exceeds {settings.INGEST_MAX_LINE_BYTES} bytes")
+                        for line in lines:
+                            take(line)
+                        if len(batch) >= settings.INGEST_STREAM_BATCH_SIZE:
+                            await push()
+                            await check_queue(line_number + 1)
+                take(pending + decompressor.flush())
+            except Throttled as e:
+                # Lines before the throttled one are still queued; the client resends from there
+                summary["retry_from_line"] = e.line
+                summary["retry_after"] = e.retry_after
+                MetricsService.record_rejected(e.reason)
+            await push()
+        except ValueError as e:
+            raise ValidationError(str(e))
+        except OverflowError as e:
+            raise PayloadTooLargeError(f"{str(e)} ({settings.INGEST_MAX_BODY_BYTES} bytes)")
+
+        if summary["shed"]:
+            MetricsService.record_rejected("shed", summary["shed"])
+        logger.info(
+            f"Streamed {summary['accepted']} logs, rejected {summary['rejected']}, shed {summary['shed']}"
+            + (f", throttled at line {summary['retry_from_line']}" if "retry_from_line" in summary else "")
+        )
+        return summary
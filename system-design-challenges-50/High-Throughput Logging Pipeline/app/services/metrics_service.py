@@ -9,6 +9,7 @@ LOGS_INGESTION_DURATION = Histogram('logs_ingestion_duration_seconds', 'Time spe
 LOGS_QUERY_DURATION = Summary('logs_query_duration_seconds', 'Time spent querying logs')
 LOGS_QUEUE_LENGTH = Gauge('logs_queue_length', 'Current length of the logs queue')
 LOGS_BATCH_SIZE = Histogram('logs_batch_size', 'Size of log batches processed')
+LOGS_REJECTED_TOTAL = Counter('logs_rejected_total', 'Logs refused by admission control', ['reason'])
 
 class MetricsService:
     @staticmethod
@@ -64,4 +65,15 @@ class MetricsService:
             LOGS_BATCH_SIZE.observe(size)
             logger.debug(f"Recorded batch size: {size}")
         except Exception as e:
-            logger.error(f"Failed to record batch size: {str(e)}")
\ No newline at end of file
+            logger.error(f"Failed to record batch size: {str(e)}")
+            
+    @staticmethod
+    def record_rejected(reason: str, count: int = 1):
+        """
+        Record logs refused by admission control (rate_limited, queue_full or shed)
+        """
+        try:
+            LOGS_REJECTED_TOTAL.labels(reason=reason).inc(count)
+            logger.debug(f"Recorded {count} rejected logs: reason={reason}")
+        except Exception as e:
+            logger.error(f"Failed to record rejected logs: {str(e)}")
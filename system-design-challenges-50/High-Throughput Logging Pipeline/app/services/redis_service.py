@@ -1,67 +1,264 @@
-import redis
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
 import json
-from typing import List, Dict, Any
+import zlib
+from datetime import datetime, timezone
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from app.core.config import settings
 from app.core.logging_config import get_logger
+from app.services.admission_control import parse_tenant_map
 
 logger = get_logger("redis_service")
 
+# A stream entry as (entry id, raw log JSON)
+StreamEntry = Tuple[str, bytes]
+
+# Stream entries read in one go, by lane
+LaneEntries = Dict[str, List[StreamEntry]]
+
+def entry_time(entry_id: str) -> datetime:
+    """When Redis accepted a stream entry; the id starts with its epoch milliseconds"""
+    return datetime.fromtimestamp(int(entry_id.split("-", 1)[0]) / 1000, tz=timezone.utc)
+
+def _decode_id(entry_id) -> str:
+    return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+
+def _entries(raw: list) -> List[StreamEntry]:
+    """
+    Normalize (id, fields) pairs from XREADGROUP/XCLAIM. Entries deleted
+    while pending come back without fields and are returned with None data.
+    """
+    return [(_decode_id(entry_id), fields.get(b"data") if fields else None) for entry_id, fields in raw]
+
+def _lane_entries(response) -> LaneEntries:
+    """Normalize a multi-stream XREADGROUP reply"""
+    return {_decode_id(lane): _entries(raw) for lane, raw in response or []}
+
 class RedisService:
+    """
+    Log queue on Redis streams shared by a consumer group.
+
+    Logs are split across streams (lanes) so workers can dequeue fairly
+    across tenants: tenants listed in ``TENANT_WEIGHTS`` have a lane of
+    their own, every other tenant is hashed into one of ``TENANT_LANES``
+    shared lanes, and logs without a tenant use ``REDIS_QUEUE_NAME``
+    itself. Tenant ids come from clients, so this keeps the number of
+    lanes, and the per-lane work of every dequeue round, bounded. Lanes
+    are registered in a set as producers first write to them.
+
+    Producers XADD one entry per log. Workers in the group read batches
+    with XREADGROUP; an entry stays in the group's pending list until the
+    worker acknowledges it after the database write, so a worker that dies
+    mid-batch loses nothing: its entries are claimed by another worker once
+    they have been idle long enough. Acknowledged entries are deleted, so
+    the total length of the lanes is the backlog.
+    """
+
     def __init__(self):
         self.redis_client = redis.from_url(settings.REDIS_URL)
         self.queue_name = settings.REDIS_QUEUE_NAME
-        
-    def push_log(self, log_data: Dict[str, Any]) -> bool:
+        self.group_name = settings.REDIS_CONSUMER_GROUP
+        self.dead_letter_name = settings.REDIS_DEAD_LETTER_QUEUE
+        self.lanes_key = f"{self.queue_name}:lanes"
+        self.lane_prefix = f"{self.queue_name}:tenant:"
+        self.shared_lane_prefix = f"{self.queue_name}:shared:"
+        self.named_tenants = set(parse_tenant_map(settings.TENANT_WEIGHTS))
+        self.shared_lanes = max(settings.TENANT_LANES, 1)
+
+    def lane(self, tenant_id: Optional[str]) -> str:
+        """Stream holding a tenant's logs"""
+        if not tenant_id:
+            return self.queue_name
+        if tenant_id in self.named_tenants:
+            return f"{self.lane_prefix}{tenant_id}"
+        return f"{self.shared_lane_prefix}{zlib.crc32(tenant_id.encode()) % self.shared_lanes}"
+
+    def lane_tenant(self, lane: str) -> Optional[str]:
+        """Tenant of a named lane, None for shared lanes and the tenant-less queue"""
+        return lane[len(self.lane_prefix):] if lane.startswith(self.lane_prefix) else None
+
+    def _add_to_lanes(self, pipe, logs: Iterable[Tuple[Optional[str], Any]]) -> None:
+        lanes = set()
+        for tenant_id, data in logs:
+            lane = self.lane(tenant_id)
+            pipe.xadd(lane, {"data": data})
+            lanes.add(lane)
+        if lanes:
+            pipe.sadd(self.lanes_key, *lanes)
+
+    async def push_log(self, log_data: Dict[str, Any]) -> bool:
         """
-        Push a single log entry to Redis queue
+        Push a single log entry to its tenant's stream
         """
         try:
-            log_json = json.dumps(log_data)
-            self.redis_client.lpush(self.queue_name, log_json)
-            logger.info(f"Pushed log to queue: {log_data.get('id', 'unknown')}")
+            log_json = json.dumps(log_data, default=str)
+            pipe = self.redis_client.pipeline(transaction=False)
+            self._add_to_lanes(pipe, [(log_data.get("tenant_id"), log_json)])
+            await pipe.execute()
+            logger.debug(f"Pushed log to queue: {log_data.get('id', 'unknown')}")
             return True
         except Exception as e:
             logger.error(f"Failed to push log to queue: {str(e)}")
             return False
-            
-    def push_logs_batch(self, logs_data: List[Dict[str, Any]]) -> bool:
+
+    async def push_logs_batch(self, logs_data: List[Dict[str, Any]]) -> bool:
         """
-        Push a batch of log entries to Redis queue
+        Push a batch of log entries to their tenants' streams in one round trip
         """
         try:
-            pipe = self.redis_client.pipeline()
-            for log_data in logs_data:
-                log_json = json.dumps(log_data)
-                pipe.lpush(self.queue_name, log_json)
-            pipe.execute()
+            pipe = self.redis_client.pipeline(transaction=False)
+            self._add_to_lanes(pipe, ((log.get("tenant_id"), json.dumps(log, default=str)) for log in logs_data))
+            await pipe.execute()
             logger.info(f"Pushed batch of {len(logs_data)} logs to queue")
             return True
         except Exception as e:
             logger.error(f"Failed to push batch of logs to queue: {str(e)}")
             return False
-            
-    def pop_log(self) -> Dict[str, Any] | None:
+
+    async def push_raw_logs(self, lines: List[Tuple[Optional[str], bytes]]) -> bool:
         """
-        Pop a single log entry from Redis queue
+        Push already-serialized log JSON, given as (tenant id, JSON) pairs,
+        to the tenants' streams as is, in one round trip
         """
         try:
-            log_json = self.redis_client.rpop(self.queue_name)
-            if log_json:
-                log_data = json.loads(log_json)
-                logger.info(f"Popped log from queue: {log_data.get('id', 'unknown')}")
-                return log_data
-            return None
+            pipe = self.redis_client.pipeline(transaction=False)
+            self._add_to_lanes(pipe, lines)
+            await pipe.execute()
+            logger.debug(f"Pushed {len(lines)} raw logs to queue")
+            return True
         except Exception as e:
-            logger.error(f"Failed to pop log from queue: {str(e)}")
-            return None
-            
-    def get_queue_length(self) -> int:
+            logger.error(f"Failed to push raw logs to queue: {str(e)}")
+            return False
+
+    async def list_lanes(self) -> List[str]:
         """
-        Get the current length of the Redis queue
+        All registered lanes, the tenant-less queue first
         """
+        lanes = sorted(_decode_id(lane) for lane in await self.redis_client.smembers(self.lanes_key))
+        return [self.queue_name] + [lane for lane in lanes if lane != self.queue_name]
+
+    async def ensure_consumer_group(self, lane: Optional[str] = None) -> None:
+        """
+        Create a lane's stream and consumer group if they do not exist yet
+        """
+        lane = lane or self.queue_name
         try:
-            length = self.redis_client.llen(self.queue_name)
-            return length
+            await self.redis_client.xgroup_create(lane, self.group_name, id="0", mkstream=True)
+            logger.info(f"Created consumer group {self.group_name} on {lane}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read_lanes(self, consumer: str, counts: Dict[str, int]) -> Tuple[LaneEntries, List[str]]:
+        """
+        Read up to ``counts[lane]`` new entries from each lane without
+        blocking, all in one round trip that also fetches the lane set so
+        the caller notices new tenants.
+
+        Returns:
+            Tuple[LaneEntries, List[str]]: Entries by lane, and the registered lanes
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        for lane, count in counts.items():
+            pipe.xreadgroup(self.group_name, consumer, {lane: ">"}, count=count)
+        pipe.smembers(self.lanes_key)
+        *responses, lanes = await pipe.execute()
+        batches: LaneEntries = {}
+        for response in responses:
+            batches.update(_lane_entries(response))
+        return batches, [_decode_id(lane) for lane in lanes]
+
+    async def wait_for_logs(self, consumer: str, lanes: List[str], count: int, block_ms: int,
+                            pending: bool = False) -> LaneEntries:
+        """
+        Read up to ``count`` entries per lane for this consumer in one
+        XREADGROUP, waiting up to ``block_ms`` until any lane has new ones.
+        With ``pending=True`` the consumer's own unacknowledged entries are
+        returned instead (used after a restart).
+        """
+        response = await self.redis_client.xreadgroup(
+            self.group_name,
+            consumer,
+            {lane: "0" if pending else ">" for lane in lanes},
+            count=count,
+            block=None if pending else block_ms,
+        )
+        return {lane: entries for lane, entries in _lane_entries(response).items() if entries}
+
+    async def ack_logs(self, entry_ids: List[str], lane: Optional[str] = None) -> None:
+        """
+        Acknowledge processed entries and delete them from their stream
+        """
+        await self.ack_lanes({lane or self.queue_name: entry_ids})
+
+    async def ack_lanes(self, entry_ids: Dict[str, List[str]]) -> None:
+        """
+        Acknowledge and delete processed entries of several lanes in one round trip
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        for lane, ids in entry_ids.items():
+            if ids:
+                pipe.xack(lane, self.group_name, *ids)
+                pipe.xdel(lane, *ids)
+        if len(pipe):
+            await pipe.execute()
+
+    async def claim_stale_logs(self, consumer: str, min_idle_ms: int, count: int,
+                               max_deliveries: int, lane: Optional[str] = None) -> List[StreamEntry]:
+        """
+        Take over entries of a lane that other consumers read but never
+        acknowledged (e.g. the worker crashed). Entries already delivered
+        ``max_deliveries`` times are moved to the dead-letter stream instead
+        of being retried forever.
+        """
+        lane = lane or self.queue_name
+        pending = await self.redis_client.xpending_range(
+            lane, self.group_name, min="-", max="+", count=count, idle=min_idle_ms
+        )
+        if not pending:
+            return []
+        retry_ids = [_decode_id(p["message_id"]) for p in pending if p["times_delivered"] < max_deliveries]
+        dead_ids = [_decode_id(p["message_id"]) for p in pending if p["times_delivered"] >= max_deliveries]
+        claimed: List[StreamEntry] = []
+        if retry_ids:
+            claimed = _entries(await self.redis_client.xclaim(
+                lane, self.group_name, consumer, min_idle_ms, retry_ids
+            ))
+        if dead_ids:
+            dead = _entries(await self.redis_client.xclaim(
+                lane, self.group_name, consumer, min_idle_ms, dead_ids
+            ))
+            await self.dead_letter(dead, "max deliveries exceeded", lane)
+        return claimed
+
+    async def dead_letter(self, entries: List[StreamEntry], reason: str, lane: Optional[str] = None) -> None:
+        """
+        Move entries that cannot be processed to the dead-letter stream
+        """
+        if not entries:
+            return
+        lane = lane or self.queue_name
+        pipe = self.redis_client.pipeline(transaction=False)
+        for entry_id, data in entries:
+            if data is not None:
+                pipe.xadd(self.dead_letter_name, {"data": data, "source": lane, "source_id": entry_id, "reason": reason})
+        await pipe.execute()
+        await self.ack_logs([entry_id for entry_id, _ in entries], lane)
+        logger.warning(f"Moved {len(entries)} logs from {lane} to {self.dead_letter_name}: {reason}")
+
+    async def get_queue_length(self) -> int:
+        """
+        Get the number of entries in all lanes that are not yet acknowledged
+        """
+        try:
+            lanes = await self.list_lanes()
+            pipe = self.redis_client.pipeline(transaction=False)
+            for lane in lanes:
+                pipe.xlen(lane)
+            return sum(await pipe.execute())
         except Exception as e:
             logger.error(f"Failed to get queue length: {str(e)}")
-            return 0
\ No newline at end of file
+            return 0
+
+    async def close(self) -> None:
+        await self.redis_client.close()
@@ -0,0 +1,193 @@
+import hashlib
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from app.core.config import settings
+
+# Placeholder for a variable token in a template
+WILDCARD = "<*>"
+
+# Messages are split on single spaces so that joining the tokens back gives
+# the exact original text, whitespace runs and newlines included
+SEPARATOR = " "
+
+_DIGIT = re.compile(r"\d")
+
+class MinedMessage(NamedTuple):
+    template_id: int
+    template: str
+    params: List[str]
+
+def template_id(template: str) -> int:
+    """
+    Id of a template text: the same in every worker process without any
+    coordination. 53 bits, so it fits a BIGINT and stays exact as a JSON
+    number in any client.
+    """
+    return int.from_bytes(hashlib.blake2b(template.encode(), digest_size=8).digest(), "big") >> 11
+
+def render(template: str, params: List[str]) -> str:
+    """
+    The original message of a log stored as a template and its parameters
+    """
+    values = iter(params)
+    return SEPARATOR.join(next(values) if token == WILDCARD else token for token in template.split(SEPARATOR))
+
+def is_variable(token: str) -> bool:
+    """Tokens with digits (ids, counts, durations, addresses) are assumed to vary"""
+    return token == WILDCARD or _DIGIT.search(token) is not None
+
+def canonical_template(template: str) -> str:
+    """A template with every token that has digits wildcarded, as a new template starts out"""
+    return SEPARATOR.join(WILDCARD if is_variable(token) else token for token in template.split(SEPARATOR))
+
+def _covers(general: List[str], specific: List[str]) -> bool:
+    return len(general) == len(specific) and all(g == WILDCARD or g == s for g, s in zip(general, specific))
+
+def group_templates(counts: Iterable[Tuple[int, str, int]]) -> List[Tuple[int, str, int, List[int]]]:
+    """
+    Merge the templates one pattern is spread over. Every worker mines on
+    its own and a template gets a new id each time it is generalized, so
+    one pattern has a template per worker and per generalization step
+    (the first of which may be a message without digits, taken as is).
+    Templates are grouped by their canonical form, and then folded into
+    the most specific other template that covers them: same token count,
+    and every position equal or a wildcard. Templates made of wildcards
+    only absorb nothing, as they would match unrelated patterns.
+
+    Args:
+        counts: (template id, template, count)
+
+    Returns:
+        List[Tuple[int, str, int, List[int]]]: (id of the most frequent member, most general
+        template, total count, member ids), most frequent first
+    """
+    groups: Dict[str, Dict] = {}
+    for key, template, count in counts:
+        group = groups.setdefault(canonical_template(template), {"ids": Counter(), "count": 0})
+        group["ids"][key] += count
+        group["count"] += count
+
+    tokens = {text: text.split(SEPARATOR) for text in groups}
+    wildcards = {text: parts.count(WILDCARD) for text, parts in tokens.items()}
+    by_length: Dict[int, List[str]] = defaultdict(list)
+    for text, parts in tokens.items():
+        by_length[len(parts)].append(text)
+    parent: Dict[str, str] = {}
+    for text, parts in tokens.items():
+        covers = [
+            other for other in by_length[len(parts)]
+            if wildcards[text] < wildcards[other] < len(parts) and _covers(tokens[other], parts)
+        ]
+        if covers:
+            parent[text] = min(covers, key=lambda other: (wildcards[other], -groups[other]["count"], other))
+
+    merged: Dict[str, Dict] = {}
+    for text, group in groups.items():
+        root = text
+        while root in parent:
+            root = parent[root]
+        target = merged.setdefault(root, {"ids": Counter(), "count": 0})
+        target["ids"].update(group["ids"])
+        target["count"] += group["count"]
+    results = [
+        (group["ids"].most_common(1)[0][0], text, group["count"], sorted(group["ids"]))
+        for text, group in merged.items()
+    ]
+    return sorted(results, key=lambda result: (-result[2], result[0]))
+
+class _Cluster:
+    __slots__ = ("tokens",)
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+
+    def similarity(self, tokens: List[str]) -> float:
+        """Share of positions where the message fits: equal constants, or a variable token in a wildcard"""
+        same = sum(1 for a, b in zip(self.tokens, tokens) if a == b or (a == WILDCARD and is_variable(b)))
+        return same / len(tokens)
+
+class _Node:
+    __slots__ = ("children", "clusters")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.clusters: List[_Cluster] = []
+
+class TemplateMiner:
+    """
+    Online log template miner after Drain (He et al., ICWS 2017).
+
+    Messages are routed through a parse tree of ``depth`` levels (root,
+    token count, then one level per leading token, then leaves) to a leaf
+    holding a few candidate templates. The most similar one is used if the message
+    fits at least ``similarity`` of its positions, and every position where
+    the message differs becomes a wildcard; otherwise the message starts
+    a new template, with tokens containing digits already wildcarded. Each message costs a handful of dict lookups and one
+    comparison per candidate, so mining keeps up with the worker.
+
+    Templates are identified by a hash of their text. A template that is
+    generalized later gets a new id, while logs already stored keep the
+    exact template they were parsed with, so rendering is always lossless.
+    """
+
+    def __init__(
+        self,
+        depth: int = settings.TEMPLATE_TREE_DEPTH,
+        similarity: float = settings.TEMPLATE_SIMILARITY,
+        max_children: int = settings.TEMPLATE_MAX_CHILDREN,
+        max_tokens: int = settings.TEMPLATE_MAX_TOKENS,
+        max_templates: int = settings.TEMPLATE_MAX_TEMPLATES,
+    ):
+        self.depth = max(depth, 3)
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_tokens = max_tokens
+        self.max_templates = max_templates
+        self.root = _Node()
+        self.template_count = 0
+        # Templates already in the catalogue table, maintained by the caller
+        self.saved: Set[int] = set()
+
+    def _leaf(self, tokens: List[str]) -> _Node:
+        node = self.root.children.setdefault(str(len(tokens)), _Node())
+        for token in tokens[:self.depth - 3]:
+            key = WILDCARD if is_variable(token) else token
+            child = node.children.get(key)
+            if child is None:
+                if key != WILDCARD and len(node.children) >= self.max_children:
+                    key = WILDCARD
+                child = node.children.setdefault(key, _Node())
+            node = child
+        return node
+
+    def mine(self, message: Optional[str]) -> Optional[MinedMessage]:
+        """
+        Template and parameters of a message, or None if it is not worth
+        templating (empty, too long, or the template limit is reached)
+        """
+        if not message:
+            return None
+        tokens = message.split(SEPARATOR)
+        if len(tokens) > self.max_tokens:
+            return None
+        leaf = self._leaf(tokens)
+
+        best, best_score = None, -1.0
+        for cluster in leaf.clusters:
+            score = cluster.similarity(tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+
+        if best is not None and best_score >= self.similarity:
+            best.tokens = [a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)]
+        elif self.template_count < self.max_templates:
+            best = _Cluster([WILDCARD if is_variable(token) else token for token in tokens])
+            leaf.clusters.append(best)
+            self.template_count += 1
+        else:
+            return None
+
+        template = SEPARATOR.join(best.tokens)
+        params = [token for token, slot in zip(tokens, best.tokens) if slot == WILDCARD]
+        return MinedMessage(template_id(template), template, params)
@@ -0,0 +1,52 @@
+import pytest
+from app.services.admission_control import AdmissionController, parse_tenant_map
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_token_buckets_per_tenant():
+    """
+    Test that each tenant has its own bucket, refilled at its rate
+    """
+    clock = FakeClock()
+    admission = AdmissionController(rate=10, rate_overrides={"big": 100}, burst_seconds=1, clock=clock)
+
+    assert [admission.acquire("a") for _ in range(10)] == [0.0] * 10
+    assert admission.acquire("a") == pytest.approx(0.1)
+    assert admission.acquire("b") == 0.0
+    assert sum(admission.acquire("big") == 0.0 for _ in range(150)) == 100
+
+    clock.now = 0.5
+    assert sum(admission.acquire("a") == 0.0 for _ in range(10)) == 5
+    assert AdmissionController.retry_after(0.1) == 1
+
+def test_queue_depth_marks():
+    """
+    Test the shed and high-water marks and the depth cache
+    """
+    clock = FakeClock()
+    admission = AdmissionController(high_water=100, shed_water=50, debug_sample_rate=0, depth_ttl=1, clock=clock)
+    assert admission.needs_queue_depth()
+
+    admission.set_queue_depth(60)
+    assert not admission.needs_queue_depth()
+    assert admission.shedding() and not admission.queue_full()
+    assert not admission.keep("DEBUG")
+    assert admission.keep("ERROR")
+
+    admission.set_queue_depth(100)
+    assert admission.queue_full()
+    clock.now = 1
+    assert admission.needs_queue_depth()
+
+def test_parse_tenant_map():
+    """
+    Test parsing per-tenant settings
+    """
+    assert parse_tenant_map("a=4, b=0.5,") == {"a": 4.0, "b": 0.5}
+    with pytest.raises(ValueError):
+        parse_tenant_map("a")
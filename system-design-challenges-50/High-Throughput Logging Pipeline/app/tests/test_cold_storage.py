@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from app.db.base import Base
+from app.schemas.logs import LogIn, LogLevel
+from app.schemas.query import LogQueryParams
+from app.services import db_service
+from app.services.cold_storage import ColdQuery, ColdStore, SegmentWriter, to_micros
+from app.services.db_service import DBService
+from app.utils.search_utils import parse_search_query
+
+SERVICES = ["auth-service", "payment-service", "notification-service"]
+LEVELS = ["INFO", "INFO", "INFO", "WARNING", "ERROR"]
+
+def make_rows(count: int, start: datetime):
+    return [
+        {
+            "id": str(uuid.UUID(int=i)),
+            "timestamp": start + timedelta(seconds=i),
+            "created_at": start + timedelta(seconds=i, milliseconds=5),
+            "level": LEVELS[i % len(LEVELS)],
+            "message": f"Request {i % 50} to /api/v1/orders completed in {i % 300}ms"
+                       + (" payment timeout" if i % 97 == 0 else ""),
+            "service": SERVICES[i % len(SERVICES)],
+            "tenant_id": f"tenant-{i % 20}",
+            "trace_id": f"{i:032x}",
+            "span_id": f"{i:016x}",
+            "metadata_": {"user_id": i % 1000, "region": "eu-west-1"},
+        }
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def store(tmp_path):
+    store = ColdStore(str(tmp_path))
+    writer = SegmentWriter(store.segment_path("log_entries_p20240301"), block_rows=1000)
+    for row in make_rows(10000, datetime(2024, 3, 1, tzinfo=timezone.utc)):
+        writer.add(row)
+    writer.close()
+    return store
+
+def test_segment_compression(store, tmp_path):
+    """
+    Test that a segment is far smaller than the same rows as JSON
+    """
+    raw = sum(len(json.dumps(row, default=str)) for row in make_rows(10000, datetime(2024, 3, 1)))
+    size = os.path.getsize(store.segment_path("log_entries_p20240301"))
+
+    assert raw / size > 10
+
+def test_cold_query_filters_newest_first(store):
+    """
+    Test filters, ordering and the keyset cursor on a segment
+    """
+    query = ColdQuery(equals={"service": "payment-service", "level": "ERROR"})
+    logs = store.query(query, 5)
+
+    assert len(logs) == 5
+    assert all(log.service == "payment-service" and log.level == LogLevel.ERROR for log in logs)
+    assert [log.timestamp for log in logs] == sorted((log.timestamp for log in logs), reverse=True)
+    assert logs[0].timestamp == datetime(2024, 3, 1, tzinfo=timezone.utc) + timedelta(seconds=9994)
+
+    after = store.query(ColdQuery(equals=query.equals, before=(to_micros(logs[-1].timestamp), logs[-1].id)), 5)
+    assert after[0].timestamp < logs[-1].timestamp
+
+    matches = store.query(ColdQuery(search=parse_search_query('"payment timeout"')), 1000)
+    assert len(matches) == len(range(0, 10000, 97))
+
+def test_cold_query_skips_blocks(store):
+    """
+    Test that time ranges and the trace_id bloom filter rule out blocks
+    """
+    segment = store.segments()[0]
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    with open(segment.path, "rb") as f:
+        in_range = segment.candidate_blocks(f, ColdQuery(start=start + timedelta(seconds=2500),
+                                                         end=start + timedelta(seconds=3500)))
+        by_trace = segment.candidate_blocks(f, ColdQuery(trace_id=f"{4321:032x}"))
+
+    assert in_range == [2, 3]
+    assert by_trace == [4]
+    assert [log.span_id for log in store.query(ColdQuery(trace_id=f"{4321:032x}"), 10)] == [f"{4321:016x}"]
+    assert store.count(ColdQuery(equals={"tenant_id": "tenant-404"})) == 0
+
+def test_concurrent_queries_share_segments(store):
+    """
+    Test that segment reads from several threads at once return the same rows
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    query = ColdQuery(search=parse_search_query('"payment timeout"'))
+    expected = [log.id for log in store.query(query, 1000)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: [log.id for log in store.query(query, 1000)], range(16)))
+
+    assert all(result == expected for result in results)
+
+def test_newest_timestamp_is_cached_until_segments_change(store, monkeypatch):
+    """
+    Test that the newest cold timestamp is not recomputed per query, but
+    follows segments written and removed through the store
+    """
+    newest = store.newest_timestamp()
+    assert newest == datetime(2024, 3, 1, tzinfo=timezone.utc) + timedelta(seconds=9999)
+
+    listed = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: listed.append(path) or listdir(path))
+    assert store.newest_timestamp() == newest
+    assert listed == []
+
+    writer = store.writer("log_entries_p20240302")
+    for row in make_rows(10, datetime(2024, 3, 2, tzinfo=timezone.utc)):
+        writer.add(row)
+    writer.close()
+    assert store.newest_timestamp() == datetime(2024, 3, 2, tzinfo=timezone.utc) + timedelta(seconds=9)
+
+    store.remove_before(datetime(2024, 3, 3, tzinfo=timezone.utc))
+    assert store.newest_timestamp() is None
+
+def test_query_logs_federates_hot_and_cold(tmp_path, monkeypatch):
+    """
+    Test that a page continues from hot rows into cold segments
+    """
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    store = ColdStore(str(tmp_path / "cold"))
+    writer = store.writer("log_entries_p1")
+    for row in make_rows(3, now - timedelta(days=3)):
+        writer.add(row)
+    writer.close()
+    monkeypatch.setattr(db_service, "cold_store", store)
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/hot.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            await DBService.bulk_insert_logs(db, [
+                LogIn(timestamp=now - timedelta(minutes=i), message=f"hot {i}", service="auth-service")
+                for i in range(2)
+            ])
+            params = LogQueryParams(service="auth-service", limit=2)
+            first, cursor = await DBService.query_logs(db, params)
+            second, end = await DBService.query_logs(db, LogQueryParams(service="auth-service", limit=2, cursor=cursor))
+            total = await DBService.get_log_count(db, params)
+        await engine.dispose()
+        return first, second, end, total
+
+    first, second, end, total = asyncio.run(run())
+    assert [log.message for log in first] == ["hot 0", "hot 1"]
+    # Of the three cold rows only i=0 belongs to auth-service
+    assert [log.id for log in second] == [str(uuid.UUID(int=0))]
+    assert end is None
+    assert total == 3
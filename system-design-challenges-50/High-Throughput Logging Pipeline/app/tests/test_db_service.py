@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import func, select
+from app.db.base import Base
+from app.db.models import LogEntry
+from app.schemas.logs import LogIn, LogLevel
+from app.services.db_service import BULK_COLUMNS, DBService, log_record
+
+def make_logs(count: int):
+    return [
+        LogIn(message=f"request {i} served", service="api", level=LogLevel.WARNING, metadata={"i": i})
+        for i in range(count)
+    ]
+
+def test_log_record_matches_bulk_columns():
+    """
+    Test that bulk records line up with the COPY column list
+    """
+    log = LogIn(timestamp=datetime(2024, 1, 1, 12), message="hello", service="api", metadata={"a": 1})
+    record = dict(zip(BULK_COLUMNS, log_record(log)))
+
+    assert len(record["id"]) == 36
+    assert record["timestamp"] == datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    assert record["level"] == "INFO"
+    assert record["metadata_"] == '{"a": 1}'
+
+def test_bulk_insert_fallback():
+    """
+    Test the multi-row INSERT path used on non-asyncpg backends
+    """
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            # More rows than fit in a single statement's bind parameters
+            written = await DBService.bulk_insert_logs(db, make_logs(5000))
+            count = (await db.execute(select(func.count(LogEntry.id)))).scalar()
+            sample = (await db.execute(select(LogEntry).limit(1))).scalars().one()
+        await engine.dispose()
+        return written, count, sample
+
+    written, count, sample = asyncio.run(run())
+    assert written == count == 5000
+    assert sample.level == LogLevel.WARNING
+    assert sample.metadata_ == {"i": 0}
+
+def test_bulk_insert_is_all_or_nothing(monkeypatch):
+    """
+    Test that a batch whose template counts fail leaves no rows behind,
+    so a redelivered batch is not stored twice
+    """
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.db.models import LogTemplate
+    from app.services.template_miner import TemplateMiner
+
+    async def fail(db, logs_data, mined):
+        raise RuntimeError("deadlock detected")
+
+    monkeypatch.setattr(DBService, "_add_template_counts", staticmethod(fail))
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        miner = TemplateMiner()
+        async with AsyncSession(engine) as db:
+            with pytest.raises(RuntimeError):
+                await DBService.bulk_insert_logs(db, make_logs(100), miner)
+            rows = (await db.execute(select(func.count(LogEntry.id)))).scalar()
+            templates = (await db.execute(select(func.count(LogTemplate.id)))).scalar()
+        await engine.dispose()
+        return rows, templates, miner.saved
+
+    rows, templates, saved = asyncio.run(run())
+    assert rows == templates == 0
+    assert saved == set()
@@ -1,7 +1,12 @@
+import asyncio
+import gzip
 import pytest
+import zstandard
 from fastapi.testclient import TestClient
 from app.main import app
+from app.core.config import settings
 from app.schemas.logs import LogIn, LogLevel
+from app.services.admission_control import AdmissionController
 from datetime import datetime
 
 client = TestClient(app)
@@ -66,4 +71,176 @@ def test_ingest_without_api_key():
     }
     
     response = client.post("/ingest/", json=log_data)
-    assert response.status_code == 422  # Validation error for missing header
\ No newline at end of file
+    assert response.status_code == 422  # Validation error for missing header
+
+
+class FakeRedisService:
+    def __init__(self):
+        self.lines = []
+        self.tenants = []
+        self.depth = 0
+
+    async def push_raw_logs(self, lines):
+        self.tenants.extend(tenant_id for tenant_id, _ in lines)
+        self.lines.extend(line for _, line in lines)
+        return True
+
+    async def get_queue_length(self):
+        return self.depth
+
+@pytest.fixture
+def fake_queue(monkeypatch):
+    from app.routers import ingest
+    fake = FakeRedisService()
+    monkeypatch.setattr(ingest.ingestion_service, "redis_service", fake)
+    monkeypatch.setattr(ingest.ingestion_service, "admission", AdmissionController(rate=0, depth_ttl=0))
+    return fake
+
+NDJSON_LINES = [
+    b'{"message": "payment timeout", "service": "payment-service", "level": "ERROR"}',
+    b'{"message": "missing service"}',
+    b'not json',
+    b'{"timestamp": "2024-03-01T12:00:00Z", "message": "ok", "service": "auth-service", "metadata": {"a": 1}}',
+]
+
+def test_ingest_stream_gzip(fake_queue):
+    """
+    Test that valid NDJSON lines are queued verbatim and invalid ones reported
+    """
+    body = gzip.compress(b"\n".join(NDJSON_LINES) + b"\n\n")
+    response = client.post(
+        "/ingest/stream",
+        content=body,
+        headers={"x-api-key": settings.API_KEY, "content-type": "application/x-ndjson", "content-encoding": "gzip"}
+    )
+    assert response.status_code == 202
+
+    data = response.json()
+    assert data["accepted"] == 2
+    assert data["rejected"] == 2
+    assert [error["line"] for error in data["errors"]] == [2, 3]
+    assert fake_queue.lines == [NDJSON_LINES[0], NDJSON_LINES[3]]
+
+def test_ingest_stream_zstd(fake_queue):
+    """
+    Test zstd bodies, including a line split across chunks
+    """
+    body = zstandard.ZstdCompressor().compress(b"\n".join(NDJSON_LINES[:1] * 1000))
+    chunks = [body[i:i + 100] for i in range(0, len(body), 100)]
+    response = client.post(
+        "/ingest/stream",
+        content=iter(chunks),
+        headers={"x-api-key": settings.API_KEY, "content-type": "application/x-ndjson", "content-encoding": "zstd"}
+    )
+    assert response.status_code == 202
+    assert response.json()["accepted"] == 1000
+    assert set(fake_queue.lines) == {NDJSON_LINES[0]}
+
+def test_ingest_stream_rejects_bad_bodies(fake_queue):
+    """
+    Test content type, encoding and corrupt body errors
+    """
+    headers = {"x-api-key": settings.API_KEY, "content-type": "application/x-ndjson"}
+
+    response = client.post("/ingest/stream", content=NDJSON_LINES[0], headers={**headers, "content-type": "application/json"})
+    assert response.status_code == 415
+    response = client.post("/ingest/stream", content=NDJSON_LINES[0], headers={**headers, "content-encoding": "br"})
+    assert response.status_code == 400
+    response = client.post("/ingest/stream", content=b"\x1f\x8bgarbage", headers={**headers, "content-encoding": "gzip"})
+    assert response.status_code == 400
+
+def test_stream_decompressor_stops_bombs():
+    """
+    Test that a highly compressed body is decoded in capped pieces
+    instead of being inflated in full
+    """
+    import tracemalloc
+    from app.utils.compression_utils import StreamDecompressor
+
+    zeros = b"\0" * (64 * 1024 * 1024)
+    bombs = {"gzip": gzip.compress(zeros, 9), "zstd": zstandard.ZstdCompressor(level=19).compress(zeros)}
+    del zeros
+    for encoding, bomb in bombs.items():
+        assert len(bomb) < 100 * 1024
+        decompressor = StreamDecompressor(encoding, 1024 * 1024)
+        decoded, largest = 0, 0
+        tracemalloc.start()
+        for i in range(0, len(bomb), 32 * 1024):
+            for piece in decompressor.decompress(bomb[i:i + 32 * 1024]):
+                decoded += len(piece)
+                largest = max(largest, len(piece))
+        decompressor.flush()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert decoded == 64 * 1024 * 1024, encoding
+        assert largest <= 1024 * 1024, encoding
+        assert peak < 4 * 1024 * 1024, encoding
+
+def test_ingest_stream_bomb_is_read_in_bounded_memory(fake_queue):
+    """
+    Test that ingesting a body that inflates a thousandfold never holds
+    more than a small piece of it, with the default limits
+    """
+    import tracemalloc
+    from app.routers import ingest
+
+    line = b"x" * 60000 + b"\n"
+    body = zstandard.ZstdCompressor().compress(line * 1100)
+    assert len(body) < 64 * 1024
+
+    async def chunks():
+        for i in range(0, len(body), 64 * 1024):
+            yield body[i:i + 64 * 1024]
+
+    tracemalloc.start()
+    summary = asyncio.run(ingest.ingestion_service.ingest_ndjson(chunks(), "zstd"))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert summary["rejected"] == 1100
+    assert peak < 16 * 1024 * 1024
+
+def test_ingest_stream_throttles_noisy_tenant(fake_queue, monkeypatch):
+    """
+    Test that a tenant over its rate gets 429 with the line to resume from, without affecting others
+    """
+    from app.routers import ingest
+    monkeypatch.setattr(ingest.ingestion_service, "admission", AdmissionController(rate=1, burst_seconds=3, depth_ttl=0))
+    lines = [
+        b'{"message": "m", "service": "s", "tenant_id": "noisy"}',
+        b'{"message": "m", "service": "s", "tenant_id": "quiet"}',
+    ]
+    headers = {"x-api-key": settings.API_KEY, "content-type": "application/x-ndjson"}
+
+    response = client.post("/ingest/stream", content=b"\n".join([lines[0]] * 5 + [lines[1]]), headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.json()["accepted"] == 3
+    assert response.json()["retry_from_line"] == 4
+    assert fake_queue.tenants == ["noisy"] * 3
+
+    response = client.post("/ingest/stream", content=lines[1], headers=headers)
+    assert response.status_code == 202
+    assert fake_queue.tenants[-1] == "quiet"
+
+def test_ingest_stream_backpressure(fake_queue, monkeypatch):
+    """
+    Test that DEBUG logs are shed past the shed mark and everything is refused past the high-water mark
+    """
+    from app.routers import ingest
+    monkeypatch.setattr(ingest.ingestion_service, "admission", AdmissionController(
+        rate=0, high_water=100, shed_water=50, debug_sample_rate=0, depth_ttl=0
+    ))
+    headers = {"x-api-key": settings.API_KEY, "content-type": "application/x-ndjson"}
+    body = b'{"message": "m", "service": "s", "level": "DEBUG"}\n{"message": "m", "service": "s"}'
+
+    fake_queue.depth = 60
+    response = client.post("/ingest/stream", content=body, headers=headers)
+    assert response.status_code == 202
+    assert (response.json()["accepted"], response.json()["shed"]) == (1, 1)
+
+    fake_queue.depth = 100
+    response = client.post("/ingest/stream", content=body, headers=headers)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(settings.QUEUE_RETRY_AFTER)
+    assert response.json()["retry_from_line"] == 1
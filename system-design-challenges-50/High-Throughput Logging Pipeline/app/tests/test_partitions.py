@@ -0,0 +1,154 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from app.db import partitions
+from app.db.models import LogEntry
+from app.schemas.query import LogQueryParams
+from app.services.db_service import log_filters
+
+NOW = datetime(2024, 3, 10, 15, 30, tzinfo=timezone.utc)
+
+def test_partition_names_round_trip():
+    """
+    Test that partition names encode their start for both intervals
+    """
+    day = partitions.partition_start(NOW, "day")
+    hour = partitions.partition_start(NOW, "hour")
+
+    assert partitions.partition_name(day, "day") == "log_entries_p20240310"
+    assert partitions.partition_name(hour, "hour") == "log_entries_p2024031015"
+    assert partitions.parse_partition_name("log_entries_p20240310", "day") == day
+    assert partitions.parse_partition_name("log_entries_p2024031015", "hour") == hour
+    assert partitions.parse_partition_name(partitions.DEFAULT_PARTITION, "day") is None
+
+def test_create_partition_sql():
+    """
+    Test the bounds of a generated partition
+    """
+    sql = partitions.create_partition_sql(partitions.partition_start(NOW, "day"), "day")
+
+    assert "log_entries_p20240310 PARTITION OF log_entries" in sql
+    assert "FROM ('2024-03-10T00:00:00+00:00') TO ('2024-03-11T00:00:00+00:00')" in sql
+
+def test_missing_and_expired_partitions():
+    """
+    Test which partitions the maintenance job creates and drops
+    """
+    existing = ["log_entries_p20240201", "log_entries_p20240208", "log_entries_p20240209",
+                "log_entries_p20240310", "log_entries_p20240311", partitions.DEFAULT_PARTITION]
+
+    missing = partitions.missing_partitions(existing, NOW, "day", premake=3)
+    assert [partitions.partition_name(start, "day") for start in missing] == [
+        "log_entries_p20240312", "log_entries_p20240313"
+    ]
+    # The cutoff is Feb 9 00:00: the Feb 8 partition ends exactly there, Feb 9 still overlaps it
+    expired = partitions.expired_partitions(existing, NOW - timedelta(hours=15, minutes=30), "day", retention_days=30)
+    assert expired == ["log_entries_p20240201", "log_entries_p20240208"]
+
+def test_log_entries_is_range_partitioned():
+    """
+    Test that the table DDL partitions on timestamp with it in the primary key
+    """
+    ddl = str(CreateTable(LogEntry.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "PARTITION BY RANGE (timestamp)" in ddl
+    assert "PRIMARY KEY (id, timestamp)" in ddl
+
+def test_log_filters_bound_time_range_by_retention():
+    """
+    Test that queries never reach past the retention cutoff
+    """
+    compiled = [
+        str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        for clause in log_filters(LogQueryParams(start_time=datetime(2000, 1, 1), service="api"))
+    ]
+
+    assert compiled[0].startswith("log_entries.timestamp >= '")
+    assert "2000-01-01" not in compiled[0]
+    assert "log_entries.service = 'api'" in compiled
+
+class FakeResult:
+    def __init__(self, value=None):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+class FakeConnection:
+    """Records SQL; the default partition holds rows in every range asked about"""
+
+    def __init__(self, statements):
+        self.statements = statements
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        return FakeResult(sql.startswith("SELECT EXISTS"))
+
+class FakeEngine:
+    def __init__(self):
+        self.statements = []
+
+    @asynccontextmanager
+    async def begin(self):
+        yield FakeConnection(self.statements)
+
+    connect = begin
+
+def test_create_partition_moves_default_stragglers():
+    """
+    Test that rows already in the default partition are moved into a new partition
+    """
+    engine = FakeEngine()
+
+    async def create():
+        async with engine.begin() as conn:
+            return await partitions.create_partition(conn, partitions.partition_start(NOW, "day"), "day")
+
+    assert asyncio.run(create()) == "log_entries_p20240310"
+    detach, create_sql, move, attach = engine.statements[1:]
+    assert detach == "ALTER TABLE log_entries DETACH PARTITION log_entries_default"
+    assert create_sql.startswith("CREATE TABLE IF NOT EXISTS log_entries_p20240310")
+    assert "DELETE FROM log_entries_default" in move and "INSERT INTO log_entries SELECT" in move
+    assert attach == "ALTER TABLE log_entries ATTACH PARTITION log_entries_default DEFAULT"
+
+def test_failed_step_does_not_stop_retention(monkeypatch):
+    """
+    Test that a partition that cannot be created does not block dropping expired ones
+    """
+    from app.workers import partition_maintenance
+
+    dropped, removed_before = [], []
+
+    async def list_partitions(conn):
+        return ["log_entries_p20240101", "log_entries_p20240310", partitions.DEFAULT_PARTITION]
+
+    async def create_partition(conn, start, interval):
+        if start.day == 11:
+            raise RuntimeError("updated partition constraint for default partition would be violated")
+        return partitions.partition_name(start, interval)
+
+    async def drop_partition(conn, name):
+        dropped.append(name)
+
+    async def purge_default_partition(conn, cutoff):
+        return 0
+
+    monkeypatch.setattr(partition_maintenance, "engine", FakeEngine())
+    monkeypatch.setattr(partition_maintenance, "get_current_utc_time", lambda: NOW)
+    monkeypatch.setattr(partitions, "list_partitions", list_partitions)
+    monkeypatch.setattr(partitions, "create_partition", create_partition)
+    monkeypatch.setattr(partitions, "drop_partition", drop_partition)
+    monkeypatch.setattr(partitions, "purge_default_partition", purge_default_partition)
+    monkeypatch.setattr(partition_maintenance.cold_store, "remove_before", lambda cutoff: removed_before.append(cutoff) or [])
+    maintenance = partition_maintenance.PartitionMaintenance()
+    maintenance.premake, maintenance.retention_days, maintenance.tier_after_days = 2, 30, 0
+
+    result = asyncio.run(maintenance.run_once())
+
+    assert result["created"] == ["log_entries_p20240312"]
+    assert result["failed"] == ["create log_entries_p20240311"]
+    assert dropped == result["dropped"] == ["log_entries_p20240101"]
+    assert len(removed_before) == 1
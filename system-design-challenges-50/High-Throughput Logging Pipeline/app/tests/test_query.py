@@ -1,29 +1,92 @@
+import asyncio
 import pytest
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 from app.main import app
+from app.core.config import settings
+from app.db.base import Base, get_db
+from app.schemas.logs import LogIn
+from app.services.db_service import DBService
 
 client = TestClient(app)
 
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """
+    Serve queries from a SQLite database seeded with five logs a minute apart
+    """
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    url = f"sqlite+aiosqlite:///{tmp_path}/logs.db"
+    now = datetime.utcnow()
+    logs = [
+        LogIn(timestamp=now - timedelta(minutes=i), message=f"request {i}", service="test-service")
+        for i in range(5)
+    ]
+
+    async def seed():
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            await DBService.bulk_insert_logs(db, logs)
+        await engine.dispose()
+
+    async def override_get_db():
+        engine = create_async_engine(url)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+        await engine.dispose()
+
+    asyncio.run(seed())
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
 def test_query_logs():
     """
     Test querying logs
     """
     response = client.get("/query/", params={"service": "test-service"})
-    # We expect this to return 404 because the endpoint is not implemented yet
-    assert response.status_code == 404
+    # The API key is a required query parameter
+    assert response.status_code == 422
 
 def test_query_logs_with_api_key():
     """
     Test querying logs with API key
     """
-    response = client.get("/query/", params={"service": "test-service", "api_key": "test-api-key"})
-    # We expect this to return 404 because the endpoint is not implemented yet
-    assert response.status_code == 404
+    response = client.get("/query/", params={"service": "test-service", "x_api_key": "wrong-api-key"})
+    assert response.status_code == 401
 
 def test_query_logs_without_api_key():
     """
     Test querying logs without API key
     """
     response = client.get("/query/", params={"service": "test-service"})
-    # We expect this to return 404 because the endpoint is not implemented yet
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 422
+
+def test_query_logs_keyset_pagination(sqlite_db):
+    """
+    Test walking all pages with the returned cursors
+    """
+    params = {"service": "test-service", "limit": 2, "x_api_key": settings.API_KEY}
+    messages, cursor = [], None
+    while True:
+        response = client.get("/query/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        data = response.json()
+        messages.extend(log["message"] for log in data["results"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert messages == [f"request {i}" for i in range(5)]
+    assert data["total"] == 5
+
+def test_query_logs_invalid_cursor(sqlite_db):
+    """
+    Test that a malformed cursor is rejected
+    """
+    response = client.get("/query/", params={"cursor": "not-a-cursor", "x_api_key": settings.API_KEY})
+    assert response.status_code == 400
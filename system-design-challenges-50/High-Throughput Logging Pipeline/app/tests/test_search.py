@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.core.exceptions import ValidationError
+from app.db.models import LOG_SEARCH_EXPRESSION
+from app.schemas.query import LogQueryParams
+from app.services.db_service import log_filters
+from app.utils.search_utils import parse_search_query
+
+def test_parse_search_query():
+    """
+    Test operators, phrases, prefixes and grouping
+    """
+    assert parse_search_query("timeout AND payment") == ("and", [("word", "timeout"), ("word", "payment")])
+    assert parse_search_query("timeout payment") == parse_search_query("timeout AND payment")
+    assert parse_search_query('"connection refused" OR time*') == (
+        "or", [("phrase", "connection refused"), ("prefix", "time")]
+    )
+    assert parse_search_query("(a OR b) -debug") == (
+        "and", [("or", [("word", "a"), ("word", "b")]), ("not", ("word", "debug"))]
+    )
+    assert parse_search_query('NOT "cache miss"') == ("not", ("phrase", "cache miss"))
+
+@pytest.mark.parametrize("query", ["", "timeout AND", '"unterminated', "(a OR b", "a )", "*"])
+def test_parse_search_query_rejects_malformed(query):
+    """
+    Test that malformed queries raise a validation error
+    """
+    with pytest.raises(ValidationError):
+        parse_search_query(query)
+
+def test_search_filter_uses_message_index_expression():
+    """
+    Test that the search filter matches the indexed expression
+    """
+    search = log_filters(LogQueryParams(search='"connection refused" AND pay*'))[-1]
+    sql = str(search.compile(dialect=postgresql.dialect()))
+
+    indexed = LOG_SEARCH_EXPRESSION.replace("message", "log_entries.message").replace("params", "log_entries.params")
+    assert sql.count(f"({indexed}) @@ ") == 2
+    assert "phraseto_tsquery('simple'," in sql
+    assert "to_tsquery('simple'," in sql
+    # Terms are also looked up in the template catalogue
+    assert sql.count("to_tsvector('simple', log_templates.template) @@ ") == 2
@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.config import settings
+from app.db.base import Base, get_db
+from app.db.models import LogEntry
+from app.schemas.logs import LogIn, LogLevel
+from app.schemas.query import LogQueryParams
+from app.services import db_service
+from app.services.db_service import DBService
+from app.services.template_miner import TemplateMiner, group_templates, render, template_id
+
+client = TestClient(app)
+
+MESSAGES = [
+    "Request 42 to /api/v1/orders completed in 120ms",
+    "User alice logged in",
+    "User bob logged in",
+    "User  carol logged in\nfrom 10.0.0.7",
+    "Payment failed for order 981: card declined",
+    "Payment failed for order 982: insufficient funds",
+    "<*> literal placeholder",
+    "",
+]
+
+def test_miner_groups_messages_and_renders_losslessly():
+    """
+    Test that similar messages share a template and every message renders back exactly
+    """
+    miner = TemplateMiner()
+    mined = [miner.mine(message) for message in MESSAGES]
+
+    assert mined[0].template == "Request <*> to <*> completed in <*>"
+    assert mined[0].params == ["42", "/api/v1/orders", "120ms"]
+    assert mined[2].template == "User <*> logged in" and mined[2].params == ["bob"]
+    assert mined[5].template == "Payment failed for order <*> <*> <*>"
+    assert mined[7] is None
+    for message, m in zip(MESSAGES, mined):
+        if m:
+            assert render(m.template, m.params) == message
+            assert m.template_id == template_id(m.template)
+
+def test_miner_limits():
+    """
+    Test that over-long messages and templates past the limit are left alone
+    """
+    miner = TemplateMiner(max_tokens=5, max_templates=1)
+    assert miner.mine("one two three four five six") is None
+    assert miner.mine("disk full on node-1") is not None
+    assert miner.mine("disk full on node-2") is not None
+    assert miner.mine("unrelated message entirely") is None
+
+def test_patterns_mined_by_several_workers_are_counted_once():
+    """
+    Test that the templates two miners produce for one pattern, including
+    the digit-free first message of each, are grouped into one result
+    """
+    from collections import Counter
+
+    counts = Counter()
+    for miner, messages in (
+        (TemplateMiner(), ["User alice logged in", "User bob logged in", "Timeout after 5ms"]),
+        (TemplateMiner(), ["User carol logged in", "Timeout after 7ms", "Timeout after 9ms"]),
+    ):
+        for message in messages:
+            mined = miner.mine(message)
+            counts[(mined.template_id, mined.template)] += 1
+    assert len({template for _, template in counts if template.startswith("User")}) == 3
+
+    rows = [(key, template, count) for (key, template), count in counts.items()] + [(1, "<*> <*> <*> <*>", 1)]
+    grouped = {template: (count, len(ids)) for _, template, count, ids in group_templates(rows)}
+
+    assert grouped == {"User <*> logged in": (3, 3), "Timeout after <*>": (3, 1), "<*> <*> <*> <*>": (1, 1)}
+
+@pytest.fixture
+def template_db(tmp_path, monkeypatch):
+    """
+    SQLite database loaded through a miner, serving the API
+    """
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    monkeypatch.setattr(db_service, "template_texts", {})
+    url = f"sqlite+aiosqlite:///{tmp_path}/logs.db"
+    now = datetime.now(timezone.utc).replace(minute=30)
+    logs = [
+        LogIn(timestamp=now - timedelta(hours=i % 3), level=LogLevel.ERROR if i % 2 else LogLevel.INFO,
+              message=f"Payment failed for order {i}: card declined", service="payment-service")
+        for i in range(10)
+    ] + [LogIn(timestamp=now, level=LogLevel.ERROR, message=f"Timeout after {i}ms", service="payment-service")
+         for i in range(3)]
+
+    async def seed():
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        miner = TemplateMiner()
+        async with AsyncSession(engine) as db:
+            await DBService.bulk_insert_logs(db, logs[:7], miner)
+            await DBService.bulk_insert_logs(db, logs[7:], miner)
+        await engine.dispose()
+
+    async def override_get_db():
+        engine = create_async_engine(url)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+        await engine.dispose()
+
+    asyncio.run(seed())
+    app.dependency_overrides[get_db] = override_get_db
+    yield override_get_db
+    app.dependency_overrides.pop(get_db, None)
+
+def test_mined_logs_are_stored_as_templates(template_db):
+    """
+    Test that mined rows keep only the template reference and render back on query
+    """
+    from sqlalchemy import select
+
+    async def run():
+        async for db in template_db():
+            stored = (await db.execute(select(LogEntry.message, LogEntry.params))).all()
+            logs, _ = await DBService.query_logs(db, LogQueryParams(limit=100))
+            return stored, logs
+
+    stored, logs = asyncio.run(run())
+    assert all(message is None for message, _ in stored)
+    assert ["0:"] in [params for _, params in stored]
+    assert sorted(log.message for log in logs)[0] == "Payment failed for order 0: card declined"
+
+def test_template_count_api(template_db):
+    """
+    Test top templates and counts over time from the hourly rollup
+    """
+    params = {"x_api_key": settings.API_KEY}
+    response = client.get("/templates/", params=params)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["template"], r["count"]) for r in results] == [
+        ("Payment failed for order <*> card declined", 10),
+        ("Timeout after <*>", 3),
+    ]
+
+    response = client.get("/templates/", params={**params, "level": "ERROR"})
+    assert [r["count"] for r in response.json()["results"]] == [5, 3]
+
+    payment = results[0]["template_id"]
+    response = client.get(f"/templates/{payment}/counts", params=params)
+    assert response.status_code == 200
+    assert [point["count"] for point in response.json()["points"]] == [3, 3, 4]
+    response = client.get(f"/templates/{payment}/counts", params={**params, "interval": "day"})
+    assert sum(point["count"] for point in response.json()["points"]) == 10
+
+    assert client.get("/templates/1/counts", params=params).status_code == 404
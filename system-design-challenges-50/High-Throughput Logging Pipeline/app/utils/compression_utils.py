@@ -1,6 +1,8 @@
 import gzip
 import json
-from typing import Union, Dict, List
+import zlib
+from typing import Union, Dict, Iterator, List, Optional
+import zstandard
 
 def compress_log_data(log_data: Union[Dict, List, str]) -> bytes:
     """
@@ -43,4 +45,83 @@ def is_compressed(data: bytes) -> bool:
     """
     Check if data is gzip compressed
     """
-    return data.startswith(b'\x1f\x8b')
\ No newline at end of file
+    return data.startswith(b'\x1f\x8b')
+
+# Worst-case zstd expansion: a 4-byte RLE block decodes to a full 128 KB block
+ZSTD_BLOCK_SIZE = 128 * 1024
+ZSTD_MAX_EXPANSION = ZSTD_BLOCK_SIZE // 4
+
+class StreamDecompressor:
+    """
+    Incremental decoder for a request body sent with a Content-Encoding of
+    gzip, zstd or identity; concatenated gzip members or zstd frames are
+    decoded one after the other. Each chunk is decoded into pieces of at
+    most ``max_output`` bytes, produced one at a time, so a small chunk
+    that inflates enormously never sits in memory as a whole: gzip is
+    capped through ``max_length``, zstd (whose decompressobj has no such
+    bound) by feeding the input in slices whose worst-case output still
+    fits the cap. Limiting the size of the whole body is up to the caller.
+    """
+
+    def __init__(self, encoding: Optional[str], max_output: int):
+        self.encoding = (encoding or "identity").strip().lower()
+        self.max_output = max_output
+        if self.encoding not in ("gzip", "zstd", "identity"):
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+        self._decoder = self._new_decoder()
+
+    def _new_decoder(self):
+        if self.encoding == "gzip":
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self.encoding == "zstd":
+            return zstandard.ZstdDecompressor().decompressobj()
+        return None
+
+    def _decode_gzip(self, pending: bytes) -> Iterator[bytes]:
+        while True:
+            if self._decoder.eof:
+                pending = self._decoder.unused_data + pending
+                if not pending:
+                    return
+                self._decoder = self._new_decoder()
+            data = self._decoder.decompress(pending, self.max_output)
+            pending = self._decoder.unconsumed_tail
+            if data:
+                yield data
+            elif not pending and not self._decoder.eof:
+                return
+
+    def _decode_zstd(self, chunk: bytes) -> Iterator[bytes]:
+        # At most one block begun in an earlier slice adds to a slice's own output
+        step = max((self.max_output - ZSTD_BLOCK_SIZE) // ZSTD_MAX_EXPANSION, 1)
+        pending = memoryview(chunk)
+        while pending:
+            if self._decoder.eof:
+                self._decoder = self._new_decoder()
+            data = self._decoder.decompress(pending[:step])
+            pending = pending[step:]
+            if self._decoder.eof and self._decoder.unused_data:
+                pending = memoryview(self._decoder.unused_data + pending)
+            if data:
+                yield data
+
+    def decompress(self, chunk: bytes) -> Iterator[bytes]:
+        """Decoded pieces of a chunk, each at most ``max_output`` bytes"""
+        if not chunk:
+            return
+        if self._decoder is None:
+            for start in range(0, len(chunk), self.max_output):
+                yield chunk[start:start + self.max_output]
+            return
+        try:
+            if self.encoding == "gzip":
+                yield from self._decode_gzip(chunk)
+            else:
+                yield from self._decode_zstd(chunk)
+        except (zlib.error, zstandard.ZstdError) as e:
+            raise ValueError(f"Corrupt {self.encoding} body: {str(e)}") from e
+
+    def flush(self) -> bytes:
+        if self._decoder is not None and not self._decoder.eof:
+            raise ValueError(f"Truncated {self.encoding} body")
+        return b""
@@ -0,0 +1,120 @@
+import re
+from typing import List, Optional, Tuple, Union
+from app.core.exceptions import ValidationError
+
+# Parsed search query: ("word" | "prefix" | "phrase", text), ("not", node) or ("and" | "or", [nodes])
+SearchNode = Tuple[str, Union[str, "SearchNode", List["SearchNode"]]]
+
+_TOKEN = re.compile(r'"[^"]*"?|\(|\)|[^\s()"]+')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+def parse_search_query(query: str) -> SearchNode:
+    """
+    Parse a message search expression.
+
+    Supported syntax:
+        timeout payment          both words (implicit AND)
+        timeout AND payment      same
+        timeout OR refused       either word
+        NOT debug, -debug        exclude a word
+        "connection refused"     phrase: the words adjacent and in order
+        time*                    prefix: timeout, timestamp, ...
+        (a OR b) AND c           grouping
+
+    Raises:
+        ValidationError: If the query is empty or malformed
+    """
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        raise ValidationError("Search query is empty")
+    node, position = _parse_or(tokens, 0)
+    if position != len(tokens):
+        raise ValidationError(f"Unexpected '{tokens[position]}' in search query")
+    return node
+
+def _parse_or(tokens: List[str], position: int) -> Tuple[SearchNode, int]:
+    nodes = []
+    node, position = _parse_and(tokens, position)
+    nodes.append(node)
+    while position < len(tokens) and tokens[position] == "OR":
+        node, position = _parse_and(tokens, position + 1)
+        nodes.append(node)
+    return (nodes[0] if len(nodes) == 1 else ("or", nodes)), position
+
+def _parse_and(tokens: List[str], position: int) -> Tuple[SearchNode, int]:
+    nodes = []
+    node, position = _parse_unary(tokens, position)
+    nodes.append(node)
+    while position < len(tokens) and tokens[position] not in ("OR", ")"):
+        if tokens[position] == "AND":
+            position += 1
+        node, position = _parse_unary(tokens, position)
+        nodes.append(node)
+    return (nodes[0] if len(nodes) == 1 else ("and", nodes)), position
+
+def _parse_unary(tokens: List[str], position: int) -> Tuple[SearchNode, int]:
+    if position >= len(tokens):
+        raise ValidationError("Search query ends with an operator")
+    token = tokens[position]
+    if token == "NOT":
+        node, position = _parse_unary(tokens, position + 1)
+        return ("not", node), position
+    if token == "(":
+        node, position = _parse_or(tokens, position + 1)
+        if position >= len(tokens) or tokens[position] != ")":
+            raise ValidationError("Unbalanced parentheses in search query")
+        return node, position + 1
+    if token == ")" or token in _OPERATORS:
+        raise ValidationError(f"Unexpected '{token}' in search query")
+    if token == "-":
+        node, position = _parse_unary(tokens, position + 1)
+        return ("not", node), position
+    if token.startswith("-"):
+        return ("not", _parse_term(token[1:])), position + 1
+    return _parse_term(token), position + 1
+
+def _parse_term(token: str) -> SearchNode:
+    if token.startswith('"'):
+        if len(token) < 2 or not token.endswith('"'):
+            raise ValidationError("Unterminated phrase in search query")
+        phrase = token[1:-1].strip()
+        if not phrase:
+            raise ValidationError("Empty phrase in search query")
+        return ("phrase", phrase)
+    if token.endswith("*"):
+        # Only word characters can carry a prefix match in a tsquery
+        prefix = re.sub(r"\W", "", token[:-1])
+        if not prefix:
+            raise ValidationError(f"Invalid prefix '{token}' in search query")
+        return ("prefix", prefix.lower())
+    return ("word", token)
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+def _contains_sequence(tokens: List[str], words: List[str]) -> bool:
+    if not words:
+        return False
+    return any(tokens[i:i + len(words)] == words for i in range(len(tokens) - len(words) + 1))
+
+def match_search(node: SearchNode, message: str, tokens: Optional[List[str]] = None) -> bool:
+    """
+    Evaluate a parsed search query against one message, approximating the
+    'simple' text search configuration used for the indexed (hot) logs.
+    Used where no inverted index exists, e.g. cold segments.
+    """
+    if tokens is None:
+        tokens = _words(message or "")
+    kind, value = node
+    if kind == "word":
+        words = _words(value)
+        return bool(words) and all(word in tokens for word in words)
+    if kind == "phrase":
+        return _contains_sequence(tokens, _words(value))
+    if kind == "prefix":
+        return any(token.startswith(value) for token in tokens)
+    if kind == "not":
+        return not match_search(value, message, tokens)
+    if kind == "and":
+        return all(match_search(child, message, tokens) for child in value)
+    return any(match_search(child, message, tokens) for child in value)
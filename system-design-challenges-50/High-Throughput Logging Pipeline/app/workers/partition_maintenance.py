@@ -0,0 +1,165 @@
+import asyncio
+from datetime import timedelta
+from typing import Dict, List
+from sqlalchemy import delete, select
+from app.db import partitions
+from app.db.base import engine
+from app.db.models import LogEntry, LogTemplate, LogTemplateCount
+from app.services.cold_storage import cold_store
+from app.services.template_miner import render
+from app.core.config import settings
+from app.core.logging_config import get_logger, setup_logging
+from app.utils.time_utils import get_current_utc_time
+
+# Setup logging
+setup_logging()
+
+logger = get_logger("partition_maintenance")
+
+class PartitionMaintenance:
+    """
+    Keeps log_entries partitions in step with the clock: pre-creates the
+    next ``LOG_PARTITION_PREMAKE`` partitions, moves those older than
+    ``COLD_TIER_AFTER_DAYS`` to cold segment files and drops those that
+    fell out of ``LOG_RETENTION_DAYS`` (cold segments and hourly template
+    counts included). Every step runs in its own short transaction, so
+    ingestion is only blocked for a catalog update.
+    """
+
+    def __init__(self):
+        self.interval = settings.LOG_PARTITION_INTERVAL
+        self.premake = settings.LOG_PARTITION_PREMAKE
+        self.retention_days = settings.LOG_RETENTION_DAYS
+        self.tier_after_days = settings.COLD_TIER_AFTER_DAYS
+        self.run_interval = settings.PARTITION_MAINTENANCE_INTERVAL
+
+    async def tier_partition(self, name: str) -> int:
+        """
+        Export a partition to a cold segment, then drop it. The rows are
+        streamed with a server-side cursor in (timestamp, id) order, and the
+        partition is only dropped once the segment is safely on disk; a
+        crash in between rewrites the same segment on the next run.
+        Messages stored as templates are rendered back into full text,
+        which the segment compresses just as well.
+
+        Returns:
+            int: Number of rows moved
+        """
+        start = partitions.parse_partition_name(name, self.interval)
+        end = start + partitions.PARTITION_INTERVALS[self.interval]
+        writer = cold_store.writer(name)
+        try:
+            async with engine.connect() as conn:
+                result = await conn.stream(
+                    select(LogEntry.__table__, LogTemplate.template)
+                    .outerjoin(LogTemplate, LogTemplate.id == LogEntry.template_id)
+                    .where(LogEntry.timestamp >= start, LogEntry.timestamp < end)
+                    .order_by(LogEntry.timestamp, LogEntry.id)
+                )
+                async for row in result:
+                    values = dict(row._mapping)
+                    values["level"] = values["level"].value if values["level"] else None
+                    if values["message"] is None and values["template"] is not None:
+                        values["message"] = render(values["template"], values["params"] or [])
+                    writer.add(values)
+        except Exception:
+            writer.abort()
+            raise
+        if writer.row_count:
+            writer.close()
+        else:
+            writer.abort()
+        async with engine.begin() as conn:
+            await partitions.drop_partition(conn, name)
+        return writer.row_count
+
+    async def run_once(self) -> Dict[str, List[str]]:
+        """
+        Create upcoming partitions, tier aged ones and drop expired ones.
+        Each step is attempted on its own: a partition that cannot be
+        created, tiered or dropped is logged and retried on the next run,
+        without holding back retention for everything else.
+
+        Returns:
+            Dict[str, List[str]]: Names of the partitions created, tiered and dropped,
+            and the steps that failed
+        """
+        now = get_current_utc_time()
+        async with engine.connect() as conn:
+            existing = await partitions.list_partitions(conn)
+        failed = []
+
+        created = []
+        for start in partitions.missing_partitions(existing, now, self.interval, self.premake):
+            try:
+                async with engine.begin() as conn:
+                    created.append(await partitions.create_partition(conn, start, self.interval))
+            except Exception as e:
+                failed.append(f"create {partitions.partition_name(start, self.interval)}")
+                logger.error(f"Creating partition for {start.isoformat()} failed: {str(e)}")
+
+        dropped = []
+        for name in partitions.expired_partitions(existing, now, self.interval, self.retention_days):
+            try:
+                async with engine.begin() as conn:
+                    await partitions.drop_partition(conn, name)
+                dropped.append(name)
+            except Exception as e:
+                failed.append(f"drop {name}")
+                logger.error(f"Dropping partition {name} failed: {str(e)}")
+
+        tiered = []
+        if self.tier_after_days:
+            for name in partitions.expired_partitions(existing, now, self.interval, self.tier_after_days):
+                if name in dropped or f"drop {name}" in failed:
+                    continue
+                try:
+                    rows = await self.tier_partition(name)
+                    logger.info(f"Moved {rows} rows of {name} to the cold tier")
+                    tiered.append(name)
+                except Exception as e:
+                    failed.append(f"tier {name}")
+                    logger.error(f"Moving partition {name} to the cold tier failed: {str(e)}")
+
+        cutoff = now - timedelta(days=self.retention_days)
+        purged = 0
+        try:
+            async with engine.begin() as conn:
+                purged = await partitions.purge_default_partition(conn, cutoff)
+        except Exception as e:
+            failed.append("purge default")
+            logger.error(f"Purging the default partition failed: {str(e)}")
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(delete(LogTemplateCount).where(LogTemplateCount.bucket < cutoff))
+        except Exception as e:
+            failed.append("expire template counts")
+            logger.error(f"Expiring template counts failed: {str(e)}")
+        removed = []
+        try:
+            removed = cold_store.remove_before(cutoff)
+        except Exception as e:
+            failed.append("expire cold segments")
+            logger.error(f"Removing expired cold segments failed: {str(e)}")
+
+        logger.info(
+            f"Partition maintenance: created {created}, tiered {tiered}, dropped {dropped}, "
+            f"removed {len(removed)} cold segments, purged {purged} default rows, failed {failed}"
+        )
+        return {"created": created, "tiered": tiered, "dropped": dropped, "failed": failed}
+
+    async def run(self):
+        """
+        Main maintenance loop
+        """
+        logger.info("Starting partition maintenance")
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {str(e)}")
+            await asyncio.sleep(self.run_interval)
+
+if __name__ == "__main__":
+    maintenance = PartitionMaintenance()
+    asyncio.run(maintenance.run())
@@ -1,9 +1,14 @@
 import asyncio
 import json
-from typing import List
-from app.services.redis_service import RedisService
+import os
+import socket
+from typing import Dict, Iterable, List, Optional, Set
+from redis.exceptions import ResponseError
+from app.services.admission_control import parse_tenant_map
+from app.services.redis_service import LaneEntries, RedisService, StreamEntry, entry_time
 from app.services.db_service import DBService
 from app.services.metrics_service import MetricsService
+from app.services.template_miner import TemplateMiner
 from app.db.base import get_db
 from app.db.models import LogEntry
 from app.core.config import settings
@@ -15,13 +20,60 @@ setup_logging()
 
 logger = get_logger("redis_worker")
 
+def fair_shares(budget: int, weights: Dict[str, float], backlogged: Iterable[str], probe: int) -> Dict[str, int]:
+    """
+    Split a batch of ``budget`` entries across lanes, weighted-fair.
+
+    Lanes that were drained last round only get ``probe`` entries, enough
+    to pick up what arrived since without reserving batch space for them.
+    Backlogged lanes share the rest in proportion to their weight, each at
+    least ``probe``. A backlogged tenant therefore never holds up others
+    for more than one round, while a lone busy tenant still gets (nearly)
+    full batches. With more lanes than the budget allows, the probe
+    shrinks so a round stays close to ``budget``.
+    """
+    if not weights:
+        return {}
+    probe = min(probe, max(1, budget // len(weights)))
+    backlogged = set(backlogged)
+    backlogged = [lane for lane in weights if lane in backlogged]
+    shares = {lane: probe for lane in weights}
+    remaining = budget - probe * (len(weights) - len(backlogged))
+    total_weight = sum(weights[lane] for lane in backlogged)
+    for lane in backlogged:
+        shares[lane] = max(probe, int(remaining * weights[lane] / total_weight)) if total_weight > 0 else probe
+    return shares
+
 class RedisWorker:
-    def __init__(self):
-        self.redis_service = RedisService()
+    """
+    Consumer-group worker: reads batches from the log lanes, writes them
+    to the database and acknowledges them only once the write committed.
+    Any number of worker processes can run side by side; each reads a
+    disjoint share of the lanes under its own consumer name.
+
+    Lanes are dequeued weighted-fair (see ``fair_shares``) with weights
+    from ``TENANT_WEIGHTS``, so a tenant with a deep backlog cannot delay
+    the logs of others behind its own.
+    """
+
+    def __init__(self, consumer_name: Optional[str] = None, redis_service: Optional[RedisService] = None):
+        self.redis_service = redis_service or RedisService()
         self.db_service = DBService()
         self.batch_size = settings.BATCH_SIZE
         self.batch_timeout = settings.BATCH_TIMEOUT
-        
+        # A stable WORKER_NAME lets a restarted worker resume its own pending entries immediately
+        self.consumer_name = consumer_name or settings.WORKER_NAME or f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_idle_ms = settings.STREAM_CLAIM_IDLE_MS
+        self.claim_interval = settings.STREAM_CLAIM_INTERVAL
+        self.max_deliveries = settings.STREAM_MAX_DELIVERIES
+        self.tenant_weights = parse_tenant_map(settings.TENANT_WEIGHTS)
+        self.probe_count = settings.FAIR_PROBE_COUNT
+        # Lanes with a consumer group, and those that filled their share last round
+        self.lanes: List[str] = []
+        self.backlogged: Set[str] = set()
+        # Messages are stored as template + parameters; the parse tree lives as long as the worker
+        self.miner = TemplateMiner() if settings.TEMPLATE_MINING else None
+
     async def process_logs_batch(self, logs_data: List[dict]) -> bool:
         """
         Process a batch of logs and write them to the database
@@ -29,62 +81,158 @@ class RedisWorker:
         try:
             # Convert dicts to LogIn objects
             logs_in = [LogIn(**log_data) for log_data in logs_data]
-            
+        except Exception as e:
+            logger.error(f"Failed to process logs batch: {str(e)}")
+            return False
+        return await self.write_logs(logs_in)
+
+    async def write_logs(self, logs_in: List[LogIn]) -> bool:
+        """
+        Write validated logs to the database in one batch
+        """
+        try:
             # Record metrics
             MetricsService.record_batch_size(len(logs_in))
-            
+
             # Write to database
             async for db in get_db():
-                db_logs = await self.db_service.create_log_entries_batch(db, logs_in)
-                logger.info(f"Processed batch of {len(db_logs)} logs")
+                written = await self.db_service.bulk_insert_logs(db, logs_in, self.miner)
+                logger.info(f"Processed batch of {written} logs")
                 break  # Exit the async generator
-                
+
             return True
         except Exception as e:
             logger.error(f"Failed to process logs batch: {str(e)}")
             return False
-            
+
+    async def handle_entries(self, entries: List[StreamEntry], lane: Optional[str] = None) -> int:
+        """
+        Write a batch of entries from one lane, see ``handle_lanes``
+        """
+        return await self.handle_lanes({lane: entries})
+
+    async def handle_lanes(self, batches: LaneEntries) -> int:
+        """
+        Write the entries read from several lanes as one batch and
+        acknowledge them on success. Entries that cannot be decoded or
+        validated go to the dead-letter stream right away; a failed
+        database write leaves the whole batch pending so it is retried.
+
+        Returns:
+            int: Number of logs written
+        """
+        entry_ids: Dict[str, List[str]] = {}
+        logs_in = []
+        for lane, entries in batches.items():
+            invalid = []
+            for entry_id, data in entries:
+                try:
+                    record = json.loads(data)
+                    if record.get("timestamp") is None:
+                        # Streamed logs are queued verbatim; stamp them with their arrival time
+                        record["timestamp"] = entry_time(entry_id)
+                    log_in = LogIn(**record)
+                except Exception:
+                    invalid.append((entry_id, data))
+                    continue
+                entry_ids.setdefault(lane, []).append(entry_id)
+                logs_in.append(log_in)
+            if invalid:
+                await self.redis_service.dead_letter(invalid, "invalid log entry", lane)
+        if not logs_in:
+            return 0
+        if not await self.write_logs(logs_in):
+            return 0
+        await self.redis_service.ack_lanes(entry_ids)
+        return len(logs_in)
+
+    def lane_weight(self, lane: str) -> float:
+        return self.tenant_weights.get(self.redis_service.lane_tenant(lane), 1.0)
+
+    async def add_lanes(self, lanes: Iterable[str]) -> None:
+        """
+        Start reading lanes created since the last round
+        """
+        for lane in lanes:
+            if lane not in self.lanes:
+                await self.redis_service.ensure_consumer_group(lane)
+                self.lanes.append(lane)
+                self.backlogged.add(lane)
+
+    async def read_fair_batch(self) -> LaneEntries:
+        """
+        Read the next batch, sharing it across lanes by weight. Without
+        anything to read, blocks up to ``BATCH_TIMEOUT`` for new entries.
+        """
+        weights = {lane: self.lane_weight(lane) for lane in self.lanes}
+        counts = fair_shares(self.batch_size, weights, self.backlogged, self.probe_count)
+        batches, lanes = await self.redis_service.read_lanes(self.consumer_name, counts)
+        self.backlogged = {lane for lane, entries in batches.items() if len(entries) >= counts[lane]}
+        await self.add_lanes(lanes)
+        if any(batches.values()):
+            return batches
+
+        # One round trip per wait; blocks server-side while every lane is empty
+        batches = await self.redis_service.wait_for_logs(
+            self.consumer_name, self.lanes, max(self.probe_count, self.batch_size // len(self.lanes)),
+            self.batch_timeout * 1000
+        )
+        self.backlogged = set(batches)
+        return batches
+
+    async def reclaim_stale_entries(self) -> int:
+        """
+        Process entries left pending by consumers that died mid-batch
+        """
+        claimed = {}
+        for lane in self.lanes:
+            entries = await self.redis_service.claim_stale_logs(
+                self.consumer_name, self.claim_idle_ms, self.batch_size, self.max_deliveries, lane
+            )
+            if entries:
+                claimed[lane] = entries
+        if claimed:
+            logger.info(f"Claimed {sum(len(entries) for entries in claimed.values())} stale logs")
+        return await self.handle_lanes(claimed)
+
     async def run(self):
         """
         Main worker loop
         """
-        logger.info("Starting Redis worker")
-        
+        logger.info(f"Starting Redis worker {self.consumer_name}")
+        await self.add_lanes(await self.redis_service.list_lanes())
+
+        # Entries this consumer read but never acknowledged before a restart;
+        # whatever cannot be written now is picked up again by the stale-entry claim
+        while True:
+            pending = await self.redis_service.wait_for_logs(
+                self.consumer_name, self.lanes, self.batch_size, 0, pending=True
+            )
+            if not pending or not await self.handle_lanes(pending):
+                break
+
+        loop = asyncio.get_event_loop()
+        next_claim = loop.time()
         while True:
             try:
-                # Get queue length and update metrics
-                queue_length = self.redis_service.get_queue_length()
-                MetricsService.set_queue_length(queue_length)
-                
-                # Process logs in batches
-                logs_batch = []
-                start_time = asyncio.get_event_loop().time()
-                
-                while len(logs_batch) < self.batch_size:
-                    # Check if timeout has been reached
-                    elapsed_time = asyncio.get_event_loop().time() - start_time
-                    if elapsed_time >= self.batch_timeout and logs_batch:
-                        break
-                        
-                    # Pop a log from Redis queue
-                    log_data = self.redis_service.pop_log()
-                    if log_data:
-                        logs_batch.append(log_data)
-                    else:
-                        # No more logs in queue, break if we have some logs
-                        if logs_batch:
-                            break
-                        # Otherwise, wait a bit before checking again
-                        await asyncio.sleep(0.1)
-                        
-                # Process the batch if we have logs
-                if logs_batch:
-                    await self.process_logs_batch(logs_batch)
-                    
+                if loop.time() >= next_claim:
+                    await self.reclaim_stale_entries()
+                    MetricsService.set_queue_length(await self.redis_service.get_queue_length())
+                    next_claim = loop.time() + self.claim_interval
+
+                if not self.lanes:
+                    await self.add_lanes(await self.redis_service.list_lanes())
+                batches = await self.read_fair_batch()
+                if batches:
+                    await self.handle_lanes(batches)
+
             except Exception as e:
                 logger.error(f"Error in worker loop: {str(e)}")
+                if isinstance(e, ResponseError) and "NOGROUP" in str(e):
+                    # A lane was deleted and recreated without the group; set them all up again
+                    self.lanes = []
                 await asyncio.sleep(1)  # Wait before retrying
 
 if __name__ == "__main__":
     worker = RedisWorker()
-    asyncio.run(worker.run())
\ No newline at end of file
+    asyncio.run(worker.run())
@@ -16,8 +16,12 @@ class FeedResponse(BaseModel):
 @router.get("/", response_model=FeedResponse)
 async def get_feed(user_id: str, limit: int = 10, cursor: Optional[str] = None):
     """Get user's feed"""
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
     try:
         feed_data = await get_user_feed(user_id, limit, cursor)
         return FeedResponse(**feed_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -9,5 +9,14 @@ class Settings(BaseSettings):
     PROJECT_VERSION: str = "1.0.0"
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # Feed materialization
+    FEED_TIMELINE_MAX_ENTRIES: int = 800      # post ids kept per follower timeline
+    FEED_FANOUT_BATCH_SIZE: int = 500         # follower timelines written per pipeline
+    FEED_SCAN_ROUNDS: int = 5                 # max timeline reads per page when skipping seen posts
+    POST_CARD_TTL: int = 3600                 # seconds a hydrated post card stays in Redis
+    SEEN_FILTER_BITS: int = 65536             # bloom filter size per user (8 KB)
+    SEEN_FILTER_HASHES: int = 4
+    SEEN_FILTER_PERIOD: int = 24 * 3600       # seen filters rotate daily; a shown post is skipped for 1-2 days
 
 settings = Settings()
\ No newline at end of file
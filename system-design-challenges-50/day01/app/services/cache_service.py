@@ -3,7 +3,7 @@ Redis Caching Layer
 """
 import redis.asyncio as redis
 import json
-from typing import Optional, Any
+from typing import Optional, Any, List
 from app.core.config import settings
 
 class CacheService:
@@ -24,6 +24,16 @@ class CacheService:
         """Delete key"""
         return await self.redis_client.delete(key)
     
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Get many values in one round trip"""
+        if not keys:
+            return []
+        return await self.redis_client.mget(keys)
+    
+    def pipeline(self):
+        """Non-transactional pipeline for batching commands into one round trip"""
+        return self.redis_client.pipeline(transaction=False)
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists"""
         return bool(await self.redis_client.exists(key))
@@ -1,30 +1,232 @@
 """
 Feed Aggregation Logic
+
+Feeds are materialized: each user's timeline is a Redis sorted set of
+post ids (``timeline:{user_id}``) scored by creation time in ms and
+capped at ``FEED_TIMELINE_MAX_ENTRIES``. New posts are pushed into
+followers' timelines by the fanout worker, so a read walks one sorted
+set and hydrates a page of post cards instead of joining the follow
+graph against posts.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy import select, or_
+from app.core.config import settings
+from app.db.models import Post, Follow
+from app.db.session import AsyncSessionLocal
+from app.services.cache_service import cache_service
+from app.services.seen_filter import seen_filter
+
+# Marks a timeline as materialized even when the user has no posts to show
+TIMELINE_SENTINEL = "__materialized__"
+TIMELINE_TTL = 3 * 24 * 3600  # timelines of users who stop reading expire and stop receiving fanout
+
+# Fanout write for one timeline: the existence check and the add happen in one
+# step, so a timeline that expires mid-fanout is not recreated as a partial key.
+# The TTL is only set when missing; refreshing it here would keep the timelines
+# of users who stopped reading alive for as long as the people they follow post.
+PUSH_TIMELINE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[3]) + 1))
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
 """
-from typing import List, Dict, Optional
-from app.schemas.post_schema import PostResponse
+
+Position = Tuple[int, str]
+
+def timeline_key(user_id: str) -> str:
+    return f"timeline:{user_id}"
+
+def post_card_key(post_id: str) -> str:
+    return f"post:{post_id}"
+
+def post_score(created_at: datetime) -> int:
+    """Timeline score of a post: creation time in epoch milliseconds"""
+    return int(created_at.timestamp() * 1000)
+
+def encode_cursor(position: Position) -> str:
+    """Opaque cursor for the (score, post id) of the last post returned"""
+    score, post_id = position
+    return base64.urlsafe_b64encode(f"{score}:{post_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Position:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, post_id = raw.split(":", 1)
+        return int(score), post_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def serialize_post(post: Post) -> Dict:
+    """Post card as stored in Redis and returned by the feed"""
+    return {
+        "id": post.id,
+        "caption": post.caption,
+        "image_url": post.image_url,
+        "user_id": post.user_id,
+        "created_at": post.created_at.isoformat() if post.created_at else None,
+        "updated_at": post.updated_at.isoformat() if post.updated_at else None
+    }
+
+def _decode(member) -> str:
+    return member.decode() if isinstance(member, bytes) else member
+
+async def cache_post_cards(posts: List[Post]) -> None:
+    """Store post cards so feed reads never touch the posts table"""
+    if not posts:
+        return
+    pipe = cache_service.pipeline()
+    for post in posts:
+        pipe.set(post_card_key(post.id), json.dumps(serialize_post(post)), ex=settings.POST_CARD_TTL)
+    await pipe.execute()
+
+async def get_post_cards(post_ids: List[str]) -> Dict[str, Dict]:
+    """Hydrate post cards with one MGET, loading any misses with one query"""
+    cards: Dict[str, Dict] = {}
+    values = await cache_service.mget([post_card_key(post_id) for post_id in post_ids])
+    missing = []
+    for post_id, value in zip(post_ids, values):
+        if value is None:
+            missing.append(post_id)
+        else:
+            cards[post_id] = json.loads(value)
+    if missing:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Post).where(Post.id.in_(missing)))
+            posts = list(result.scalars())
+        await cache_post_cards(posts)
+        cards.update((post.id, serialize_post(post)) for post in posts)
+    return cards
+
+async def push_to_timelines(user_ids: List[str], post_id: str, score: int) -> int:
+    """
+    Add a post to the given users' timelines, trimming each to the cap.
+    Only timelines that are already materialized are written; the rest are
+    built from the follow graph on their owner's next read. Each timeline is
+    checked and written atomically, all in one round trip.
+
+    Returns:
+        int: Number of timelines updated
+    """
+    if not user_ids:
+        return 0
+    script = cache_service.redis_client.register_script(PUSH_TIMELINE_SCRIPT)
+    pipe = cache_service.pipeline()
+    for user_id in user_ids:
+        await script(keys=[timeline_key(user_id)],
+                     args=[post_id, score, settings.FEED_TIMELINE_MAX_ENTRIES, TIMELINE_TTL], client=pipe)
+    return sum(await pipe.execute())
+
+async def rebuild_timeline(user_id: str) -> int:
+    """
+    Materialize a timeline from the follow graph (the user's own posts and
+    those of everyone they follow), replacing whatever was cached.
+
+    Returns:
+        int: Number of posts in the timeline
+    """
+    followed = select(Follow.followed_id).where(Follow.follower_id == user_id)
+    query = (
+        select(Post.id, Post.created_at)
+        .where(or_(Post.user_id == user_id, Post.user_id.in_(followed)))
+        .order_by(Post.created_at.desc())
+        .limit(settings.FEED_TIMELINE_MAX_ENTRIES)
+    )
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(query)).all()
+    key = timeline_key(user_id)
+    entries = {post_id: post_score(created_at) for post_id, created_at in rows}
+    entries[TIMELINE_SENTINEL] = 0
+    pipe = cache_service.pipeline()
+    pipe.delete(key)
+    pipe.zadd(key, entries)
+    pipe.expire(key, TIMELINE_TTL)
+    await pipe.execute()
+    return len(rows)
+
+async def invalidate_timeline(user_id: str) -> None:
+    """Drop a timeline so the next read rebuilds it (e.g. after a follow change)"""
+    await cache_service.delete(timeline_key(user_id))
+
+async def _read_after(key: str, position: Optional[Position], count: int) -> Tuple[List[Position], bool]:
+    """
+    Read up to ``count`` timeline entries that come after ``position``,
+    newest first.
+
+    Returns:
+        Tuple[List[Position], bool]: Entries as (score, post id), and whether the timeline ended
+    """
+    if position is None:
+        raw = await cache_service.redis_client.zrevrangebyscore(
+            key, "+inf", "-inf", start=0, num=count, withscores=True)
+        entries = [(int(score), _decode(member)) for member, score in raw]
+        return [entry for entry in entries if entry[1] != TIMELINE_SENTINEL], len(raw) < count
+    max_score, last_id = position
+    fetch = count
+    while True:
+        # Posts sharing the cursor's score sort by id descending; skip those already returned
+        raw = await cache_service.redis_client.zrevrangebyscore(
+            key, max_score, "-inf", start=0, num=fetch, withscores=True)
+        entries = [(int(score), _decode(member)) for member, score in raw]
+        after = [(score, post_id) for score, post_id in entries
+                 if (score < max_score or post_id < last_id) and post_id != TIMELINE_SENTINEL]
+        if after or len(raw) < fetch:
+            return after, len(raw) < fetch
+        fetch *= 2
 
 async def get_user_feed(user_id: str, limit: int = 10, cursor: Optional[str] = None) -> Dict:
-    """Get user's feed based on who they follow"""
-    # This is a placeholder implementation
-    # In a real implementation, this would:
-    # 1. Get the list of users that the current user follows
-    # 2. Fetch recent posts from those users
-    # 3. Apply ranking algorithm (chronological, engagement-based, etc.)
-    # 4. Return paginated results
-    
-    # Placeholder data
-    posts = [
-        {
-            "id": "1",
-            "caption": "Beautiful sunset today!",
-            "image_url": "https://example.com/sunset.jpg",
-            "user_id": "user123",
-            "created_at": "2023-01-01T12:00:00Z"
-        }
-    ]
-    
+    """
+    Get a page of the user's materialized feed, newest first.
+
+    Posts the user has already been shown (per the seen-post filter) are
+    skipped; the timeline is read in chunks until the page is full, the
+    timeline ends, or ``FEED_SCAN_ROUNDS`` chunks were read.
+
+    Args:
+        user_id: Feed owner
+        limit: Page size
+        cursor: Opaque cursor from the previous page, None for the first page
+
+    Returns:
+        Dict: ``posts`` (post cards) and ``next_cursor`` (None at the end of the feed)
+    """
+    position = decode_cursor(cursor) if cursor else None
+    key = timeline_key(user_id)
+    if position is None:
+        if await cache_service.exists(key):
+            await cache_service.redis_client.expire(key, TIMELINE_TTL)
+        else:
+            await rebuild_timeline(user_id)
+
+    page: List[str] = []
+    exhausted = False
+    for _ in range(settings.FEED_SCAN_ROUNDS):
+        count = max((limit - len(page)) * 2, 20)
+        entries, ended = await _read_after(key, position, count)
+        seen = await seen_filter.seen(user_id, [post_id for _, post_id in entries])
+        for index, (entry, already_seen) in enumerate(zip(entries, seen)):
+            position = entry
+            if not already_seen:
+                page.append(entry[1])
+            if len(page) == limit:
+                exhausted = ended and index == len(entries) - 1
+                break
+        else:
+            exhausted = ended
+        if len(page) == limit or exhausted:
+            break
+
+    cards = await get_post_cards(page)
+    posts = [cards[post_id] for post_id in page if post_id in cards]
+    await seen_filter.mark(user_id, page)
     return {
         "posts": posts,
-        "next_cursor": None
-    }
\ No newline at end of file
+        "next_cursor": encode_cursor(position) if position is not None and not exhausted else None
+    }
@@ -0,0 +1,72 @@
+"""
+Seen-Post Bloom Filter
+"""
+import hashlib
+import time
+from typing import List
+from app.core.config import settings
+from app.services.cache_service import cache_service
+
+class SeenPostFilter:
+    """
+    Per-user bloom filter of post ids already shown, stored as Redis
+    bitmaps (``seen:{user_id}:{generation}``) so every API instance shares
+    it. Checking or marking a page costs one pipelined round trip. False
+    positives hide a small fraction of unseen posts; false negatives cannot
+    happen while a mark is remembered.
+
+    The filter rotates every ``period`` seconds: marks go into the current
+    generation's bitmap and checks consult the current and previous one, so
+    a post is remembered for one to two periods. A bitmap therefore only
+    ever holds one period of marks, which bounds the false positive rate
+    for users who keep reading instead of letting it climb with every page.
+    """
+
+    def __init__(self, bits: int = 65536, hashes: int = 4, period: int = 24 * 3600):
+        self.bits = bits
+        self.hashes = hashes
+        self.period = period
+
+    @staticmethod
+    def key(user_id: str, generation: int) -> str:
+        return f"seen:{user_id}:{generation}"
+
+    def generation(self) -> int:
+        return int(time.time() // self.period)
+
+    def positions(self, post_id: str) -> List[int]:
+        digest = hashlib.blake2b(post_id.encode(), digest_size=4 * self.hashes).digest()
+        return [int.from_bytes(digest[i:i + 4], "big") % self.bits for i in range(0, len(digest), 4)]
+
+    async def seen(self, user_id: str, post_ids: List[str]) -> List[bool]:
+        """Whether each post has (probably) been shown to the user"""
+        if not post_ids:
+            return []
+        generation = self.generation()
+        keys = [self.key(user_id, generation), self.key(user_id, generation - 1)]
+        pipe = cache_service.pipeline()
+        for post_id in post_ids:
+            positions = self.positions(post_id)
+            for key in keys:
+                for position in positions:
+                    pipe.getbit(key, position)
+        bits = await pipe.execute()
+        step = self.hashes
+        return [any(all(bits[j:j + step]) for j in range(i, i + step * len(keys), step))
+                for i in range(0, len(bits), step * len(keys))]
+
+    async def mark(self, user_id: str, post_ids: List[str]) -> None:
+        """Record posts as shown"""
+        if not post_ids:
+            return
+        key = self.key(user_id, self.generation())
+        pipe = cache_service.pipeline()
+        for post_id in post_ids:
+            for position in self.positions(post_id):
+                pipe.setbit(key, position, 1)
+        # Kept through the next period, while it is the previous generation
+        pipe.expire(key, 2 * self.period)
+        await pipe.execute()
+
+# Global seen-post filter instance
+seen_filter = SeenPostFilter(settings.SEEN_FILTER_BITS, settings.SEEN_FILTER_HASHES, settings.SEEN_FILTER_PERIOD)
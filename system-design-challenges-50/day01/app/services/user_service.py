@@ -1,8 +1,12 @@
 """
 User Operations
 """
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
+from sqlalchemy import select
+from app.db.models import Follow
+from app.db.session import AsyncSessionLocal
 from app.schemas.user_schema import UserResponse
+from app.services.feed_service import invalidate_timeline
 
 async def get_user(user_id: str) -> Optional[Dict]:
     """Get user by ID"""
@@ -19,12 +23,33 @@ async def get_following(user_id: str) -> List[str]:
     # Placeholder implementation
     return ["user123", "user456", "user789"]
 
+async def iter_follower_batches(user_id: str, batch_size: int) -> AsyncIterator[List[str]]:
+    """Yield the ids of a user's followers in batches, using keyset pagination on follower id"""
+    last_id = ""
+    while True:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Follow.follower_id)
+                .where(Follow.followed_id == user_id, Follow.follower_id > last_id)
+                .order_by(Follow.follower_id)
+                .limit(batch_size)
+            )
+            follower_ids = list(result.scalars())
+        if follower_ids:
+            yield follower_ids
+        if len(follower_ids) < batch_size:
+            return
+        last_id = follower_ids[-1]
+
 async def follow_user(user_id: str, target_user_id: str) -> bool:
     """Follow a user"""
     # Placeholder implementation
+    # The materialized feed no longer matches the follow graph
+    await invalidate_timeline(user_id)
     return True
 
 async def unfollow_user(user_id: str, target_user_id: str) -> bool:
     """Unfollow a user"""
     # Placeholder implementation
+    await invalidate_timeline(user_id)
     return True
\ No newline at end of file
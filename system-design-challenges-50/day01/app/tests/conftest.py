@@ -1,11 +1,23 @@
 """
 Pytest Fixtures
 """
+import os
+import shutil
+import tempfile
+
+# Point the app at a throwaway database before anything imports the settings,
+# so test runs never write ./app.db into the tree
+TEST_DB_DIR = tempfile.mkdtemp(prefix="day01-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DB_DIR, 'app.db')}"
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from app.db import models  # noqa: F401 - registers the tables on Base
 from app.db.base import Base
-from app.db.session import AsyncSessionLocal
+from app.db.session import AsyncSessionLocal, sync_engine
+from app.services.cache_service import cache_service
+from app.services.feed_service import PUSH_TIMELINE_SCRIPT
 
 @pytest.fixture(scope="session")
 def test_db():
@@ -29,4 +41,117 @@ def client():
     from app.main import app
     
     with TestClient(app) as c:
-        yield c
\ No newline at end of file
+        yield c
+
+@pytest.fixture(scope="session", autouse=True)
+def remove_test_database():
+    """Delete the throwaway database once the session is over"""
+    yield
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
+
+@pytest.fixture
+def database():
+    """Create the app's tables in the throwaway database"""
+    Base.metadata.create_all(bind=sync_engine)
+    yield
+    Base.metadata.drop_all(bind=sync_engine)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        results = []
+        for name, args, kwargs in self.calls:
+            results.append(await getattr(self.redis, name)(*args, **kwargs))
+        return results
+
+class FakeRedis:
+    """Just enough of redis.asyncio for sorted-set timelines, cards and bitmaps"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}  # seconds to live as last set, keys without one are persistent
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def expire(self, key, ttl):
+        if key not in self.data:
+            return False
+        self.ttls[key] = ttl
+        return True
+
+    async def ttl(self, key):
+        if key not in self.data:
+            return -2
+        return self.ttls.get(key, -1)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.ttls.pop(key, None)
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+        return True
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    async def zremrangebyrank(self, key, start, end):
+        ordered = sorted(self.data.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+        end = len(ordered) + end if end < 0 else end
+        for member, _ in ordered[start:end + 1]:
+            del self.data[key][member]
+
+    async def zrevrangebyscore(self, key, max_score, min_score, start=0, num=None, withscores=False):
+        high = float(max_score)
+        ordered = sorted(((member, score) for member, score in self.data.get(key, {}).items() if score <= high),
+                         key=lambda item: (item[1], item[0]), reverse=True)
+        return [(member.encode(), float(score)) for member, score in ordered[start:start + num]]
+
+    async def getbit(self, key, offset):
+        return int(offset in self.data.get(key, set()))
+
+    async def setbit(self, key, offset, value):
+        self.data.setdefault(key, set()).add(offset)
+
+    def register_script(self, source):
+        """Scripts run as their Python equivalent; only the timeline push is used"""
+        assert source == PUSH_TIMELINE_SCRIPT
+
+        async def script(keys, args, client=None):
+            if isinstance(client, FakePipeline):
+                client.calls.append(("push_timeline", (keys, args), {}))
+                return client
+            return await self.push_timeline(keys, args)
+        return script
+
+    async def push_timeline(self, keys, args):
+        key, (post_id, score, cap, ttl) = keys[0], args
+        if key not in self.data:
+            return 0
+        await self.zadd(key, {post_id: score})
+        await self.zremrangebyrank(key, 0, -(cap + 1))
+        if await self.ttl(key) < 0:
+            await self.expire(key, ttl)
+        return 1
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache_service, "redis_client", fake)
+    return fake
@@ -0,0 +1,97 @@
+"""
+Feed Materialization Tests
+"""
+import asyncio
+import json
+import pytest
+from app.services import feed_service
+from app.services.feed_service import (
+    TIMELINE_SENTINEL, TIMELINE_TTL, decode_cursor, encode_cursor, get_user_feed, post_card_key, push_to_timelines, timeline_key
+)
+from app.services.seen_filter import seen_filter
+
+def materialize(redis, user_id, count, score=lambda i: 1000 + i):
+    """Timeline with posts p0..p{count-1} and their cards, newest is the highest index"""
+    redis.data[timeline_key(user_id)] = {f"p{i}": score(i) for i in range(count)}
+    redis.data[timeline_key(user_id)][TIMELINE_SENTINEL] = 0
+    for i in range(count):
+        redis.data[post_card_key(f"p{i}")] = json.dumps({"id": f"p{i}"}).encode()
+
+def read_all(user_id, limit):
+    pages, cursor = [], None
+    while True:
+        feed = asyncio.run(get_user_feed(user_id, limit, cursor))
+        pages.append([post["id"] for post in feed["posts"]])
+        cursor = feed["next_cursor"]
+        if cursor is None:
+            return pages
+
+def test_cursor_round_trip():
+    """Test that cursors are opaque and decode to (score, post id)"""
+    cursor = encode_cursor((1700000000123, "post:1"))
+    assert ":" not in cursor
+    assert decode_cursor(cursor) == (1700000000123, "post:1")
+    with pytest.raises(ValueError):
+        decode_cursor("abc123")
+
+def test_pages_follow_cursor(redis):
+    """Test that paging walks the timeline newest first without gaps or repeats"""
+    materialize(redis, "alice", 7)
+
+    pages = read_all("alice", 3)
+
+    assert pages == [["p6", "p5", "p4"], ["p3", "p2", "p1"], ["p0"]]
+
+def test_pages_with_equal_scores(redis):
+    """Test that posts sharing a timestamp are neither skipped nor repeated"""
+    materialize(redis, "alice", 6, score=lambda i: 1000)
+
+    pages = read_all("alice", 4)
+
+    assert sorted(post for page in pages for post in page) == [f"p{i}" for i in range(6)]
+
+def test_seen_posts_are_not_returned_again(redis):
+    """Test that a fresh first page skips posts already shown"""
+    materialize(redis, "alice", 5)
+
+    first = asyncio.run(get_user_feed("alice", 2))
+    again = asyncio.run(get_user_feed("alice", 2))
+
+    assert [post["id"] for post in first["posts"]] == ["p4", "p3"]
+    assert [post["id"] for post in again["posts"]] == ["p2", "p1"]
+
+def test_seen_posts_are_forgotten_after_two_rotations(redis, monkeypatch):
+    """Test that the seen filter remembers the previous generation only"""
+    materialize(redis, "alice", 3)
+    monkeypatch.setattr(seen_filter, "generation", lambda: 10)
+    first = asyncio.run(get_user_feed("alice", 2))
+    monkeypatch.setattr(seen_filter, "generation", lambda: 11)
+    next_day = asyncio.run(get_user_feed("alice", 2))
+    monkeypatch.setattr(seen_filter, "generation", lambda: 12)
+    two_days_later = asyncio.run(get_user_feed("alice", 2))
+
+    assert [post["id"] for post in first["posts"]] == ["p2", "p1"]
+    assert [post["id"] for post in next_day["posts"]] == ["p0"]
+    assert [post["id"] for post in two_days_later["posts"]] == ["p2", "p1"]
+
+def test_fanout_caps_materialized_timelines(redis, monkeypatch):
+    """Test that fanout trims timelines and skips users without one"""
+    monkeypatch.setattr(feed_service.settings, "FEED_TIMELINE_MAX_ENTRIES", 3)
+    materialize(redis, "alice", 3)
+
+    updated = asyncio.run(push_to_timelines(["alice", "bob"], "new", 5000))
+
+    assert updated == 1
+    assert set(redis.data[timeline_key("alice")]) == {"new", "p2", "p1"}
+    assert timeline_key("bob") not in redis.data
+
+def test_fanout_keeps_timeline_expiry(redis):
+    """Test that fanout sets a missing TTL but never extends an existing one"""
+    materialize(redis, "alice", 2)
+    materialize(redis, "carol", 2)
+    redis.ttls[timeline_key("alice")] = 60
+
+    asyncio.run(push_to_timelines(["alice", "carol"], "new", 5000))
+
+    assert redis.ttls[timeline_key("alice")] == 60
+    assert redis.ttls[timeline_key("carol")] == TIMELINE_TTL
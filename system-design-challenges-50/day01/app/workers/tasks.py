@@ -1,42 +1,35 @@
 """
 Celery Tasks (e.g., fanout new posts)
 """
+from app.core.config import settings
+from app.core.logger import logger
 from app.workers.celery_app import worker_config
-from app.services.feed_service import get_user_feed
+from app.services.feed_service import cache_post_cards, post_score, push_to_timelines, rebuild_timeline
+from app.services.user_service import iter_follower_batches
 from app.db.session import AsyncSessionLocal
 from app.db.models import Post
 
 async def fanout_new_post(post_id: str):
     """Fanout a new post to followers' feeds"""
-    # This is a placeholder implementation
-    # In a real implementation, this would:
-    # 1. Get the post creator
-    # 2. Get all followers of the creator
-    # 3. Add the post to each follower's feed cache
-    # 4. Handle errors and retries
-    
-    print(f"Fanout task started for post {post_id}")
-    
-    # Simulate async work
-    import asyncio
-    await asyncio.sleep(0.1)
-    
-    print(f"Fanout task completed for post {post_id}")
-    return {"status": "completed", "post_id": post_id}
+    async with AsyncSessionLocal() as db:
+        post = await db.get(Post, post_id)
+    if post is None:
+        logger.warning(f"Fanout skipped, post {post_id} not found")
+        return {"status": "not_found", "post_id": post_id}
+
+    # Cache the card first so followers can hydrate the post as soon as it appears
+    await cache_post_cards([post])
+    score = post_score(post.created_at)
+    # The author sees their own post too
+    timelines = await push_to_timelines([post.user_id], post.id, score)
+    async for follower_ids in iter_follower_batches(post.user_id, settings.FEED_FANOUT_BATCH_SIZE):
+        timelines += await push_to_timelines(follower_ids, post.id, score)
+
+    logger.info(f"Fanout of post {post_id} updated {timelines} timelines")
+    return {"status": "completed", "post_id": post_id, "timelines": timelines}
 
 async def update_feed_cache(user_id: str):
     """Update a user's feed cache"""
-    # This is a placeholder implementation
-    # In a real implementation, this would:
-    # 1. Generate the user's feed
-    # 2. Cache the feed in Redis
-    # 3. Set appropriate TTL
-    
-    print(f"Updating feed cache for user {user_id}")
-    
-    # Simulate async work
-    import asyncio
-    await asyncio.sleep(0.1)
-    
-    print(f"Feed cache updated for user {user_id}")
-    return {"status": "completed", "user_id": user_id}
\ No newline at end of file
+    entries = await rebuild_timeline(user_id)
+    logger.info(f"Feed cache rebuilt for user {user_id} with {entries} posts")
+    return {"status": "completed", "user_id": user_id, "entries": entries}
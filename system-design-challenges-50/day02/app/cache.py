@@ -0,0 +1,142 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+Loader = Callable[[], Awaitable[Any]]
+BatchLoader = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+class TTLCache:
+    """
+    In-memory cache with a fixed TTL per entry and LRU eviction past
+    ``max_entries``. Concurrent misses for the same key share one upstream
+    call: the first caller starts the load and everyone else awaits it.
+    Loads run as their own tasks, so a caller that disconnects does not
+    cancel the fetch for the others.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _start_load(self, key: Hashable, loader: Loader) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    async def _load(self, key: Hashable, loader: Loader) -> Any:
+        self.loads += 1
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def _finish(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def get_or_load(self, key: Hashable, loader: Loader) -> Any:
+        """Return the cached value, calling ``loader`` (at most once per key at a time) on a miss"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        return await asyncio.shield(self._start_load(key, loader))
+
+    async def refresh(self, key: Hashable, loader: Loader) -> Any:
+        """Reload a key even if it is still fresh (joins a load already in flight)"""
+        return await asyncio.shield(self._start_load(key, loader))
+
+    async def get_many_or_load(self, keys: Iterable[Hashable], batch_loader: BatchLoader) -> Dict[Hashable, Any]:
+        """
+        Return values for many keys. Keys that are neither cached nor already
+        being loaded are fetched together with a single ``batch_loader`` call.
+        """
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        missing: List[Hashable] = []
+        for key in dict.fromkeys(keys):
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                results[key] = value
+                continue
+            self.misses += 1
+            if key in self._inflight:
+                waiting[key] = self._inflight[key]
+            else:
+                missing.append(key)
+
+        if missing:
+            loop = asyncio.get_event_loop()
+            futures = {key: loop.create_future() for key in missing}
+            for key, future in futures.items():
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key: self._finish(key, done))
+            waiting.update(futures)
+            await asyncio.shield(asyncio.ensure_future(self._load_many(futures, batch_loader)))
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+        return results
+
+    async def _load_many(self, futures: Dict[Hashable, asyncio.Future], batch_loader: BatchLoader) -> None:
+        """Resolve every future from one batch call; failures are delivered through the futures"""
+        self.loads += 1
+        try:
+            values = await batch_loader(list(futures))
+            for key, future in futures.items():
+                self.set(key, values[key])
+                future.set_result(values[key])
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for future in futures.values():
+                if not future.done():
+                    future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'upstream_loads': self.loads,
+            'hit_rate': (self.hits / lookups * 100) if lookups else 0.0
+        }
@@ -20,6 +20,16 @@ class Config:
     
     # Cache settings
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "300"))  # 5 minutes default
+    CURRENT_WEATHER_TTL: int = int(os.getenv("CURRENT_WEATHER_TTL", "60"))  # seconds
+    FORECAST_TTL: int = int(os.getenv("FORECAST_TTL", "900"))  # seconds
+    MAX_CACHED_CITIES: int = int(os.getenv("MAX_CACHED_CITIES", "10000"))
+    MAX_BATCH_CITIES: int = int(os.getenv("MAX_BATCH_CITIES", "50"))
+    WARM_TOP_N_CITIES: int = int(os.getenv("WARM_TOP_N_CITIES", "100"))
+    WARM_INTERVAL: int = int(os.getenv("WARM_INTERVAL", "45"))  # seconds; keep below CURRENT_WEATHER_TTL
+    
+    # History settings
+    WEATHER_HISTORY_CAPACITY: int = int(os.getenv("WEATHER_HISTORY_CAPACITY", "105120"))  # points per city (1 year at 5 min)
+    MAX_HISTORY_BUCKETS: int = int(os.getenv("MAX_HISTORY_BUCKETS", "1000"))
     
     # Scaling settings
     MAX_CONCURRENT_REQUESTS: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "1000"))
@@ -27,6 +37,9 @@ class Config:
     
     # Monitoring settings
     ENABLE_METRICS: bool = os.getenv("ENABLE_METRICS", "true").lower() == "true"
+    METRICS_MAX_SERIES: int = int(os.getenv("METRICS_MAX_SERIES", "200"))  # endpoints tracked individually
+    METRICS_RATE_HORIZON: int = int(os.getenv("METRICS_RATE_HORIZON", "300"))  # seconds of per-second counts
+    METRICS_QUANTILE_INTERVAL: float = float(os.getenv("METRICS_QUANTILE_INTERVAL", "60"))  # seconds per latency window
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
     # Availability settings
@@ -1,22 +1,34 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta
 import time
-from .models import WeatherData, Location, ForecastData, UserPreferences
+from .models import WeatherData, Location, ForecastData, UserPreferences, HistoryData
 from .services import weather_service
 from .monitoring import metrics_collector
+from .metrics_engine import route_label
 from .config import config
 
 app = FastAPI(title="Day 2 - Weather Dashboard (Non-Functional Requirements Focus)")
 
+@app.on_event("startup")
+async def start_cache_refresher():
+    weather_service.start_refresher(config.WARM_TOP_N_CITIES, config.WARM_INTERVAL)
+
+@app.on_event("shutdown")
+async def stop_cache_refresher():
+    await weather_service.stop_refresher()
+
 # Add middleware to collect metrics
 @app.middleware("http")
 async def metrics_middleware(request, call_next):
     start_time = time.time()
     response = await call_next(request)
     process_time = time.time() - start_time
+    # The matched route's template, not the URL: query strings and path values never create series
+    route = request.scope.get("route")
     metrics_collector.record_request(
-        endpoint=str(request.url),
+        endpoint=route_label(request.method, getattr(route, "path", None)),
         response_time=process_time,
         success=response.status_code < 400
     )
@@ -40,6 +52,19 @@ async def root():
 async def hello():
     return {"message": "Hello from day02"}
 
+@app.get("/weather/batch", response_model=Dict[str, WeatherData])
+async def get_current_weather_batch(cities: str):
+    """Get current weather for a comma-separated list of cities"""
+    names = [city.strip() for city in cities.split(",") if city.strip()]
+    if not names:
+        raise HTTPException(status_code=400, detail="At least one city is required")
+    if len(names) > config.MAX_BATCH_CITIES:
+        raise HTTPException(status_code=400, detail=f"Batch limited to {config.MAX_BATCH_CITIES} cities")
+    try:
+        return await weather_service.get_current_weather_batch(names)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching weather data: {str(e)}")
+
 @app.get("/weather/{city}", response_model=WeatherData)
 async def get_current_weather(city: str):
     """Get current weather for a specific city"""
@@ -60,6 +85,17 @@ async def get_forecast(city: str, days: int = 5):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching forecast data: {str(e)}")
 
+@app.get("/history/{city}", response_model=HistoryData)
+async def get_history(city: str, start: Optional[datetime] = None, end: Optional[datetime] = None, buckets: int = 100):
+    """Get min/max/avg weather history for a city, downsampled to at most `buckets` points"""
+    if not 1 <= buckets <= config.MAX_HISTORY_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"buckets must be between 1 and {config.MAX_HISTORY_BUCKETS}")
+    end = end or datetime.now()
+    start = start or end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return weather_service.get_history(city, start, end, buckets)
+
 @app.post("/preferences", response_model=UserPreferences)
 async def set_user_preferences(preferences: UserPreferences):
     """Set user preferences for the weather dashboard"""
@@ -81,7 +117,9 @@ async def get_user_preferences(user_id: int):
 @app.get("/metrics")
 async def get_metrics():
     """Get application metrics"""
-    return metrics_collector.get_metrics_summary()
+    summary = metrics_collector.get_metrics_summary()
+    summary['weather_cache'] = weather_service.cache_stats()
+    return summary
 
 @app.get("/config")
 async def get_config():
@@ -90,6 +128,8 @@ async def get_config():
         "api_host": config.API_HOST,
         "api_port": config.API_PORT,
         "cache_ttl": config.CACHE_TTL,
+        "current_weather_ttl": config.CURRENT_WEATHER_TTL,
+        "forecast_ttl": config.FORECAST_TTL,
         "max_concurrent_requests": config.MAX_CONCURRENT_REQUESTS,
         "rate_limit_per_minute": config.RATE_LIMIT_PER_MINUTE,
         "enable_metrics": config.ENABLE_METRICS,
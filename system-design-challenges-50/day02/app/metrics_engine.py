@@ -0,0 +1,193 @@
+import math
+import time
+from array import array
+from typing import Dict, Optional
+
+# Label for requests that did not match any route, so fuzzed URLs share one series
+UNMATCHED_ROUTE = "<unmatched>"
+# Label that absorbs every endpoint seen after the series cap is reached
+OVERFLOW_SERIES = "<overflow>"
+
+def route_label(method: str, route_path: Optional[str]) -> str:
+    """Series label for a request: the route template (e.g. ``/weather/{city}``), never the raw URL"""
+    return f"{method} {route_path or UNMATCHED_ROUTE}"
+
+class RateCounter:
+    """Per-second event counts in a ring buffer covering the last ``horizon`` seconds"""
+
+    def __init__(self, horizon: int = 300):
+        self.horizon = horizon
+        self._counts = array('L', [0]) * horizon
+        self._seconds = array('q', [-1]) * horizon
+
+    def add(self, count: int = 1, now: Optional[float] = None) -> None:
+        second = int(time.time() if now is None else now)
+        slot = second % self.horizon
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+        self._counts[slot] += count
+
+    def rate(self, window_seconds: int = 60, now: Optional[float] = None) -> float:
+        """Events per second over the last ``window_seconds`` (capped at the horizon)"""
+        window_seconds = max(1, min(window_seconds, self.horizon))
+        current = int(time.time() if now is None else now)
+        oldest = current - window_seconds
+        total = sum(count for count, second in zip(self._counts, self._seconds) if oldest < second <= current)
+        return total / window_seconds
+
+class LogHistogram:
+    """
+    Latency histogram with log-spaced buckets between ``min_value`` and
+    ``max_value``. Memory is fixed by the bucket count; quantiles are
+    accurate to within about half a bucket (~2.5% relative error by default).
+    """
+
+    def __init__(self, min_value: float = 1e-5, max_value: float = 100.0, growth: float = 1.05):
+        self.min_value = min_value
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.num_buckets = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 2
+        self.counts = array('L', [0]) * self.num_buckets
+        self.count = 0
+        self.sum = 0.0
+
+    def bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return min(int(math.log(value / self.min_value) / self._log_growth) + 1, self.num_buckets - 1)
+
+    def value_at(self, index: int) -> float:
+        """Geometric midpoint of a bucket"""
+        if index == 0:
+            return self.min_value
+        return self.min_value * self.growth ** (index - 0.5)
+
+    def record(self, value: float) -> None:
+        self.counts[self.bucket(value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def reset(self) -> None:
+        for index in range(self.num_buckets):
+            self.counts[index] = 0
+        self.count = 0
+        self.sum = 0.0
+
+class WindowedQuantiles:
+    """
+    Quantiles over recent samples using two rotating histograms: samples
+    from the current and the previous ``interval`` seconds are combined, so
+    results reflect the last one to two intervals in constant memory.
+    """
+
+    def __init__(self, interval: float = 60.0):
+        self.interval = interval
+        self._current = LogHistogram()
+        self._previous = LogHistogram()
+        self._current_started = time.time()
+
+    def _rotate(self, now: float) -> None:
+        elapsed = now - self._current_started
+        if elapsed < self.interval:
+            return
+        self._previous, self._current = self._current, self._previous
+        self._current.reset()
+        if elapsed >= 2 * self.interval:
+            # Both intervals are stale
+            self._previous.reset()
+        self._current_started = now
+
+    def record(self, value: float, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self._rotate(now)
+        self._current.record(value)
+
+    def quantile(self, q: float, now: Optional[float] = None) -> float:
+        self._rotate(time.time() if now is None else now)
+        total = self._current.count + self._previous.count
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, (current, previous) in enumerate(zip(self._current.counts, self._previous.counts)):
+            seen += current + previous
+            if seen >= rank and current + previous:
+                return self._current.value_at(index)
+        return self._current.value_at(self._current.num_buckets - 1)
+
+class EndpointSeries:
+    """Lifetime counters plus windowed rate and latency for one series"""
+
+    __slots__ = ("count", "errors", "total_time", "rate", "latency")
+
+    def __init__(self, rate_horizon: int, quantile_interval: float):
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.rate = RateCounter(rate_horizon)
+        self.latency = WindowedQuantiles(quantile_interval)
+
+    def record(self, duration: float, success: bool, now: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        if not success:
+            self.errors += 1
+        self.rate.add(1, now)
+        self.latency.record(duration, now)
+
+    def summary(self, window_seconds: int, now: float) -> Dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'average_response_time': self.total_time / self.count if self.count else 0.0,
+            'request_rate': self.rate.rate(window_seconds, now),
+            'p50': self.latency.quantile(0.5, now),
+            'p95': self.latency.quantile(0.95, now),
+            'p99': self.latency.quantile(0.99, now),
+        }
+
+class MetricsEngine:
+    """
+    Fixed-memory request metrics keyed by route label. At most
+    ``max_series`` labels get their own series; anything beyond that is
+    folded into a single overflow series, so memory stays constant no
+    matter how many distinct endpoints clients invent.
+    """
+
+    def __init__(self, max_series: int = 200, rate_horizon: int = 300, quantile_interval: float = 60.0):
+        self.max_series = max_series
+        self.rate_horizon = rate_horizon
+        self.quantile_interval = quantile_interval
+        self.total = self._new_series()
+        self._series: Dict[str, EndpointSeries] = {}
+        self.overflow_requests = 0
+
+    def _new_series(self) -> EndpointSeries:
+        return EndpointSeries(self.rate_horizon, self.quantile_interval)
+
+    def _series_for(self, label: str) -> EndpointSeries:
+        series = self._series.get(label)
+        if series is not None:
+            return series
+        if len(self._series) < self.max_series:
+            series = self._series[label] = self._new_series()
+            return series
+        self.overflow_requests += 1
+        overflow = self._series.get(OVERFLOW_SERIES)
+        if overflow is None:
+            # The overflow series is allowed on top of the cap
+            overflow = self._series[OVERFLOW_SERIES] = self._new_series()
+        return overflow
+
+    def record(self, label: str, duration: float, success: bool = True, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self.total.record(duration, success, now)
+        self._series_for(label).record(duration, success, now)
+
+    def series_count(self) -> int:
+        return len(self._series)
+
+    def endpoint_summaries(self, window_seconds: int = 60, now: Optional[float] = None) -> Dict[str, Dict]:
+        now = time.time() if now is None else now
+        return {label: series.summary(window_seconds, now) for label, series in self._series.items()}
@@ -23,6 +23,25 @@ class ForecastData(BaseModel):
     forecast: List[WeatherData]
     last_updated: datetime
 
+class AggregateStats(BaseModel):
+    min: float
+    max: float
+    avg: float
+
+class HistoryBucket(BaseModel):
+    start: datetime
+    count: int
+    temperature: AggregateStats
+    humidity: AggregateStats
+    pressure: AggregateStats
+    wind_speed: AggregateStats
+
+class HistoryData(BaseModel):
+    city: str
+    start: datetime
+    end: datetime
+    buckets: List[HistoryBucket]
+
 class UserPreferences(BaseModel):
     user_id: int
     favorite_cities: List[str]
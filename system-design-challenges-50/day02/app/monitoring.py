@@ -1,9 +1,9 @@
 import time
 import logging
 from typing import Dict, List, Callable, Any
-from collections import defaultdict, deque
-from typing import DefaultDict
 from datetime import datetime, timedelta
+from .config import config
+from .metrics_engine import MetricsEngine
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,38 +12,27 @@ logger = logging.getLogger(__name__)
 class MetricsCollector:
     """Collects and stores application metrics"""
     
-    def __init__(self):
-        self.request_count = 0
-        self.error_count = 0
-        self.response_times = deque(maxlen=1000)  # Keep last 1000 response times
-        self.endpoint_metrics: DefaultDict[str, Dict[str, Any]] = defaultdict(lambda: {
-            'count': 0,
-            'errors': 0,
-            'response_times': deque(maxlen=100)
-        })
+    def __init__(self, max_series: int = 200, rate_horizon: int = 300, quantile_interval: float = 60.0):
+        # Endpoints are route templates (see metrics_engine.route_label); memory is
+        # bounded by max_series no matter how many distinct URLs are requested
+        self.engine = MetricsEngine(max_series, rate_horizon, quantile_interval)
         self.start_time = time.time()
     
+    @property
+    def request_count(self) -> int:
+        return self.engine.total.count
+    
+    @property
+    def error_count(self) -> int:
+        return self.engine.total.errors
+    
     def record_request(self, endpoint: str, response_time: float, success: bool = True):
         """Record a request"""
-        self.request_count += 1
-        self.response_times.append(response_time)
-        
-        # Record endpoint-specific metrics
-        self.endpoint_metrics[endpoint]['count'] += 1
-        self.endpoint_metrics[endpoint]['response_times'].append(response_time)
-        
-        if not success:
-            self.error_count += 1
-            self.endpoint_metrics[endpoint]['errors'] += 1
+        self.engine.record(endpoint, response_time, success)
     
     def get_request_rate(self, window_seconds: int = 60) -> float:
         """Get requests per second over the specified window"""
-        # This is a simplified implementation
-        # In a real system, you'd track timestamps of requests
-        elapsed_time = time.time() - self.start_time
-        if elapsed_time > 0:
-            return self.request_count / elapsed_time
-        return 0.0
+        return self.engine.total.rate.rate(window_seconds)
     
     def get_error_rate(self) -> float:
         """Get error rate as a percentage"""
@@ -53,10 +42,14 @@ class MetricsCollector:
     
     def get_average_response_time(self) -> float:
         """Get average response time in seconds"""
-        if self.response_times:
-            return sum(self.response_times) / len(self.response_times)
+        if self.request_count:
+            return self.engine.total.total_time / self.request_count
         return 0.0
     
+    def get_latency_percentile(self, q: float) -> float:
+        """Get a recent response time quantile in seconds (e.g. q=0.99 for p99)"""
+        return self.engine.total.latency.quantile(q)
+    
     def get_uptime(self) -> str:
         """Get uptime as a formatted string"""
         uptime_seconds = time.time() - self.start_time
@@ -74,9 +67,14 @@ class MetricsCollector:
             'error_count': self.error_count,
             'error_rate': self.get_error_rate(),
             'average_response_time': self.get_average_response_time(),
+            'p50_response_time': self.get_latency_percentile(0.5),
+            'p95_response_time': self.get_latency_percentile(0.95),
+            'p99_response_time': self.get_latency_percentile(0.99),
             'request_rate': self.get_request_rate(),
             'uptime': self.get_uptime(),
-            'endpoint_metrics': dict(self.endpoint_metrics)
+            'series_count': self.engine.series_count(),
+            'overflow_requests': self.engine.overflow_requests,
+            'endpoint_metrics': self.engine.endpoint_summaries()
         }
 
 class HealthChecker:
@@ -102,5 +100,9 @@ class HealthChecker:
         return results
 
 # Global instances
-metrics_collector = MetricsCollector()
+metrics_collector = MetricsCollector(
+    max_series=config.METRICS_MAX_SERIES,
+    rate_horizon=config.METRICS_RATE_HORIZON,
+    quantile_interval=config.METRICS_QUANTILE_INTERVAL
+)
 health_checker = HealthChecker()
\ No newline at end of file
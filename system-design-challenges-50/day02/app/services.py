@@ -1,22 +1,41 @@
 import asyncio
-from typing import List, Dict
-from .models import WeatherData, Location, ForecastData
+import logging
+from collections import Counter
+from typing import List, Dict, Optional
+from .models import WeatherData, Location, ForecastData, HistoryData, HistoryBucket
+from .cache import TTLCache
+from .timeseries import CityHistory, FIELDS
+from .config import config
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 class WeatherService:
-    def __init__(self):
-        # In-memory storage for weather data
-        self.weather_data: Dict[str, List[WeatherData]] = {}
+    def __init__(self, current_ttl: float = 60.0, forecast_ttl: float = 900.0,
+                 max_cached_cities: int = 10000, forecast_cache_days: int = 14,
+                 max_tracked_cities: int = 10000, history_capacity: int = 105120):
+        # In-memory storage for weather data: columnar history plus the latest full record
+        self.weather_data: Dict[str, CityHistory] = {}
+        self.latest_weather: Dict[str, WeatherData] = {}
+        self.history_capacity = history_capacity
         self.locations: Dict[str, Location] = {}
-        
-    async def get_current_weather(self, city: str) -> WeatherData:
-        """Simulate fetching current weather data for a city"""
-        # Simulate API call delay
-        await asyncio.sleep(0.1)
-        
-        # Return mock data if city exists
-        if city in self.weather_data and self.weather_data[city]:
-            return self.weather_data[city][-1]  # Return latest data
+        # Per-city caches; forecasts are cached for the longest horizon and sliced per request
+        self.current_cache = TTLCache(current_ttl, max_cached_cities)
+        self.forecast_cache = TTLCache(forecast_ttl, max_cached_cities)
+        self.forecast_cache_days = forecast_cache_days
+        # Requests per city since the last warm-up cycle, used to pick the cities kept warm
+        self.popularity: Counter = Counter()
+        self.max_tracked_cities = max_tracked_cities
+        self._refresher: Optional[asyncio.Task] = None
+    
+    def _track(self, city: str) -> None:
+        if city in self.popularity or len(self.popularity) < self.max_tracked_cities:
+            self.popularity[city] += 1
+    
+    def _build_current_weather(self, city: str) -> WeatherData:
+        # Return stored data if the city has any
+        if city in self.latest_weather:
+            return self.latest_weather[city]  # Return latest data
         else:
             # Create mock data for new city
             return WeatherData(
@@ -30,7 +49,39 @@ class WeatherService:
                 condition="Sunny" if hash(city) % 2 == 0 else "Cloudy"
             )
     
+    async def _fetch_current_weather(self, city: str) -> WeatherData:
+        """Simulate fetching current weather data for a city from the upstream API"""
+        # Simulate API call delay
+        await asyncio.sleep(0.1)
+        return self._build_current_weather(city)
+    
+    async def _fetch_current_weather_batch(self, cities: List[str]) -> Dict[str, WeatherData]:
+        """Simulate one upstream call returning current weather for several cities"""
+        await asyncio.sleep(0.1)
+        return {city: self._build_current_weather(city) for city in cities}
+    
+    async def get_current_weather(self, city: str) -> WeatherData:
+        """Get current weather for a city, from cache when fresh"""
+        self._track(city)
+        return await self.current_cache.get_or_load(city, lambda: self._fetch_current_weather(city))
+    
+    async def get_current_weather_batch(self, cities: List[str]) -> Dict[str, WeatherData]:
+        """Get current weather for many cities; all cache misses share one upstream call"""
+        for city in cities:
+            self._track(city)
+        return await self.current_cache.get_many_or_load(cities, self._fetch_current_weather_batch)
+    
     async def get_forecast(self, city: str, days: int = 5) -> ForecastData:
+        """Get a forecast for a city, from cache when fresh"""
+        if days > self.forecast_cache_days:
+            return await self._fetch_forecast(city, days)
+        self._track(city)
+        cached = await self.forecast_cache.get_or_load(
+            city, lambda: self._fetch_forecast(city, self.forecast_cache_days)
+        )
+        return ForecastData(city=cached.city, forecast=cached.forecast[:days], last_updated=cached.last_updated)
+    
+    async def _fetch_forecast(self, city: str, days: int) -> ForecastData:
         """Generate a mock forecast for a city"""
         # Simulate API call delay
         await asyncio.sleep(0.2)
@@ -61,16 +112,87 @@ class WeatherService:
     async def update_weather_data(self, city: str, data: WeatherData) -> None:
         """Update weather data for a city"""
         if city not in self.weather_data:
-            self.weather_data[city] = []
-        self.weather_data[city].append(data)
-        
-        # Keep only last 100 records per city
-        if len(self.weather_data[city]) > 100:
-            self.weather_data[city] = self.weather_data[city][-100:]
+            self.weather_data[city] = CityHistory(self.history_capacity)
+        history = self.weather_data[city]
+        timestamp = data.timestamp.timestamp()
+        is_latest = history.last_timestamp is None or timestamp >= history.last_timestamp
+        # Oldest points are overwritten in place once the city's history is full;
+        # late readings are inserted in time order
+        if not history.append(timestamp, [getattr(data, field) for field in FIELDS]):
+            logger.warning(f"Dropped reading for {city} at {data.timestamp}: older than its whole history")
+        if is_latest:
+            self.latest_weather[city] = data
+            self.current_cache.invalidate(city)
+    
+    def get_history(self, city: str, start: datetime, end: datetime, buckets: int = 100) -> HistoryData:
+        """Downsample a city's history to min/max/avg per interval for charting"""
+        history = self.weather_data.get(city)
+        rows = history.downsample(start.timestamp(), end.timestamp(), buckets) if history is not None else []
+        return HistoryData(
+            city=city,
+            start=start,
+            end=end,
+            buckets=[
+                HistoryBucket(start=datetime.fromtimestamp(row.pop("start")), **row)
+                for row in rows
+            ]
+        )
     
     def add_location(self, location: Location) -> None:
         """Add a location to the service"""
         self.locations[location.city] = location
+    
+    async def refresh_popular(self, top_n: int) -> List[str]:
+        """Reload current weather and forecasts for the most requested cities"""
+        cities = [city for city, _ in self.popularity.most_common(top_n)]
+        self.popularity.clear()
+        if not cities:
+            return cities
+        current = await self._fetch_current_weather_batch(cities)
+        for city, weather in current.items():
+            self.current_cache.set(city, weather)
+        results = await asyncio.gather(
+            *(self.forecast_cache.refresh(city, lambda city=city: self._fetch_forecast(city, self.forecast_cache_days))
+              for city in cities),
+            return_exceptions=True
+        )
+        for city, result in zip(cities, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to refresh forecast for {city}: {result}")
+        return cities
+    
+    async def _refresh_loop(self, top_n: int, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_popular(top_n)
+            except Exception as e:
+                logger.error(f"Cache refresh failed: {e}")
+    
+    def start_refresher(self, top_n: int, interval: float) -> None:
+        """Keep the top-N cities warm by reloading them every ``interval`` seconds"""
+        if self._refresher is None:
+            self._refresher = asyncio.ensure_future(self._refresh_loop(top_n, interval))
+    
+    async def stop_refresher(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+    
+    def cache_stats(self) -> Dict[str, Dict]:
+        return {
+            'current': self.current_cache.stats(),
+            'forecast': self.forecast_cache.stats()
+        }
 
 # Global instance of the weather service
-weather_service = WeatherService()
\ No newline at end of file
+weather_service = WeatherService(
+    current_ttl=config.CURRENT_WEATHER_TTL,
+    forecast_ttl=config.FORECAST_TTL,
+    max_cached_cities=config.MAX_CACHED_CITIES,
+    history_capacity=config.WEATHER_HISTORY_CAPACITY
+)
\ No newline at end of file
@@ -0,0 +1,128 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Numeric columns kept per observation, in the order values are passed to ``append``
+FIELDS = ("temperature", "humidity", "pressure", "wind_speed")
+
+class CityHistory:
+    """
+    Weather observations for one city, stored column-wise in typed arrays:
+    an 8-byte timestamp plus a 4-byte float per field (24 bytes per point,
+    versus roughly a kilobyte for a pydantic object in a list).
+
+    Columns grow until ``capacity`` points are held, then act as a ring
+    buffer that overwrites the oldest point in place; nothing is copied on
+    append. Observations normally arrive in timestamp order, which keeps
+    every physical segment sorted so windows are found by binary search, and
+    aggregates run over array slices with the C-level ``min``/``max``/``sum``.
+    A late observation is inserted at its place in time order, which copies
+    the columns once, so stragglers are fine but a stream of them is not.
+    """
+
+    def __init__(self, capacity: int = 105120):
+        self.capacity = capacity
+        self.timestamps = array('d')
+        self.columns: Dict[str, array] = {field: array('f') for field in FIELDS}
+        self._start = 0  # physical index of the oldest point once the buffer is full
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        if not self.timestamps:
+            return None
+        return self.timestamps[self._start - 1]
+
+    def append(self, timestamp: float, values: Sequence[float]) -> bool:
+        """
+        Add one observation; ``values`` follow the order of ``FIELDS``.
+        Returns False if the history is full and the observation is older
+        than all of it, in which case it is dropped.
+        """
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            return self._insert_late(timestamp, values)
+        if len(self.timestamps) < self.capacity:
+            self.timestamps.append(timestamp)
+            for field, value in zip(FIELDS, values):
+                self.columns[field].append(value)
+            return True
+        index = self._start
+        self.timestamps[index] = timestamp
+        for field, value in zip(FIELDS, values):
+            self.columns[field][index] = value
+        self._start = (index + 1) % self.capacity
+        return True
+
+    def _insert_late(self, timestamp: float, values: Sequence[float]) -> bool:
+        """Insert an observation older than the latest one at its place in time order"""
+        if self._start:
+            # Unroll the ring so the points are in one sorted run
+            start = self._start
+            self.timestamps = self.timestamps[start:] + self.timestamps[:start]
+            for field, column in self.columns.items():
+                self.columns[field] = column[start:] + column[:start]
+            self._start = 0
+        full = len(self.timestamps) >= self.capacity
+        if full and timestamp < self.timestamps[0]:
+            return False
+        index = bisect_right(self.timestamps, timestamp)
+        self.timestamps.insert(index, timestamp)
+        for field, value in zip(FIELDS, values):
+            self.columns[field].insert(index, value)
+        if full:
+            del self.timestamps[0]
+            for column in self.columns.values():
+                del column[0]
+        return True
+
+    def _segments(self) -> List[Tuple[int, int]]:
+        """Physical index ranges holding the points, oldest first"""
+        if self._start == 0:
+            return [(0, len(self.timestamps))]
+        return [(self._start, len(self.timestamps)), (0, self._start)]
+
+    def _window(self, start: float, end: float) -> List[Tuple[int, int]]:
+        """Physical index ranges of points with ``start <= timestamp < end``"""
+        ranges = []
+        for lo, hi in self._segments():
+            first = bisect_left(self.timestamps, start, lo, hi)
+            last = bisect_left(self.timestamps, end, first, hi)
+            if first < last:
+                ranges.append((first, last))
+        return ranges
+
+    def count(self, start: float, end: float) -> int:
+        return sum(hi - lo for lo, hi in self._window(start, end))
+
+    def downsample(self, start: float, end: float, buckets: int,
+                   fields: Sequence[str] = FIELDS) -> List[Dict]:
+        """
+        Split ``[start, end)`` into ``buckets`` equal intervals and return
+        min/max/avg of each field per non-empty interval, e.g.
+        ``{"start": ts, "count": 12, "temperature": {"min": ..., "max": ..., "avg": ...}}``.
+        """
+        if buckets < 1 or end <= start:
+            return []
+        step = (end - start) / buckets
+        results = []
+        for bucket in range(buckets):
+            bucket_start = start + bucket * step
+            bucket_end = end if bucket == buckets - 1 else bucket_start + step
+            ranges = self._window(bucket_start, bucket_end)
+            count = sum(hi - lo for lo, hi in ranges)
+            if not count:
+                continue
+            row: Dict = {"start": bucket_start, "count": count}
+            for field in fields:
+                column = self.columns[field]
+                slices = [column[lo:hi] for lo, hi in ranges]
+                row[field] = {
+                    "min": min(min(part) for part in slices),
+                    "max": max(max(part) for part in slices),
+                    "avg": sum(sum(part) for part in slices) / count,
+                }
+            results.append(row)
+        return results
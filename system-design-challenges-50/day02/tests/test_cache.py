@@ -0,0 +1,72 @@
+import pytest
+import asyncio
+from app.cache import TTLCache
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    """Test that concurrent misses for one key call the loader once"""
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "sunny"
+
+    results = await asyncio.gather(*(cache.get_or_load("London", loader) for _ in range(50)))
+
+    assert results == ["sunny"] * 50
+    assert len(calls) == 1
+    assert await cache.get_or_load("London", loader) == "sunny"
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_reloaded():
+    """Test that entries past their TTL are fetched again"""
+    cache = TTLCache(ttl=0.01)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert await cache.get_or_load("Paris", loader) == 1
+    await asyncio.sleep(0.02)
+    assert await cache.get_or_load("Paris", loader) == 2
+
+@pytest.mark.asyncio
+async def test_batch_loads_only_missing_keys():
+    """Test that a batch fetches uncached keys in one call"""
+    cache = TTLCache(ttl=60)
+    cache.set("Tokyo", "cached")
+    batches = []
+
+    async def batch_loader(keys):
+        batches.append(keys)
+        return {key: key.lower() for key in keys}
+
+    results = await cache.get_many_or_load(["Tokyo", "Oslo", "Lima", "Oslo"], batch_loader)
+
+    assert results == {"Tokyo": "cached", "Oslo": "oslo", "Lima": "lima"}
+    assert batches == [["Oslo", "Lima"]]
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_single_key_waiters():
+    """Test that a failed batch load fails requests waiting on its keys"""
+    cache = TTLCache(ttl=60)
+
+    async def batch_loader(keys):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def loader():
+        return "unused"
+
+    batch = asyncio.ensure_future(cache.get_many_or_load(["Rome"], batch_loader))
+    await asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("Rome", loader)
+    with pytest.raises(RuntimeError):
+        await batch
+    # Nothing was cached, so the next request retries upstream
+    assert await cache.get_or_load("Rome", loader) == "unused"
@@ -0,0 +1,53 @@
+import pytest
+from app.metrics_engine import (
+    MetricsEngine, RateCounter, LogHistogram, WindowedQuantiles,
+    route_label, OVERFLOW_SERIES, UNMATCHED_ROUTE
+)
+
+def test_route_label_uses_template():
+    """Test that series are labelled by route template, not URL"""
+    assert route_label("GET", "/weather/{city}") == "GET /weather/{city}"
+    assert route_label("GET", None) == f"GET {UNMATCHED_ROUTE}"
+
+def test_series_cap_with_fuzzed_endpoints():
+    """Test that unbounded distinct endpoints cannot grow the series map"""
+    engine = MetricsEngine(max_series=10)
+    for i in range(10000):
+        engine.record(f"GET /fuzz/{i}?q={i}", 0.01, now=1000.0)
+
+    assert engine.series_count() == 11  # 10 real series + overflow
+    assert engine.total.count == 10000
+    assert engine.overflow_requests == 9990
+    assert engine.endpoint_summaries(now=1000.0)[OVERFLOW_SERIES]['count'] == 9990
+
+def test_rate_counter_window():
+    """Test requests per second over a sliding window"""
+    counter = RateCounter(horizon=60)
+    for second in range(100, 130):
+        counter.add(2, now=second)
+
+    assert counter.rate(10, now=129) == pytest.approx(2.0)
+    # Only 10 of the last 20 seconds had traffic
+    assert counter.rate(20, now=139) == pytest.approx(1.0)
+    # Slots older than the horizon are not counted after wrap-around
+    assert counter.rate(60, now=200) == 0.0
+
+def test_log_histogram_relative_error():
+    """Test that bucket midpoints stay within the bucket's relative error"""
+    histogram = LogHistogram()
+    for value in (0.0005, 0.012, 0.3, 4.2):
+        estimate = histogram.value_at(histogram.bucket(value))
+        assert estimate == pytest.approx(value, rel=0.03)
+
+def test_windowed_quantiles():
+    """Test percentiles and expiry of old samples"""
+    quantiles = WindowedQuantiles(interval=60)
+    start = quantiles._current_started
+    for i in range(1, 101):
+        quantiles.record(i / 1000, now=start + 1)
+
+    assert quantiles.quantile(0.5, now=start + 1) == pytest.approx(0.050, rel=0.05)
+    assert quantiles.quantile(0.99, now=start + 1) == pytest.approx(0.099, rel=0.05)
+    # Still visible one interval later, gone after two
+    assert quantiles.quantile(0.5, now=start + 90) > 0
+    assert quantiles.quantile(0.5, now=start + 300) == 0.0
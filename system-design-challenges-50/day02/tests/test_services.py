@@ -1,6 +1,6 @@
 import pytest
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.models import WeatherData, Location
 from app.services import WeatherService
 
@@ -57,6 +57,20 @@ async def test_update_weather_data(weather_service):
     assert city in weather_service.weather_data
     assert len(weather_service.weather_data[city]) == 1
 
+@pytest.mark.asyncio
+async def test_late_reading_is_stored(weather_service):
+    """Test that a reading older than the latest one is kept without replacing it"""
+    city = "Test City"
+    now = datetime.now()
+    for offset, temperature in ((0, 20.0), (-600, 15.0)):
+        await weather_service.update_weather_data(city, WeatherData(
+            id=1, city=city, temperature=temperature, humidity=60.0, pressure=1013.25,
+            wind_speed=10.0, timestamp=now + timedelta(seconds=offset), condition="Sunny"
+        ))
+
+    assert len(weather_service.weather_data[city]) == 2
+    assert weather_service.latest_weather[city].temperature == 20.0
+
 def test_add_location(weather_service):
     """Test adding a location"""
     location = Location(
@@ -69,4 +83,91 @@ def test_add_location(weather_service):
     weather_service.add_location(location)
     
     assert location.city in weather_service.locations
-    assert weather_service.locations[location.city] == location
\ No newline at end of file
+    assert weather_service.locations[location.city] == location
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_upstream_call(weather_service):
+    """Test that concurrent requests for one city are collapsed and then cached"""
+    results = await asyncio.gather(*(weather_service.get_current_weather("Test City") for _ in range(20)))
+
+    assert all(weather is results[0] for weather in results)
+    assert weather_service.current_cache.loads == 1
+    await weather_service.get_current_weather("Test City")
+    assert weather_service.current_cache.loads == 1
+
+@pytest.mark.asyncio
+async def test_update_invalidates_cached_weather(weather_service):
+    """Test that stored updates are visible despite the cache"""
+    city = "Test City"
+    await weather_service.get_current_weather(city)
+    update = WeatherData(
+        id=2,
+        city=city,
+        temperature=-5.0,
+        humidity=80.0,
+        pressure=1000.0,
+        wind_speed=3.0,
+        timestamp=datetime.now(),
+        condition="Snow"
+    )
+    await weather_service.update_weather_data(city, update)
+
+    weather = await weather_service.get_current_weather(city)
+    assert weather.condition == "Snow"
+
+@pytest.mark.asyncio
+async def test_forecasts_share_cached_horizon(weather_service):
+    """Test that forecasts of different lengths come from one cached fetch"""
+    short = await weather_service.get_forecast("Test City", 3)
+    long = await weather_service.get_forecast("Test City", 10)
+
+    assert len(short.forecast) == 3
+    assert len(long.forecast) == 10
+    assert weather_service.forecast_cache.loads == 1
+
+@pytest.mark.asyncio
+async def test_get_current_weather_batch(weather_service):
+    """Test fetching many cities with one upstream call"""
+    cities = ["Oslo", "Lima", "Rome"]
+    weather = await weather_service.get_current_weather_batch(cities)
+
+    assert list(weather) == cities
+    assert all(weather[city].city == city for city in cities)
+    assert weather_service.current_cache.loads == 1
+
+@pytest.mark.asyncio
+async def test_refresh_popular_warms_top_cities(weather_service):
+    """Test that the refresher reloads the most requested cities"""
+    for _ in range(3):
+        await weather_service.get_current_weather("Oslo")
+    await weather_service.get_current_weather("Lima")
+
+    refreshed = await weather_service.refresh_popular(top_n=1)
+
+    assert refreshed == ["Oslo"]
+    assert weather_service.forecast_cache.get("Oslo") is not None
+    assert weather_service.forecast_cache.get("Lima") is None
+
+@pytest.mark.asyncio
+async def test_get_history(weather_service):
+    """Test downsampled history after several updates"""
+    city = "Test City"
+    start = datetime(2024, 1, 1)
+    for hour in range(6):
+        await weather_service.update_weather_data(city, WeatherData(
+            id=hour + 1,
+            city=city,
+            temperature=10.0 + hour,
+            humidity=50.0,
+            pressure=1013.25,
+            wind_speed=4.0,
+            timestamp=start + timedelta(hours=hour),
+            condition="Cloudy"
+        ))
+
+    history = weather_service.get_history(city, start, start + timedelta(hours=6), buckets=2)
+
+    assert [bucket.count for bucket in history.buckets] == [3, 3]
+    assert history.buckets[0].temperature.min == 10.0
+    assert history.buckets[1].temperature.max == 15.0
+    assert history.buckets[1].start == start + timedelta(hours=3)
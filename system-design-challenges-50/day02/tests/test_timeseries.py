@@ -0,0 +1,59 @@
+import pytest
+from app.timeseries import CityHistory
+
+def fill(history, timestamps):
+    for ts in timestamps:
+        history.append(ts, [float(ts), 50.0, 1000.0 + ts, 2.0])
+
+def test_downsample_min_max_avg():
+    """Test per-bucket aggregates over a window"""
+    history = CityHistory(capacity=100)
+    fill(history, range(10))
+
+    rows = history.downsample(0, 10, buckets=2)
+
+    assert [row["count"] for row in rows] == [5, 5]
+    assert rows[0]["temperature"] == {"min": 0.0, "max": 4.0, "avg": 2.0}
+    assert rows[1]["temperature"] == {"min": 5.0, "max": 9.0, "avg": 7.0}
+    assert rows[1]["start"] == 5
+
+def test_empty_buckets_are_skipped():
+    """Test that intervals without points produce no rows"""
+    history = CityHistory(capacity=100)
+    fill(history, [0, 1, 8, 9])
+
+    rows = history.downsample(0, 10, buckets=5)
+
+    assert [row["start"] for row in rows] == [0, 8]
+
+def test_ring_buffer_overwrites_oldest_points():
+    """Test that a full buffer keeps the newest points across the wrap-around"""
+    history = CityHistory(capacity=8)
+    fill(history, range(20))
+
+    assert len(history) == 8
+    assert history.last_timestamp == 19
+    assert history.count(0, 100) == 8
+    rows = history.downsample(10, 20, buckets=1)
+    assert rows[0]["count"] == 8
+    assert rows[0]["temperature"]["min"] == 12.0
+    assert rows[0]["temperature"]["max"] == 19.0
+    # A window spanning both physical segments of the ring
+    assert history.downsample(14, 18, buckets=1)[0]["temperature"]["avg"] == pytest.approx(15.5)
+
+def test_late_points_are_inserted_in_order():
+    """Test that late observations land in time order, even after the ring wraps"""
+    history = CityHistory(capacity=8)
+    fill(history, [1, 2, 4, 5])
+    assert history.append(3, [3.0, 50.0, 1003.0, 2.0])
+    assert history.downsample(0, 10, buckets=1)[0]["count"] == 5
+
+    fill(history, [6, 7, 8, 9, 10])  # wraps: 1 and 2 are overwritten
+    assert history.append(5.5, [5.5, 50.0, 1005.5, 2.0])
+    assert history.last_timestamp == 10
+    assert history.count(0, 5) == 1  # 3 made room for the late point
+    assert [row["temperature"]["min"] for row in history.downsample(5, 6, buckets=2)] == [5.0, 5.5]
+
+    assert not history.append(0, [0.0, 50.0, 1000.0, 2.0])
+    fill(history, [11])
+    assert history.last_timestamp == 11 and len(history) == 8
@@ -1,26 +1,62 @@
 """
 Cache Invalidation
 """
-from app.cache.redis_client import redis_client
-from typing import List
+import asyncio
+import time
+from app.cache.invalidation_bus import invalidation_bus
+from app.cache.loaders import item_key, item_loader
+from app.cache.tiered import tiered_cache
+from app.core.logging_config import logger
+from typing import Any, Dict
+
+async def _rebuild_item_filter():
+    try:
+        await item_loader.rebuild()
+    except Exception as e:
+        logger.error(f"Failed to rebuild item bloom filter: {e}")
+
+# Creates announced by other instances extend the local existence filter; after
+# lost messages (or on first subscribe) it is rebuilt from the database
+invalidation_bus.created_handlers.append(item_loader.remember)
+invalidation_bus.reset_handlers.append(item_loader.forget_all)
+invalidation_bus.reset_handlers.append(lambda: asyncio.ensure_future(_rebuild_item_filter()))
 
 async def invalidate_item_cache(item_id: int) -> bool:
-    """Invalidate cache for a specific item"""
-    # Delete item cache
-    await redis_client.delete(f"item:{item_id}")
-    # Delete related caches (e.g., lists)
-    await redis_client.delete("items:list")
+    """Invalidate cache for a specific item on every instance"""
+    version = time.time_ns()
+    keys = [item_key(item_id), "items:list"]
+    for key in keys:
+        await tiered_cache.delete(key)
+    invalidation_bus.publish(keys, version)
+    return True
+
+async def announce_item_created(item_id: int, data: Dict[str, Any]) -> bool:
+    """Cache a new item and tell every instance it now exists"""
+    version = time.time_ns()
+    item_loader.remember(item_key(item_id))
+    await tiered_cache.set(item_key(item_id), data)
+    # Evicts negative entries other instances may hold for this ID
+    invalidation_bus.publish([item_key(item_id)], version, created=True)
+    invalidation_bus.publish(["items:list"], version)
+    return True
+
+async def refresh_item_cache(item_id: int, data: Dict[str, Any]) -> bool:
+    """Write-through an updated item and evict older copies from every instance's L1"""
+    version = time.time_ns()
+    await tiered_cache.set(item_key(item_id), data)
+    invalidation_bus.publish([item_key(item_id), "items:list"], version)
     return True
 
 async def invalidate_all_items_cache() -> bool:
     """Invalidate all items cache"""
-    # This is a simplified implementation
-    # In a real system, you might want to use Redis SCAN command
-    # or maintain a separate index of item keys
-    await redis_client.delete("items:list")
+    await tiered_cache.invalidate_pattern("item:*")
+    await tiered_cache.delete("items:list")
+    invalidation_bus.publish_pattern("item:*")
+    invalidation_bus.publish(["items:list"])
     return True
 
 async def invalidate_user_cache(user_id: int) -> bool:
     """Invalidate cache for a specific user"""
-    await redis_client.delete(f"user:{user_id}")
-    return True
\ No newline at end of file
+    await tiered_cache.delete(f"user:{user_id}")
+    invalidation_bus.publish([f"user:{user_id}"])
+    return True
@@ -0,0 +1,181 @@
+"""
+Cross-Instance L1 Invalidation Bus
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional
+from app.cache.l1 import TinyLFUCache
+from app.cache.redis_client import RedisClient, redis_client
+from app.cache.tiered import tiered_cache
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.monitoring.metrics import record_invalidation_event
+
+class InvalidationBus:
+    """
+    Broadcasts L1 invalidations to every API instance over Redis pub/sub.
+
+    Writers queue ``(key, version)`` pairs, where version is the wall-clock
+    ns of the write; queued pairs are sent as one compact message after
+    ``batch_window`` seconds or once ``max_batch`` keys are waiting, so a
+    burst of writes costs a handful of PUBLISH calls. Each message carries
+    the sender's instance id and a per-sender sequence number. A subscriber
+    that sees a sequence jump, or loses its subscription, can no longer
+    know what it missed and flushes its whole L1 instead.
+
+    Keys published with ``created=True`` are also listed under ``"a"`` and
+    passed to ``created_handlers`` (e.g. to update existence filters);
+    ``reset_handlers`` run whenever L1 is flushed because messages were lost.
+
+    Message format: ``{"i": sender, "s": seq, "k": [[key, version], ...], "a": [key, ...], "p": [pattern, ...]}``
+    """
+
+    def __init__(self, l1: TinyLFUCache, redis: RedisClient, channel: str = "cache:invalidations",
+                 batch_window: float = 0.005, max_batch: int = 256, clock_skew: float = 1.0):
+        self.l1 = l1
+        self.redis = redis
+        self.channel = channel
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.clock_skew_ns = int(clock_skew * 1e9)
+        self.instance_id = uuid.uuid4().hex[:12]
+        self._seq = 0
+        self._pending: Dict[str, int] = {}
+        self._pending_patterns: List[str] = []
+        self._pending_created: List[str] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._last_seq: Dict[str, int] = {}
+        self.created_handlers: List[Callable[[str], None]] = []
+        self.reset_handlers: List[Callable[[], None]] = []
+
+    def publish(self, keys: Iterable[str], version: Optional[int] = None, created: bool = False) -> None:
+        """Queue invalidations for keys changed by a write at ``version`` (defaults to now)"""
+        version = time.time_ns() if version is None else version
+        for key in keys:
+            # Fence local readers too; the sender ignores its own messages
+            self.l1.invalidate(key, version)
+            self._pending[key] = max(version, self._pending.get(key, 0))
+            if created:
+                self._pending_created.append(key)
+        self._schedule()
+
+    def publish_pattern(self, pattern: str) -> None:
+        """Queue eviction of every L1 key matching a glob-style pattern"""
+        self.l1.delete_matching(pattern)
+        self._pending_patterns.append(pattern)
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if len(self._pending) >= self.max_batch:
+            asyncio.ensure_future(self.flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.batch_window)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Send everything queued as one message; returns the number of keys sent"""
+        if not self._pending and not self._pending_patterns:
+            return 0
+        pending, self._pending = self._pending, {}
+        patterns, self._pending_patterns = self._pending_patterns, []
+        created, self._pending_created = self._pending_created, []
+        # Consume the sequence number even if the publish fails, so receivers see the gap
+        self._seq += 1
+        message = {"i": self.instance_id, "s": self._seq, "k": [[key, version] for key, version in pending.items()]}
+        if created:
+            message["a"] = created
+        if patterns:
+            message["p"] = patterns
+        try:
+            await self.redis.publish(self.channel, json.dumps(message, separators=(",", ":")))
+            record_invalidation_event("published", len(pending) + len(patterns))
+        except Exception as e:
+            logger.error(f"Failed to publish {len(pending)} invalidations: {e}")
+            record_invalidation_event("publish_failed", len(pending) + len(patterns))
+        return len(pending)
+
+    def handle_message(self, data) -> int:
+        """Apply one received message to L1; returns the number of entries evicted"""
+        message = json.loads(data)
+        sender, seq = message["i"], message["s"]
+        if sender == self.instance_id:
+            return 0
+        last = self._last_seq.get(sender)
+        self._last_seq[sender] = seq
+        if last is not None and seq != last + 1:
+            logger.warning(f"Invalidation gap from {sender} ({last} -> {seq}), flushing L1")
+            self._reset()
+            record_invalidation_event("gap_flush")
+            return 0
+        evicted = 0
+        for key, version in message.get("k", []):
+            # Widen the version by the allowed clock skew between instances
+            evicted += self.l1.invalidate(key, version + self.clock_skew_ns)
+        for key in message.get("a", []):
+            for handler in self.created_handlers:
+                handler(key)
+        for pattern in message.get("p", []):
+            evicted += self.l1.delete_matching(pattern)
+        record_invalidation_event("received", len(message.get("k", [])) + len(message.get("p", [])))
+        return evicted
+
+    def _reset(self) -> None:
+        self.l1.invalidate_all()
+        for handler in self.reset_handlers:
+            handler()
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything published while we were not subscribed is lost
+                self._reset()
+                self._last_seq.clear()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        try:
+                            self.handle_message(message["data"])
+                        except (ValueError, KeyError) as e:
+                            logger.error(f"Malformed invalidation message: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Invalidation subscription lost: {e}")
+                record_invalidation_event("resubscribe")
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.ensure_future(self._listen())
+
+    async def stop(self) -> None:
+        await self.flush()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+# Global invalidation bus instance
+invalidation_bus = InvalidationBus(
+    tiered_cache.l1,
+    redis_client,
+    channel=settings.INVALIDATION_CHANNEL,
+    batch_window=settings.INVALIDATION_BATCH_WINDOW,
+    clock_skew=settings.INVALIDATION_CLOCK_SKEW,
+)
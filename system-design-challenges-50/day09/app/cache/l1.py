@@ -0,0 +1,213 @@
+"""
+L1 In-Process Cache (W-TinyLFU)
+"""
+import fnmatch
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+MISSING = object()
+
+# Halves every byte of a counter row in one pass (TinyLFU aging)
+_HALVE = bytes(value >> 1 for value in range(256))
+_MAX_COUNT = 15
+_MIX = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+_SEEDS = (0x8F1BBCDC, 0x6ED9EBA1, 0xCA62C1D6, 0x5A827999)
+
+class FrequencySketch:
+    """
+    Count-min sketch of small saturating counters. After ``10 * capacity``
+    increments every counter is halved, so the estimate tracks recent
+    popularity instead of all-time totals.
+    """
+
+    def __init__(self, capacity: int):
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in _SEEDS]
+        self.sample_size = max(10 * capacity, 10)
+        self.additions = 0
+
+    def _indexes(self, key: Hashable):
+        h = hash(key)
+        for seed in _SEEDS:
+            mixed = ((h ^ seed) * _MIX) & _MASK64
+            yield (mixed ^ (mixed >> 29)) & self._mask
+
+    def increment(self, key: Hashable) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < _MAX_COUNT:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._rows = [bytearray(row.translate(_HALVE)) for row in self._rows]
+            self.additions //= 2
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+class _Entry:
+    __slots__ = ("key", "value", "expires_at", "version")
+
+    def __init__(self, key: str, value: Any, expires_at: float, version: int):
+        self.key = key
+        self.value = value
+        self.expires_at = expires_at
+        self.version = version
+
+class TinyLFUCache:
+    """
+    Size-bounded in-process cache with W-TinyLFU admission and per-entry TTL.
+
+    New keys enter a small LRU window. Keys evicted from the window compete
+    with the least recently used key of the main segmented LRU (probation +
+    protected) and are only admitted if the frequency sketch says they are
+    requested more often, so one-off scans cannot flush the hot set.
+    Values are stored as-is; callers must not mutate what they get back.
+
+    Every entry carries a version (wall-clock ns when its value was read
+    from the source). ``invalidate`` evicts entries older than a write and
+    leaves a short-lived fence so a slower reader cannot re-insert the value
+    it fetched before that write.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0,
+                 window_ratio: float = 0.01, protected_ratio: float = 0.8,
+                 fence_ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.window_capacity = max(1, int(max_entries * window_ratio))
+        self.main_capacity = max(1, max_entries - self.window_capacity)
+        self.protected_capacity = int(self.main_capacity * protected_ratio)
+        self.sketch = FrequencySketch(max_entries)
+        self._window: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._probation: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._protected: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.fence_ttl = fence_ttl
+        self._fences: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._floor_version = 0
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._find(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def _find(self, key: str) -> Optional[_Entry]:
+        for segment in (self._window, self._probation, self._protected):
+            entry = segment.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def _touch(self, key: str) -> None:
+        """Record a hit: window and protected refresh recency, probation promotes."""
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        else:
+            self._protected[key] = self._probation.pop(key)
+            if len(self._protected) > self.protected_capacity:
+                demoted_key, demoted = self._protected.popitem(last=False)
+                self._probation[demoted_key] = demoted
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` on a miss or expired entry."""
+        self.sketch.increment(key)
+        entry = self._find(key)
+        if entry is None:
+            return default
+        if entry.expires_at <= time.monotonic():
+            self.delete(key)
+            return default
+        self._touch(key)
+        return entry.value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            version: Optional[int] = None) -> bool:
+        """
+        Store a value read at ``version`` (defaults to now). Returns False if
+        the value is older than an invalidation already received for the key.
+        """
+        now = time.monotonic()
+        version = time.time_ns() if version is None else version
+        if version <= self._floor_version:
+            return False
+        fence = self._fences.get(key)
+        if fence is not None and fence[1] > now and fence[0] >= version:
+            return False
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        entry = self._find(key)
+        if entry is not None:
+            entry.value = value
+            entry.expires_at = expires_at
+            entry.version = version
+            self._touch(key)
+            return True
+        self._window[key] = _Entry(key, value, expires_at, version)
+        if len(self._window) > self.window_capacity:
+            _, candidate = self._window.popitem(last=False)
+            self._admit(candidate)
+        return True
+
+    def _admit(self, candidate: _Entry) -> None:
+        if len(self._probation) + len(self._protected) < self.main_capacity:
+            self._probation[candidate.key] = candidate
+            return
+        segment = self._probation if self._probation else self._protected
+        victim_key = next(iter(segment))
+        victim = segment[victim_key]
+        expired = victim.expires_at <= time.monotonic()
+        if expired or self.sketch.estimate(candidate.key) > self.sketch.estimate(victim_key):
+            del segment[victim_key]
+            self._probation[candidate.key] = candidate
+
+    def delete(self, key: str) -> bool:
+        for segment in (self._window, self._probation, self._protected):
+            if segment.pop(key, None) is not None:
+                return True
+        return False
+
+    def invalidate(self, key: str, version: int) -> bool:
+        """Evict ``key`` if its value predates ``version`` and fence out older reads"""
+        now = time.monotonic()
+        previous = self._fences.pop(key, None)
+        if previous is not None and previous[1] > now:
+            version = max(version, previous[0])
+        self._fences[key] = (version, now + self.fence_ttl)
+        while self._fences:
+            oldest_key, (_, expires_at) = next(iter(self._fences.items()))
+            if expires_at > now:
+                break
+            del self._fences[oldest_key]
+        entry = self._find(key)
+        if entry is not None and entry.version <= version:
+            return self.delete(key)
+        return False
+
+    def invalidate_all(self) -> None:
+        """Drop every entry and reject values read before this point"""
+        self._floor_version = time.time_ns()
+        self.clear()
+
+    def delete_matching(self, pattern: str) -> int:
+        """Evict every key matching a glob-style pattern"""
+        keys = [key for segment in (self._window, self._probation, self._protected)
+                for key in segment if fnmatch.fnmatchcase(key, pattern)]
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def keys(self) -> List[str]:
+        return [key for segment in (self._window, self._probation, self._protected) for key in segment]
+
+    def clear(self) -> None:
+        self._fences.clear()
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
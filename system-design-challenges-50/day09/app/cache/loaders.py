@@ -0,0 +1,96 @@
+"""
+Read-Through Loaders
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Set
+from sqlalchemy import select
+from app.cache.bloom import BloomFilter
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.db.models import Item
+from app.db.session import AsyncSessionLocal
+from app.monitoring.metrics import record_database_query
+
+class Loader(ABC):
+    """Loads the value for a cache key from the system of record"""
+
+    @abstractmethod
+    async def load(self, key: str) -> Optional[Any]:
+        """Return the JSON-serializable value for ``key``, or None if it does not exist"""
+
+    def might_exist(self, key: str) -> bool:
+        """Cheap pre-check; False means ``load`` would certainly return None"""
+        return True
+
+def item_key(item_id: int) -> str:
+    """Cache key for a single item"""
+    return f"item:{item_id}"
+
+def serialize_item(item: Item) -> Dict[str, Any]:
+    """Cacheable representation of an item"""
+    return {
+        "id": item.id,
+        "name": item.name,
+        "description": item.description,
+        "price": item.price,
+    }
+
+class ItemLoader(Loader):
+    """
+    Loads ``item:{id}`` keys from the items table, with a bloom filter of
+    existing item keys so lookups for IDs that were never created skip
+    Redis and the database. Until the filter is built every key might exist.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, capacity: int = 1000000):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self._bloom: Optional[BloomFilter] = None
+        self._generation = 0
+        self._created_during_rebuild: Set[str] = set()
+
+    def might_exist(self, key: str) -> bool:
+        return self._bloom is None or key in self._bloom
+
+    def remember(self, key: str) -> None:
+        """Record a newly created item key"""
+        if self._bloom is not None:
+            self._bloom.add(key)
+        else:
+            self._created_during_rebuild.add(key)
+
+    def forget_all(self) -> None:
+        """Stop trusting the filter (e.g. after missing create notifications)"""
+        self._bloom = None
+        self._generation += 1
+
+    async def rebuild(self) -> int:
+        """Build the filter from every item ID in the database"""
+        self.forget_all()
+        generation = self._generation
+        self._created_during_rebuild = set()
+        async with self.session_factory() as session:
+            ids = (await session.execute(select(Item.id))).scalars().all()
+        record_database_query("items", "select")
+        if generation != self._generation:
+            # A newer rebuild has started; let it install its filter
+            return 0
+        bloom = BloomFilter(max(self.capacity, 2 * len(ids)))
+        for item_id in ids:
+            bloom.add(item_key(item_id))
+        # Creates that committed after the SELECT snapshot
+        for key in self._created_during_rebuild:
+            bloom.add(key)
+        self._created_during_rebuild = set()
+        self._bloom = bloom
+        logger.info(f"Item bloom filter built with {len(ids)} keys")
+        return len(ids)
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        item_id = int(key.rsplit(":", 1)[1])
+        async with self.session_factory() as session:
+            item = await session.get(Item, item_id)
+        record_database_query("items", "select")
+        return serialize_item(item) if item is not None else None
+
+item_loader = ItemLoader(capacity=settings.ITEM_BLOOM_CAPACITY)
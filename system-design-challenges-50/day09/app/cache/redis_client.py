@@ -15,8 +15,18 @@ class RedisClient:
     async def set(self, key: str, value: str, ex: Optional[int] = None):
         return await self.redis_client.set(key, value, ex=ex)
     
-    async def delete(self, key: str):
-        return await self.redis_client.delete(key)
+    async def delete(self, *keys: str):
+        return await self.redis_client.delete(*keys)
+    
+    async def scan_iter(self, pattern: str, count: int = 500):
+        async for key in self.redis_client.scan_iter(match=pattern, count=count):
+            yield key.decode() if isinstance(key, bytes) else key
+    
+    async def publish(self, channel: str, message: str):
+        return await self.redis_client.publish(channel, message)
+    
+    def pubsub(self):
+        return self.redis_client.pubsub()
     
     async def close(self):
         await self.redis_client.close()
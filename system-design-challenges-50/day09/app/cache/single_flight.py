@@ -0,0 +1,34 @@
+"""
+Single-Flight Request Coalescing
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that arrive while a
+    call for their key is running await its result (or exception) instead
+    of starting their own, so a hot key that misses costs one load.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so one cancelled caller does not cancel the load for everyone else
+        return await asyncio.shield(call)
+
+    def _forget(self, key: str, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            call.exception()
@@ -0,0 +1,143 @@
+"""
+Tiered Cache (L1 in-process + L2 Redis)
+"""
+import json
+import random
+import time
+from typing import Any, Optional
+from app.cache.l1 import MISSING, TinyLFUCache
+from app.cache.loaders import Loader
+from app.cache.redis_client import RedisClient, redis_client
+from app.cache.single_flight import SingleFlight
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.monitoring.metrics import record_cache_hit, record_cache_miss, record_tier_lookup
+
+class TieredCache:
+    """
+    Cache-aside lookups across an in-process L1 and a shared Redis L2.
+
+    ``get`` checks L1, then L2 (promoting hits into L1), then the optional
+    read-through loader, whose result is written to both tiers. Redis errors
+    are treated as L2 misses so the database stays reachable when Redis is down.
+
+    Misses for the same key are coalesced so only one L2 read and one load
+    run at a time. Keys the loader reports as nonexistent are cached as
+    negative entries (JSON ``null`` in L2) for ``negative_ttl`` seconds, and
+    the loader's existence check can rule a key out before touching Redis.
+    All TTLs are shortened by up to ``ttl_jitter`` so entries filled
+    together do not expire together.
+    """
+
+    def __init__(self, l1: TinyLFUCache, l2: RedisClient, l2_ttl: int = 3600,
+                 negative_ttl: int = 30, ttl_jitter: float = 0.1):
+        self.l1 = l1
+        self.l2 = l2
+        self.l2_ttl = l2_ttl
+        self.negative_ttl = negative_ttl
+        self.ttl_jitter = ttl_jitter
+        self._flights = SingleFlight()
+
+    def _jittered(self, ttl: float) -> float:
+        return ttl * (1 - random.random() * self.ttl_jitter)
+
+    def _l1_ttl(self, value: Any) -> float:
+        return self._jittered(self.l1.ttl if value is not None else min(self.l1.ttl, self.negative_ttl))
+
+    def _l2_ttl(self, value: Any, ttl: Optional[int]) -> int:
+        return max(1, int(self._jittered(self.negative_ttl if value is None else ttl or self.l2_ttl)))
+
+    async def _l2_get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.l2.get(key)
+        except Exception as e:
+            logger.warning(f"L2 get failed for {key}: {e}")
+            return None
+
+    async def get(self, key: str, loader: Optional[Loader] = None, ttl: Optional[int] = None) -> Optional[Any]:
+        """Get a value, loading it through ``loader`` on a miss in both tiers"""
+        start = time.perf_counter()
+        value = self.l1.get(key, MISSING)
+        record_tier_lookup("l1", value is not MISSING, time.perf_counter() - start)
+        if value is not MISSING:
+            record_cache_hit()
+            return value
+
+        if loader is not None:
+            start = time.perf_counter()
+            ruled_out = not loader.might_exist(key)
+            record_tier_lookup("bloom", ruled_out, time.perf_counter() - start)
+            if ruled_out:
+                record_cache_hit()
+                self.l1.set(key, None, ttl=self._l1_ttl(None))
+                return None
+        return await self._flights.do(key, lambda: self._read_through(key, loader, ttl))
+
+    async def _read_through(self, key: str, loader: Optional[Loader], ttl: Optional[int]) -> Optional[Any]:
+        # Anything read from here on is at least as new as this version
+        version = time.time_ns()
+        start = time.perf_counter()
+        raw = await self._l2_get(key)
+        record_tier_lookup("l2", raw is not None, time.perf_counter() - start)
+        if raw is not None:
+            record_cache_hit()
+            value = json.loads(raw)
+            self.l1.set(key, value, ttl=self._l1_ttl(value), version=version)
+            return value
+
+        record_cache_miss()
+        if loader is None:
+            return None
+        start = time.perf_counter()
+        value = await loader.load(key)
+        record_tier_lookup("origin", value is not None, time.perf_counter() - start)
+        await self._fill(key, value, ttl, version)
+        return value
+
+    async def _fill(self, key: str, value: Any, ttl: Optional[int], version: int) -> bool:
+        # A value loaded before a concurrent write must not reach either tier
+        if not self.l1.set(key, value, ttl=self._l1_ttl(value), version=version):
+            return False
+        try:
+            return bool(await self.l2.set(key, json.dumps(value), ex=self._l2_ttl(value, ttl)))
+        except Exception as e:
+            logger.warning(f"L2 set failed for {key}: {e}")
+            return False
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Write-through to both tiers"""
+        self.l1.set(key, value, ttl=self._l1_ttl(value))
+        try:
+            return bool(await self.l2.set(key, json.dumps(value), ex=self._l2_ttl(value, ttl)))
+        except Exception as e:
+            logger.warning(f"L2 set failed for {key}: {e}")
+            return False
+
+    async def delete(self, key: str) -> bool:
+        """Remove a key from both tiers"""
+        removed = self.l1.delete(key)
+        try:
+            removed = await self.l2.delete(key) > 0 or removed
+        except Exception as e:
+            logger.warning(f"L2 delete failed for {key}: {e}")
+        return removed
+
+    async def invalidate_pattern(self, pattern: str) -> int:
+        """Remove every key matching a glob-style pattern from both tiers"""
+        removed = self.l1.delete_matching(pattern)
+        try:
+            keys = [key async for key in self.l2.scan_iter(pattern)]
+            if keys:
+                removed = max(removed, await self.l2.delete(*keys))
+        except Exception as e:
+            logger.warning(f"L2 pattern invalidation failed for {pattern}: {e}")
+        return removed
+
+# Global tiered cache instance
+tiered_cache = TieredCache(
+    TinyLFUCache(max_entries=settings.L1_MAX_ENTRIES, ttl=settings.L1_TTL),
+    redis_client,
+    l2_ttl=settings.L2_TTL,
+    negative_ttl=settings.NEGATIVE_TTL,
+    ttl_jitter=settings.TTL_JITTER,
+)
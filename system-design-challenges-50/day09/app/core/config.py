@@ -9,5 +9,14 @@ class Settings(BaseSettings):
     PROJECT_VERSION: str = "1.0.0"
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    L1_MAX_ENTRIES: int = int(os.getenv("L1_MAX_ENTRIES", 10000))
+    L1_TTL: float = float(os.getenv("L1_TTL", 60))
+    L2_TTL: int = int(os.getenv("L2_TTL", 3600))
+    NEGATIVE_TTL: int = int(os.getenv("NEGATIVE_TTL", 30))
+    TTL_JITTER: float = float(os.getenv("TTL_JITTER", 0.1))
+    ITEM_BLOOM_CAPACITY: int = int(os.getenv("ITEM_BLOOM_CAPACITY", 1000000))
+    INVALIDATION_CHANNEL: str = os.getenv("INVALIDATION_CHANNEL", "cache:invalidations")
+    INVALIDATION_BATCH_WINDOW: float = float(os.getenv("INVALIDATION_BATCH_WINDOW", 0.005))
+    INVALIDATION_CLOCK_SKEW: float = float(os.getenv("INVALIDATION_CLOCK_SKEW", 1.0))
 
 settings = Settings()
\ No newline at end of file
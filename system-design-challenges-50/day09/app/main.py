@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
 
 app = FastAPI(
@@ -9,6 +10,11 @@ app = FastAPI(
 
 # Import routers
 from app.routes import health, items
+from app.cache.invalidation_bus import invalidation_bus
+from app.cache.redis_client import redis_client
+from app.db.models import Base
+from app.db.session import async_engine
+from app.monitoring.metrics import metrics_store
 
 # Include routers
 app.include_router(health.router, prefix="/health", tags=["health"])
@@ -18,6 +24,19 @@ app.include_router(items.router, prefix="/items", tags=["items"])
 async def root():
     return {"message": f"Welcome to {settings.PROJECT_NAME}"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics, including per-tier cache hit ratios and latencies"""
+    return metrics_store.render_prometheus()
+
 @app.on_event("startup")
 async def startup_event():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await invalidation_bus.start()
     print(f"{settings.PROJECT_NAME} started successfully")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await invalidation_bus.stop()
+    await redis_client.close()
@@ -1,6 +1,42 @@
 """
 Metrics Collection
 """
+from bisect import bisect_left
+from typing import Dict, Tuple
+
+# Upper bounds in seconds, from sub-100us L1 hits to slow database loads
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (Prometheus-style cumulative export)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th sample"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
 # Metrics storage
 class MetricsStore:
     def __init__(self):
@@ -8,6 +44,10 @@ class MetricsStore:
         self.request_duration = {}
         self.cache_hits = 0
         self.cache_misses = 0
+        self.tier_hits: Dict[str, int] = {}
+        self.tier_misses: Dict[str, int] = {}
+        self.tier_latency: Dict[str, LatencyHistogram] = {}
+        self.invalidation_events: Dict[str, int] = {}
         self.active_connections = 0
         self.database_queries = {}
     
@@ -25,10 +65,87 @@ class MetricsStore:
         """Record cache miss"""
         self.cache_misses += 1
     
+    def record_tier_lookup(self, tier: str, hit: bool, duration: float):
+        """Record one lookup against a cache tier ("l1", "l2") or the origin"""
+        counters = self.tier_hits if hit else self.tier_misses
+        counters[tier] = counters.get(tier, 0) + 1
+        histogram = self.tier_latency.get(tier)
+        if histogram is None:
+            histogram = self.tier_latency[tier] = LatencyHistogram()
+        histogram.observe(duration)
+    
+    def record_invalidation_event(self, event: str, count: int = 1):
+        """Record invalidation bus activity (published, received, gap_flush, ...)"""
+        self.invalidation_events[event] = self.invalidation_events.get(event, 0) + count
+    
     def update_active_connections(self, count: int):
         """Update active connections gauge"""
         self.active_connections = count
     
+    def cache_stats(self) -> Dict:
+        """Overall and per-tier hit ratios with latency percentiles"""
+        def ratio(hits: int, misses: int) -> float:
+            return hits / (hits + misses) if hits + misses else 0.0
+        tiers = {}
+        for tier in sorted(set(self.tier_hits) | set(self.tier_misses) | set(self.tier_latency)):
+            hits = self.tier_hits.get(tier, 0)
+            misses = self.tier_misses.get(tier, 0)
+            histogram = self.tier_latency.get(tier, LatencyHistogram())
+            tiers[tier] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": ratio(hits, misses),
+                **{f"p{int(q * 100)}_seconds": histogram.quantile(q) for q in QUANTILES},
+            }
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_ratio": ratio(self.cache_hits, self.cache_misses),
+            "tiers": tiers,
+            "invalidations": dict(self.invalidation_events),
+        }
+    
+    def render_prometheus(self) -> str:
+        """Render cache metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP cache_lookups_total Cache lookups by tier and result",
+            "# TYPE cache_lookups_total counter",
+        ]
+        for tier, count in sorted(self.tier_hits.items()):
+            lines.append(f'cache_lookups_total{{tier="{tier}",result="hit"}} {count}')
+        for tier, count in sorted(self.tier_misses.items()):
+            lines.append(f'cache_lookups_total{{tier="{tier}",result="miss"}} {count}')
+        lines += [
+            "# HELP cache_tier_latency_seconds Latency of lookups served by each tier",
+            "# TYPE cache_tier_latency_seconds histogram",
+        ]
+        for tier, histogram in sorted(self.tier_latency.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'cache_tier_latency_seconds_bucket{{tier="{tier}",le="{bound}"}} {cumulative}')
+            lines.append(f'cache_tier_latency_seconds_bucket{{tier="{tier}",le="+Inf"}} {histogram.count}')
+            lines.append(f'cache_tier_latency_seconds_sum{{tier="{tier}"}} {histogram.sum:.6f}')
+            lines.append(f'cache_tier_latency_seconds_count{{tier="{tier}"}} {histogram.count}')
+        lines += [
+            "# HELP cache_requests_total Cache requests by overall result",
+            "# TYPE cache_requests_total counter",
+            f'cache_requests_total{{result="hit"}} {self.cache_hits}',
+            f'cache_requests_total{{result="miss"}} {self.cache_misses}',
+            "# HELP cache_invalidation_events_total L1 invalidation bus activity by event",
+            "# TYPE cache_invalidation_events_total counter",
+        ]
+        for event, count in sorted(self.invalidation_events.items()):
+            lines.append(f'cache_invalidation_events_total{{event="{event}"}} {count}')
+        lines += [
+            "# HELP database_queries_total Database queries by table and operation",
+            "# TYPE database_queries_total counter",
+        ]
+        for key, count in sorted(self.database_queries.items()):
+            table, operation = key.split(":", 1)
+            lines.append(f'database_queries_total{{table="{table}",operation="{operation}"}} {count}')
+        return "\n".join(lines) + "\n"
+    
     def record_database_query(self, table: str, operation: str):
         """Record database query"""
         key = f"{table}:{operation}"
@@ -49,6 +166,14 @@ def record_cache_miss():
     """Record cache miss"""
     metrics_store.record_cache_miss()
 
+def record_tier_lookup(tier: str, hit: bool, duration: float):
+    """Record a lookup against one cache tier"""
+    metrics_store.record_tier_lookup(tier, hit, duration)
+
+def record_invalidation_event(event: str, count: int = 1):
+    """Record invalidation bus activity"""
+    metrics_store.record_invalidation_event(event, count)
+
 def update_active_connections(count: int):
     """Update active connections gauge"""
     metrics_store.update_active_connections(count)
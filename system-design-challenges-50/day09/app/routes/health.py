@@ -3,6 +3,7 @@ Health Check Route
 """
 from fastapi import APIRouter, Response
 from pydantic import BaseModel
+from app.monitoring.metrics import metrics_store
 
 router = APIRouter()
 
@@ -12,4 +13,9 @@ class HealthResponse(BaseModel):
 
 @router.get("/", response_model=HealthResponse)
 async def health_check():
-    return HealthResponse()
\ No newline at end of file
+    return HealthResponse()
+
+@router.get("/cache")
+async def cache_health():
+    """Overall and per-tier cache hit ratios and latency percentiles"""
+    return metrics_store.cache_stats()
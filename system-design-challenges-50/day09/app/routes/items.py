@@ -3,9 +3,14 @@ Items Routes
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from sqlalchemy import select
 from typing import List, Optional
+from app.cache.invalidation import announce_item_created, invalidate_item_cache, refresh_item_cache
+from app.cache.loaders import item_key, item_loader, serialize_item
+from app.cache.tiered import tiered_cache
 from app.db.models import Item
 from app.db.session import AsyncSessionLocal
+from app.monitoring.metrics import record_database_query
 
 router = APIRouter()
 
@@ -20,32 +25,57 @@ class ItemResponse(ItemCreate):
 @router.post("/", response_model=ItemResponse)
 async def create_item(item: ItemCreate):
     """Create a new item"""
-    # Implementation will be added later
-    return ItemResponse(id=1, **item.dict())
+    async with AsyncSessionLocal() as session:
+        db_item = Item(**item.dict())
+        session.add(db_item)
+        await session.commit()
+        record_database_query("items", "insert")
+    data = serialize_item(db_item)
+    # Write-through so the first read is already an L1 hit
+    await announce_item_created(db_item.id, data)
+    return ItemResponse(**data)
 
 @router.get("/{item_id}", response_model=ItemResponse)
 async def get_item(item_id: int):
     """Get an item by ID"""
-    # Implementation will be added later
-    return ItemResponse(id=item_id, name="Sample Item", price=10.0)
+    data = await tiered_cache.get(item_key(item_id), loader=item_loader)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return ItemResponse(**data)
 
 @router.get("/", response_model=List[ItemResponse])
 async def list_items(skip: int = 0, limit: int = 100):
     """List items with pagination"""
-    # Implementation will be added later
-    return [
-        ItemResponse(id=1, name="Sample Item 1", price=10.0),
-        ItemResponse(id=2, name="Sample Item 2", price=20.0)
-    ]
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Item).order_by(Item.id).offset(skip).limit(limit))
+        items = result.scalars().all()
+    record_database_query("items", "select")
+    return [ItemResponse(**serialize_item(item)) for item in items]
 
 @router.put("/{item_id}", response_model=ItemResponse)
 async def update_item(item_id: int, item: ItemCreate):
     """Update an item"""
-    # Implementation will be added later
-    return ItemResponse(id=item_id, **item.dict())
+    async with AsyncSessionLocal() as session:
+        db_item = await session.get(Item, item_id)
+        if db_item is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        for field, value in item.dict().items():
+            setattr(db_item, field, value)
+        await session.commit()
+        record_database_query("items", "update")
+    data = serialize_item(db_item)
+    await refresh_item_cache(item_id, data)
+    return ItemResponse(**data)
 
 @router.delete("/{item_id}")
 async def delete_item(item_id: int):
     """Delete an item"""
-    # Implementation will be added later
-    return {"message": f"Item {item_id} deleted successfully"}
\ No newline at end of file
+    async with AsyncSessionLocal() as session:
+        db_item = await session.get(Item, item_id)
+        if db_item is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        await session.delete(db_item)
+        await session.commit()
+        record_database_query("items", "delete")
+    await invalidate_item_cache(item_id)
+    return {"message": f"Item {item_id} deleted successfully"}
@@ -1,6 +1,15 @@
 """
 Pytest Fixtures
 """
+import os
+import shutil
+import tempfile
+
+# Point the app at a throwaway database before anything imports the settings,
+# so test runs never write ./app.db into the tree
+TEST_DB_DIR = tempfile.mkdtemp(prefix="day09-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DB_DIR, 'app.db')}"
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -28,4 +37,10 @@ def client():
     from app.main import app
     
     with TestClient(app) as c:
-        yield c
\ No newline at end of file
+        yield c
+
+@pytest.fixture(scope="session", autouse=True)
+def remove_test_database():
+    """Delete the throwaway database once the session is over"""
+    yield
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
@@ -0,0 +1,166 @@
+"""
+Cache Tests
+"""
+import asyncio
+import fnmatch
+from app.cache.bloom import BloomFilter
+from app.cache.l1 import MISSING, FrequencySketch, TinyLFUCache
+from app.cache.loaders import Loader
+from app.cache.tiered import TieredCache
+from app.monitoring.metrics import metrics_store
+
+class FakeRedis:
+    """In-memory stand-in for RedisClient"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, pattern, count=500):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, pattern):
+                yield key
+
+class CountingLoader(Loader):
+    def __init__(self, rows, delay=0.0, known=None):
+        self.rows = rows
+        self.delay = delay
+        self.known = known
+        self.calls = 0
+
+    async def load(self, key):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.rows.get(key)
+
+    def might_exist(self, key):
+        return self.known is None or key in self.known
+
+def test_sketch_counts_and_ages():
+    """Test that the frequency sketch estimates counts and halves them over time"""
+    sketch = FrequencySketch(capacity=1024)
+    for _ in range(10):
+        sketch.increment("hot")
+    assert sketch.estimate("hot") == 10
+    assert sketch.estimate("cold") == 0
+    sketch.additions = sketch.sample_size - 1
+    sketch.increment("cold")
+    assert sketch.estimate("hot") == 5
+
+def test_l1_ttl_expiry():
+    """Test that entries expire after their TTL"""
+    cache = TinyLFUCache(max_entries=10, ttl=60)
+    cache.set("a", 1, ttl=0)
+    cache.set("b", 2)
+    assert cache.get("a", MISSING) is MISSING
+    assert cache.get("b") == 2
+
+def test_l1_admission_keeps_hot_keys():
+    """Test that a scan of one-off keys does not evict frequently used keys"""
+    cache = TinyLFUCache(max_entries=100, ttl=60)
+    hot = [f"hot-{i}" for i in range(50)]
+    for _ in range(5):
+        for key in hot:
+            if cache.get(key, MISSING) is MISSING:
+                cache.set(key, key)
+    for i in range(1000):
+        key = f"scan-{i}"
+        if cache.get(key, MISSING) is MISSING:
+            cache.set(key, key)
+    assert len(cache) <= 100
+    assert sum(key in cache for key in hot) >= 45
+
+def test_l1_delete_matching():
+    """Test glob-style eviction"""
+    cache = TinyLFUCache(max_entries=10)
+    cache.set("item:1", 1)
+    cache.set("item:2", 2)
+    cache.set("user:1", 3)
+    assert cache.delete_matching("item:*") == 2
+    assert cache.keys() == ["user:1"]
+
+def test_tiered_read_through_populates_both_tiers():
+    """Test that a miss loads once, fills L2 and L1, and later reads stay in L1"""
+    redis = FakeRedis()
+    cache = TieredCache(TinyLFUCache(max_entries=10), redis)
+    loader = CountingLoader({"item:1": {"id": 1, "name": "a"}})
+
+    async def scenario():
+        assert await cache.get("item:1", loader=loader) == {"id": 1, "name": "a"}
+        assert b'"name": "a"' in redis.data["item:1"]
+        before = metrics_store.tier_hits.get("l1", 0)
+        assert await cache.get("item:1", loader=loader) == {"id": 1, "name": "a"}
+        assert metrics_store.tier_hits["l1"] == before + 1
+        assert loader.calls == 1
+
+        cache.l1.clear()
+        assert await cache.get("item:1", loader=loader) == {"id": 1, "name": "a"}
+        assert loader.calls == 1
+        assert "item:1" in cache.l1
+
+        assert await cache.invalidate_pattern("item:*") == 1
+        assert redis.data == {}
+
+    asyncio.run(scenario())
+
+def test_concurrent_misses_load_once():
+    """Test that a burst of requests for an expired hot key runs one load"""
+    cache = TieredCache(TinyLFUCache(max_entries=10), FakeRedis())
+    loader = CountingLoader({"item:1": {"id": 1}}, delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("item:1", loader=loader) for _ in range(100)))
+
+    assert asyncio.run(scenario()) == [{"id": 1}] * 100
+    assert loader.calls == 1
+
+def test_missing_ids_are_cached_negatively():
+    """Test that nonexistent IDs hit the loader once and are then served as misses from cache"""
+    redis = FakeRedis()
+    cache = TieredCache(TinyLFUCache(max_entries=10), redis, negative_ttl=30)
+    loader = CountingLoader({})
+
+    async def scenario():
+        assert await cache.get("item:404", loader=loader) is None
+        assert redis.data["item:404"] == b"null"
+        cache.l1.clear()
+        assert await cache.get("item:404", loader=loader) is None
+        assert await cache.get("item:404", loader=loader) is None
+
+    asyncio.run(scenario())
+    assert loader.calls == 1
+
+def test_existence_filter_skips_redis_and_loader():
+    """Test that keys ruled out by the loader's filter never reach L2 or the loader"""
+    redis = FakeRedis()
+    cache = TieredCache(TinyLFUCache(max_entries=10), redis)
+    loader = CountingLoader({"item:1": {"id": 1}}, known={"item:1"})
+
+    assert asyncio.run(cache.get("item:2", loader=loader)) is None
+    assert loader.calls == 0
+    assert redis.data == {}
+
+def test_ttl_jitter_stays_within_bounds():
+    """Test that jittered TTLs are spread but never longer than configured"""
+    cache = TieredCache(TinyLFUCache(max_entries=10), FakeRedis(), l2_ttl=1000, ttl_jitter=0.1)
+    ttls = {cache._l2_ttl({"id": 1}, None) for _ in range(200)}
+    assert len(ttls) > 10
+    assert all(900 <= ttl <= 1000 for ttl in ttls)
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added key is reported present and few others are"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"item:{i}")
+    assert all(f"item:{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other:{i}" in bloom for i in range(10000))
+    assert false_positives < 300
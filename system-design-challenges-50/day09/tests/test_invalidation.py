@@ -0,0 +1,88 @@
+"""
+Invalidation Bus Tests
+"""
+import asyncio
+import time
+from app.cache.invalidation_bus import InvalidationBus
+from app.cache.l1 import MISSING, TinyLFUCache
+
+class FakeRedis:
+    """Records PUBLISH calls"""
+
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, channel, message):
+        self.published.append(message)
+        return 1
+
+def make_bus(redis):
+    return InvalidationBus(TinyLFUCache(max_entries=100), redis, batch_window=0.001)
+
+def test_burst_of_writes_is_one_message():
+    """Test that writes inside the batch window are sent together and evict remote L1 entries"""
+    redis = FakeRedis()
+    sender, receiver = make_bus(redis), make_bus(redis)
+    for i in range(50):
+        receiver.l1.set(f"item:{i}", {"id": i})
+
+    async def scenario():
+        for i in range(50):
+            sender.publish([f"item:{i}"])
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert len(redis.published) == 1
+    assert receiver.handle_message(redis.published[0]) == 50
+    assert len(receiver.l1) == 0
+    # Senders ignore their own messages
+    assert sender.handle_message(redis.published[0]) == 0
+
+def test_stale_fill_is_fenced_out():
+    """Test that a value read before a remote write cannot be re-inserted after the invalidation"""
+    redis = FakeRedis()
+    sender, receiver = make_bus(redis), make_bus(redis)
+    read_started = time.time_ns()
+
+    async def scenario():
+        sender.publish(["item:1"])
+        await sender.flush()
+
+    asyncio.run(scenario())
+    receiver.handle_message(redis.published[0])
+    assert receiver.l1.set("item:1", {"name": "old"}, version=read_started) is False
+    assert receiver.l1.get("item:1", MISSING) is MISSING
+
+def test_sequence_gap_flushes_l1():
+    """Test that a missed message makes the receiver drop its whole L1"""
+    redis = FakeRedis()
+    sender, receiver = make_bus(redis), make_bus(redis)
+    receiver.l1.set("item:7", {"id": 7})
+
+    async def scenario():
+        for key in ("item:1", "item:2", "item:3"):
+            sender.publish([key])
+            await sender.flush()
+
+    asyncio.run(scenario())
+    receiver.handle_message(redis.published[0])
+    assert "item:7" in receiver.l1
+    receiver.handle_message(redis.published[2])
+    assert len(receiver.l1) == 0
+
+def test_created_keys_reach_handlers_and_evict_negative_entries():
+    """Test that a create elsewhere drops cached misses and updates existence filters"""
+    redis = FakeRedis()
+    sender, receiver = make_bus(redis), make_bus(redis)
+    receiver.l1.set("item:9", None)
+    created = []
+    receiver.created_handlers.append(created.append)
+
+    async def scenario():
+        sender.publish(["item:9"], created=True)
+        await sender.flush()
+
+    asyncio.run(scenario())
+    receiver.handle_message(redis.published[0])
+    assert created == ["item:9"]
+    assert "item:9" not in receiver.l1
@@ -2,45 +2,55 @@
 Items Tests
 """
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 
-client = TestClient(app)
-
-def test_create_item():
-    """Test creating an item"""
+@pytest.fixture
+def item(client):
+    """Create an item and return its JSON"""
     response = client.post("/items/", json={"name": "Test Item", "price": 10.0})
     assert response.status_code == 200
-    data = response.json()
-    assert data["name"] == "Test Item"
-    assert data["price"] == 10.0
+    return response.json()
 
-def test_get_item():
+def test_create_item(item):
+    """Test creating an item"""
+    assert item["name"] == "Test Item"
+    assert item["price"] == 10.0
+    assert "id" in item
+
+def test_get_item(client, item):
     """Test getting an item"""
-    response = client.get("/items/1")
+    response = client.get(f"/items/{item['id']}")
     assert response.status_code == 200
     data = response.json()
-    assert "id" in data
-    assert "name" in data
+    assert data["id"] == item["id"]
+    assert data["name"] == "Test Item"
+
+def test_get_missing_item(client):
+    """Test that an unknown item is a 404"""
+    response = client.get("/items/999999999")
+    assert response.status_code == 404
 
-def test_list_items():
+def test_list_items(client, item):
     """Test listing items"""
     response = client.get("/items/")
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
+    assert any(row["id"] == item["id"] for row in data)
 
-def test_update_item():
+def test_update_item(client, item):
     """Test updating an item"""
-    response = client.put("/items/1", json={"name": "Updated Item", "price": 20.0})
+    response = client.put(f"/items/{item['id']}", json={"name": "Updated Item", "price": 20.0})
     assert response.status_code == 200
     data = response.json()
     assert data["name"] == "Updated Item"
     assert data["price"] == 20.0
+    # The cached copy is updated with the write
+    assert client.get(f"/items/{item['id']}").json()["name"] == "Updated Item"
 
-def test_delete_item():
+def test_delete_item(client, item):
     """Test deleting an item"""
-    response = client.delete("/items/1")
+    response = client.delete(f"/items/{item['id']}")
     assert response.status_code == 200
     data = response.json()
-    assert "message" in data
\ No newline at end of file
+    assert "message" in data
+    assert client.get(f"/items/{item['id']}").status_code == 404
@@ -1,20 +1,38 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import JSONResponse
+from typing import Optional
 
 from ...services.news_service import NewsService
 from ...services.prefetch_service import PrefetchService
+from ...services.access_tracker import articles_target, get_access_tracker, prefetch_target
+from ...services.response_cache import CachedResponse, get_response_cache
 from ...core.logging import logger
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
 
+def _edge_response(entry: CachedResponse, cache_status: str, if_none_match: Optional[str]) -> Response:
+    """Build the HTTP response for a cached entry, answering 304 when the client's copy is current."""
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": entry.cache_control,
+        "Age": str(int(entry.age())),
+        "X-Cache": cache_status,
+    }
+    if entry.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 @router.get("/")
 async def get_articles(
     category: Optional[str] = Query(None, description="Filter articles by category"),
     limit: int = Query(10, ge=1, le=100, description="Number of articles to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    prefetch: bool = Query(False, description="Enable prefetching for better performance")
-) -> List[dict]:
+    prefetch: bool = Query(False, description="Enable prefetching for better performance"),
+    if_none_match: Optional[str] = Header(None),
+    x_region: Optional[str] = Header(None)
+) -> Response:
     """
     Get articles with optional filtering and prefetching.
     
@@ -23,46 +41,66 @@ async def get_articles(
         limit: Number of articles to return
         offset: Offset for pagination
         prefetch: Enable prefetching for better performance
+        if_none_match: ETag of the client's cached copy
+        x_region: Region of the requesting edge, selects the latency budget
         
     Returns:
-        List[dict]: List of articles
+        Response: Serialized list of articles, or 503 if the origin failed with nothing cached
     """
     try:
-        if prefetch:
-            prefetch_service = PrefetchService()
-            articles = await prefetch_service.get_prefetched_articles(category, limit, offset)
-        else:
-            news_service = NewsService()
-            articles = await news_service.get_articles(category, limit, offset)
+        # Track first-page demand so the cache warmer can refresh it ahead of time
+        if offset == 0:
+            target = prefetch_target("default_user", category, limit) if prefetch else articles_target(category, limit)
+            get_access_tracker().record(target)
+        
+        async def origin():
+            if prefetch:
+                prefetch_service = PrefetchService()
+                articles = await prefetch_service.get_prefetched_articles(category, limit, offset)
+            else:
+                news_service = NewsService()
+                articles = await news_service.get_articles(category, limit, offset)
+            logger.info(f"Retrieved {len(articles)} articles")
+            return articles
         
-        logger.info(f"Retrieved {len(articles)} articles")
-        return articles
+        key = f"articles:{category or 'all'}:{limit}:{offset}:{int(prefetch)}"
+        entry, cache_status = await get_response_cache().fetch(key, origin, x_region)
+        return _edge_response(entry, cache_status, if_none_match)
     except Exception as e:
+        # Only reached without a stale copy to fall back on
         logger.error(f"Error retrieving articles: {e}")
-        return []
+        return JSONResponse(status_code=503, content={"error": "Articles temporarily unavailable"})
 
 
 @router.get("/{article_id}")
-async def get_article(article_id: int) -> dict:
+async def get_article(
+    article_id: int,
+    if_none_match: Optional[str] = Header(None),
+    x_region: Optional[str] = Header(None)
+):
     """
     Get a specific article by ID.
     
     Args:
         article_id: Article ID
+        if_none_match: ETag of the client's cached copy
+        x_region: Region of the requesting edge, selects the latency budget
         
     Returns:
-        dict: Article data
+        Response: Serialized article data, or an error dict
     """
     try:
-        news_service = NewsService()
-        article = await news_service.get_article(article_id)
+        async def origin():
+            news_service = NewsService()
+            return await news_service.get_article(article_id)
         
-        if article:
+        entry, cache_status = await get_response_cache().fetch(f"article:{article_id}", origin, x_region)
+        if entry:
             logger.info(f"Retrieved article {article_id}")
-            return article
+            return _edge_response(entry, cache_status, if_none_match)
         else:
             logger.warning(f"Article {article_id} not found")
             return {"error": "Article not found"}
     except Exception as e:
         logger.error(f"Error retrieving article {article_id}: {e}")
-        return {"error": "Internal server error"}
\ No newline at end of file
+        return {"error": "Internal server error"}
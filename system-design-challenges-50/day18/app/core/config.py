@@ -21,6 +21,22 @@ class Settings(BaseSettings):
     # Prefetch
     PREFETCH_LIMIT: int = int(os.getenv("PREFETCH_LIMIT", 10))
     
+    # Predictive cache warming
+    ACCESS_FLUSH_INTERVAL: float = float(os.getenv("ACCESS_FLUSH_INTERVAL", 5))
+    WARM_INTERVAL_SECONDS: int = int(os.getenv("WARM_INTERVAL_SECONDS", 60))
+    WARM_TOP_K: int = int(os.getenv("WARM_TOP_K", 50))
+    WARM_BUDGET: int = int(os.getenv("WARM_BUDGET", 20))  # refreshes per cycle
+    WARM_LEAD_SECONDS: int = int(os.getenv("WARM_LEAD_SECONDS", 120))
+    
+    # Edge response cache
+    REGION: str = os.getenv("REGION", "us-east")
+    EDGE_CACHE_MAX_ENTRIES: int = int(os.getenv("EDGE_CACHE_MAX_ENTRIES", 1024))
+    EDGE_CACHE_MAX_AGE: int = int(os.getenv("EDGE_CACHE_MAX_AGE", 30))
+    EDGE_STALE_WHILE_REVALIDATE: int = int(os.getenv("EDGE_STALE_WHILE_REVALIDATE", 60))
+    EDGE_STALE_IF_ERROR: int = int(os.getenv("EDGE_STALE_IF_ERROR", 300))
+    EDGE_LATENCY_BUDGETS: str = os.getenv("EDGE_LATENCY_BUDGETS", "us-east=50,eu-west=80,ap-southeast=150")  # ms
+    EDGE_DEFAULT_BUDGET_MS: float = float(os.getenv("EDGE_DEFAULT_BUDGET_MS", 100))
+    
     class Config:
         case_sensitive = True
 
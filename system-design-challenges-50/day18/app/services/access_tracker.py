@@ -0,0 +1,171 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+
+from ..services.cache import get_cache_service
+from ..core.config import settings
+from ..core.logging import logger
+
+# Multiply every counter in a hash by ARGV[1], dropping those that reach zero
+DECAY_SCRIPT = """
+local counters = redis.call('HGETALL', KEYS[1])
+for i = 1, #counters, 2 do
+    local scaled = math.floor(tonumber(counters[i + 1]) * tonumber(ARGV[1]))
+    if scaled > 0 then
+        redis.call('HSET', KEYS[1], counters[i], scaled)
+    else
+        redis.call('HDEL', KEYS[1], counters[i])
+    end
+end
+return #counters / 2
+"""
+
+
+def articles_target(category: Optional[str], limit: int) -> str:
+    """Warm target for the first page of a category listing."""
+    return f"articles|{category or 'all'}|{limit}"
+
+
+def prefetch_target(user_id: str, category: Optional[str], limit: int) -> str:
+    """Warm target for the first page of a user's prefetched feed."""
+    return f"prefetch|{user_id}|{category or 'all'}|{limit}"
+
+
+class AccessTracker:
+    """
+    Records how often each warmable page is requested, bucketed by hour of day.
+
+    Counts are buffered in-process and flushed to one Redis hash per hour
+    (``access:hod:{HH}``) with a single pipeline from a background thread,
+    so the request path only touches a local Counter. A rolling
+    ``access:total`` hash gives a time-independent baseline for targets
+    without an hourly history.
+    """
+
+    def __init__(self, flush_interval: float = 5.0, flush_threshold: int = 500):
+        self.cache_service = get_cache_service()
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending: Counter = Counter()
+        self._pending_events = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flushing = threading.Event()
+
+    @staticmethod
+    def _hour_key(hour: int) -> str:
+        return f"access:hod:{hour:02d}"
+
+    def record(self, target: str, now: Optional[datetime] = None) -> None:
+        """
+        Count one request for a warm target.
+
+        Args:
+            target: Target descriptor from articles_target/prefetch_target
+            now: Request time (defaults to the current UTC time)
+        """
+        hour = (now or datetime.now(timezone.utc)).hour
+        with self._lock:
+            self._pending[(hour, target)] += 1
+            self._pending_events += 1
+            due = (self._pending_events >= self.flush_threshold
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due and not self._flushing.is_set():
+            # Flush off the request path so cached reads never wait on Redis
+            self._flushing.set()
+            threading.Thread(target=self._background_flush, daemon=True).start()
+
+    def _background_flush(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._flushing.clear()
+
+    def flush(self) -> int:
+        """
+        Push buffered counts to Redis in one pipeline.
+
+        Returns:
+            int: Number of distinct counters written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._pending_events = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            pipe = self.cache_service.client.pipeline(transaction=False)
+            for (hour, target), count in pending.items():
+                pipe.hincrby(self._hour_key(hour), target, count)
+                pipe.hincrby("access:total", target, count)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error flushing access counters: {e}")
+        return len(pending)
+
+    def top_targets(self, hour: int, k: int) -> List[Tuple[str, float]]:
+        """
+        Rank warm targets by predicted demand for an hour of the day.
+
+        The hour's own count dominates; the all-day total breaks ties and
+        covers targets first seen at other hours.
+
+        Args:
+            hour: Hour of day (0-23, UTC)
+            k: Number of targets to return
+
+        Returns:
+            List[Tuple[str, float]]: (target, score) pairs, highest first
+        """
+        try:
+            pipe = self.cache_service.client.pipeline(transaction=False)
+            pipe.hgetall(self._hour_key(hour))
+            pipe.hgetall("access:total")
+            hourly, total = pipe.execute()
+        except Exception as e:
+            logger.error(f"Error reading access counters: {e}")
+            return []
+        scores: Dict[str, float] = {target: 0.1 * int(count) for target, count in total.items()}
+        for target, count in hourly.items():
+            scores[target] = scores.get(target, 0.0) + int(count)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def decay(self, factor: float = 0.5) -> None:
+        """
+        Scale every counter down so old traffic patterns fade out.
+
+        Each hash is scaled by a Lua script, so increments flushed by the
+        API while the decay runs are scaled or kept, never overwritten.
+
+        Args:
+            factor: Multiplier applied to each count; counts that reach zero are dropped
+        """
+        try:
+            client = self.cache_service.client
+            script = client.register_script(DECAY_SCRIPT)
+            pipe = client.pipeline(transaction=False)
+            for key in [self._hour_key(hour) for hour in range(24)] + ["access:total"]:
+                script(keys=[key], args=[factor], client=pipe)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error decaying access counters: {e}")
+
+
+# Global access tracker instance
+_access_tracker: Optional[AccessTracker] = None
+
+
+def get_access_tracker() -> AccessTracker:
+    """
+    Get access tracker instance.
+
+    Returns:
+        AccessTracker: Access tracker instance
+    """
+    global _access_tracker
+    if _access_tracker is None:
+        _access_tracker = AccessTracker(flush_interval=settings.ACCESS_FLUSH_INTERVAL)
+    return _access_tracker
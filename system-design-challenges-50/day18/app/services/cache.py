@@ -68,6 +68,47 @@ class CacheService:
             logger.error(f"Error deleting key {key} from cache: {e}")
             return False
     
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Get many values in one round trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            List[Optional[str]]: Values in key order, None for misses
+        """
+        if not keys:
+            return []
+        try:
+            return self.client.mget(keys)
+        except Exception as e:
+            logger.error(f"Error getting {len(keys)} keys from cache: {e}")
+            return [None] * len(keys)
+
+    def set_many(self, mapping: Dict[str, str], expire: int = 3600) -> bool:
+        """
+        Set many key-value pairs with the same expiry in one pipelined round trip.
+
+        Args:
+            mapping: Keys and values to cache
+            expire: Expiration time in seconds
+
+        Returns:
+            bool: True if successful
+        """
+        if not mapping:
+            return True
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expire)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error setting {len(mapping)} keys in cache: {e}")
+            return False
+
     def exists(self, key: str) -> bool:
         """
         Check if key exists in cache.
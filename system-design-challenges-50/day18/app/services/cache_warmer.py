@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..services.access_tracker import AccessTracker, get_access_tracker
+from ..services.cache import get_cache_service
+from ..services.news_service import NewsService
+from ..services.prefetch_service import PrefetchService
+from ..core.config import settings
+from ..core.logging import logger
+
+
+class CacheWarmer:
+    """
+    Refreshes the pages most likely to be requested soon.
+
+    Each cycle ranks warm targets by their request counts for the hour that
+    starts ``lead_seconds`` from now, checks the remaining TTL of the top K
+    in one pipeline, and refreshes those that are missing or would expire
+    within the lead window, spending at most ``budget`` refreshes.
+    """
+
+    def __init__(self, tracker: Optional[AccessTracker] = None, top_k: int = 50,
+                 budget: int = 20, lead_seconds: int = 120):
+        self.cache_service = get_cache_service()
+        self.tracker = tracker or get_access_tracker()
+        self.news_service = NewsService()
+        self.prefetch_service = PrefetchService()
+        self.top_k = top_k
+        self.budget = budget
+        self.lead_seconds = lead_seconds
+
+    @staticmethod
+    def cache_key(target: str) -> Optional[str]:
+        """Cache key holding a target's page."""
+        parts = target.split("|")
+        if parts[0] == "articles" and len(parts) == 3:
+            return f"articles:{parts[1]}:{parts[2]}:0"
+        if parts[0] == "prefetch" and len(parts) == 4:
+            return PrefetchService.page_key(parts[1], None if parts[2] == "all" else parts[2], int(parts[3]), 0)
+        return None
+
+    def plan(self, now: Optional[datetime] = None) -> List[Tuple[str, float, int]]:
+        """
+        Choose the targets to refresh this cycle.
+
+        Args:
+            now: Current time (defaults to UTC now)
+
+        Returns:
+            List[Tuple[str, float, int]]: (target, score, ttl) in refresh order
+        """
+        now = now or datetime.now(timezone.utc)
+        hour = (now + timedelta(seconds=self.lead_seconds)).hour
+        candidates = [
+            (target, score, key)
+            for target, score in self.tracker.top_targets(hour, self.top_k)
+            for key in [self.cache_key(target)] if key
+        ]
+        if not candidates:
+            return []
+
+        pipe = self.cache_service.client.pipeline(transaction=False)
+        for _, _, key in candidates:
+            pipe.ttl(key)
+        ttls = pipe.execute()
+
+        # TTL is -2 for a missing key and -1 for a key without expiry
+        due = [
+            (target, score, ttl)
+            for (target, score, _), ttl in zip(candidates, ttls)
+            if ttl == -2 or 0 <= ttl < self.lead_seconds
+        ]
+        return due[:self.budget]
+
+    async def warm_target(self, target: str) -> int:
+        """
+        Rebuild one target's page, bypassing the cached copy.
+
+        Returns:
+            int: Number of articles cached
+        """
+        parts = target.split("|")
+        category = None if parts[-2] == "all" else parts[-2]
+        limit = int(parts[-1])
+        if parts[0] == "articles":
+            articles = await self.news_service.get_articles(category, limit, 0, refresh=True)
+        else:
+            articles = await self.prefetch_service.get_prefetched_articles(
+                category, limit, 0, user_id=parts[1], refresh=True
+            )
+            # The next page is prefetched in the background; finish it before
+            # the Celery task's event loop closes
+            await self.prefetch_service.wait_for_prefetches()
+        return len(articles)
+
+    async def run_cycle(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Flush pending access counts and warm the planned targets.
+
+        Returns:
+            Dict[str, Any]: Summary of the cycle
+        """
+        self.tracker.flush()
+        warmed = []
+        for target, score, ttl in self.plan(now):
+            try:
+                await self.warm_target(target)
+                warmed.append(target)
+            except Exception as e:
+                logger.error(f"Error warming {target}: {e}")
+        logger.info(f"Cache warm cycle refreshed {len(warmed)} targets")
+        return {"status": "completed", "warmed": warmed}
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """
+    Build a cache warmer from settings.
+
+    Returns:
+        CacheWarmer: Cache warmer instance
+    """
+    return CacheWarmer(
+        top_k=settings.WARM_TOP_K,
+        budget=settings.WARM_BUDGET,
+        lead_seconds=settings.WARM_LEAD_SECONDS
+    )
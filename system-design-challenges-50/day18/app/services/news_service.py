@@ -2,6 +2,7 @@ import json
 from typing import List, Optional, Dict, Any
 import asyncio
 import time
+import zlib
 
 from ..db.models import Article
 from ..db.session import SessionLocal
@@ -9,6 +10,11 @@ from ..services.cache import get_cache_service
 from ..core.config import settings
 from ..core.logging import logger
 
+# The simulated catalogue gives each category its own block of IDs, the way
+# a real table's primary keys are unique across categories
+CATEGORIES = ("general", "technology", "science", "business", "sports", "health", "entertainment")
+CATEGORY_ID_BLOCK = 1_000_000
+
 
 class NewsService:
     """Service for handling news articles."""
@@ -16,64 +22,74 @@ class NewsService:
     def __init__(self):
         self.cache_service = get_cache_service()
     
-    async def get_articles(self, category: Optional[str] = None, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+    async def get_articles(self, category: Optional[str] = None, limit: int = 10, offset: int = 0,
+                           refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Get articles with optional filtering by category.
         
+        List pages are cached as arrays of article IDs and hydrated from the
+        per-article keys, so an article body is stored once no matter how
+        many pages it appears on.
+        
         Args:
             category: Filter articles by category
             limit: Number of articles to return
             offset: Offset for pagination
+            refresh: Re-query the page even if it is cached (used by cache warming)
             
         Returns:
             List[Dict[str, Any]]: List of articles
+            
+        Raises:
+            Exception: If the page cannot be loaded, so the edge cache serves
+                its stale copy instead of caching an empty page
         """
         try:
             # Create cache key
             cache_key = f"articles:{category or 'all'}:{limit}:{offset}"
             
-            # Try to get from cache first
-            cached_data = self.cache_service.get(cache_key)
-            if cached_data:
-                logger.info(f"Articles found in cache for key: {cache_key}")
-                return json.loads(cached_data)
+            # Try to get the page's article IDs from cache first
+            cached_ids = None if refresh else self.cache_service.get(cache_key)
+            if cached_ids:
+                logger.info(f"Article IDs found in cache for key: {cache_key}")
+                return await self.get_articles_by_ids(json.loads(cached_ids))
             
             # If not in cache, get from database
             logger.info(f"Fetching articles from database for category: {category}")
+            articles = await self._query_articles(category, limit, offset)
             
-            # Simulate database query delay
-            await asyncio.sleep(0.1)
-            
-            # In a real implementation, you would query the database:
-            # db = SessionLocal()
-            # query = db.query(Article).filter(Article.is_published == True)
-            # if category:
-            #     query = query.filter(Article.category == category)
-            # articles = query.offset(offset).limit(limit).all()
-            
-            # For now, we'll simulate articles
-            articles = []
-            start_id = offset + 1
-            for i in range(limit):
-                article_id = start_id + i
-                articles.append({
-                    "id": article_id,
-                    "title": f"Sample Article {article_id}",
-                    "content": f"This is the content of sample article {article_id}. " * 10,
-                    "category": category or "general",
-                    "author": f"Author {article_id % 5 + 1}",
-                    "published_at": "2023-01-01T12:00:00Z",
-                    "views": article_id * 10
-                })
-            
-            # Cache the results
-            self.cache_service.set(cache_key, json.dumps(articles), settings.CACHE_TTL)
+            # Cache the page as IDs and the bodies under their own keys
+            self.cache_service.set(cache_key, json.dumps([a["id"] for a in articles]), settings.CACHE_TTL)
+            self._cache_articles(articles)
             
             return articles
             
         except Exception as e:
             logger.error(f"Error fetching articles: {e}")
-            return []
+            raise
+    
+    async def get_articles_by_ids(self, article_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Hydrate article bodies with one MGET, loading any misses in one query.
+        
+        Args:
+            article_ids: Article IDs in display order
+            
+        Returns:
+            List[Dict[str, Any]]: Articles in the same order, skipping unknown IDs
+        """
+        cached = self.cache_service.mget([f"article:{article_id}" for article_id in article_ids])
+        found = {
+            article_id: json.loads(body)
+            for article_id, body in zip(article_ids, cached) if body
+        }
+        missing = [article_id for article_id in article_ids if article_id not in found]
+        if missing:
+            logger.info(f"Loading {len(missing)} article bodies from database")
+            loaded = await self._load_articles(missing)
+            self._cache_articles(loaded)
+            found.update((article["id"], article) for article in loaded)
+        return [found[article_id] for article_id in article_ids if article_id in found]
     
     async def get_article(self, article_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -97,34 +113,76 @@ class NewsService:
             
             # If not in cache, get from database
             logger.info(f"Fetching article {article_id} from database")
-            
-            # Simulate database query delay
-            await asyncio.sleep(0.05)
-            
-            # In a real implementation, you would query the database:
-            # db = SessionLocal()
-            # article = db.query(Article).filter(Article.id == article_id, Article.is_published == True).first()
-            
-            # For now, we'll simulate an article
-            article = {
-                "id": article_id,
-                "title": f"Sample Article {article_id}",
-                "content": f"This is the detailed content of sample article {article_id}. " * 50,
-                "category": "technology",
-                "author": f"Author {article_id % 5 + 1}",
-                "published_at": "2023-01-01T12:00:00Z",
-                "views": article_id * 10
-            }
+            articles = await self._load_articles([article_id])
+            if not articles:
+                return None
             
             # Cache the result
-            self.cache_service.set(cache_key, json.dumps(article), settings.CACHE_TTL)
+            self._cache_articles(articles)
             
-            return article
+            return articles[0]
             
         except Exception as e:
             logger.error(f"Error fetching article {article_id}: {e}")
             return None
     
+    def _cache_articles(self, articles: List[Dict[str, Any]]) -> None:
+        """Write article bodies to their per-article keys in one pipeline."""
+        self.cache_service.set_many(
+            {f"article:{article['id']}": json.dumps(article) for article in articles},
+            settings.CACHE_TTL
+        )
+    
+    async def _query_articles(self, category: Optional[str], limit: int, offset: int) -> List[Dict[str, Any]]:
+        """Run the list query for one page."""
+        # Simulate database query delay
+        await asyncio.sleep(0.1)
+        
+        # In a real implementation, you would query the database:
+        # db = SessionLocal()
+        # query = db.query(Article).filter(Article.is_published == True)
+        # if category:
+        #     query = query.filter(Article.category == category)
+        # articles = query.offset(offset).limit(limit).all()
+        
+        # For now, we'll simulate articles
+        return [self._simulate_article(self._article_id(category or "general", offset + 1 + i))
+                for i in range(limit)]
+    
+    async def _load_articles(self, article_ids: List[int]) -> List[Dict[str, Any]]:
+        """Load many article bodies by primary key in one query."""
+        # Simulate database query delay
+        await asyncio.sleep(0.05)
+        
+        # In a real implementation, you would query the database:
+        # db = SessionLocal()
+        # articles = db.query(Article).filter(Article.id.in_(article_ids), Article.is_published == True).all()
+        
+        # For now, we'll simulate articles
+        return [self._simulate_article(article_id) for article_id in article_ids]
+    
+    @staticmethod
+    def _article_id(category: str, position: int) -> int:
+        """ID of the article at ``position`` (1-based) in a category's listing."""
+        if category in CATEGORIES:
+            block = CATEGORIES.index(category)
+        else:
+            block = len(CATEGORIES) + zlib.crc32(category.encode()) % 1000
+        return block * CATEGORY_ID_BLOCK + position
+    
+    @staticmethod
+    def _simulate_article(article_id: int) -> Dict[str, Any]:
+        block, position = divmod(article_id, CATEGORY_ID_BLOCK)
+        return {
+            "id": article_id,
+            "title": f"Sample Article {article_id}",
+            "content": f"This is the content of sample article {article_id}. " * 10,
+            "category": CATEGORIES[block] if block < len(CATEGORIES) else "general",
+            "author": f"Author {position % 5 + 1}",
+            "published_at": "2023-01-01T12:00:00Z",
+            "views": position * 10
+        }
+    
     async def record_view(self, article_id: int) -> bool:
         """
         Record a view for an article.
@@ -10,6 +10,10 @@ from ..core.config import settings
 from ..core.logging import logger
 
 
+# Next-page prefetches in flight, keyed by the page's cache key
+_pending_pages: Dict[str, asyncio.Task] = {}
+
+
 class PrefetchService:
     """Service for prefetching news articles based on user preferences."""
     
@@ -59,78 +63,40 @@ class PrefetchService:
             logger.error(f"Error fetching user preferences for user {user_id}: {e}")
             return None
     
-    async def get_prefetched_articles(self, category: Optional[str] = None, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+    async def get_prefetched_articles(self, category: Optional[str] = None, limit: int = 10, offset: int = 0,
+                                      user_id: str = "default_user", refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Get prefetched articles based on user preferences.
         
+        Serving a page also schedules the user's next page in the background,
+        so paging forward is a cache hit.
+        
         Args:
             category: Filter articles by category
             limit: Number of articles to return
             offset: Offset for pagination
+            user_id: User to personalise for (until authentication provides one)
+            refresh: Rebuild the page even if it is cached (used by cache warming)
             
         Returns:
             List[Dict[str, Any]]: List of prefetched articles
         """
         try:
-            # For demonstration, we'll use a default user ID
-            # In a real implementation, this would come from authentication
-            user_id = "default_user"
-            
             # Get user preferences
             preferences = await self.get_user_preferences(user_id)
             
-            # Create cache key
-            cache_key = f"prefetched_articles:{user_id}:{category or 'all'}:{limit}:{offset}"
-            
-            # Try to get from cache first
-            cached_data = self.cache_service.get(cache_key)
-            if cached_data:
+            # Try to get the page's article IDs from cache first
+            cache_key = self.page_key(user_id, category, limit, offset)
+            cached_ids = None if refresh else self.cache_service.get(cache_key)
+            if cached_ids:
                 logger.info(f"Prefetched articles found in cache for user: {user_id}")
-                return json.loads(cached_data)
-            
-            # If not in cache, generate prefetched articles
-            logger.info(f"Generating prefetched articles for user: {user_id}")
-            
-            # Get articles based on preferences
-            articles = []
-            
-            if preferences:
-                # Get articles from preferred categories
-                preferred_categories = preferences.get("preferred_categories", [])
-                
-                # Distribute limit among preferred categories
-                category_limit = max(1, limit // len(preferred_categories)) if preferred_categories else limit
-                
-                for pref_category in preferred_categories:
-                    if len(articles) >= limit:
-                        break
-                        
-                    # Get articles for this category
-                    category_articles = await self.news_service.get_articles(
-                        category=pref_category, 
-                        limit=category_limit, 
-                        offset=offset
-                    )
-                    
-                    # Add to results
-                    for article in category_articles:
-                        if len(articles) >= limit:
-                            break
-                        articles.append(article)
-            
-            # If we don't have enough articles, fill with general articles
-            if len(articles) < limit:
-                remaining = limit - len(articles)
-                general_articles = await self.news_service.get_articles(
-                    category=category,
-                    limit=remaining,
-                    offset=offset
-                )
-                articles.extend(general_articles[:remaining])
-            
-            # Cache the results
-            self.cache_service.set(cache_key, json.dumps(articles), settings.CACHE_TTL)
+                articles = await self.news_service.get_articles_by_ids(json.loads(cached_ids))
+            else:
+                logger.info(f"Generating prefetched articles for user: {user_id}")
+                articles = await self._build_page(preferences, category, limit, offset)
+                self.cache_service.set(cache_key, json.dumps([a["id"] for a in articles]), settings.CACHE_TTL)
             
+            self._schedule_next_page(user_id, preferences, category, limit, offset + limit)
             return articles
             
         except Exception as e:
@@ -138,6 +104,73 @@ class PrefetchService:
             # Fallback to regular news service
             return await self.news_service.get_articles(category, limit, offset)
     
+    @staticmethod
+    def page_key(user_id: str, category: Optional[str], limit: int, offset: int) -> str:
+        return f"prefetched_articles:{user_id}:{category or 'all'}:{limit}:{offset}"
+    
+    async def _build_page(self, preferences: Optional[Dict[str, Any]], category: Optional[str],
+                          limit: int, offset: int) -> List[Dict[str, Any]]:
+        """
+        Assemble a page from the user's preferred categories.
+        
+        Categories are fetched concurrently, so the page costs the slowest
+        category rather than the sum of all of them.
+        """
+        preferred_categories = (preferences or {}).get("preferred_categories", [])
+        articles: List[Dict[str, Any]] = []
+        
+        if preferred_categories:
+            # Distribute limit among preferred categories
+            category_limit = max(1, limit // len(preferred_categories))
+            results = await asyncio.gather(*(
+                self.news_service.get_articles(category=pref_category, limit=category_limit, offset=offset)
+                for pref_category in preferred_categories
+            ))
+            for category_articles in results:
+                articles.extend(category_articles[:limit - len(articles)])
+        
+        # If we don't have enough articles, fill with general articles
+        if len(articles) < limit:
+            remaining = limit - len(articles)
+            general_articles = await self.news_service.get_articles(
+                category=category,
+                limit=remaining,
+                offset=offset
+            )
+            articles.extend(general_articles[:remaining])
+        
+        return articles
+    
+    def _schedule_next_page(self, user_id: str, preferences: Optional[Dict[str, Any]],
+                            category: Optional[str], limit: int, offset: int) -> None:
+        """Precompute the user's next page in the background unless it is already cached."""
+        cache_key = self.page_key(user_id, category, limit, offset)
+        if cache_key in _pending_pages or self.cache_service.exists(cache_key):
+            return
+        
+        async def prefetch_next_page():
+            try:
+                articles = await self._build_page(preferences, category, limit, offset)
+                self.cache_service.set(cache_key, json.dumps([a["id"] for a in articles]), settings.CACHE_TTL)
+            except Exception as e:
+                logger.error(f"Error prefetching next page for user {user_id}: {e}")
+            finally:
+                _pending_pages.pop(cache_key, None)
+        
+        # Keep a reference so the task is not garbage collected mid-flight
+        _pending_pages[cache_key] = asyncio.ensure_future(prefetch_next_page())
+    
+    @staticmethod
+    async def wait_for_prefetches() -> None:
+        """
+        Wait for the next-page prefetches in flight.
+        
+        Callers that own their event loop (Celery tasks under asyncio.run)
+        must, or the prefetches are cancelled when the loop shuts down.
+        """
+        if _pending_pages:
+            await asyncio.gather(*list(_pending_pages.values()), return_exceptions=True)
+    
     async def prefetch_for_user(self, user_id: str) -> bool:
         """
         Prefetch articles for a user in the background.
@@ -152,7 +185,8 @@ class PrefetchService:
             logger.info(f"Starting prefetch for user: {user_id}")
             
             # Generate prefetched articles (this will cache them)
-            articles = await self.get_prefetched_articles(limit=settings.PREFETCH_LIMIT)
+            articles = await self.get_prefetched_articles(limit=settings.PREFETCH_LIMIT, user_id=user_id)
+            await self.wait_for_prefetches()
             
             logger.info(f"Prefetched {len(articles)} articles for user: {user_id}")
             return True
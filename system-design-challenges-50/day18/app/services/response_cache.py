@@ -0,0 +1,205 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import time
+
+from ..core.config import settings
+from ..core.logging import logger
+
+
+Origin = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class CachedResponse:
+    """Serialized response body plus the freshness window it was stored with."""
+    body: bytes
+    etag: str
+    max_age: int
+    stale_while_revalidate: int
+    stale_if_error: int
+    stored_at: float
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.monotonic()) - self.stored_at
+
+    def is_fresh(self, now: float) -> bool:
+        return self.age(now) < self.max_age
+
+    def can_serve_while_revalidating(self, now: float) -> bool:
+        return self.age(now) < self.max_age + self.stale_while_revalidate
+
+    def can_serve_on_error(self, now: float) -> bool:
+        return self.age(now) < self.max_age + max(self.stale_while_revalidate, self.stale_if_error)
+
+    @property
+    def cache_control(self) -> str:
+        return (f"public, max-age={self.max_age}, "
+                f"stale-while-revalidate={self.stale_while_revalidate}, "
+                f"stale-if-error={self.stale_if_error}")
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Weak comparison against an If-None-Match header value."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.replace("W/", "", 1) == self.etag for tag in tags)
+
+
+def parse_latency_budgets(spec: str) -> Dict[str, float]:
+    """
+    Parse ``region=ms`` pairs, e.g. ``"us-east=50,eu-west=80"``.
+
+    Returns:
+        Dict[str, float]: Budget in seconds per region
+    """
+    budgets = {}
+    for item in spec.split(","):
+        region, _, millis = item.partition("=")
+        if region.strip() and millis.strip():
+            budgets[region.strip()] = float(millis) / 1000
+    return budgets
+
+
+class ResponseCache:
+    """
+    In-process LRU of serialized API responses with HTTP freshness semantics.
+
+    Fresh entries and entries inside the stale-while-revalidate window are
+    returned straight from memory; the latter also start a background
+    refresh. Past that window, the origin is given the requesting region's
+    latency budget: if it answers in time the new body is served, otherwise
+    (or if it fails) the stale body is served while the refresh finishes in
+    the background, for as long as stale-if-error allows. Concurrent misses
+    for one key share a single origin call.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_age: int = 30,
+                 stale_while_revalidate: int = 60, stale_if_error: int = 300,
+                 latency_budgets: Optional[Dict[str, float]] = None,
+                 default_budget: float = 0.1):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.latency_budgets = latency_budgets or {}
+        self.default_budget = default_budget
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def budget_for(self, region: Optional[str]) -> float:
+        """Seconds the origin may take before a stale entry is served instead."""
+        return self.latency_budgets.get(region or settings.REGION, self.default_budget)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, value: Any) -> CachedResponse:
+        """Serialize ``value`` once and store the bytes."""
+        body = json.dumps(value, separators=(",", ":"), default=str).encode()
+        entry = CachedResponse(
+            body=body,
+            etag=f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"',
+            max_age=self.max_age,
+            stale_while_revalidate=self.stale_while_revalidate,
+            stale_if_error=self.stale_if_error,
+            stored_at=time.monotonic(),
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def _load(self, key: str, origin: Origin) -> Optional[CachedResponse]:
+        value = await origin()
+        if value is None:
+            return None
+        return self.put(key, value)
+
+    def _refresh(self, key: str, origin: Origin) -> asyncio.Future:
+        """Start (or join) the origin call for a key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, origin))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_refresh(key, done))
+        return task
+
+    def _finish_refresh(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error refreshing cached response {key}: {task.exception()}")
+
+    async def fetch(self, key: str, origin: Origin,
+                    region: Optional[str] = None) -> Tuple[Optional[CachedResponse], str]:
+        """
+        Return the response for ``key``, consulting the origin only when needed.
+
+        Args:
+            key: Cache key for the request
+            origin: Coroutine factory producing the JSON-serializable response, or None to skip caching
+            region: Requesting region, used to pick the latency budget
+
+        Returns:
+            Tuple[Optional[CachedResponse], str]: Entry (None if the origin had nothing) and
+            cache status: HIT, STALE, MISS or REFRESHED
+        """
+        now = time.monotonic()
+        entry = self.get(key)
+        if entry is not None and entry.is_fresh(now):
+            return entry, "HIT"
+        if entry is not None and entry.can_serve_while_revalidating(now):
+            self._refresh(key, origin)
+            return entry, "STALE"
+
+        task = self._refresh(key, origin)
+        if entry is not None and entry.can_serve_on_error(now):
+            try:
+                fresh = await asyncio.wait_for(asyncio.shield(task), self.budget_for(region))
+            except Exception:
+                # Over budget or origin failure: the refresh keeps running in the background
+                return entry, "STALE"
+            return (fresh, "REFRESHED") if fresh is not None else (entry, "STALE")
+
+        return await asyncio.shield(task), "MISS"
+
+
+# Global response cache instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get response cache instance.
+
+    Returns:
+        ResponseCache: Response cache instance
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.EDGE_CACHE_MAX_ENTRIES,
+            max_age=settings.EDGE_CACHE_MAX_AGE,
+            stale_while_revalidate=settings.EDGE_STALE_WHILE_REVALIDATE,
+            stale_if_error=settings.EDGE_STALE_IF_ERROR,
+            latency_budgets=parse_latency_budgets(settings.EDGE_LATENCY_BUDGETS),
+            default_budget=settings.EDGE_DEFAULT_BUDGET_MS / 1000,
+        )
+    return _response_cache
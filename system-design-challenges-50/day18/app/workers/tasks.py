@@ -4,6 +4,8 @@ import asyncio
 
 from ..core.config import settings
 from ..services.prefetch_service import PrefetchService
+from ..services.access_tracker import articles_target, get_access_tracker
+from ..services.cache_warmer import get_cache_warmer
 from ..core.logging import logger
 
 
@@ -22,11 +24,22 @@ celery_app.conf.update(
     task_routes={
         "prefetch_task": {"queue": "prefetch"},
         "cache_warm_task": {"queue": "cache"},
+        "access_decay_task": {"queue": "cache"},
+    },
+    beat_schedule={
+        "predictive-cache-warm": {
+            "task": "cache_warm_task",
+            "schedule": settings.WARM_INTERVAL_SECONDS,
+        },
+        "access-counter-decay": {
+            "task": "access_decay_task",
+            "schedule": 24 * 60 * 60,
+        },
     },
 )
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, name="prefetch_task")
 def prefetch_task(self, user_id: str) -> Dict[str, Any]:
     """
     Task to prefetch articles for a user.
@@ -46,20 +59,14 @@ def prefetch_task(self, user_id: str) -> Dict[str, Any]:
         # Create prefetch service
         prefetch_service = PrefetchService()
         
-        # Run prefetch
-        # Note: We need to run this in an async context
-        # For simplicity, we'll simulate the prefetching
-        logger.info(f"Prefetching articles for user: {user_id}")
-        
         # Update task state
         self.update_state(state="PROGRESS", meta={"status": "prefetching"})
         
-        # Simulate prefetching
-        import time
-        time.sleep(2)  # Simulate work
+        # Celery tasks are synchronous, so drive the async service in its own loop
+        success = asyncio.run(prefetch_service.prefetch_for_user(user_id))
         
         result = {
-            "status": "completed",
+            "status": "completed" if success else "failed",
             "user_id": user_id,
             "message": f"Prefetched articles for user {user_id}"
         }
@@ -76,10 +83,15 @@ def prefetch_task(self, user_id: str) -> Dict[str, Any]:
         }
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, name="cache_warm_task")
 def cache_warm_task(self, category: str = None) -> Dict[str, Any]:
     """
-    Task to warm up the cache with popular articles.
+    Task to warm up the cache ahead of predicted demand.
+    
+    Without a category this runs one predictive warming cycle: the pages
+    with the most requests in the upcoming hour are refreshed if they are
+    missing or about to expire, within the configured budget. With a
+    category, that category's first page is refreshed directly.
     
     Args:
         category: Category to warm up (optional)
@@ -93,13 +105,17 @@ def cache_warm_task(self, category: str = None) -> Dict[str, Any]:
         # Update task state
         self.update_state(state="PROGRESS", meta={"status": "initializing"})
         
-        # Simulate cache warming
-        import time
-        time.sleep(1)  # Simulate work
+        warmer = get_cache_warmer()
+        if category:
+            asyncio.run(warmer.warm_target(articles_target(category, 10)))
+            warmed = [category]
+        else:
+            warmed = asyncio.run(warmer.run_cycle())["warmed"]
         
         result = {
             "status": "completed",
             "category": category,
+            "warmed": warmed,
             "message": f"Warmed cache for category {category or 'all'}"
         }
         
@@ -112,4 +128,16 @@ def cache_warm_task(self, category: str = None) -> Dict[str, Any]:
             "status": "failed",
             "category": category,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+@celery_app.task(name="access_decay_task")
+def access_decay_task() -> Dict[str, Any]:
+    """
+    Task to halve access counters so demand predictions follow recent traffic.
+    
+    Returns:
+        Dict[str, Any]: Task result
+    """
+    get_access_tracker().decay(0.5)
+    return {"status": "completed"}
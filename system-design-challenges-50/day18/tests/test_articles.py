@@ -3,10 +3,18 @@ from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch, AsyncMock
 
 from app.main import app
+from app.services.response_cache import get_response_cache
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    get_response_cache().clear()
+    yield
+    get_response_cache().clear()
+
+
 @patch('app.services.news_service.NewsService.get_articles')
 def test_get_articles(mock_get_articles):
     """Test getting articles."""
@@ -74,4 +82,42 @@ def test_get_articles_with_prefetch(mock_get_prefetched_articles):
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 1
-    assert data[0]["title"] == "Prefetched Article 1"
\ No newline at end of file
+    assert data[0]["title"] == "Prefetched Article 1"
+
+
+@patch('app.services.news_service.NewsService.get_article')
+def test_get_article_served_from_edge_cache(mock_get_article):
+    """Test that repeat reads skip the service and honour If-None-Match."""
+    mock_get_article.return_value = {"id": 2, "title": "Cached Article"}
+
+    first = client.get("/v1/articles/2")
+    assert first.headers["X-Cache"] == "MISS"
+    assert "stale-while-revalidate" in first.headers["Cache-Control"]
+
+    second = client.get("/v1/articles/2")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == {"id": 2, "title": "Cached Article"}
+    assert mock_get_article.call_count == 1
+
+    not_modified = client.get("/v1/articles/2", headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+
+
+@patch('app.services.news_service.NewsService.get_articles')
+def test_get_articles_serves_stale_copy_when_origin_fails(mock_get_articles):
+    """Test that an origin failure falls back to the stale page instead of an empty one."""
+    mock_get_articles.return_value = [{"id": 1, "title": "Good Article"}]
+    assert client.get("/v1/articles/").status_code == 200
+
+    # Past stale-while-revalidate, still inside stale-if-error
+    entry = get_response_cache().get("articles:all:10:0:0")
+    entry.stored_at -= entry.max_age + entry.stale_while_revalidate + 1
+    mock_get_articles.side_effect = RuntimeError("database down")
+
+    response = client.get("/v1/articles/")
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "STALE"
+    assert response.json() == [{"id": 1, "title": "Good Article"}]
+
+    get_response_cache().clear()
+    assert client.get("/v1/articles/").status_code == 503
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import patch
+
+from app.services.access_tracker import AccessTracker, articles_target, prefetch_target
+from app.services.cache_warmer import CacheWarmer
+
+
+class FakeRedis:
+    """Just enough of the redis client for counters and TTL checks."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    def hincrby(self, key, field, amount):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = str(int(bucket.get(field, 0)) + amount)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def ttl(self, key):
+        return self.ttls.get(key, -2)
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+class FakeCacheService:
+    def __init__(self):
+        self.client = FakeRedis()
+
+
+@pytest.fixture
+def cache():
+    fake = FakeCacheService()
+    with patch("app.services.access_tracker.get_cache_service", return_value=fake), \
+            patch("app.services.cache_warmer.get_cache_service", return_value=fake), \
+            patch("app.services.news_service.get_cache_service", return_value=fake), \
+            patch("app.services.prefetch_service.get_cache_service", return_value=fake):
+        yield fake
+
+
+def test_tracker_ranks_by_hour_of_day(cache):
+    """Test that the upcoming hour's demand outranks all-day totals."""
+    tracker = AccessTracker(flush_threshold=1000)
+    morning = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+    evening = datetime(2024, 1, 1, 20, 0, tzinfo=timezone.utc)
+    for _ in range(5):
+        tracker.record(articles_target("business", 10), now=morning)
+    for _ in range(20):
+        tracker.record(articles_target("sports", 10), now=evening)
+    tracker.flush()
+
+    top = tracker.top_targets(8, k=2)
+    assert top[0][0] == articles_target("business", 10)
+
+
+def test_warmer_plans_missing_and_expiring_within_budget(cache):
+    """Test that only missing or soon-to-expire pages are refreshed, within budget."""
+    tracker = AccessTracker(flush_threshold=1000)
+    now = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+    targets = [articles_target(f"cat{i}", 10) for i in range(5)] + [prefetch_target("u1", None, 10)]
+    for count, target in enumerate(targets, start=1):
+        for _ in range(count):
+            tracker.record(target, now=now)
+    tracker.flush()
+
+    cache.client.ttls["articles:cat4:10:0"] = 250   # fresh
+    cache.client.ttls["articles:cat3:10:0"] = 30    # about to expire
+    warmer = CacheWarmer(tracker=tracker, top_k=10, budget=3, lead_seconds=120)
+
+    planned = [target for target, _, _ in warmer.plan(now)]
+    assert planned == [prefetch_target("u1", None, 10), articles_target("cat3", 10), articles_target("cat2", 10)]
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.services import prefetch_service
+from app.services.access_tracker import prefetch_target
+from app.services.cache_warmer import CacheWarmer
+from app.services.news_service import NewsService
+from app.services.prefetch_service import PrefetchService
+
+
+class FakeCache:
+    """In-memory stand-in for CacheService."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=3600):
+        self.data[key] = value
+        return True
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set_many(self, mapping, expire=3600):
+        self.data.update(mapping)
+        return True
+
+    def exists(self, key):
+        return key in self.data
+
+
+@pytest.fixture
+def cache():
+    fake = FakeCache()
+    with patch("app.services.news_service.get_cache_service", return_value=fake), \
+            patch("app.services.prefetch_service.get_cache_service", return_value=fake):
+        yield fake
+
+
+def test_list_pages_cache_article_ids(cache):
+    """Test that list pages store IDs and bodies are stored once per article."""
+    service = NewsService()
+    first = asyncio.run(service.get_articles("technology", limit=5, offset=0))
+    asyncio.run(service.get_articles("technology", limit=3, offset=2))
+
+    ids = [NewsService._article_id("technology", position) for position in range(1, 6)]
+    assert json.loads(cache.data["articles:technology:5:0"]) == ids
+    assert json.loads(cache.data["articles:technology:3:2"]) == ids[2:]
+    assert sum(key.startswith("article:") for key in cache.data) == 5
+
+    cached = asyncio.run(service.get_articles("technology", limit=5, offset=0))
+    assert cached == first
+
+
+def test_failed_page_is_not_cached_as_empty(cache):
+    """Test that a failed list query raises rather than returning an empty page."""
+    async def failing_query(self, category, limit, offset):
+        raise RuntimeError("database down")
+
+    with patch.object(NewsService, "_query_articles", failing_query):
+        with pytest.raises(RuntimeError):
+            asyncio.run(NewsService().get_articles("technology", limit=5))
+    assert "articles:technology:5:0" not in cache.data
+
+
+def test_categories_do_not_share_article_ids(cache):
+    """Test that pages of two categories never hydrate each other's bodies."""
+    service = NewsService()
+    technology = asyncio.run(service.get_articles("technology", limit=5, offset=0))
+    sports = asyncio.run(service.get_articles("sports", limit=5, offset=0))
+
+    assert not {a["id"] for a in technology} & {a["id"] for a in sports}
+    cached = asyncio.run(service.get_articles("sports", limit=5, offset=0))
+    assert cached == sports
+    assert all(article["category"] == "sports" for article in cached)
+
+    page = asyncio.run(PrefetchService().get_prefetched_articles(limit=9))
+    assert len({article["id"] for article in page}) == len(page)
+
+
+def test_prefetch_fetches_categories_concurrently(cache):
+    """Test that prefetch latency is max(category) rather than sum(category)."""
+    async def slow_query(self, category, limit, offset):
+        await asyncio.sleep(0.1)
+        return [NewsService._simulate_article(NewsService._article_id(category or "general", offset + 1 + i))
+                for i in range(limit)]
+
+    async def scenario():
+        with patch.object(NewsService, "_query_articles", slow_query):
+            start = time.perf_counter()
+            articles = await PrefetchService().get_prefetched_articles(limit=9)
+            elapsed = time.perf_counter() - start
+            await asyncio.gather(*prefetch_service._pending_pages.values())
+        return articles, elapsed
+
+    articles, elapsed = asyncio.run(scenario())
+    assert len(articles) == 9
+    assert elapsed < 0.25
+    # The next page was precomputed in the background
+    assert "prefetched_articles:default_user:all:9:9" in cache.data
+
+
+def test_warming_a_feed_finishes_its_next_page(cache):
+    """Test that the next-page prefetch survives the end of the warm task's event loop."""
+    warmer = CacheWarmer(tracker=object())
+    asyncio.run(warmer.warm_target(prefetch_target("u1", None, 9)))
+
+    assert "prefetched_articles:u1:all:9:9" in cache.data
+    assert not prefetch_service._pending_pages
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.response_cache import ResponseCache, parse_latency_budgets
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    fake = Clock()
+    # Replace the module's clock only; the event loop keeps real time
+    with patch("app.services.response_cache.time", Mock(monotonic=fake)):
+        yield fake
+
+
+def make_origin(value, delay=0.0, fail=False):
+    calls = []
+
+    async def origin():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("origin down")
+        return value
+
+    origin.calls = calls
+    return origin
+
+
+def test_parse_latency_budgets():
+    """Test that region budgets are read in milliseconds."""
+    assert parse_latency_budgets("us-east=50, eu-west=80,bad") == {"us-east": 0.05, "eu-west": 0.08}
+
+
+def test_fresh_entries_skip_origin(clock):
+    """Test that fresh entries are served from memory without calling the origin."""
+    cache = ResponseCache(max_age=30)
+
+    async def scenario():
+        origin = make_origin({"id": 1})
+        first, status = await cache.fetch("article:1", origin)
+        assert status == "MISS"
+        clock.now += 10
+        second, status = await cache.fetch("article:1", origin)
+        assert status == "HIT"
+        assert second.body == first.body == b'{"id":1}'
+        assert len(origin.calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_stale_while_revalidate_refreshes_in_background(clock):
+    """Test that stale entries are served immediately and replaced by the refresh."""
+    cache = ResponseCache(max_age=30, stale_while_revalidate=60)
+
+    async def scenario():
+        await cache.fetch("k", make_origin([1]))
+        clock.now += 45
+        entry, status = await cache.fetch("k", make_origin([2]))
+        assert (status, entry.body) == ("STALE", b"[1]")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        entry, status = await cache.fetch("k", make_origin([3]))
+        assert (status, entry.body) == ("HIT", b"[2]")
+
+    asyncio.run(scenario())
+
+
+def test_latency_budget_decides_stale_or_wait(clock):
+    """Test that a slow origin yields stale content within the region's budget."""
+    cache = ResponseCache(max_age=30, stale_while_revalidate=10, stale_if_error=300,
+                          latency_budgets={"eu-west": 0.01, "ap-southeast": 1.0})
+
+    async def scenario():
+        await cache.fetch("k", make_origin("old"))
+        clock.now += 100
+        entry, status = await cache.fetch("k", make_origin("slow", delay=0.2), region="eu-west")
+        assert (status, entry.body) == ("STALE", b'"old"')
+
+        cache.put("j", "old")
+        clock.now += 100
+        entry, status = await cache.fetch("j", make_origin("quick", delay=0.01), region="ap-southeast")
+        assert (status, entry.body) == ("REFRESHED", b'"quick"')
+
+    asyncio.run(scenario())
+
+
+def test_stale_if_error_and_miss_errors(clock):
+    """Test that origin failures fall back to stale bytes but propagate on a cold miss."""
+    cache = ResponseCache(max_age=30, stale_while_revalidate=10, stale_if_error=300)
+
+    async def scenario():
+        await cache.fetch("k", make_origin("old"))
+        clock.now += 100
+        entry, status = await cache.fetch("k", make_origin(None, fail=True))
+        assert (status, entry.body) == ("STALE", b'"old"')
+        with pytest.raises(RuntimeError):
+            await cache.fetch("cold", make_origin(None, fail=True))
+
+    asyncio.run(scenario())
+
+
+def test_lru_eviction_and_etag_matching():
+    """Test that the LRU drops the least recently used key and ETags compare weakly."""
+    cache = ResponseCache(max_entries=2)
+    a = cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") is a
+    assert a.matches(f'W/{a.etag}, "other"')
+    assert not a.matches('"other"')
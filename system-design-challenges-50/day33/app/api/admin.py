@@ -4,6 +4,7 @@ Admin and Metrics Endpoints
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, List
+from app.workers.replication_worker import replication_worker
 
 router = APIRouter()
 
@@ -37,6 +38,11 @@ async def rebalance_cluster():
         message="Cluster rebalancing initiated"
     )
 
+@router.get("/replication-lag", response_model=Dict[str, Dict[str, float]])
+async def get_replication_lag():
+    """Unshipped entries and seconds behind for each target region"""
+    return await replication_worker.lag()
+
 @router.get("/regions", response_model=List[str])
 async def list_regions():
     # Implementation will be added later
@@ -3,7 +3,14 @@ Key-Value Store CRUD Endpoints
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.consistency import ConsistencyLevel
+from app.db.kv_store import get_node
+from app.storage.record import Record
+from app.utils.logger import logger
+from app.utils.metrics import record_replication_event
+from app.workers.replication_worker import replication_worker
 
 router = APIRouter()
 
@@ -11,28 +18,83 @@ class KeyValueRequest(BaseModel):
     key: str
     value: str
     ttl: Optional[int] = None
+    # Vector clock from a previous read, so the write supersedes that version
+    context: Optional[Dict[str, int]] = None
 
 class KeyValueResponse(BaseModel):
     key: str
     value: str
     timestamp: float
+    vector_clock: Dict[str, int] = {}
+
+async def _replicate(record: Record) -> None:
+    """
+    Queue a committed write for the regions outside its quorum. The write
+    has already succeeded, so a full or unreachable replication log is
+    logged and counted rather than failed back to the client; Merkle
+    anti-entropy brings those regions up to date.
+    """
+    targets = get_node().coordinator.async_targets(record.key)
+    if not targets:
+        return
+    try:
+        await replication_worker.enqueue(record, targets)
+    except Exception as exc:
+        for region in targets:
+            record_replication_event(settings.REGION_ID, region, "dropped")
+        logger.warning(f"Could not queue {record.key} for {targets}: {exc}")
+
+def _to_response(record: Record) -> KeyValueResponse:
+    return KeyValueResponse(
+        key=record.key,
+        value=record.value,
+        timestamp=record.timestamp,
+        vector_clock=record.clock
+    )
 
 @router.post("/", response_model=KeyValueResponse)
-async def create_key_value(request: KeyValueRequest):
-    # Implementation will be added later
-    return KeyValueResponse(key=request.key, value=request.value, timestamp=1234567890.0)
+async def create_key_value(
+    request: KeyValueRequest,
+    consistency: ConsistencyLevel = ConsistencyLevel.STRONG,
+    w: Optional[int] = None
+):
+    record = await get_node().coordinator.put(
+        request.key, request.value, ttl=request.ttl, level=consistency, w=w, context=request.context
+    )
+    await _replicate(record)
+    return _to_response(record)
 
 @router.get("/{key}", response_model=KeyValueResponse)
-async def get_key_value(key: str):
-    # Implementation will be added later
-    return KeyValueResponse(key=key, value="sample_value", timestamp=1234567890.0)
+async def get_key_value(
+    key: str,
+    consistency: ConsistencyLevel = ConsistencyLevel.STRONG,
+    r: Optional[int] = None
+):
+    record = await get_node().coordinator.get(key, level=consistency, r=r)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Key {key} not found")
+    return _to_response(record)
 
 @router.put("/{key}", response_model=KeyValueResponse)
-async def update_key_value(key: str, request: KeyValueRequest):
-    # Implementation will be added later
-    return KeyValueResponse(key=key, value=request.value, timestamp=1234567890.0)
+async def update_key_value(
+    key: str,
+    request: KeyValueRequest,
+    consistency: ConsistencyLevel = ConsistencyLevel.STRONG,
+    w: Optional[int] = None
+):
+    record = await get_node().coordinator.put(
+        key, request.value, ttl=request.ttl, level=consistency, w=w, context=request.context
+    )
+    await _replicate(record)
+    return _to_response(record)
 
 @router.delete("/{key}")
-async def delete_key_value(key: str):
-    # Implementation will be added later
-    return {"message": f"Key {key} deleted successfully"}
\ No newline at end of file
+async def delete_key_value(
+    key: str,
+    consistency: ConsistencyLevel = ConsistencyLevel.STRONG,
+    w: Optional[int] = None
+):
+    if await get_node().coordinator.get(key, level=consistency) is None:
+        raise HTTPException(status_code=404, detail=f"Key {key} not found")
+    await _replicate(await get_node().coordinator.delete(key, level=consistency, w=w))
+    return {"message": f"Key {key} deleted successfully"}
@@ -1,9 +1,12 @@
 """
 Replication and Sync Endpoints
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
+from app.db.kv_store import get_node
+from app.storage.record import Record, decode_batch, encode_batch
+from app.workers.tasks import sync_region_task
 
 router = APIRouter()
 
@@ -16,6 +19,19 @@ class SyncRequest(BaseModel):
     region_id: str
     timestamp: float
 
+class RecordPayload(BaseModel):
+    key: str
+    value: Optional[str] = None
+    clock: Dict[str, int] = {}
+    timestamp: float
+    expires_at: Optional[float] = None
+
+class MerkleRequest(BaseModel):
+    nodes: Dict[int, List[int]]
+
+class LeavesRequest(BaseModel):
+    leaves: List[List[int]]
+
 class ReplicationResponse(BaseModel):
     status: str
     replicated_keys: int
@@ -31,10 +47,47 @@ async def replicate_data(request: ReplicationRequest):
     )
 
 @router.post("/sync", response_model=ReplicationResponse)
-async def sync_region(request: SyncRequest):
-    # Implementation will be added later
+async def sync_region(request: SyncRequest, background_tasks: BackgroundTasks):
+    # Anti-entropy runs after the response; progress shows up in replication metrics
+    background_tasks.add_task(sync_region_task, request.region_id, request.timestamp)
     return ReplicationResponse(
         status="success",
         replicated_keys=0,
         message=f"Sync initiated for region {request.region_id}"
-    )
\ No newline at end of file
+    )
+
+@router.post("/apply", response_model=RecordPayload)
+async def apply_record(payload: RecordPayload):
+    """Store a versioned record sent by a peer coordinator"""
+    record = get_node().storage_engine.apply(Record.from_dict(payload.dict()))
+    return RecordPayload(**record.to_dict())
+
+@router.get("/record/{key}", response_model=RecordPayload)
+async def read_record(key: str):
+    """Return this replica's newest version of a key, tombstones included"""
+    record = get_node().storage_engine.get_version(key)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Key {key} not found")
+    return RecordPayload(**record.to_dict())
+
+@router.post("/batch")
+async def apply_batch(request: Request):
+    """Apply a compressed batch of changes shipped by a peer's replication log"""
+    records = decode_batch(await request.body())
+    engine = get_node().storage_engine
+    for record in records:
+        engine.apply(record)
+    return {"applied": len(records)}
+
+@router.post("/merkle")
+async def merkle_hashes(request: MerkleRequest):
+    """Hashes of the requested Merkle tree nodes, keyed by partition"""
+    return {"hashes": get_node().merkle_index.node_hashes(request.nodes)}
+
+@router.post("/leaves")
+async def leaf_records(request: LeavesRequest):
+    """Every stored version in the requested Merkle leaves, as a compressed batch"""
+    node = get_node()
+    keys = node.merkle_index.leaf_keys(tuple(leaf) for leaf in request.leaves)
+    records = [record for record in map(node.storage_engine.get_version, keys) if record is not None]
+    return Response(content=encode_batch(records), media_type="application/octet-stream")
\ No newline at end of file
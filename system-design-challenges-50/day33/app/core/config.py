@@ -10,5 +10,23 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     REGION_ID: str = os.getenv("REGION_ID", "us-east-1")
+    STORAGE_DIR: str = os.getenv("STORAGE_DIR", "./data")
+    MEMTABLE_SIZE_BYTES: int = int(os.getenv("MEMTABLE_SIZE_BYTES", str(4 * 1024 * 1024)))
+    WAL_FSYNC: bool = os.getenv("WAL_FSYNC", "false").lower() == "true"
+    # Seconds tombstones survive compaction; keep above the longest replica outage
+    GC_GRACE_SECONDS: float = float(os.getenv("GC_GRACE_SECONDS", str(10 * 24 * 3600)))
+    # Comma-separated "region=url" pairs; the local region needs no url
+    CLUSTER_NODES: str = os.getenv("CLUSTER_NODES", "")
+    VIRTUAL_NODES: int = int(os.getenv("VIRTUAL_NODES", "160"))
+    REPLICATION_FACTOR: int = int(os.getenv("REPLICATION_FACTOR", "3"))
+    REPLICA_TIMEOUT: float = float(os.getenv("REPLICA_TIMEOUT", "0.5"))
+    HINT_REPLAY_INTERVAL: float = float(os.getenv("HINT_REPLAY_INTERVAL", "5.0"))
+    MAX_HINTS_PER_NODE: int = int(os.getenv("MAX_HINTS_PER_NODE", "100000"))
+    REPLICATION_BATCH_SIZE: int = int(os.getenv("REPLICATION_BATCH_SIZE", "500"))
+    REPLICATION_BATCH_WINDOW: float = float(os.getenv("REPLICATION_BATCH_WINDOW", "0.05"))
+    REPLICATION_MAX_BACKLOG: int = int(os.getenv("REPLICATION_MAX_BACKLOG", "1000000"))
+    MERKLE_PARTITION_BITS: int = int(os.getenv("MERKLE_PARTITION_BITS", "4"))
+    MERKLE_DEPTH: int = int(os.getenv("MERKLE_DEPTH", "10"))
+    REPLICATION_BACKPRESSURE_TIMEOUT: float = float(os.getenv("REPLICATION_BACKPRESSURE_TIMEOUT", "5.0"))
 
 settings = Settings()
\ No newline at end of file
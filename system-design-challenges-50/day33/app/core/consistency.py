@@ -2,7 +2,7 @@
 Consistency Strategies
 """
 from enum import Enum
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 class ConsistencyLevel(Enum):
     EVENTUAL = "eventual"
@@ -21,4 +21,20 @@ class ConsistencyStrategy:
             return 1000  # 1 second
         elif self.level == ConsistencyLevel.SEQUENTIAL:
             return 100   # 100ms
-        return 0  # Strong consistency - no delay
\ No newline at end of file
+        return 0  # Strong consistency - no delay
+    
+    def quorum(self, n: int, r: Optional[int] = None, w: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Read and write quorum sizes for a replication factor of n. Strong
+        reads and writes both wait for a majority so R + W > N; sequential
+        writes wait for a majority but read one replica; eventual waits for one.
+        Explicit r/w override the level and are clamped to [1, n].
+        """
+        majority = n // 2 + 1
+        if self.level == ConsistencyLevel.STRONG:
+            default_r, default_w = majority, majority
+        elif self.level == ConsistencyLevel.SEQUENTIAL:
+            default_r, default_w = 1, majority
+        else:
+            default_r, default_w = 1, 1
+        return max(1, min(n, r or default_r)), max(1, min(n, w or default_w))
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""
+Quorum Request Coordinator
+"""
+import asyncio
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.consistency import ConsistencyLevel, ConsistencyStrategy
+from app.core.hashing import ConsistentHasher
+from app.core.merkle import Leaf, MerkleIndex
+from app.core.vector_clock import VectorClock
+from app.storage.engine import StorageEngine
+from app.storage.record import Record, decode_batch, encode_batch, reconcile
+from app.utils.exceptions import RegionUnavailableError
+from app.utils.logger import logger
+
+
+class ReplicaClient:
+    """Transport to one replica node"""
+
+    async def apply(self, record: Record) -> Record:
+        raise NotImplementedError
+
+    async def read(self, key: str) -> Optional[Record]:
+        raise NotImplementedError
+
+    async def apply_batch(self, records: List[Record]) -> int:
+        for record in records:
+            await self.apply(record)
+        return len(records)
+
+    async def merkle_hashes(self, requests: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        raise NotImplementedError
+
+    async def leaf_records(self, leaves: List[Leaf]) -> List[Record]:
+        raise NotImplementedError
+
+
+class LocalReplica(ReplicaClient):
+    """The storage engine of the node running the coordinator"""
+
+    def __init__(self, engine: StorageEngine, merkle: Optional[MerkleIndex] = None):
+        self.engine = engine
+        self.merkle = merkle
+
+    async def apply(self, record: Record) -> Record:
+        return self.engine.apply(record)
+
+    async def read(self, key: str) -> Optional[Record]:
+        return self.engine.get_version(key)
+
+    async def apply_batch(self, records: List[Record]) -> int:
+        for record in records:
+            self.engine.apply(record)
+        return len(records)
+
+    async def merkle_hashes(self, requests: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        return self.merkle.node_hashes(requests)
+
+    async def leaf_records(self, leaves: List[Leaf]) -> List[Record]:
+        records = (self.engine.get_version(key) for key in self.merkle.leaf_keys(leaves))
+        return [record for record in records if record is not None]
+
+
+class HttpReplica(ReplicaClient):
+    """A peer region reached through its /replicate endpoints"""
+
+    def __init__(self, base_url: str, timeout: float = 1.0):
+        import httpx
+
+        self.client = httpx.AsyncClient(base_url=base_url.rstrip("/"), timeout=timeout)
+
+    async def apply(self, record: Record) -> Record:
+        response = await self.client.post("/replicate/apply", json=record.to_dict())
+        response.raise_for_status()
+        return Record.from_dict(response.json())
+
+    async def read(self, key: str) -> Optional[Record]:
+        response = await self.client.get(f"/replicate/record/{key}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return Record.from_dict(response.json())
+
+    async def apply_batch(self, records: List[Record]) -> int:
+        response = await self.client.post(
+            "/replicate/batch", content=encode_batch(records),
+            headers={"Content-Type": "application/octet-stream"}
+        )
+        response.raise_for_status()
+        return response.json()["applied"]
+
+    async def merkle_hashes(self, requests: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        response = await self.client.post("/replicate/merkle", json={"nodes": requests})
+        response.raise_for_status()
+        return {int(partition): hashes for partition, hashes in response.json()["hashes"].items()}
+
+    async def leaf_records(self, leaves: List[Leaf]) -> List[Record]:
+        response = await self.client.post("/replicate/leaves", json={"leaves": leaves})
+        response.raise_for_status()
+        return decode_batch(response.content)
+
+
+class HintedHandoff:
+    """
+    Per-node queues of writes that could not be delivered. Hints are replayed
+    in order, ``batch_size`` at a time through ``apply_batch``, and a node's
+    queue stops at the first failure, so a replica that is still down is
+    probed once per cycle rather than once per hint.
+    """
+
+    def __init__(self, max_hints_per_node: int = 100000, batch_size: int = 500):
+        self.max_hints_per_node = max_hints_per_node
+        self.batch_size = batch_size
+        self.hints: Dict[str, Deque[Record]] = {}
+
+    def add(self, node: str, record: Record) -> None:
+        self.hints.setdefault(node, deque(maxlen=self.max_hints_per_node)).append(record)
+
+    def pending(self) -> Dict[str, int]:
+        return {node: len(queue) for node, queue in self.hints.items() if queue}
+
+    async def replay(self, replicas: Dict[str, ReplicaClient], timeout: float) -> int:
+        """Deliver queued hints; returns how many were delivered"""
+        delivered = 0
+        # Snapshot: add() may create a queue for a new node while we await
+        for node, queue in list(self.hints.items()):
+            client = replicas.get(node)
+            while client is not None and queue:
+                batch = list(islice(queue, self.batch_size))
+                try:
+                    await asyncio.wait_for(client.apply_batch(batch), timeout)
+                except Exception as exc:
+                    logger.debug(f"Hint replay to {node} failed: {exc}")
+                    break
+                # Hints added meanwhile go to the back; a full queue may have
+                # dropped some of this batch from the front already
+                for record in batch:
+                    if queue and queue[0] is record:
+                        queue.popleft()
+                delivered += len(batch)
+        return delivered
+
+
+class QuorumCoordinator:
+    """
+    Dynamo-style coordinator: each key lives on the first N distinct nodes of
+    its preference list. Writes return after W acks, reads after R responses,
+    and the level or explicit r/w on each request picks the trade-off.
+    """
+
+    def __init__(self, node_id: str, ring: ConsistentHasher, replicas: Dict[str, ReplicaClient],
+                 replication_factor: int = 3, timeout: float = 0.5,
+                 handoff: Optional[HintedHandoff] = None):
+        self.node_id = node_id
+        self.ring = ring
+        self.replicas = replicas
+        self.replication_factor = replication_factor
+        self.timeout = timeout
+        self.handoff = handoff or HintedHandoff()
+        self._background: Set[asyncio.Task] = set()
+        self._replay_task: Optional[asyncio.Task] = None
+
+    def preference_list(self, key: str) -> List[str]:
+        return self.ring.get_preference_list(key, self.replication_factor)
+
+    def async_targets(self, key: str) -> List[str]:
+        """Regions that receive a key through the replication stream, not the quorum"""
+        preference = set(self.preference_list(key))
+        return [node for node in self.replicas if node not in preference]
+
+    def _spawn(self, coro) -> asyncio.Task:
+        # Keep a reference so fire-and-forget tasks are not garbage collected.
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def _apply(self, node: str, record: Record) -> Tuple[str, bool]:
+        client = self.replicas.get(node)
+        if client is not None:
+            try:
+                await asyncio.wait_for(client.apply(record), self.timeout)
+                return node, True
+            except Exception:
+                pass
+        self.handoff.add(node, record)
+        return node, False
+
+    async def _read(self, node: str, key: str) -> Tuple[str, bool, Optional[Record]]:
+        client = self.replicas.get(node)
+        if client is None:
+            return node, False, None
+        try:
+            return node, True, await asyncio.wait_for(client.read(key), self.timeout)
+        except Exception:
+            return node, False, None
+
+    async def _base_clock(self, key: str, context: Optional[Dict[str, int]]) -> Dict[str, int]:
+        if context is not None:
+            return context
+        local = self.replicas.get(self.node_id)
+        if isinstance(local, LocalReplica):
+            current = local.engine.get_version(key)
+            return current.clock if current else {}
+        return {}
+
+    async def put(self, key: str, value: Optional[str], ttl: Optional[int] = None,
+                  level: ConsistencyLevel = ConsistencyLevel.STRONG,
+                  w: Optional[int] = None, context: Optional[Dict[str, int]] = None) -> Record:
+        """
+        Version the write under this node's clock entry and send it to every
+        replica in parallel. Returns once W have acked; the remaining sends
+        keep running in the background and failures become hints.
+        """
+        preference = self.preference_list(key)
+        if not preference:
+            raise RegionUnavailableError("No nodes in the hash ring")
+        _, w = ConsistencyStrategy(level).quorum(len(preference), w=w)
+
+        clock = VectorClock.from_dict(self.node_id, await self._base_clock(key, context))
+        clock.tick()
+        now = time.time()
+        record = Record(key, value, clock.to_dict(), now, now + ttl if ttl else None)
+
+        acks = failures = 0
+        for next_done in asyncio.as_completed([self._spawn(self._apply(node, record))
+                                               for node in preference]):
+            _, ok = await next_done
+            if ok:
+                acks += 1
+                if acks >= w:
+                    return record
+            else:
+                failures += 1
+                if len(preference) - failures < w:
+                    break
+        raise RegionUnavailableError(
+            f"Write quorum not reached for {key}: {acks}/{w} acks from {len(preference)} replicas"
+        )
+
+    async def delete(self, key: str, level: ConsistencyLevel = ConsistencyLevel.STRONG,
+                     w: Optional[int] = None) -> Record:
+        return await self.put(key, None, level=level, w=w)
+
+    async def get_version(self, key: str, level: ConsistencyLevel = ConsistencyLevel.STRONG,
+                          r: Optional[int] = None) -> Optional[Record]:
+        """
+        Query R replicas (falling through to the rest of the preference list
+        when some fail), reconcile their versions, and repair stale replicas
+        in the background. Returns tombstones too.
+        """
+        preference = self.preference_list(key)
+        if not preference:
+            raise RegionUnavailableError("No nodes in the hash ring")
+        r, _ = ConsistencyStrategy(level).quorum(len(preference), r=r)
+
+        responses: Dict[str, Optional[Record]] = {}
+        candidates = list(preference)
+        while len(responses) < r and candidates:
+            batch, candidates = candidates[:r - len(responses)], candidates[r - len(responses):]
+            for node, ok, record in await asyncio.gather(*(self._read(node, key) for node in batch)):
+                if ok:
+                    responses[node] = record
+        if len(responses) < r:
+            raise RegionUnavailableError(
+                f"Read quorum not reached for {key}: {len(responses)}/{r} replicas responded"
+            )
+
+        versions = [record for record in responses.values() if record is not None]
+        if not versions:
+            return None
+        winner = versions[0]
+        for record in versions[1:]:
+            winner = reconcile(record, winner)
+
+        stale = [node for node, record in responses.items()
+                 if record is None or record.clock != winner.clock]
+        if stale:
+            self._spawn(self._repair(stale, winner))
+        return winner
+
+    async def get(self, key: str, level: ConsistencyLevel = ConsistencyLevel.STRONG,
+                  r: Optional[int] = None) -> Optional[Record]:
+        """Live value of a key at the requested consistency level"""
+        record = await self.get_version(key, level, r)
+        if record is None or not record.is_live():
+            return None
+        return record
+
+    async def _repair(self, nodes: Iterable[str], record: Record) -> None:
+        await asyncio.gather(*(self._apply(node, record) for node in nodes))
+
+    async def replay_hints(self) -> int:
+        return await self.handoff.replay(self.replicas, self.timeout)
+
+    async def _replay_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.replay_hints()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"Hinted handoff replay failed: {exc}")
+
+    def start(self, interval: float = 5.0) -> None:
+        """Start replaying hinted handoffs in the background"""
+        if self._replay_task is None:
+            self._replay_task = asyncio.ensure_future(self._replay_loop(interval))
+
+    async def stop(self) -> None:
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            self._replay_task = None
+        for task in list(self._background):
+            task.cancel()
@@ -1,48 +1,205 @@
 """
 Consistent Hashing and Partitioning
 """
+import bisect
 import hashlib
-from typing import List, Dict, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Hashes are truncated to 64 bits, which is plenty of resolution for a ring
+# of a few thousand virtual nodes and keeps every ring position a small int.
+RING_BITS = 64
+RING_SIZE = 1 << RING_BITS
+
+
+def ring_hash(key: str) -> int:
+    """Map a key onto the ring"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+@dataclass(frozen=True)
+class KeyRange:
+    """
+    A slice of the ring whose owner changed after a membership change.
+
+    Covers hashes ``h`` with ``start < h <= end``; when ``start >= end`` the
+    range wraps past zero.
+    """
+    start: int
+    end: int
+    source: Optional[str]
+    target: Optional[str]
+
+    def contains(self, hash_key: int) -> bool:
+        if self.start < self.end:
+            return self.start < hash_key <= self.end
+        return hash_key > self.start or hash_key <= self.end
+
+    def contains_key(self, key: str) -> bool:
+        return self.contains(ring_hash(key))
+
 
 class ConsistentHasher:
-    def __init__(self, nodes: List[str], replicas: int = 3):
-        self.replicas = replicas
+    def __init__(self, nodes: List[str], vnodes: int = 160,
+                 weights: Optional[Dict[str, float]] = None):
+        if vnodes < 1:
+            raise ValueError("vnodes must be at least 1")
+        self.vnodes = vnodes
         self.ring: Dict[int, str] = {}
         self.sorted_keys: List[int] = []
-        
+        self.weights: Dict[str, float] = {}
+        self._points: Dict[str, List[int]] = {}
+
+        weights = weights or {}
         for node in nodes:
-            self.add_node(node)
-    
+            self._insert(node, weights.get(node, 1.0))
+        self._rebuild()
+
     def _hash(self, key: str) -> int:
         """Generate hash for a key"""
-        return int(hashlib.md5(key.encode()).hexdigest(), 16)
-    
-    def add_node(self, node: str) -> None:
-        """Add a node to the hash ring"""
-        for i in range(self.replicas):
-            key = self._hash(f"{node}:{i}")
-            self.ring[key] = node
-            self.sorted_keys.append(key)
-        self.sorted_keys.sort()
-    
-    def remove_node(self, node: str) -> None:
-        """Remove a node from the hash ring"""
-        for i in range(self.replicas):
-            key = self._hash(f"{node}:{i}")
-            if key in self.ring:
-                del self.ring[key]
-            if key in self.sorted_keys:
-                self.sorted_keys.remove(key)
-    
+        return ring_hash(key)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._points)
+
+    def _vnode_count(self, weight: float) -> int:
+        return max(1, int(round(self.vnodes * weight)))
+
+    def _insert(self, node: str, weight: float) -> None:
+        if weight <= 0:
+            raise ValueError(f"weight for {node} must be positive")
+        points = []
+        for i in range(self._vnode_count(weight)):
+            point = self._hash(f"{node}#{i}")
+            # A collision between two nodes is astronomically unlikely on a
+            # 64-bit ring; the first owner keeps the point so lookups stay
+            # deterministic regardless of insertion order within a node.
+            if point not in self.ring:
+                self.ring[point] = node
+                points.append(point)
+        self.weights[node] = weight
+        self._points[node] = points
+
+    def _evict(self, node: str) -> None:
+        for point in self._points.pop(node, []):
+            del self.ring[point]
+        self.weights.pop(node, None)
+
+    def _rebuild(self) -> None:
+        self.sorted_keys = sorted(self.ring)
+
+    def _snapshot(self) -> Tuple[List[int], Dict[int, str]]:
+        return self.sorted_keys, dict(self.ring)
+
+    def add_node(self, node: str, weight: float = 1.0) -> List[KeyRange]:
+        """Add a node to the hash ring and return the key ranges it takes over"""
+        if node in self._points:
+            return self.set_weight(node, weight)
+        before = self._snapshot()
+        self._insert(node, weight)
+        self._rebuild()
+        return self._moved_ranges(before)
+
+    def remove_node(self, node: str) -> List[KeyRange]:
+        """Remove a node from the hash ring and return the key ranges it hands off"""
+        if node not in self._points:
+            return []
+        before = self._snapshot()
+        self._evict(node)
+        self._rebuild()
+        return self._moved_ranges(before)
+
+    def set_weight(self, node: str, weight: float) -> List[KeyRange]:
+        """Change a node's share of the ring and return the key ranges that move"""
+        if self.weights.get(node) == weight:
+            return []
+        before = self._snapshot()
+        self._evict(node)
+        self._insert(node, weight)
+        self._rebuild()
+        return self._moved_ranges(before)
+
+    def _index(self, hash_key: int) -> int:
+        idx = bisect.bisect_left(self.sorted_keys, hash_key)
+        return 0 if idx == len(self.sorted_keys) else idx
+
     def get_node(self, key: str) -> Optional[str]:
         """Get the node responsible for a key"""
-        if not self.ring:
+        if not self.sorted_keys:
             return None
-        
-        hash_key = self._hash(key)
-        for ring_key in self.sorted_keys:
-            if hash_key <= ring_key:
-                return self.ring[ring_key]
-        
-        # Wrap around to the first node
-        return self.ring[self.sorted_keys[0]]
\ No newline at end of file
+        return self.ring[self.sorted_keys[self._index(self._hash(key))]]
+
+    def get_nodes(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Resolve the owner of many keys in one pass"""
+        sorted_keys = self.sorted_keys
+        if not sorted_keys:
+            return {key: None for key in keys}
+        ring = self.ring
+        size = len(sorted_keys)
+        search = bisect.bisect_left
+        hash_fn = self._hash
+        owners = {}
+        for key in keys:
+            idx = search(sorted_keys, hash_fn(key))
+            owners[key] = ring[sorted_keys[idx if idx < size else 0]]
+        return owners
+
+    def get_preference_list(self, key: str, n: int) -> List[str]:
+        """
+        Walk clockwise from a key and return the first ``n`` distinct nodes.
+        The first entry is the coordinator; the rest hold replicas.
+        """
+        if not self.sorted_keys or n <= 0:
+            return []
+        n = min(n, len(self._points))
+        start = self._index(self._hash(key))
+        size = len(self.sorted_keys)
+        preference: List[str] = []
+        for offset in range(size):
+            node = self.ring[self.sorted_keys[(start + offset) % size]]
+            if node not in preference:
+                preference.append(node)
+                if len(preference) == n:
+                    break
+        return preference
+
+    def _moved_ranges(self, before: Tuple[List[int], Dict[int, str]]) -> List[KeyRange]:
+        """
+        Diff the ring against a previous snapshot. Every interval between two
+        adjacent boundary points (from either ring) has a single owner in each
+        ring, so comparing owners per interval gives the exact set of ranges to
+        stream; adjacent intervals with the same handoff are merged.
+        """
+        old_keys, old_ring = before
+        new_keys, new_ring = self.sorted_keys, self.ring
+        boundaries = sorted(set(old_keys) | set(new_keys))
+        if not boundaries:
+            return []
+
+        def owner(keys: List[int], ring: Dict[int, str], point: int) -> Optional[str]:
+            if not keys:
+                return None
+            idx = bisect.bisect_left(keys, point)
+            return ring[keys[idx if idx < len(keys) else 0]]
+
+        moved: List[KeyRange] = []
+        prev = boundaries[-1]
+        for point in boundaries:
+            source = owner(old_keys, old_ring, point)
+            target = owner(new_keys, new_ring, point)
+            if source != target:
+                last = moved[-1] if moved else None
+                if last and last.end == prev and last.source == source and last.target == target:
+                    moved[-1] = KeyRange(last.start, point, source, target)
+                else:
+                    moved.append(KeyRange(prev, point, source, target))
+            prev = point
+
+        # The first and last intervals meet at the wrap point.
+        if len(moved) > 1:
+            first, last = moved[0], moved[-1]
+            if last.end == first.start and last.source == first.source and last.target == first.target:
+                moved[0] = KeyRange(last.start, first.end, first.source, first.target)
+                moved.pop()
+        return moved
@@ -0,0 +1,135 @@
+"""
+Merkle Trees for Anti-Entropy
+"""
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.hashing import RING_BITS, ring_hash
+
+Leaf = Tuple[int, int]  # (partition, leaf index)
+
+
+def record_digest(key: str, clock: Dict[str, int], deleted: bool) -> int:
+    """64-bit digest of one key version"""
+    payload = json.dumps([key, sorted(clock.items()), deleted], separators=(",", ":"))
+    return int.from_bytes(hashlib.blake2b(payload.encode(), digest_size=8).digest(), "big")
+
+
+class MerkleTree:
+    """
+    Fixed-depth binary tree over one partition's slice of the ring. Leaves
+    are the XOR of their items' digests, so a write updates its leaf in O(1);
+    inner nodes hash their children and are only recomputed when read.
+    """
+
+    def __init__(self, depth: int):
+        self.depth = depth
+        self.hashes: List[int] = [0] * (1 << (depth + 1))
+        self._dirty: Set[int] = set()
+
+    def toggle(self, leaf: int, digest: int) -> None:
+        """XOR a digest into a leaf (adding and removing are the same operation)"""
+        node = (1 << self.depth) + leaf
+        self.hashes[node] ^= digest
+        node >>= 1
+        while node and node not in self._dirty:
+            self._dirty.add(node)
+            node >>= 1
+
+    def node_hash(self, node: int) -> int:
+        if node in self._dirty:
+            left, right = self.node_hash(2 * node), self.node_hash(2 * node + 1)
+            digest = hashlib.blake2b(
+                left.to_bytes(8, "big") + right.to_bytes(8, "big"), digest_size=8
+            ).digest()
+            self.hashes[node] = int.from_bytes(digest, "big")
+            self._dirty.discard(node)
+        return self.hashes[node]
+
+    def is_leaf(self, node: int) -> bool:
+        return node >= 1 << self.depth
+
+    def leaf_index(self, node: int) -> int:
+        return node - (1 << self.depth)
+
+
+class MerkleIndex:
+    """
+    Per-partition Merkle trees over (key, vector clock) for one replica.
+    The top ``partition_bits`` of a key's ring hash pick its partition and
+    the next ``depth`` bits pick its leaf, so every leaf covers a contiguous
+    hash range. The index keeps each leaf's key -> digest map to make
+    incremental updates and leaf-range transfers cheap.
+    """
+
+    def __init__(self, partition_bits: int = 4, depth: int = 10):
+        self.partition_bits = partition_bits
+        self.depth = depth
+        self.trees = [MerkleTree(depth) for _ in range(1 << partition_bits)]
+        self._leaves: Dict[Leaf, Dict[str, int]] = {}
+
+    def locate(self, key: str) -> Leaf:
+        h = ring_hash(key)
+        partition = h >> (RING_BITS - self.partition_bits)
+        leaf = (h >> (RING_BITS - self.partition_bits - self.depth)) & ((1 << self.depth) - 1)
+        return partition, leaf
+
+    def update(self, record) -> None:
+        """Fold a newly stored version of a key into its leaf"""
+        position = self.locate(record.key)
+        items = self._leaves.setdefault(position, {})
+        tree = self.trees[position[0]]
+        previous = items.get(record.key)
+        if previous is not None:
+            tree.toggle(position[1], previous)
+        digest = record_digest(record.key, record.clock, record.value is None)
+        items[record.key] = digest
+        tree.toggle(position[1], digest)
+
+    def rebuild(self, records: Iterable) -> None:
+        for record in records:
+            self.update(record)
+
+    def node_hashes(self, requests: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        """Hashes of the requested nodes, keyed by partition"""
+        return {partition: [self.trees[partition].node_hash(node) for node in nodes]
+                for partition, nodes in requests.items()}
+
+    def leaf_keys(self, leaves: Iterable[Leaf]) -> List[str]:
+        keys: List[str] = []
+        for leaf in leaves:
+            keys.extend(self._leaves.get(tuple(leaf), {}))
+        return keys
+
+    @property
+    def partitions(self) -> int:
+        return len(self.trees)
+
+
+async def divergent_leaves(local: MerkleIndex, remote_hashes,
+                           partitions: Optional[Iterable[int]] = None) -> List[Leaf]:
+    """
+    Walk both replicas' trees top-down and return the leaves that differ.
+    ``remote_hashes`` is a coroutine function taking and returning
+    {partition: [node hashes]}; it is called once per tree level, and only
+    subtrees whose hashes differ are descended into, so the cost tracks the
+    size of the divergence rather than the size of the region.
+    """
+    frontier: Dict[int, List[int]] = {p: [1] for p in (partitions or range(local.partitions))}
+    leaves: List[Leaf] = []
+    while frontier:
+        theirs = await remote_hashes(frontier)
+        ours = local.node_hashes(frontier)
+        next_frontier: Dict[int, List[int]] = {}
+        for partition, nodes in frontier.items():
+            tree = local.trees[partition]
+            for node, mine, other in zip(nodes, ours[partition], theirs[partition]):
+                if mine == other:
+                    continue
+                if tree.is_leaf(node):
+                    leaves.append((partition, tree.leaf_index(node)))
+                else:
+                    next_frontier.setdefault(partition, []).extend((2 * node, 2 * node + 1))
+        frontier = next_frontier
+    return leaves
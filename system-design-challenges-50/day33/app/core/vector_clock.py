@@ -28,17 +28,21 @@ class VectorClock:
          0 if clocks are concurrent
          1 if this clock is newer
         """
-        self_newer = all(self.clock[node] >= other_clock.get(node, 0) for node in self.clock)
-        other_newer = all(other_clock.get(node, 0) >= self.clock[node] for node in other_clock)
+        nodes = set(self.clock) | set(other_clock)
+        self_newer = all(self.clock.get(node, 0) >= other_clock.get(node, 0) for node in nodes)
+        other_newer = all(other_clock.get(node, 0) >= self.clock.get(node, 0) for node in nodes)
         
         if self_newer and not other_newer:
             return 1
         elif other_newer and not self_newer:
             return -1
-        elif self.clock == other_clock:
-            return 0
         else:
-            return 0  # Concurrent
+            return 0  # Equal or concurrent
+    
+    def merge(self, other_clock: Dict[str, int]) -> None:
+        """Take the pointwise maximum with another clock without ticking"""
+        for node, timestamp in other_clock.items():
+            self.clock[node] = max(self.clock.get(node, 0), timestamp)
     
     def to_dict(self) -> Dict[str, int]:
         """Convert clock to dictionary"""
@@ -0,0 +1,73 @@
+"""
+Local Storage Engine and Request Coordinator Instances
+"""
+import os
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.coordinator import HintedHandoff, HttpReplica, LocalReplica, QuorumCoordinator, ReplicaClient
+from app.core.hashing import ConsistentHasher
+from app.core.merkle import MerkleIndex
+from app.storage.engine import StorageEngine
+
+def build_replicas(local: LocalReplica) -> Dict[str, ReplicaClient]:
+    """Parse CLUSTER_NODES ("region=url,...") into replica clients"""
+    replicas: Dict[str, ReplicaClient] = {settings.REGION_ID: local}
+    for entry in filter(None, (part.strip() for part in settings.CLUSTER_NODES.split(","))):
+        region, _, url = entry.partition("=")
+        if region != settings.REGION_ID:
+            replicas[region] = HttpReplica(url, timeout=settings.REPLICA_TIMEOUT)
+    return replicas
+
+class RegionNode:
+    """This region's storage engine, Merkle index and request coordinator"""
+
+    def __init__(self, directory: str):
+        self.storage_engine = StorageEngine(
+            directory,
+            node_id=settings.REGION_ID,
+            memtable_size_bytes=settings.MEMTABLE_SIZE_BYTES,
+            wal_fsync=settings.WAL_FSYNC,
+            gc_grace=settings.GC_GRACE_SECONDS,
+        )
+
+        # Merkle trees over this node's keys, kept current on every stored version
+        self.merkle_index = MerkleIndex(settings.MERKLE_PARTITION_BITS, settings.MERKLE_DEPTH)
+        self.merkle_index.rebuild(self.storage_engine.items(include_deleted=True))
+        self.storage_engine.add_write_listener(self.merkle_index.update)
+
+        self.replicas = build_replicas(LocalReplica(self.storage_engine, self.merkle_index))
+
+        # Routes client requests to the key's replicas
+        self.coordinator = QuorumCoordinator(
+            settings.REGION_ID,
+            ConsistentHasher(list(self.replicas), vnodes=settings.VIRTUAL_NODES),
+            self.replicas,
+            replication_factor=settings.REPLICATION_FACTOR,
+            timeout=settings.REPLICA_TIMEOUT,
+            handoff=HintedHandoff(settings.MAX_HINTS_PER_NODE),
+        )
+
+    def close(self) -> None:
+        self.storage_engine.close()
+
+_node: Optional[RegionNode] = None
+
+def open_node(directory: Optional[str] = None) -> RegionNode:
+    """
+    Open this region's store in ``directory`` (default STORAGE_DIR/REGION_ID),
+    closing the one already open
+    """
+    global _node
+    close_node()
+    _node = RegionNode(directory or os.path.join(settings.STORAGE_DIR, settings.REGION_ID))
+    return _node
+
+def get_node() -> RegionNode:
+    """The open region node, opened on first use"""
+    return _node or open_node()
+
+def close_node() -> None:
+    global _node
+    if _node is not None:
+        _node.close()
+        _node = None
@@ -1,5 +1,9 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.config import settings
+from app.utils.metrics import metrics_store, record_request
+from app.utils.exceptions import GeoKVError, handle_exception
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -9,6 +13,8 @@ app = FastAPI(
 
 # Import routers
 from app.api import health, kv, replication, admin
+from app.db.kv_store import close_node, get_node
+from app.workers.replication_worker import replication_worker
 
 # Include routers
 app.include_router(health.router, prefix="/health", tags=["health"])
@@ -16,10 +22,40 @@ app.include_router(kv.router, prefix="/kv", tags=["kv"])
 app.include_router(replication.router, prefix="/replicate", tags=["replication"])
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
+@app.on_event("startup")
+async def startup():
+    get_node().coordinator.start(settings.HINT_REPLAY_INTERVAL)
+    replication_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    replication_worker.stop()
+    await get_node().coordinator.stop()
+    close_node()
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw URL, so series count stays bounded
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", "unmatched")
+    record_request(request.method, endpoint, response.status_code, time.perf_counter() - start)
+    return response
+
+@app.exception_handler(GeoKVError)
+async def geo_kv_error_handler(request: Request, exc: GeoKVError):
+    error = handle_exception(exc)
+    return JSONResponse(status_code=error["status_code"], content={"detail": error["error"], "message": str(exc)})
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Day 33 - Geo-Distributed Key-Value Store"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics_store.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 @app.get("/hello")
 async def hello():
     return {"message": "Hello from day33"}
@@ -0,0 +1,3 @@
+"""
+Embedded LSM Storage Engine
+"""
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Bloom Filter
+"""
+import hashlib
+import math
+import struct
+from typing import Tuple
+
+
+class BloomFilter:
+    def __init__(self, num_bits: int, num_hashes: int, bits: bytearray = None):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.01) -> "BloomFilter":
+        """Size a filter for an expected number of keys and false-positive rate"""
+        capacity = max(1, capacity)
+        num_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = int(round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _hashes(self, key: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, key: str) -> None:
+        h1, h2 = self._hashes(key)
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+
+    def might_contain(self, key: str) -> bool:
+        h1, h2 = self._hashes(key)
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            if not self.bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+    __contains__ = might_contain
+
+    def to_bytes(self) -> bytes:
+        return struct.pack(">II", self.num_bits, self.num_hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        num_bits, num_hashes = struct.unpack_from(">II", data)
+        return cls(num_bits, num_hashes, bytearray(data[8:]))
@@ -0,0 +1,77 @@
+"""
+Size-Tiered Compaction
+"""
+import heapq
+import time
+from dataclasses import replace
+from typing import Iterator, Optional, Sequence, Tuple
+
+from app.storage.record import Record
+from app.storage.sstable import SSTable
+
+# How long tombstones and expired records outlive the delete or expiry
+# (Cassandra's default); must exceed how long hints, replication logs and
+# anti-entropy can take to reach a replica that missed the delete
+DEFAULT_GC_GRACE = 10 * 24 * 3600.0
+
+
+class SizeTieredCompaction:
+    """
+    Picks runs of similarly sized tables to merge. Tables are ordered newest
+    first and only contiguous runs are chosen, so the merged output can take
+    the run's place without changing which version of a key wins.
+    """
+
+    def __init__(self, min_threshold: int = 4, max_threshold: int = 32,
+                 bucket_low: float = 0.5, bucket_high: float = 1.5):
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.bucket_low = bucket_low
+        self.bucket_high = bucket_high
+
+    def pick(self, tables: Sequence[SSTable]) -> Optional[Tuple[int, int]]:
+        """Return the [start, end) slice to compact, preferring the smallest tier"""
+        best: Optional[Tuple[int, int]] = None
+        best_avg = float("inf")
+        start = 0
+        while start < len(tables):
+            end, total = start + 1, tables[start].size
+            while end < len(tables) and end - start < self.max_threshold:
+                avg = total / (end - start)
+                if not self.bucket_low * avg <= tables[end].size <= self.bucket_high * avg:
+                    break
+                total += tables[end].size
+                end += 1
+            if end - start >= self.min_threshold and total / (end - start) < best_avg:
+                best, best_avg = (start, end), total / (end - start)
+            start = end
+        return best
+
+
+def merge_tables(tables: Sequence[SSTable], older: Sequence[SSTable],
+                 now: Optional[float] = None, gc_grace: float = DEFAULT_GC_GRACE) -> Iterator[Record]:
+    """
+    K-way merge of ``tables`` (newest first) keeping the newest version of each
+    key. Tombstones and expired records are kept as they are for ``gc_grace``
+    seconds, so a replica that missed the delete cannot hand the old value
+    back through hinted handoff, replication or Merkle sync. After that they
+    are dropped outright when no older table can still hold the key;
+    otherwise they are kept as tombstones so the older value is not
+    resurrected.
+    """
+    now = now or time.time()
+    streams = [((record.key, rank, record) for record in table)
+               for rank, table in enumerate(tables)]
+    last_key = None
+    for key, _, record in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+        if key == last_key:
+            continue
+        last_key = key
+        if record.is_live(now):
+            yield record
+            continue
+        deleted_at = record.timestamp if record.is_tombstone else record.expires_at
+        if deleted_at + gc_grace > now:
+            yield record
+        elif any(table.might_contain(key) for table in older):
+            yield record if record.is_tombstone else replace(record, value=None, expires_at=None)
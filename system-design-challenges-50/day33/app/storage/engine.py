@@ -0,0 +1,304 @@
+"""
+LSM Storage Engine
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.vector_clock import VectorClock
+from app.storage.compaction import DEFAULT_GC_GRACE, SizeTieredCompaction, merge_tables
+from app.storage.memtable import Memtable
+from app.storage.record import Record, reconcile
+from app.storage.sstable import SSTable, write_sstable
+from app.storage.wal import WriteAheadLog
+from app.utils.logger import logger
+
+MANIFEST = "MANIFEST"
+WAL_PREFIX = "wal-"
+WAL_SUFFIX = ".log"
+
+
+class StorageEngine:
+    """
+    Per-node embedded store: writes go to the WAL and memtable, full memtables
+    are flushed to immutable SSTables, and size-tiered compaction keeps the
+    number of tables a read has to consult small.
+
+    Flushes and compactions run on a single maintenance thread. A full
+    memtable is frozen (still readable) and a fresh one takes the writes, so
+    a write only ever appends to the WAL and memtable; the engine lock is
+    held again only to swap finished tables in.
+    """
+
+    def __init__(self, directory: str, node_id: str = "local",
+                 memtable_size_bytes: int = 4 * 1024 * 1024, wal_fsync: bool = False,
+                 compaction: Optional[SizeTieredCompaction] = None, index_interval: int = 16,
+                 gc_grace: float = DEFAULT_GC_GRACE):
+        self.directory = directory
+        self.node_id = node_id
+        self.memtable_size_bytes = memtable_size_bytes
+        self.wal_fsync = wal_fsync
+        self.compaction = compaction or SizeTieredCompaction()
+        self.index_interval = index_interval
+        self.gc_grace = gc_grace
+        self._lock = threading.RLock()
+        # Serializes flushes and compactions, whichever thread asks for them
+        self._maintenance_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"lsm-{node_id}")
+        self._listeners: List[Callable[[Record], None]] = []
+
+        os.makedirs(directory, exist_ok=True)
+        self._next_id = 1
+        self.tables: List[SSTable] = []  # newest first
+        self._load_manifest()
+
+        # Frozen memtables waiting for the maintenance thread, newest first,
+        # each with the WAL files that back it
+        self.immutables: List[Tuple[Memtable, List[str]]] = []
+        self.memtable = Memtable()
+        self._memtable_wals: List[str] = []
+        self._wal_seq = 0
+        for path in self._wal_paths():
+            for record in WriteAheadLog.replay(path):
+                self.memtable.put(record)
+            self._memtable_wals.append(path)
+            self._wal_seq = int(os.path.basename(path)[len(WAL_PREFIX):-len(WAL_SUFFIX)])
+        self.wal = self._new_wal()
+
+    # -- manifest -----------------------------------------------------------
+
+    def _load_manifest(self) -> None:
+        path = os.path.join(self.directory, MANIFEST)
+        names: List[str] = []
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+            names = manifest["tables"]
+            self._next_id = manifest["next_id"]
+        self.tables = [SSTable(os.path.join(self.directory, name)) for name in names]
+
+        # Tables written but never committed to the manifest (crash mid-flush
+        # or mid-compaction) are unreachable; their data is still in the WAL
+        # or in the input tables.
+        live = set(names)
+        for name in os.listdir(self.directory):
+            if (name.endswith(".sst") or name.endswith(".tmp")) and name not in live:
+                os.remove(os.path.join(self.directory, name))
+
+    def _save_manifest(self) -> None:
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"tables": [os.path.basename(t.path) for t in self.tables],
+                       "next_id": self._next_id}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _new_table_path(self) -> str:
+        path = os.path.join(self.directory, f"{self._next_id:08d}.sst")
+        self._next_id += 1
+        return path
+
+    def _wal_paths(self) -> List[str]:
+        """WAL files left by a previous run, oldest first"""
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith(WAL_PREFIX) and name.endswith(WAL_SUFFIX))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _new_wal(self) -> WriteAheadLog:
+        self._wal_seq += 1
+        path = os.path.join(self.directory, f"{WAL_PREFIX}{self._wal_seq:08d}{WAL_SUFFIX}")
+        self._memtable_wals.append(path)
+        return WriteAheadLog(path, fsync=self.wal_fsync)
+
+    # -- reads --------------------------------------------------------------
+
+    def get_version(self, key: str) -> Optional[Record]:
+        """Newest stored version of a key, including tombstones and expired records"""
+        with self._lock:
+            record = self.memtable.get(key)
+            if record is not None:
+                return record
+            for memtable, _ in self.immutables:
+                record = memtable.get(key)
+                if record is not None:
+                    return record
+            for table in self.tables:
+                record = table.get(key)
+                if record is not None:
+                    return record
+        return None
+
+    def get(self, key: str) -> Optional[Record]:
+        """Live value of a key, or None if it is missing, deleted, or expired"""
+        record = self.get_version(key)
+        if record is None or not record.is_live():
+            return None
+        return record
+
+    def items(self, include_deleted: bool = False) -> Iterator[Record]:
+        """
+        Every live record in key order, merged across memtable and tables.
+        With include_deleted, tombstones and expired records not yet
+        compacted away are returned too.
+        """
+        with self._lock:
+            sources = ([self.memtable.sorted_records()]
+                       + [memtable.sorted_records() for memtable, _ in self.immutables]
+                       + list(self.tables))
+        streams = [((record.key, rank, record) for record in source)
+                   for rank, source in enumerate(sources)]
+        now = time.time()
+        last_key = None
+        for key, _, record in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+            if key != last_key:
+                last_key = key
+                if include_deleted or record.is_live(now):
+                    yield record
+
+    # -- writes -------------------------------------------------------------
+
+    def put(self, key: str, value: Optional[str], ttl: Optional[int] = None) -> Record:
+        """Local write: advances this node's entry in the key's vector clock"""
+        with self._lock:
+            current = self.get_version(key)
+            clock = VectorClock.from_dict(self.node_id, current.clock if current else {})
+            clock.tick()
+            now = time.time()
+            record = Record(key, value, clock.to_dict(), now, now + ttl if ttl else None)
+            self._write(record)
+            return record
+
+    def delete(self, key: str) -> Record:
+        """Write a tombstone; the key disappears for good at compaction"""
+        return self.put(key, None)
+
+    def apply(self, record: Record) -> Record:
+        """
+        Store a version produced elsewhere (replication, read repair). Stale
+        versions are ignored; concurrent ones are resolved last-writer-wins
+        with their clocks merged so the winner dominates both histories.
+        Returns the version that ends up stored.
+        """
+        with self._lock:
+            current = self.get_version(record.key)
+            if current is not None:
+                record = reconcile(record, current)
+                if record is current:
+                    return current
+            self._write(record)
+            return record
+
+    def add_write_listener(self, listener: Callable[[Record], None]) -> None:
+        """Call ``listener`` with every version this engine stores"""
+        self._listeners.append(listener)
+
+    def _write(self, record: Record) -> None:
+        self.wal.append(record)
+        self.memtable.put(record)
+        for listener in self._listeners:
+            listener(record)
+        if self.memtable.approximate_size >= self.memtable_size_bytes:
+            self._rotate()
+
+    def _rotate(self) -> Future:
+        """Freeze the memtable for the maintenance thread and start a new one (lock held)"""
+        self.wal.close()
+        self.immutables.insert(0, (self.memtable, self._memtable_wals))
+        self.memtable = Memtable()
+        self._memtable_wals = []
+        self.wal = self._new_wal()
+        return self._executor.submit(self._maintain)
+
+    # -- maintenance --------------------------------------------------------
+
+    def _maintain(self) -> None:
+        """Flush every frozen memtable, then compact until no tier is full"""
+        try:
+            while self._flush_oldest():
+                pass
+            while self.compact():
+                pass
+        except Exception as exc:
+            logger.error(f"Storage maintenance in {self.directory} failed: {exc}")
+            raise
+
+    def _flush_oldest(self) -> bool:
+        """Write the oldest frozen memtable to a new SSTable; returns whether there was one"""
+        with self._maintenance_lock:
+            with self._lock:
+                if not self.immutables:
+                    return False
+                memtable, wals = self.immutables[-1]
+                path = self._new_table_path()
+            write_sstable(path, memtable.sorted_records(), len(memtable),
+                          index_interval=self.index_interval)
+            table = SSTable(path)
+            with self._lock:
+                self.tables.insert(0, table)
+                self.immutables.pop()
+                self._save_manifest()
+            for wal in wals:
+                if os.path.exists(wal):
+                    os.remove(wal)
+            return True
+
+    def flush(self) -> None:
+        """
+        Turn the memtable into a new SSTable and run the compactions that
+        follow, blocking until they are done. Writes never call this: they
+        leave full memtables to the maintenance thread.
+        """
+        with self._lock:
+            future = self._rotate() if len(self.memtable) else self._executor.submit(self._maintain)
+        future.result()
+
+    def compact(self) -> bool:
+        """
+        Run one size-tiered compaction if a tier is full; returns whether it
+        did. The merge runs without the engine lock; reads keep using the
+        input tables until the output is swapped in.
+        """
+        with self._maintenance_lock:
+            with self._lock:
+                picked = self.compaction.pick(self.tables)
+                if picked is None:
+                    return False
+                start, end = picked
+                inputs, older = self.tables[start:end], self.tables[end:]
+                path = self._new_table_path()
+            written = write_sstable(path, merge_tables(inputs, older, gc_grace=self.gc_grace),
+                                    sum(t.count for t in inputs),
+                                    index_interval=self.index_interval)
+            output = [SSTable(path)] if written else []
+            if not written:
+                os.remove(path)
+            with self._lock:
+                start = self.tables.index(inputs[0])
+                self.tables[start:start + len(inputs)] = output
+                self._save_manifest()
+            for table in inputs:
+                table.delete()
+            return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memtable_keys": len(self.memtable),
+                "memtable_bytes": self.memtable.approximate_size,
+                "immutable_memtables": len(self.immutables),
+                "sstables": len(self.tables),
+                "sstable_bytes": sum(t.size for t in self.tables),
+            }
+
+    def close(self) -> None:
+        """Finish queued flushes and release files; the open memtable stays in its WAL"""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self.wal.close()
+            for table in self.tables:
+                table.close()
@@ -0,0 +1,37 @@
+"""
+In-Memory Write Buffer
+"""
+from typing import Dict, List, Optional
+
+from app.storage.record import Record
+
+
+class Memtable:
+    """
+    Latest record per key. Keys are only sorted once, when the table is
+    flushed, so writes stay O(1).
+    """
+
+    def __init__(self):
+        self._records: Dict[str, Record] = {}
+        self.approximate_size = 0
+
+    def put(self, record: Record) -> None:
+        previous = self._records.get(record.key)
+        if previous is not None:
+            self.approximate_size -= self._footprint(previous)
+        self._records[record.key] = record
+        self.approximate_size += self._footprint(record)
+
+    def get(self, key: str) -> Optional[Record]:
+        return self._records.get(key)
+
+    def sorted_records(self) -> List[Record]:
+        return [self._records[key] for key in sorted(self._records)]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @staticmethod
+    def _footprint(record: Record) -> int:
+        return len(record.key) + len(record.value or "") + 16 * len(record.clock) + 64
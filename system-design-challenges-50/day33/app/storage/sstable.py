@@ -0,0 +1,116 @@
+"""
+Sorted String Tables
+"""
+import bisect
+import json
+import os
+import struct
+from typing import Iterable, Iterator, List, Optional
+
+from app.storage.bloom import BloomFilter
+from app.storage.record import Record, iter_frames
+
+# data_end, index_offset, index_length, bloom_offset, bloom_length, count, magic
+_FOOTER = struct.Struct(">QQIQIIQ")
+_MAGIC = 0x4745_4F4B_5653_5354  # "GEOKVSST"
+
+
+def write_sstable(path: str, records: Iterable[Record], expected_count: int,
+                  index_interval: int = 16, bloom_error_rate: float = 0.01) -> int:
+    """
+    Write records (already sorted by key, one per key) to an immutable table.
+
+    Layout: data frames, then a sparse JSON index of every ``index_interval``th
+    key, then the bloom filter, then a fixed-size footer. The file is written
+    under a temporary name and renamed so readers never see a partial table.
+    Returns the number of records written.
+    """
+    bloom = BloomFilter.for_capacity(expected_count, bloom_error_rate)
+    index: List[list] = []
+    count = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        offset = 0
+        for record in records:
+            if count % index_interval == 0:
+                index.append([record.key, offset])
+            frame = record.encode()
+            f.write(frame)
+            offset += len(frame)
+            bloom.add(record.key)
+            count += 1
+        data_end = offset
+        index_bytes = json.dumps(index, separators=(",", ":")).encode()
+        bloom_bytes = bloom.to_bytes()
+        f.write(index_bytes)
+        f.write(bloom_bytes)
+        f.write(_FOOTER.pack(data_end, data_end, len(index_bytes),
+                             data_end + len(index_bytes), len(bloom_bytes), count, _MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+class SSTable:
+    """Read-only view of a table; only the sparse index and bloom stay in memory"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY)
+        self.size = os.fstat(self._fd).st_size
+        footer = os.pread(self._fd, _FOOTER.size, self.size - _FOOTER.size)
+        (self._data_end, index_offset, index_length,
+         bloom_offset, bloom_length, self.count, magic) = _FOOTER.unpack(footer)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an SSTable")
+        index = json.loads(os.pread(self._fd, index_length, index_offset))
+        self._index_keys = [entry[0] for entry in index]
+        self._index_offsets = [entry[1] for entry in index]
+        self.bloom = BloomFilter.from_bytes(os.pread(self._fd, bloom_length, bloom_offset))
+
+    @property
+    def min_key(self) -> Optional[str]:
+        return self._index_keys[0] if self._index_keys else None
+
+    def might_contain(self, key: str) -> bool:
+        return key in self.bloom
+
+    def get(self, key: str) -> Optional[Record]:
+        """Point lookup: bloom check, then read and scan a single index block"""
+        if not self._index_keys or key not in self.bloom:
+            return None
+        slot = bisect.bisect_right(self._index_keys, key) - 1
+        if slot < 0:
+            return None
+        start = self._index_offsets[slot]
+        end = self._index_offsets[slot + 1] if slot + 1 < len(self._index_offsets) else self._data_end
+        for record in iter_frames(os.pread(self._fd, end - start, start)):
+            if record.key == key:
+                return record
+            if record.key > key:
+                break
+        return None
+
+    def __iter__(self) -> Iterator[Record]:
+        """Stream every record in key order, one index block at a time"""
+        offsets = self._index_offsets + [self._data_end]
+        for start, end in zip(offsets, offsets[1:]):
+            yield from iter_frames(os.pread(self._fd, end - start, start))
+
+    def close(self) -> None:
+        if getattr(self, "_fd", None) is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def delete(self) -> None:
+        """
+        Unlink a table replaced by compaction. The descriptor stays open
+        until the table is garbage collected, so a scan that took it before
+        the swap can still finish reading it.
+        """
+        os.remove(self.path)
+
+    def __del__(self) -> None:
+        self.close()
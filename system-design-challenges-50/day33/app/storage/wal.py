@@ -0,0 +1,37 @@
+"""
+Write-Ahead Log
+"""
+import os
+from typing import Iterator
+
+from app.storage.record import Record, iter_frames
+
+
+class WriteAheadLog:
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "ab")
+
+    def append(self, record: Record) -> None:
+        """Persist a record before it is applied to the memtable"""
+        self._file.write(record.encode())
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    @staticmethod
+    def replay(path: str) -> Iterator[Record]:
+        """Yield every intact record in a log file"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            yield from iter_frames(f.read())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def delete(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
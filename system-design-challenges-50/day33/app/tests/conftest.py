@@ -0,0 +1,12 @@
+"""
+Pytest Fixtures
+"""
+import pytest
+from app.db import kv_store
+
+@pytest.fixture(autouse=True)
+def region_node(tmp_path):
+    """A fresh region node per test, stored under tmp_path instead of ./data"""
+    node = kv_store.open_node(str(tmp_path / "node"))
+    yield node
+    kv_store.close_node()
@@ -0,0 +1,108 @@
+"""
+Quorum Coordinator Tests
+"""
+import asyncio
+import pytest
+from app.core.consistency import ConsistencyLevel
+from app.core.coordinator import HintedHandoff, LocalReplica, QuorumCoordinator
+from app.core.hashing import ConsistentHasher
+from app.storage.engine import StorageEngine
+from app.storage.record import Record
+from app.utils.exceptions import RegionUnavailableError
+
+NODES = ["us-east-1", "us-west-1", "eu-central-1"]
+
+class FlakyReplica(LocalReplica):
+    """Local replica that can be switched off to simulate an outage"""
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.down = False
+
+    async def apply(self, record):
+        if self.down:
+            raise ConnectionError("replica down")
+        return await super().apply(record)
+
+    async def read(self, key):
+        if self.down:
+            raise ConnectionError("replica down")
+        return await super().read(key)
+
+    async def apply_batch(self, records):
+        if self.down:
+            raise ConnectionError("replica down")
+        return await super().apply_batch(records)
+
+def make_cluster(tmp_path):
+    replicas = {
+        node: FlakyReplica(StorageEngine(str(tmp_path / node), node_id=node))
+        for node in NODES
+    }
+    coordinator = QuorumCoordinator("us-east-1", ConsistentHasher(NODES), replicas,
+                                    replication_factor=3, handoff=HintedHandoff())
+    return coordinator, replicas
+
+def test_write_reaches_quorum_and_reads_back(tmp_path):
+    """Test a strong write followed by a strong read"""
+    async def scenario():
+        coordinator, replicas = make_cluster(tmp_path)
+        await coordinator.put("k", "v")
+        await asyncio.sleep(0)
+        record = await coordinator.get("k")
+        assert record.value == "v"
+        assert sum(1 for r in replicas.values() if r.engine.get("k")) >= 2
+    asyncio.run(scenario())
+
+def test_quorum_failure(tmp_path):
+    """Test that a write fails when fewer than W replicas are reachable"""
+    async def scenario():
+        coordinator, replicas = make_cluster(tmp_path)
+        replicas["us-west-1"].down = True
+        replicas["eu-central-1"].down = True
+        with pytest.raises(RegionUnavailableError):
+            await coordinator.put("k", "v", level=ConsistencyLevel.STRONG)
+        await coordinator.put("k", "v", level=ConsistencyLevel.EVENTUAL)
+    asyncio.run(scenario())
+
+def test_hinted_handoff_and_read_repair(tmp_path):
+    """Test that missed writes are replayed and stale replicas repaired"""
+    async def scenario():
+        coordinator, replicas = make_cluster(tmp_path)
+        replicas["eu-central-1"].down = True
+        await coordinator.put("k", "v1")
+        await asyncio.gather(*coordinator._background)
+        assert coordinator.handoff.pending() == {"eu-central-1": 1}
+
+        replicas["eu-central-1"].down = False
+        assert await coordinator.replay_hints() == 1
+        assert replicas["eu-central-1"].engine.get("k").value == "v1"
+
+        # Make one replica stale, then read from all three
+        replicas["us-west-1"].engine.apply(replicas["us-east-1"].engine.get_version("k"))
+        replicas["us-east-1"].engine.put("k", "v2")
+        record = await coordinator.get("k", r=3)
+        assert record.value == "v2"
+        await asyncio.gather(*coordinator._background)
+        assert all(r.engine.get("k").value == "v2" for r in replicas.values())
+    asyncio.run(scenario())
+
+def test_hint_replay_survives_concurrent_adds(tmp_path):
+    """Test that hints queued for a new node during a replay do not break it"""
+    async def scenario():
+        coordinator, replicas = make_cluster(tmp_path)
+        handoff = HintedHandoff(batch_size=2)
+        replicas["eu-central-1"].down = True
+
+        class SlowReplica(FlakyReplica):
+            async def apply_batch(self, records):
+                handoff.add("eu-central-1", Record(f"late-{len(records)}", "v", {"us-east-1": 1}))
+                await asyncio.sleep(0)
+                return await super().apply_batch(records)
+
+        slow = SlowReplica(replicas["us-west-1"].engine)
+        for i in range(3):
+            handoff.add("us-west-1", Record(f"k{i}", "v", {"us-east-1": 1}))
+        assert await handoff.replay({"us-west-1": slow, "eu-central-1": replicas["eu-central-1"]}, 1.0) == 3
+        assert handoff.pending() == {"eu-central-1": 2}
+        assert all(slow.engine.get(f"k{i}").value == "v" for i in range(3))
+    asyncio.run(scenario())
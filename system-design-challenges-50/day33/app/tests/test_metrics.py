@@ -0,0 +1,37 @@
+"""
+Metrics Tests
+"""
+import random
+import pytest
+from app.utils.metrics import Histogram, MetricsStore
+
+def test_histogram_quantiles():
+    """Test that bucketed quantiles stay close to the exact ones"""
+    histogram = Histogram()
+    samples = [random.expovariate(100) for _ in range(20000)]
+    for sample in samples:
+        histogram.record(sample)
+    samples.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = samples[int(q * len(samples)) - 1]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.1)
+
+def test_histogram_constant_memory():
+    """Test that memory does not grow with the number of samples"""
+    histogram = Histogram()
+    buckets = len(histogram.counts)
+    for i in range(100000):
+        histogram.record(i / 1000.0)
+    assert len(histogram.counts) == buckets
+    assert histogram.count == 100000
+
+def test_prometheus_exposition():
+    """Test per-endpoint, per-region percentiles in the exposition output"""
+    store = MetricsStore()
+    for duration in (0.001, 0.002, 0.003):
+        store.record_request("GET", "/kv/{key}", 200, duration, region="us-east-1")
+    store.record_request("GET", "/kv/{key}", 200, 0.5, region="eu-central-1")
+    output = store.render_prometheus()
+    assert 'geo_kv_requests_total{method="GET",endpoint="/kv/{key}",status="200",region="us-east-1"} 3' in output
+    assert 'region="eu-central-1",quantile="0.99"' in output
+    assert "geo_kv_request_duration_seconds_count" in output
@@ -41,4 +41,48 @@ def test_remove_node():
     
     # Verify the node is no longer in the ring
     node = hasher.get_node("test_key")
-    assert node in ["us-east-1", "us-west-1"]
\ No newline at end of file
+    assert node in ["us-east-1", "us-west-1"]
+
+def test_batch_lookup_matches_single_lookup():
+    """Test that get_nodes agrees with get_node"""
+    hasher = ConsistentHasher(["us-east-1", "us-west-1", "eu-central-1"])
+    keys = [f"key-{i}" for i in range(500)]
+    owners = hasher.get_nodes(keys)
+    assert all(owners[key] == hasher.get_node(key) for key in keys)
+
+
+def test_preference_list_distinct_nodes():
+    """Test that preference lists hold N distinct nodes led by the owner"""
+    nodes = ["us-east-1", "us-west-1", "eu-central-1", "ap-south-1"]
+    hasher = ConsistentHasher(nodes)
+    preference = hasher.get_preference_list("test_key", 3)
+    assert len(preference) == 3
+    assert len(set(preference)) == 3
+    assert preference[0] == hasher.get_node("test_key")
+    assert len(hasher.get_preference_list("test_key", 10)) == len(nodes)
+
+
+def test_weighted_distribution():
+    """Test that a heavier node owns proportionally more keys"""
+    hasher = ConsistentHasher(["a", "b"], weights={"a": 3.0, "b": 1.0})
+    owners = list(hasher.get_nodes(f"key-{i}" for i in range(20000)).values())
+    share = owners.count("a") / len(owners)
+    assert 0.65 < share < 0.85
+
+
+def test_moved_ranges_on_membership_change():
+    """Test that only the reported ranges change owner"""
+    hasher = ConsistentHasher(["us-east-1", "us-west-1"])
+    keys = [f"key-{i}" for i in range(2000)]
+    before = hasher.get_nodes(keys)
+
+    moved = hasher.add_node("eu-central-1")
+    after = hasher.get_nodes(keys)
+    assert moved and all(r.target == "eu-central-1" for r in moved)
+    for key in keys:
+        in_moved = any(r.contains_key(key) for r in moved)
+        assert (before[key] != after[key]) == in_moved
+
+    moved = hasher.remove_node("eu-central-1")
+    assert all(r.source == "eu-central-1" for r in moved)
+    assert hasher.get_nodes(keys) == before
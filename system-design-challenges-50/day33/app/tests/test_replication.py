@@ -1,12 +1,77 @@
 """
 Replication Tests
 """
+import asyncio
+import time
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.storage.record import Record, decode_batch, encode_batch
+from app.utils.exceptions import ReplicationError
+from app.utils.metrics import metrics_store
+from app.workers.replication_log import ReplicationLog, coalesce
+from app.workers.replication_worker import replication_worker
 
 client = TestClient(app)
 
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        results = []
+        for name, args, kwargs in self.calls:
+            results.append(await getattr(self.redis, name)(*args, **kwargs))
+        return results
+
+class FakeRedis:
+    """Just enough of redis.asyncio for streams and a cursor hash"""
+
+    def __init__(self):
+        self.streams = {}
+        self.hashes = {}
+        self.seq = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def xlen(self, stream):
+        return len(self.streams.get(stream, []))
+
+    async def xadd(self, stream, fields):
+        self.seq += 1
+        entry_id = f"{int(time.time() * 1000)}-{self.seq}"
+        self.streams.setdefault(stream, []).append((entry_id.encode(), {k.encode(): v.encode() for k, v in fields.items()}))
+        return entry_id
+
+    async def xread(self, streams, count=None, block=None):
+        (stream, cursor), = streams.items()
+        after = tuple(map(int, cursor.split("-")))
+        entries = [(entry_id, fields) for entry_id, fields in self.streams.get(stream, [])
+                   if tuple(map(int, entry_id.decode().split("-"))) > after][:count]
+        return [(stream.encode(), entries)] if entries else []
+
+    async def xdel(self, stream, *ids):
+        drop = {entry_id.encode() for entry_id in ids}
+        before = len(self.streams.get(stream, []))
+        self.streams[stream] = [entry for entry in self.streams.get(stream, []) if entry[0] not in drop]
+        return before - len(self.streams[stream])
+
+    async def xrange(self, stream, count=None):
+        return self.streams.get(stream, [])[:count]
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value.encode()
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
 def test_replicate_data():
     """Test data replication endpoint"""
     response = client.post("/replicate/", json={
@@ -27,4 +92,87 @@ def test_sync_region():
     })
     assert response.status_code == 200
     data = response.json()
-    assert data["status"] == "success"
\ No newline at end of file
+    assert data["status"] == "success"
+
+def test_coalesce_repeated_writes():
+    """Test that a batch keeps only the newest version of each key"""
+    records = [
+        Record("a", "1", {"us-east-1": 1}),
+        Record("b", "1", {"us-east-1": 1}),
+        Record("a", "2", {"us-east-1": 2}),
+    ]
+    coalesced = {record.key: record.value for record in coalesce(records)}
+    assert coalesced == {"a": "2", "b": "1"}
+
+def test_batch_round_trip():
+    """Test the compressed batch wire format"""
+    records = [Record(f"key-{i}", "x" * 100, {"us-east-1": i}) for i in range(100)]
+    payload = encode_batch(records)
+    assert len(payload) < sum(len(r.encode()) for r in records) / 4
+    assert decode_batch(payload) == records
+
+def test_replication_log_cursor_and_ack():
+    """Test that acked entries are dropped and reads resume past the cursor"""
+    log = ReplicationLog(FakeRedis())
+
+    async def scenario():
+        for i in range(5):
+            await log.append(Record(f"key-{i}", "v", {"us-east-1": 1}), ["us-west-1", "eu-central-1"])
+        ids, records = await log.read_batch("us-west-1", 3)
+        assert [record.key for record in records] == ["key-0", "key-1", "key-2"]
+        await log.ack("us-west-1", ids)
+        assert await log.cursor("us-west-1") == ids[-1]
+        assert await log.cursor("eu-central-1") == "0-0"
+
+        ids, records = await log.read_batch("us-west-1", 10)
+        assert [record.key for record in records] == ["key-3", "key-4"]
+        await log.ack("us-west-1", ids)
+        assert await log.read_batch("us-west-1", 10) == ([], [])
+        assert (await log.lag("us-west-1"))["entries"] == 0
+        assert (await log.lag("eu-central-1"))["entries"] == 5
+    asyncio.run(scenario())
+
+def test_replication_log_backpressure():
+    """Test that a full backlog blocks appends until the shipper drains it"""
+    log = ReplicationLog(FakeRedis(), max_backlog=2, backpressure_timeout=0.2)
+
+    async def scenario():
+        await log.append(Record("a", "v"), ["us-west-1"])
+        await log.append(Record("b", "v"), ["us-west-1"])
+        with pytest.raises(ReplicationError):
+            await log.append(Record("c", "v"), ["us-west-1"])
+
+        ids, _ = await log.read_batch("us-west-1", 10)
+        waiting = asyncio.ensure_future(log.append(Record("c", "v"), ["us-west-1"]))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        await log.ack("us-west-1", ids)
+        await asyncio.wait_for(waiting, 1)
+        assert (await log.lag("us-west-1"))["entries"] == 1
+    asyncio.run(scenario())
+
+def test_replication_lag_seconds():
+    """Test that lag is measured from the oldest unshipped entry"""
+    redis = FakeRedis()
+    log = ReplicationLog(redis)
+
+    async def scenario():
+        await log.append(Record("a", "v"), ["us-west-1"])
+        stream = redis.streams["replication:log:us-west-1"]
+        stream[0] = (f"{int((time.time() - 30) * 1000)}-1".encode(), stream[0][1])
+        lag = await log.lag("us-west-1")
+        assert lag["entries"] == 1 and 29 <= lag["seconds"] <= 31
+    asyncio.run(scenario())
+
+def test_full_replication_log_does_not_fail_committed_write(region_node, monkeypatch):
+    """Test that a write that met its quorum succeeds even if it cannot be queued"""
+    log = ReplicationLog(FakeRedis(), max_backlog=1, backpressure_timeout=0)
+    monkeypatch.setattr(replication_worker, "log", log)
+    monkeypatch.setattr(region_node.coordinator, "async_targets", lambda key: ["us-west-1"])
+    asyncio.run(log.append(Record("filler", "v"), ["us-west-1"]))
+
+    dropped = metrics_store.replication_events.get(("us-east-1", "us-west-1", "dropped"), 0)
+    response = client.post("/kv/", json={"key": "k", "value": "v"})
+    assert response.status_code == 200
+    assert region_node.storage_engine.get("k").value == "v"
+    assert metrics_store.replication_events[("us-east-1", "us-west-1", "dropped")] == dropped + 1
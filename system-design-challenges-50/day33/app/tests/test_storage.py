@@ -0,0 +1,132 @@
+"""
+Storage Engine Tests
+"""
+import threading
+import time
+from app.storage import engine as engine_module
+from app.storage.compaction import SizeTieredCompaction, merge_tables
+from app.storage.engine import StorageEngine
+from app.storage.record import Record
+
+def make_engine(path, **kwargs):
+    kwargs.setdefault("memtable_size_bytes", 2048)
+    return StorageEngine(str(path), node_id="us-east-1", **kwargs)
+
+def test_put_get_delete(tmp_path):
+    """Test basic point operations and vector clock advancement"""
+    engine = make_engine(tmp_path)
+    first = engine.put("k", "v1")
+    second = engine.put("k", "v2")
+    assert engine.get("k").value == "v2"
+    assert second.clock["us-east-1"] == first.clock["us-east-1"] + 1
+
+    engine.delete("k")
+    assert engine.get("k") is None
+    assert engine.get_version("k").is_tombstone
+
+def test_wal_recovery(tmp_path):
+    """Test that unflushed writes survive a restart"""
+    engine = make_engine(tmp_path, memtable_size_bytes=1 << 20)
+    engine.put("k", "v")
+    engine.close()
+
+    reopened = make_engine(tmp_path)
+    assert reopened.get("k").value == "v"
+    assert not reopened.tables
+
+def test_flush_and_compaction(tmp_path):
+    """Test that reads stay correct across flushes and compactions"""
+    engine = make_engine(tmp_path, compaction=SizeTieredCompaction(min_threshold=3))
+    for i in range(500):
+        engine.put(f"key-{i:04d}", f"value-{i}")
+    for i in range(0, 500, 2):
+        engine.put(f"key-{i:04d}", f"updated-{i}")
+    for i in range(0, 500, 5):
+        engine.delete(f"key-{i:04d}")
+    engine.flush()
+
+    assert len(engine.tables) < 10
+    for i in range(500):
+        record = engine.get(f"key-{i:04d}")
+        if i % 5 == 0:
+            assert record is None
+        else:
+            assert record.value == (f"updated-{i}" if i % 2 == 0 else f"value-{i}")
+    assert len(list(engine.items())) == 400
+
+    engine.close()
+    reopened = make_engine(tmp_path)
+    assert reopened.get("key-0002").value == "updated-2"
+
+def test_ttl_expiry_dropped_at_compaction(tmp_path):
+    """Test that expired keys are hidden from reads and purged by compaction"""
+    engine = make_engine(tmp_path, compaction=SizeTieredCompaction(min_threshold=2), gc_grace=0)
+    engine.apply(Record("old", "v", {"us-west-1": 1}, time.time(), time.time() - 1))
+    assert engine.get("old") is None
+    engine.flush()
+    engine.put("fresh", "v")
+    engine.flush()
+
+    assert len(engine.tables) == 1
+    assert engine.get_version("old") is None
+    assert engine.get("fresh").value == "v"
+
+def test_apply_resolves_versions(tmp_path):
+    """Test that replicated versions respect vector clock ordering"""
+    engine = make_engine(tmp_path)
+    local = engine.put("k", "local")
+
+    stale = engine.apply(Record("k", "stale", {}, time.time() - 10))
+    assert stale.value == "local"
+
+    newer_clock = dict(local.clock, **{"us-west-1": 1})
+    assert engine.apply(Record("k", "remote", newer_clock)).value == "remote"
+
+    concurrent = engine.apply(Record("k", "concurrent", {"eu-central-1": 5}, time.time() + 1))
+    assert concurrent.value == "concurrent"
+    assert concurrent.clock["us-west-1"] == 1 and concurrent.clock["eu-central-1"] == 5
+
+def test_tombstones_kept_for_gc_grace(tmp_path):
+    """Test that deletes survive compaction until the grace period is over"""
+    engine = make_engine(tmp_path, compaction=SizeTieredCompaction(min_threshold=2), gc_grace=60)
+    engine.put("k", "v")
+    engine.flush()
+    engine.delete("k")
+    engine.flush()
+
+    assert len(engine.tables) == 1
+    assert engine.get_version("k").is_tombstone
+    # A replica replaying the old value must not bring the key back
+    stale = Record("k", "v", {"us-east-1": 1}, time.time() - 10)
+    assert engine.apply(stale).is_tombstone
+    assert engine.get("k") is None
+
+    later = merge_tables(engine.tables, [], now=time.time() + 61, gc_grace=60)
+    assert list(later) == []
+
+def test_writes_do_not_wait_for_maintenance(tmp_path, monkeypatch):
+    """Test that a full memtable is flushed off the write path and stays readable meanwhile"""
+    engine = make_engine(tmp_path)
+    flushing, release = threading.Event(), threading.Event()
+    real_write = engine_module.write_sstable
+
+    def slow_write(*args, **kwargs):
+        flushing.set()
+        release.wait(5)
+        return real_write(*args, **kwargs)
+
+    monkeypatch.setattr(engine_module, "write_sstable", slow_write)
+    for i in range(100):
+        engine.put(f"key-{i:04d}", "x" * 50)
+    assert flushing.wait(5)
+    assert engine.immutables and not engine.tables
+    assert engine.get("key-0000").value == "x" * 50
+
+    release.set()
+    engine.flush()
+    assert not engine.immutables and engine.tables
+    assert len(list(engine.items())) == 100
+    engine.close()
+
+    reopened = make_engine(tmp_path)
+    assert len(list(reopened.items())) == 100
@@ -1,41 +1,163 @@
 """
 Prometheus Metrics Setup
 """
+import math
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """
+    Log-linear fixed-bucket latency histogram. Bucket bounds grow by
+    ``growth`` from ``min_value`` to ``max_value``, so recording is one log
+    and one list increment and memory is fixed no matter how many samples
+    arrive; quantiles are accurate to within one bucket width (~5% by default).
+    """
+
+    def __init__(self, min_value: float = 1e-5, max_value: float = 60.0, growth: float = 1.1):
+        self.min_value = min_value
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.num_buckets = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 2
+        self.counts: List[int] = [0] * self.num_buckets
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int(math.log(value / self.min_value) / self._log_growth) + 1
+        return min(index, self.num_buckets - 1)
+
+    def _upper_bound(self, index: int) -> float:
+        return self.min_value * self.growth ** index
+
+    def record(self, value: float) -> None:
+        self.counts[self._bucket(value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            if seen + bucket_count >= rank:
+                lower = self._upper_bound(index - 1) if index else 0.0
+                upper = min(self._upper_bound(index), self.max)
+                fraction = (rank - seen) / bucket_count
+                return lower + (upper - lower) * fraction
+            seen += bucket_count
+        return self.max
+
 # Metrics storage
 class MetricsStore:
     def __init__(self):
-        self.request_count = {}
-        self.request_duration = {}
+        self.request_count: Dict[Tuple[str, str, int, str], int] = {}
+        self.request_duration: Dict[Tuple[str, str, str], Histogram] = {}
         self.active_connections = 0
-        self.key_operations = {}
-        self.replication_events = {}
-    
-    def record_request(self, method: str, endpoint: str, status: int, duration: float):
+        self.key_operations: Dict[Tuple[str, str], int] = {}
+        self.replication_events: Dict[Tuple[str, str, str], int] = {}
+
+    def record_request(self, method: str, endpoint: str, status: int, duration: float,
+                       region: Optional[str] = None):
         """Record HTTP request metrics"""
-        key = f"{method}:{endpoint}:{status}"
-        self.request_count[key] = self.request_count.get(key, 0) + 1
-        self.request_duration[key] = self.request_duration.get(key, []) + [duration]
-    
+        region = region or settings.REGION_ID
+        count_key = (method, endpoint, status, region)
+        self.request_count[count_key] = self.request_count.get(count_key, 0) + 1
+        duration_key = (method, endpoint, region)
+        histogram = self.request_duration.get(duration_key)
+        if histogram is None:
+            histogram = self.request_duration[duration_key] = Histogram()
+        histogram.record(duration)
+
     def record_key_operation(self, operation: str, region: str):
         """Record key operation metrics"""
-        key = f"{operation}:{region}"
+        key = (operation, region)
         self.key_operations[key] = self.key_operations.get(key, 0) + 1
-    
+
     def record_replication_event(self, source_region: str, target_region: str, status: str):
         """Record replication event metrics"""
-        key = f"{source_region}:{target_region}:{status}"
+        key = (source_region, target_region, status)
         self.replication_events[key] = self.replication_events.get(key, 0) + 1
-    
+
     def update_active_connections(self, count: int):
         """Update active connections gauge"""
         self.active_connections = count
 
+    def latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 in seconds per "METHOD endpoint@region" """
+        return {
+            f"{method} {endpoint}@{region}": {
+                f"p{int(q * 100)}": histogram.quantile(q) for q in QUANTILES
+            }
+            for (method, endpoint, region), histogram in self.request_duration.items()
+        }
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP geo_kv_requests_total HTTP requests by method, endpoint, status and region",
+            "# TYPE geo_kv_requests_total counter",
+        ]
+        for (method, endpoint, status, region), count in self.request_count.items():
+            labels = _labels(method=method, endpoint=endpoint, status=status, region=region)
+            lines.append(f"geo_kv_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP geo_kv_request_duration_seconds HTTP request latency",
+            "# TYPE geo_kv_request_duration_seconds summary",
+        ]
+        for (method, endpoint, region), histogram in self.request_duration.items():
+            labels = _labels(method=method, endpoint=endpoint, region=region)
+            for q in QUANTILES:
+                lines.append(
+                    f'geo_kv_request_duration_seconds{{{labels},quantile="{q}"}} {histogram.quantile(q):.6f}'
+                )
+            lines.append(f"geo_kv_request_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"geo_kv_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP geo_kv_key_operations_total Key operations by operation and region",
+            "# TYPE geo_kv_key_operations_total counter",
+        ]
+        for (operation, region), count in self.key_operations.items():
+            lines.append(f"geo_kv_key_operations_total{{{_labels(operation=operation, region=region)}}} {count}")
+
+        lines += [
+            "# HELP geo_kv_replication_events_total Replication events by source, target and status",
+            "# TYPE geo_kv_replication_events_total counter",
+        ]
+        for (source, target, status), count in self.replication_events.items():
+            labels = _labels(source_region=source, target_region=target, status=status)
+            lines.append(f"geo_kv_replication_events_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP geo_kv_active_connections Open client connections",
+            "# TYPE geo_kv_active_connections gauge",
+            f"geo_kv_active_connections {self.active_connections}",
+        ]
+        return "\n".join(lines) + "\n"
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
 # Global metrics store
 metrics_store = MetricsStore()
 
-def record_request(method: str, endpoint: str, status: int, duration: float):
+def record_request(method: str, endpoint: str, status: int, duration: float,
+                   region: Optional[str] = None):
     """Record HTTP request metrics"""
-    metrics_store.record_request(method, endpoint, status, duration)
+    metrics_store.record_request(method, endpoint, status, duration, region)
 
 def record_key_operation(operation: str, region: str):
     """Record key operation metrics"""
@@ -47,4 +169,4 @@ def record_replication_event(source_region: str, target_region: str, status: str
 
 def update_active_connections(count: int):
     """Update active connections gauge"""
-    metrics_store.update_active_connections(count)
\ No newline at end of file
+    metrics_store.update_active_connections(count)
@@ -0,0 +1,120 @@
+"""
+Per-Region Replication Log
+"""
+import asyncio
+import json
+import time
+from typing import Dict, List, Tuple
+
+from app.storage.record import Record, reconcile
+from app.utils.exceptions import ReplicationError
+
+STREAM_PREFIX = "replication:log:"
+CURSORS_KEY = "replication:cursors"
+
+
+def coalesce(records: List[Record]) -> List[Record]:
+    """Collapse repeated writes to the same key into the version that survives"""
+    latest: Dict[str, Record] = {}
+    for record in records:
+        current = latest.get(record.key)
+        latest[record.key] = record if current is None else reconcile(record, current)
+    return list(latest.values())
+
+
+def _entry_time(entry_id) -> float:
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    return int(entry_id.split("-", 1)[0]) / 1000.0
+
+
+class ReplicationLog:
+    """
+    One Redis stream per target region holding changes still to be shipped.
+    Stream IDs give a total order per region; each region's cursor is the
+    last ID its peer acknowledged, and shipped entries are deleted in the
+    same transaction that advances the cursor, so the stream length is the
+    backlog.
+    """
+
+    def __init__(self, redis_client, max_backlog: int = 1000000,
+                 backpressure_timeout: float = 5.0):
+        self.redis = redis_client
+        self.max_backlog = max_backlog
+        self.backpressure_timeout = backpressure_timeout
+        self._saturated: Dict[str, bool] = {}
+
+    def _stream(self, region: str) -> str:
+        return f"{STREAM_PREFIX}{region}"
+
+    async def _wait_for_capacity(self, region: str) -> None:
+        deadline = time.monotonic() + self.backpressure_timeout
+        while self._saturated.get(region):
+            if await self.redis.xlen(self._stream(region)) < self.max_backlog:
+                self._saturated[region] = False
+                return
+            if time.monotonic() >= deadline:
+                raise ReplicationError(f"Replication backlog to {region} is full")
+            await asyncio.sleep(0.05)
+
+    async def append(self, record: Record, regions: List[str]) -> None:
+        """
+        Queue a change for each target region in one round trip. When a
+        region's backlog is over the high-water mark, callers wait for the
+        shipper to drain it (up to backpressure_timeout) instead of growing
+        Redis without bound.
+        """
+        if not regions:
+            return
+        for region in regions:
+            await self._wait_for_capacity(region)
+        payload = json.dumps(record.to_dict(), separators=(",", ":"))
+        pipe = self.redis.pipeline(transaction=False)
+        for region in regions:
+            pipe.xlen(self._stream(region))
+            pipe.xadd(self._stream(region), {"r": payload})
+        results = await pipe.execute()
+        for region, backlog in zip(regions, results[::2]):
+            if backlog + 1 >= self.max_backlog:
+                self._saturated[region] = True
+
+    async def cursor(self, region: str) -> str:
+        cursor = await self.redis.hget(CURSORS_KEY, region)
+        if isinstance(cursor, bytes):
+            cursor = cursor.decode()
+        return cursor or "0-0"
+
+    async def read_batch(self, region: str, batch_size: int,
+                         block_ms: int = 1000) -> Tuple[List[str], List[Record]]:
+        """Block until changes after the region's cursor exist; return up to batch_size"""
+        stream = self._stream(region)
+        response = await self.redis.xread({stream: await self.cursor(region)},
+                                          count=batch_size, block=block_ms)
+        if not response:
+            return [], []
+        ids, records = [], []
+        for entry_id, fields in response[0][1]:
+            payload = fields.get(b"r", fields.get("r"))
+            ids.append(entry_id.decode() if isinstance(entry_id, bytes) else entry_id)
+            records.append(Record.from_dict(json.loads(payload)))
+        return ids, records
+
+    async def ack(self, region: str, ids: List[str]) -> None:
+        """Advance the cursor past shipped entries and drop them from the stream"""
+        if not ids:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(CURSORS_KEY, region, ids[-1])
+        pipe.xdel(self._stream(region), *ids)
+        await pipe.execute()
+
+    async def lag(self, region: str) -> Dict[str, float]:
+        """Backlog for a region in entries and in seconds since the oldest unshipped change"""
+        stream = self._stream(region)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xlen(stream)
+        pipe.xrange(stream, count=1)
+        backlog, oldest = await pipe.execute()
+        seconds = max(0.0, time.time() - _entry_time(oldest[0][0])) if oldest else 0.0
+        return {"entries": backlog, "seconds": round(seconds, 3)}
+
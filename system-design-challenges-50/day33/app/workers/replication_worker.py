@@ -2,46 +2,98 @@
 Handles Async Replication Jobs
 """
 import asyncio
-from typing import List
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.coordinator import ReplicaClient
+from app.db.kv_store import get_node
 from app.db.redis_cache import redis_cache
-from app.db.models import KeyValueEntry
-from app.db.session import AsyncSessionLocal
+from app.storage.record import Record
+from app.utils.logger import logger
+from app.utils.metrics import record_replication_event
+from app.workers.replication_log import ReplicationLog, coalesce
 
 class ReplicationWorker:
-    def __init__(self):
+    def __init__(self, log: Optional[ReplicationLog] = None, batch_size: int = 500,
+                 batch_window: float = 0.05):
         self.running = False
-    
+        self.log = log or ReplicationLog(
+            redis_cache.redis_client,
+            max_backlog=settings.REPLICATION_MAX_BACKLOG,
+            backpressure_timeout=settings.REPLICATION_BACKPRESSURE_TIMEOUT
+        )
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.peers: Dict[str, ReplicaClient] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def enqueue(self, record: Record, target_regions: List[str]):
+        """Append a change to the replication log of every target region"""
+        await self.log.append(record, target_regions)
+
     async def start_replication_job(self, key: str, source_region: str, target_regions: List[str]):
-        """Start a replication job for a key"""
-        # Implementation will be added later
-        print(f"Starting replication job for key {key} from {source_region} to {target_regions}")
-        
-        # Simulate async work
-        await asyncio.sleep(0.1)
-        return {"status": "completed", "key": key, "regions": target_regions}
-    
-    async def process_replication_queue(self):
-        """Process the replication queue"""
+        """Queue the current local version of a key for the target regions"""
+        record = get_node().storage_engine.get_version(key)
+        if record is None:
+            return {"status": "skipped", "key": key, "regions": target_regions}
+        await self.enqueue(record, target_regions)
+        return {"status": "queued", "key": key, "regions": target_regions}
+
+    async def ship_batch(self, region: str, client: ReplicaClient) -> int:
+        """
+        Ship one batch to a region: read past its cursor, coalesce repeated
+        writes to the same key, send them compressed in one request, then ack.
+        Returns the number of log entries consumed.
+        """
+        ids, records = await self.log.read_batch(region, self.batch_size)
+        if not ids:
+            return 0
+        await client.apply_batch(coalesce(records))
+        await self.log.ack(region, ids)
+        record_replication_event(settings.REGION_ID, region, "completed")
+        return len(ids)
+
+    async def process_replication_queue(self, region: str, client: ReplicaClient):
+        """Ship a region's log until stopped, one batch in flight at a time"""
         while self.running:
-            # Get items from replication queue
-            queue_item = await redis_cache.get("replication_queue")
-            if queue_item:
-                # Process the item
-                print(f"Processing replication item: {queue_item}")
-                await redis_cache.delete("replication_queue")
-            
-            # Wait before checking again
-            await asyncio.sleep(1)
-    
-    def start(self):
+            try:
+                shipped = await self.ship_batch(region, client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                record_replication_event(settings.REGION_ID, region, "failed")
+                logger.warning(f"Replication to {region} failed: {exc}")
+                await asyncio.sleep(1)
+                continue
+            # A partial batch means the log is drained; wait one window so
+            # writes arriving meanwhile coalesce into the next batch.
+            if shipped < self.batch_size:
+                await asyncio.sleep(self.batch_window)
+
+    async def lag(self) -> Dict[str, Dict[str, float]]:
+        """Replication lag per region in entries and seconds"""
+        return {region: await self.log.lag(region) for region in self.peers}
+
+    def start(self, peers: Optional[Dict[str, ReplicaClient]] = None):
         """Start the worker"""
         self.running = True
-        print("Replication worker started")
-    
+        if peers is None:
+            peers = {region: client for region, client in get_node().replicas.items()
+                     if region != settings.REGION_ID}
+        self.peers = peers
+        for region, client in peers.items():
+            self._tasks[region] = asyncio.ensure_future(self.process_replication_queue(region, client))
+        logger.info(f"Replication worker started for {list(peers)}")
+
     def stop(self):
         """Stop the worker"""
         self.running = False
-        print("Replication worker stopped")
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        logger.info("Replication worker stopped")
 
 # Global replication worker instance
-replication_worker = ReplicationWorker()
\ No newline at end of file
+replication_worker = ReplicationWorker(
+    batch_size=settings.REPLICATION_BATCH_SIZE,
+    batch_window=settings.REPLICATION_BATCH_WINDOW
+)
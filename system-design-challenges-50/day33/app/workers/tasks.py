@@ -2,15 +2,35 @@
 Celery or RQ Tasks
 """
 from app.core.config import settings
+from app.core.merkle import divergent_leaves
+from app.db.kv_store import get_node
+from app.utils.metrics import record_replication_event
+from app.workers.replication_worker import replication_worker
 
 async def replicate_key_task(key: str, source_region: str, target_region: str):
     """Task to replicate a key from one region to another"""
-    # Implementation will be added later
-    print(f"Replicating key {key} from {source_region} to {target_region}")
-    return {"status": "completed", "key": key}
+    return await replication_worker.start_replication_job(key, source_region, [target_region])
 
 async def sync_region_task(region_id: str, timestamp: float):
-    """Task to sync an entire region"""
-    # Implementation will be added later
-    print(f"Syncing region {region_id} from timestamp {timestamp}")
-    return {"status": "completed", "region_id": region_id}
\ No newline at end of file
+    """
+    Merkle anti-entropy with one region: find the leaves whose hashes differ
+    and exchange only the keys in those leaves, in both directions.
+    """
+    node = get_node()
+    peer = node.replicas.get(region_id)
+    local = node.replicas.get(settings.REGION_ID)
+    if peer is None or region_id == settings.REGION_ID:
+        return {"status": "skipped", "region_id": region_id}
+
+    leaves = await divergent_leaves(node.merkle_index, peer.merkle_hashes)
+    if not leaves:
+        return {"status": "completed", "region_id": region_id, "divergent_leaves": 0,
+                "keys_sent": 0, "keys_received": 0}
+
+    theirs = await peer.leaf_records(leaves)
+    ours = await local.leaf_records(leaves)
+    await local.apply_batch(theirs)
+    await peer.apply_batch(ours)
+    record_replication_event(settings.REGION_ID, region_id, "synced")
+    return {"status": "completed", "region_id": region_id, "divergent_leaves": len(leaves),
+            "keys_sent": len(ours), "keys_received": len(theirs)}
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare point read/write throughput of the embedded LSM engine against the
+SQL-backed KeyValueEntry model.
+
+Usage: python scripts/benchmark_storage.py [num_keys]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, KeyValueEntry
+from app.storage.engine import StorageEngine
+
+
+def timed(label, ops, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {ops / elapsed:>12,.0f} ops/sec")
+
+
+def bench_lsm(workdir, keys, reads):
+    engine = StorageEngine(os.path.join(workdir, "lsm"), node_id="bench")
+
+    def writes():
+        for key in keys:
+            engine.put(key, f"value-{key}")
+
+    def lookups():
+        for key in reads:
+            engine.get(key)
+
+    timed("lsm write", len(keys), writes)
+    engine.flush()
+    timed("lsm read", len(reads), lookups)
+    engine.close()
+
+
+def bench_sql(workdir, keys, reads):
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    def writes():
+        for key in keys:
+            with Session() as session:
+                session.add(KeyValueEntry(key=key, value=f"value-{key}", region_id="bench",
+                                          vector_clock=json.dumps({"bench": 1})))
+                session.commit()
+
+    def lookups():
+        for key in reads:
+            with Session() as session:
+                session.query(KeyValueEntry).filter_by(key=key, region_id="bench").first()
+
+    timed("sql write", len(keys), writes)
+    timed("sql read", len(reads), lookups)
+
+
+def main():
+    num_keys = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    keys = [f"key-{i:08d}" for i in range(num_keys)]
+    random.shuffle(keys)
+    reads = random.choices(keys, k=num_keys)
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_lsm(workdir, keys, reads)
+        bench_sql(workdir, keys, reads)
+
+
+if __name__ == "__main__":
+    main()